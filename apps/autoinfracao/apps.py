@@ -6,3 +6,7 @@ class AutoinfracaoConfig(AppConfig):
     name = "apps.autoinfracao"
     verbose_name = "Autos de Infração"
 
+
+    def ready(self):
+        # Invalida o cache dos catálogos (tipos/enquadramentos) quando mudam
+        from . import catalogos  # noqa: F401
@@ -0,0 +1,49 @@
+# apps/autoinfracao/catalogos.py
+"""
+Catálogos (tipos de infração e enquadramentos) em cache compartilhado.
+
+Mudam pouco e aparecem em todo formulário de AIF: ficam no cache por
+prefeitura, sob uma versão única dos catálogos que muda a cada gravação ou
+exclusão em InfracaoTipo/Enquadramento (os itens globais valem para todas
+as prefeituras).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils import cache as cache_compartilhado
+
+from .models import Enquadramento, InfracaoTipo
+
+TIMEOUT = 60 * 60
+
+
+def _chave(nome, prefeitura_id):
+    return f"catalogos:{nome}:{prefeitura_id}:{cache_compartilhado.versao('catalogos')}"
+
+
+def tipos_infracao(prefeitura_id):
+    """[{id, codigo, nome}] dos tipos ativos da prefeitura ou, se ela não tiver nenhum, dos globais."""
+    def calcular():
+        campos = ("id", "codigo", "nome")
+        locais = list(InfracaoTipo.objects.filter(prefeitura_id=prefeitura_id, ativo=True)
+                      .order_by("nome").values(*campos))
+        return locais or list(InfracaoTipo.objects.filter(prefeitura__isnull=True, ativo=True)
+                              .order_by("nome").values(*campos))
+    return cache_compartilhado.obter_ou_calcular(_chave("tipos", prefeitura_id), calcular, TIMEOUT)
+
+
+def enquadramentos(prefeitura_id):
+    """[(id, rótulo)] dos enquadramentos ativos da prefeitura, na ordem da descrição."""
+    def calcular():
+        return [(e.pk, str(e)) for e in Enquadramento.objects.filter(prefeitura_id=prefeitura_id, ativo=True)
+                .only("id", "codigo", "artigo", "descricao").order_by("descricao")]
+    return cache_compartilhado.obter_ou_calcular(_chave("enquadramentos", prefeitura_id), calcular, TIMEOUT)
+
+
+@receiver(post_save, sender=InfracaoTipo, dispatch_uid="catalogos_tipo_save")
+@receiver(post_delete, sender=InfracaoTipo, dispatch_uid="catalogos_tipo_delete")
+@receiver(post_save, sender=Enquadramento, dispatch_uid="catalogos_enq_save")
+@receiver(post_delete, sender=Enquadramento, dispatch_uid="catalogos_enq_delete")
+def _nova_versao(sender, **kwargs):
+    transaction.on_commit(lambda: cache_compartilhado.invalidar("catalogos"))
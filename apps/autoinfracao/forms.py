@@ -3,6 +3,7 @@ from django.db.models import Q
 from apps.autoinfracao.models import AutoInfracao, InfracaoTipo, Enquadramento, AutoInfracaoMultaItem, AutoInfracaoAnexo
 from apps.autoinfracao.models import Embargo, Interdicao, EmbargoAnexo, InterdicaoAnexo
 from apps.usuarios.models import Usuario
+from apps.autoinfracao import catalogos
 from django.db import models
 
 
@@ -35,6 +36,9 @@ class AutoInfracaoCreateForm(forms.ModelForm):
     fiscais = forms.ModelMultipleChoiceField(
         queryset=Usuario.objects.none(), required=False, label="Fiscais"
     )
+    # [{id, codigo, nome}] para os checkboxes e ids já vinculados ao AIF
+    tipos_opcoes = []
+    tipos_marcados = frozenset()
 
     class Meta:
         model = AutoInfracao
@@ -78,20 +82,23 @@ class AutoInfracaoCreateForm(forms.ModelForm):
         if "prazo_regularizacao_data" in self.fields:
             self.fields["prazo_regularizacao_data"].input_formats = ["%Y-%m-%d", "%d/%m/%Y"]
         if prefeitura_id:
-            local_qs = InfracaoTipo.objects.filter(prefeitura_id=prefeitura_id, ativo=True)
-            global_qs = InfracaoTipo.objects.filter(prefeitura__isnull=True, ativo=True)
-            if local_qs.exists():
-                base_qs = local_qs
-            else:
-                base_qs = global_qs
+            # Opções do catálogo em cache (catalogos.py); a queryset só valida o POST
+            self.tipos_opcoes = catalogos.tipos_infracao(prefeitura_id)
+            ids = [t["id"] for t in self.tipos_opcoes]
             # Garante que valores já vinculados permaneçam visíveis
             if getattr(self.instance, 'pk', None):
-                selecionados = list(self.instance.tipos.all().values_list('pk', flat=True))
-                if selecionados:
-                    base_qs = (base_qs | InfracaoTipo.objects.filter(pk__in=selecionados))
-            self.fields["tipos"].queryset = base_qs.order_by("nome").distinct()
+                self.tipos_marcados = set(self.instance.tipos.values_list('pk', flat=True))
+                faltando = self.tipos_marcados.difference(ids)
+                if faltando:
+                    extras = list(InfracaoTipo.objects.filter(pk__in=faltando).values("id", "codigo", "nome"))
+                    self.tipos_opcoes = sorted(self.tipos_opcoes + extras, key=lambda t: t["nome"])
+                    ids += [t["id"] for t in extras]
+            self.fields["tipos"].queryset = InfracaoTipo.objects.filter(pk__in=ids).order_by("nome")
             # Volta para SelectMultiple (estável em todos os navegadores)
             self.fields["tipos"].widget = forms.SelectMultiple(attrs={"size": "10"})
+            self.fields["tipos"].choices = [
+                (t["id"], f"{t['codigo']} — {t['nome']}" if t["codigo"] else t["nome"]) for t in self.tipos_opcoes
+            ]
             self.fields["fiscais"].queryset = Usuario.objects.filter(
                 prefeitura_id=prefeitura_id
             ).order_by("first_name", "last_name", "email")
@@ -174,9 +181,11 @@ class AutoInfracaoMultaItemForm(forms.ModelForm):
         prefeitura_id = kwargs.pop("prefeitura_id", None)
         super().__init__(*args, **kwargs)
         if prefeitura_id:
-            self.fields["enquadramento"].queryset = Enquadramento.objects.filter(
-                prefeitura_id=prefeitura_id, ativo=True
-            ).order_by("descricao")
+            campo = self.fields["enquadramento"]
+            campo.queryset = Enquadramento.objects.filter(prefeitura_id=prefeitura_id, ativo=True)
+            # opções do catálogo em cache: o select não consulta o banco a cada formulário
+            vazio = [("", campo.empty_label)] if campo.empty_label is not None else []
+            campo.choices = vazio + catalogos.enquadramentos(prefeitura_id)
         # Rótulos amigáveis
         self.fields["valor_unitario"].label = "Valor da Multa"
         self.fields["valor_homologado"].label = "Valor Homologado"
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from apps.autoinfracao.models import AutoInfracao, AutoInfracaoMultaItem, totais_itens_multa
+
+
+class Command(BaseCommand):
+    help = "Recalcula total_itens/total_homologado dos AIFs a partir dos itens de multa"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefeitura', type=int, help='ID da prefeitura (padrão: todas)')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas informa quantos AIFs estão divergentes')
+
+    def handle(self, *args, **options):
+        qs = AutoInfracao.objects.all()
+        if options.get('prefeitura'):
+            qs = qs.filter(prefeitura_id=options['prefeitura'])
+
+        calc = totais_itens_multa(AutoInfracaoMultaItem)
+        divergentes = (qs.annotate(calc_itens=calc['total_itens'], calc_homologado=calc['total_homologado'])
+                         .exclude(total_itens=F('calc_itens'), total_homologado=F('calc_homologado'))
+                         .values_list('pk', flat=True))
+        ids = list(divergentes)
+        if options['dry_run']:
+            self.stdout.write(f'{len(ids)} AIF(s) com totais divergentes.')
+            return
+
+        for i in range(0, len(ids), 1000):
+            AutoInfracao.atualizar_totais(AutoInfracao.objects.filter(pk__in=ids[i:i + 1000]))
+        self.stdout.write(self.style.SUCCESS(f'Totais recalculados: {len(ids)} AIF(s) corrigido(s).'))
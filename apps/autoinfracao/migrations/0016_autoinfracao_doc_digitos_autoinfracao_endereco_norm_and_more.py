@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autoinfracao', '0015_autoinfracao_processo'),
+        ('cadastros', '0002_rename_cad_imove_prefeitu_eab0d7_idx_cad_imovel_prefeit_4fc6bf_idx_and_more'),
+        ('denuncias', '0012_denuncia_processo'),
+        ('notificacoes', '0010_notificacao_processo'),
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('processos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='doc_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='endereco_norm',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='nome_norm',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='tel_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(fields=['prefeitura', 'doc_digitos'], name='aif_auto_in_prefeit_710065_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(fields=['prefeitura', 'tel_digitos'], name='aif_auto_in_prefeit_4ea1a3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(fields=['prefeitura', 'nome_norm'], name='aif_auto_in_prefeit_230f49_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(fields=['prefeitura', 'endereco_norm'], name='aif_auto_in_prefeit_9e7845_idx'),
+        ),
+    ]
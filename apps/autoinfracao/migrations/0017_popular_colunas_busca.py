@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from utils.texto import normalizar_texto, so_digitos
+
+
+def popular(apps, schema_editor):
+    Model = apps.get_model('autoinfracao', 'AutoInfracao')
+    # Lotes por pk (não itera e grava a mesma tabela no mesmo cursor)
+    ultimo = 0
+    while True:
+        lote = list(Model.objects.filter(pk__gt=ultimo).order_by('pk')[:2000])
+        if not lote:
+            break
+        for obj in lote:
+            obj.doc_digitos = so_digitos(obj.cpf_cnpj)[:20]
+            obj.tel_digitos = so_digitos(obj.telefone)[:20]
+            obj.nome_norm = normalizar_texto(obj.nome_razao)[:255]
+            obj.endereco_norm = normalizar_texto(" ".join(
+                str(v) for v in (obj.logradouro, obj.numero, obj.bairro, obj.cidade) if v
+            ))[:255]
+        Model.objects.bulk_update(lote, ['doc_digitos', 'tel_digitos', 'nome_norm', 'endereco_norm'])
+        ultimo = lote[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autoinfracao', '0016_autoinfracao_doc_digitos_autoinfracao_endereco_norm_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:33
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autoinfracao', '0017_popular_colunas_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(models.F('prefeitura'), django.db.models.functions.comparison.Coalesce('prazo_regularizacao_data', django.db.models.expressions.RawSQL("'9999-12-31'", []), output_field=models.DateField()), models.OrderBy(models.F('criada_em'), descending=True), models.OrderBy(models.F('id'), descending=True), name='aif_pref_prazo_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='embargo',
+            index=models.Index(fields=['prefeitura', 'criada_em', 'id'], name='aif_embargo_prefeit_e24f0c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interdicao',
+            index=models.Index(fields=['prefeitura', 'criada_em', 'id'], name='aif_interdi_prefeit_60985a_idx'),
+        ),
+    ]
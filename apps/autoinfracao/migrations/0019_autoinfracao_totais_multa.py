@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autoinfracao', '0018_autoinfracao_aif_pref_prazo_ordem_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='total_homologado',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='autoinfracao',
+            name='total_itens',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+    ]
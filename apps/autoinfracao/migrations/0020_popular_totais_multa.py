@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def popular(apps, schema_editor):
+    from apps.autoinfracao.models import totais_itens_multa
+
+    AutoInfracao = apps.get_model('autoinfracao', 'AutoInfracao')
+    AutoInfracaoMultaItem = apps.get_model('autoinfracao', 'AutoInfracaoMultaItem')
+    com_itens = AutoInfracao.objects.filter(pk__in=AutoInfracaoMultaItem.objects.values('auto_infracao_id'))
+    com_itens.update(**totais_itens_multa(AutoInfracaoMultaItem))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autoinfracao', '0019_autoinfracao_totais_multa'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autoinfracao', '0020_popular_totais_multa'),
+        ('cadastros', '0004_popular_colunas_busca'),
+        ('denuncias', '0015_denuncia_denuncias_d_prefeit_685034_idx'),
+        ('notificacoes', '0013_notificacao_notif_pref_prazo_ordem_idx'),
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('processos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='autoinfracao',
+            index=models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao_data'], name='aif_auto_in_prefeit_b023a3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='embargo',
+            index=models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao_data'], name='aif_embargo_prefeit_d8d33f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interdicao',
+            index=models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao_data'], name='aif_interdi_prefeit_16d211_idx'),
+        ),
+    ]
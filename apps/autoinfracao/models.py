@@ -1,9 +1,13 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
-from apps.prefeituras.models import Prefeitura
+from apps.prefeituras.models import EscopoPrefeitura, Prefeitura
 from apps.usuarios.models import Usuario
+from utils import metricas
 from utils.protocolo import gerar_protocolo_para_instance
+from utils.texto import incluir_campos_derivados, normalizar_texto, so_digitos
+from utils.paginacao import prazo_ordem
 from utils.choices import (
     PESSOA_TIPO_CHOICES,
     AIF_STATUS_CHOICES,
@@ -14,6 +18,7 @@ from utils.choices import (
 )
 import os
 import hashlib
+import time
 from PIL import Image
 from io import BytesIO
 from django.core.files.base import ContentFile
@@ -24,7 +29,7 @@ def upload_anexo_path_aif(instance, filename):
     return f"autoinfracao/anexos/{instance.auto_infracao.id}/{filename}"
 
 
-class InfracaoTipo(models.Model):
+class InfracaoTipo(EscopoPrefeitura, models.Model):
     """
     Catálogo de tipos de infração configurável por prefeitura.
     Se 'prefeitura' for nulo, considera-se "global" (disponível para todas).
@@ -50,7 +55,19 @@ class InfracaoTipo(models.Model):
         return lbl
 
 
-class AutoInfracao(models.Model):
+_CAMPOS_BUSCA = ("doc_digitos", "tel_digitos", "nome_norm", "endereco_norm")
+_CAMPOS_BUSCA_ORIGEM = (
+    'cpf_cnpj',
+    'telefone',
+    'nome_razao',
+    'logradouro',
+    'numero',
+    'bairro',
+    'cidade',
+)
+
+
+class AutoInfracao(EscopoPrefeitura, models.Model):
     # Identificação
     protocolo = models.CharField(max_length=64, unique=True, editable=False)
     prefeitura = models.ForeignKey(Prefeitura, on_delete=models.PROTECT)
@@ -134,11 +151,35 @@ class AutoInfracao(models.Model):
     criado_por = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, related_name="aif_criados")
     atualizada_por = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, related_name="aif_editados")
 
+    # Totais dos itens de multa (mantidos por AutoInfracaoMultaItem.save()/delete())
+    total_itens = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    total_homologado = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+
+    # Colunas normalizadas para busca (mantidas no save(); não editáveis)
+    doc_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    tel_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    nome_norm = models.CharField(max_length=255, blank=True, editable=False)
+    endereco_norm = models.CharField(max_length=255, blank=True, editable=False)
+
     class Meta:
         db_table = "aif_auto_infracao"
         verbose_name = "Auto de Infração"
         verbose_name_plural = "Autos de Infração"
         ordering = ["-criada_em"]
+        indexes = [
+            models.Index(fields=['prefeitura', 'doc_digitos']),
+            models.Index(fields=['prefeitura', 'tel_digitos']),
+            models.Index(fields=['prefeitura', 'nome_norm']),
+            models.Index(fields=['prefeitura', 'endereco_norm']),
+            # Listagem paginada por cursor: (prazo, -criada_em, -id)
+            models.Index(
+                models.F('prefeitura'), prazo_ordem('prazo_regularizacao_data'),
+                models.F('criada_em').desc(), models.F('id').desc(),
+                name='aif_pref_prazo_ordem_idx',
+            ),
+            # Relatório de prazos (casos em aberto por faixa de prazo)
+            models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao_data']),
+        ]
 
     def save(self, *args, **kwargs):
         # Normaliza lat/lng
@@ -154,6 +195,14 @@ class AutoInfracao(models.Model):
                 return None
         self.latitude = _coerce_float6(self.latitude, -90.0, 90.0)
         self.longitude = _coerce_float6(self.longitude, -180.0, 180.0)
+        # Colunas normalizadas de busca
+        self.doc_digitos = so_digitos(self.cpf_cnpj)[:20]
+        self.tel_digitos = so_digitos(self.telefone)[:20]
+        self.nome_norm = normalizar_texto(self.nome_razao)[:255]
+        self.endereco_norm = normalizar_texto(" ".join(
+            str(v) for v in (self.logradouro, self.numero, self.bairro, self.cidade) if v
+        ))[:255]
+        incluir_campos_derivados(kwargs, _CAMPOS_BUSCA_ORIGEM, _CAMPOS_BUSCA)
         if not self.pk and not self.protocolo:
             self.protocolo = gerar_protocolo_para_instance(self, 'AIF')
         super().save(*args, **kwargs)
@@ -163,25 +212,17 @@ class AutoInfracao(models.Model):
 
     @property
     def total_multa(self):
-        total = 0
-        for item in getattr(self, 'multas', []).all() if hasattr(self, 'multas') else []:
-            # Prevalece valor homologado; se ausente, usa valor da multa
-            val = item.valor_homologado if item.valor_homologado is not None else item.valor_unitario
-            try:
-                total += (val or 0)
-            except Exception:
-                total += 0
-        return total
+        # Soma dos itens (prevalece o valor homologado; se ausente, o valor da multa)
+        return self.total_homologado
 
     @property
     def total_infracao_itens(self):
-        total = 0
-        for item in getattr(self, 'multas', []).all() if hasattr(self, 'multas') else []:
-            try:
-                total += (item.valor_unitario or 0)
-            except Exception:
-                total += 0
-        return total
+        return self.total_itens
+
+    @classmethod
+    def atualizar_totais(cls, queryset):
+        """Recalcula total_itens/total_homologado em um único UPDATE a partir dos itens."""
+        return queryset.update(**totais_itens_multa(AutoInfracaoMultaItem))
 
     @property
     def dias_restantes(self):
@@ -214,7 +255,7 @@ def upload_anexo_path_interdicao(instance, filename):
     return f"autoinfracao/interdicoes/{instance.interdicao.id}/{filename}"
 
 
-class Embargo(models.Model):
+class Embargo(EscopoPrefeitura, models.Model):
     protocolo = models.CharField(max_length=64, unique=True, editable=False)
     prefeitura = models.ForeignKey(Prefeitura, on_delete=models.PROTECT)
     auto_infracao = models.ForeignKey('AutoInfracao', on_delete=models.PROTECT, related_name='embargos')
@@ -237,6 +278,10 @@ class Embargo(models.Model):
         verbose_name = 'Embargo'
         verbose_name_plural = 'Embargos'
         ordering = ['-criada_em']
+        indexes = [
+            models.Index(fields=['prefeitura', 'criada_em', 'id']),
+            models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao_data']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.pk and not self.protocolo:
@@ -303,6 +348,8 @@ class EmbargoAnexo(models.Model):
         if not self.arquivo:
             return
         try:
+            t0 = time.perf_counter()
+            bytes_recebidos = self.arquivo.size
             MAX_KB = 100
             TARGET_KB = 95
             def _encode(img, quality):
@@ -340,6 +387,7 @@ class EmbargoAnexo(models.Model):
             new_name = f"{base}.jpg"
             self.arquivo.save(new_name, ContentFile(best), save=False)
             self.otimizada = True
+            metricas.foto_processada("embargo", time.perf_counter() - t0, bytes_recebidos, len(best))
 
             # hash
             hash_obj = hashlib.sha256()
@@ -352,7 +400,7 @@ class EmbargoAnexo(models.Model):
             print(f"[WARN] Falha ao processar anexo de Embargo: {e}")
 
 
-class Interdicao(models.Model):
+class Interdicao(EscopoPrefeitura, models.Model):
     protocolo = models.CharField(max_length=64, unique=True, editable=False)
     prefeitura = models.ForeignKey(Prefeitura, on_delete=models.PROTECT)
     auto_infracao = models.ForeignKey('AutoInfracao', on_delete=models.PROTECT, related_name='interdicoes')
@@ -375,6 +423,10 @@ class Interdicao(models.Model):
         verbose_name = 'Interdição'
         verbose_name_plural = 'Interdições'
         ordering = ['-criada_em']
+        indexes = [
+            models.Index(fields=['prefeitura', 'criada_em', 'id']),
+            models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao_data']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.pk and not self.protocolo:
@@ -441,6 +493,8 @@ class InterdicaoAnexo(models.Model):
         if not self.arquivo:
             return
         try:
+            t0 = time.perf_counter()
+            bytes_recebidos = self.arquivo.size
             MAX_KB = 100
             TARGET_KB = 95
             def _encode(img, quality):
@@ -478,6 +532,7 @@ class InterdicaoAnexo(models.Model):
             new_name = f"{base}.jpg"
             self.arquivo.save(new_name, ContentFile(best), save=False)
             self.otimizada = True
+            metricas.foto_processada("interdicao", time.perf_counter() - t0, bytes_recebidos, len(best))
 
             # hash
             hash_obj = hashlib.sha256()
@@ -524,6 +579,8 @@ class AutoInfracaoAnexo(models.Model):
         if not self.arquivo:
             return
         try:
+            t0 = time.perf_counter()
+            bytes_recebidos = self.arquivo.size
             MAX_KB = 100
             TARGET_KB = 95
             def _encode(img, quality):
@@ -561,6 +618,7 @@ class AutoInfracaoAnexo(models.Model):
             new_name = f"{base}.jpg"
             self.arquivo.save(new_name, ContentFile(best), save=False)
             self.otimizada = True
+            metricas.foto_processada("autoinfracao", time.perf_counter() - t0, bytes_recebidos, len(best))
 
             # hash
             hash_obj = hashlib.sha256()
@@ -573,7 +631,7 @@ class AutoInfracaoAnexo(models.Model):
             print(f"[WARN] Falha ao processar anexo AIF: {e}")
 
 
-class Enquadramento(models.Model):
+class Enquadramento(EscopoPrefeitura, models.Model):
     """ Catálogo de enquadramentos legais/multas por prefeitura (ou global). """
     prefeitura = models.ForeignKey(Prefeitura, on_delete=models.CASCADE, null=True, blank=True)
     codigo = models.CharField(max_length=30, blank=True)
@@ -595,6 +653,24 @@ class Enquadramento(models.Model):
         return " - ".join([p for p in parts if p])
 
 
+def totais_itens_multa(item_model):
+    """Expressões (subqueries correlacionadas) de total_itens e total_homologado por AIF."""
+    dec0 = models.Value(0, output_field=models.DecimalField(max_digits=12, decimal_places=2))
+    itens = item_model.objects.filter(auto_infracao_id=models.OuterRef('pk')).order_by().values('auto_infracao_id')
+
+    def _soma(expr):
+        return Coalesce(
+            models.Subquery(itens.annotate(s=models.Sum(expr)).values('s')[:1],
+                            output_field=models.DecimalField(max_digits=12, decimal_places=2)),
+            dec0,
+        )
+
+    return {
+        'total_itens': _soma('valor_unitario'),
+        'total_homologado': _soma(Coalesce('valor_homologado', 'valor_unitario')),
+    }
+
+
 class AutoInfracaoMultaItem(models.Model):
     auto_infracao = models.ForeignKey(AutoInfracao, on_delete=models.CASCADE, related_name="multas")
     enquadramento = models.ForeignKey(Enquadramento, on_delete=models.PROTECT)
@@ -619,7 +695,21 @@ class AutoInfracaoMultaItem(models.Model):
             self.valor_total = (self.valor_homologado or 0)
         except Exception:
             self.valor_total = 0
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._atualizar_totais_aif()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            self._atualizar_totais_aif()
+        return resultado
+
+    def _atualizar_totais_aif(self):
+        AutoInfracao.atualizar_totais(AutoInfracao.objects.filter(pk=self.auto_infracao_id))
+        # Mantém coerente o AIF já carregado (ex.: item obtido por obj.multas)
+        if AutoInfracaoMultaItem.auto_infracao.is_cached(self):
+            self.auto_infracao.refresh_from_db(fields=['total_itens', 'total_homologado'])
 
     def __str__(self):
         return f"{self.enquadramento} = {self.valor_total} (homologado)"
@@ -0,0 +1,75 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+
+from utils.testes import ConsultasTestMixin, um_caso
+
+from .models import AutoInfracao
+
+
+class ConsultasAutoInfracaoTests(ConsultasTestMixin, TestCase):
+    """Número de consultas das telas de AIF e medidas não cresce com a quantidade de dados."""
+
+    def test_listar(self):
+        # embargos e interdições de cada linha vêm em prefetch
+        self.assertConsultasConstantes(lambda casos: reverse("autoinfracao:listar"), limite=10)
+
+    def test_medidas_listar(self):
+        self.assertConsultasConstantes(lambda casos: reverse("autoinfracao:medidas_listar"), limite=10)
+
+    def test_relatorio_arrecadacao(self):
+        self.assertConsultasConstantes(lambda casos: reverse("autoinfracao:relatorio_arrecadacao"), limite=9)
+
+    def test_relatorio_arrecadacao_print(self):
+        self.assertConsultasConstantes(lambda casos: reverse("autoinfracao:relatorio_arrecadacao_print"), limite=9)
+
+    def test_detalhe(self):
+        # itens de multa com o enquadramento em prefetch
+        self.assertConsultasConstantes(lambda caso: reverse("autoinfracao:detalhe", args=[caso["aif"].pk]),
+                                       limite=18, preparar=um_caso)
+
+    def test_imprimir(self):
+        self.assertConsultasConstantes(lambda caso: reverse("autoinfracao:imprimir", args=[caso["aif"].pk]),
+                                       limite=21, preparar=um_caso)
+
+    def test_editar(self):
+        self.assertConsultasConstantes(lambda caso: reverse("autoinfracao:editar", args=[caso["aif"].pk]),
+                                       limite=15, preparar=um_caso)
+
+    def test_embargo_detalhe(self):
+        self.assertConsultasConstantes(lambda caso: reverse("autoinfracao:embargo_detalhe", args=[caso["embargo"].pk]),
+                                       limite=10, preparar=um_caso)
+
+    def test_interdicao_detalhe(self):
+        self.assertConsultasConstantes(
+            lambda caso: reverse("autoinfracao:interdicao_detalhe", args=[caso["interdicao"].pk]),
+            limite=10, preparar=um_caso,
+        )
+
+
+class DescontoHomologacaoTests(ConsultasTestMixin, TestCase):
+    """Desconto global: itens e totais do AIF gravados juntos ou nenhum."""
+
+    def setUp(self):
+        super().setUp()
+        self.aif = um_caso(self.prefeitura, self.usuario, 2)["aif"]
+        self.url = reverse("autoinfracao:editar", args=[self.aif.pk])
+        self.dados = {"action": "apply_discount", "desconto_percent": "10", "justificativa": "Pagamento à vista"}
+
+    def test_aplica_desconto(self):
+        self.client.post(self.url, self.dados)
+        self.aif.refresh_from_db()
+        self.assertEqual(list(self.aif.multas.values_list("valor_homologado", flat=True)), [Decimal("90.00")] * 2)
+        self.assertEqual((self.aif.total_homologado, self.aif.valor_multa_homologado),
+                         (Decimal("180.00"), Decimal("180.00")))
+
+    def test_falha_nos_totais_desfaz_os_itens(self):
+        with mock.patch.object(AutoInfracao, "atualizar_totais", side_effect=DatabaseError), \
+                self.assertRaises(DatabaseError):
+            self.client.post(self.url, self.dados)
+        self.aif.refresh_from_db()
+        self.assertEqual(list(self.aif.multas.values_list("valor_homologado", flat=True)), [Decimal("100.00")] * 2)
+        self.assertEqual(self.aif.total_homologado, Decimal("200.00"))
@@ -1,8 +1,7 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q, Sum, Count, Value, DecimalField, OuterRef, Subquery
-from django.db.models.functions import TruncMonth, Coalesce, Greatest
+from django.db import transaction
+from django.db.models import Prefetch, Value
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from datetime import timedelta
@@ -30,74 +29,75 @@ from apps.denuncias.models import Denuncia, DenunciaHistorico
 from apps.usuarios.models import Usuario
 from apps.cadastros.models import Pessoa, Imovel
 from apps.usuarios.audit import log_event
+from apps.busca.protocolos import ids_por_prefixo, objeto_id_exato
+from apps.relatorios import arrecadacao
+from .filtros import filtrar_autos
+from utils.texto import normalizar_texto, prefixo_q, so_digitos
+from utils.paginacao import KeysetPaginator, prazo_ordem
+from utils.replica import le_da_replica
 from django.core.files.base import ContentFile
 import os
 
 
 
 def _get_prefeitura_id(request):
-    return request.session.get("prefeitura_id")
+    return request.prefeitura_id
+
+
+def _com_itens_multa(qs):
+    """AIFs com os itens de multa (e enquadramentos) já carregados para obj.multas.all no template."""
+    return qs.prefetch_related(
+        Prefetch("multas", queryset=AutoInfracaoMultaItem.objects.select_related("enquadramento"))
+    )
 
 
 @login_required
+@le_da_replica
 def listar(request):
     prefeitura_id = _get_prefeitura_id(request)
     if not prefeitura_id:
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    qs = AutoInfracao.objects.filter(prefeitura_id=prefeitura_id).order_by("-criada_em")
-
-    # filtros básicos
-    protocolo = request.GET.get("protocolo", "").strip()
-    cpf_cnpj = request.GET.get("cpf_cnpj", "").strip()
-    nome_razao = request.GET.get("nome_razao", "").strip()
-    endereco = request.GET.get("endereco", "").strip()
-    status = request.GET.get("status", "").strip()
+    qs, filtros = filtrar_autos(prefeitura_id, request.GET)
 
-    if protocolo:
-        qs = qs.filter(protocolo__icontains=protocolo)
-    if cpf_cnpj:
-        qs = qs.filter(cpf_cnpj__icontains=cpf_cnpj)
-    if nome_razao:
-        qs = qs.filter(nome_razao__icontains=nome_razao)
-    if endereco:
-        qs = qs.filter(
-            Q(logradouro__icontains=endereco)
-            | Q(numero__icontains=endereco)
-            | Q(bairro__icontains=endereco)
-            | Q(cidade__icontains=endereco)
-        )
-    if status:
-        qs = qs.filter(status=status)
-
-    # Ordenação: crescente por dias de prazo (negativos primeiro, sem prazo no final)
-    itens = list(qs)
-    def _key(a):
-        d = getattr(a, 'dias_restantes', None)
-        return d if d is not None else 10**9
-    itens.sort(key=_key)
-    page_obj = Paginator(itens, 20).get_page(request.GET.get("page"))
+    # Ordenação: crescente por prazo (vencidos primeiro, sem prazo no final), paginada por cursor
+    qs = qs.annotate(prazo_ordem=prazo_ordem("prazo_regularizacao_data")).prefetch_related("embargos", "interdicoes")
+    paginator = KeysetPaginator(qs, 20, ordenacao=("prazo_ordem", "-criada_em", "-id"), contagem="aproximada")
+    page_obj = paginator.get_page(request.GET.get("cursor"))
     params = request.GET.copy()
+    params.pop('cursor', None)
     params.pop('page', None)
     querystring = params.urlencode()
 
     context = {
         "page_obj": page_obj,
-        "filtros": {
-            "protocolo": protocolo,
-            "cpf_cnpj": cpf_cnpj,
-            "nome_razao": nome_razao,
-            "endereco": endereco,
-            "status": status,
-        },
+        "filtros": filtros,
         "status_choices": AutoInfracao._meta.get_field("status").choices,
         "querystring": querystring,
     }
     return render(request, "autoinfracao/listar_autoinfracao.html", context)
 
 
+def _arrecadacao_contexto(request, prefeitura_id):
+    """Parâmetros do GET + resultado (em cache) do relatório de arrecadação."""
+    d_ini, d_fim, status_list, forma_list = arrecadacao.parametros(request.GET)
+
+    # Tela, impressão e CSV compartilham o mesmo resultado (apps.relatorios)
+    dados = arrecadacao.relatorio(prefeitura_id, d_ini, d_fim, status_list, forma_list)
+
+    from utils.choices import PAGAMENTO_FORMA_CHOICES
+    return {
+        'inicio': d_ini, 'fim': d_fim,
+        'status_sel': status_list, 'forma_sel': forma_list,
+        'status_choices': AutoInfracao._meta.get_field('status').choices,
+        'forma_choices': PAGAMENTO_FORMA_CHOICES,
+        **dados,
+    }
+
+
 @login_required
+@le_da_replica
 def relatorio_arrecadacao(request):
     """Arrecadação AIF mensal: Multa aplicada, Homologada e Paga.
     Filtros: período (ano corrente padrão), status (multi), forma_pagamento (multi para pagos). CSV disponível.
@@ -107,164 +107,20 @@ def relatorio_arrecadacao(request):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    def _parse_date(s):
-        if not s:
-            return None
-        s = s.strip()
-        for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
-            try:
-                return timezone.datetime.strptime(s, fmt).date()
-            except Exception:
-                pass
-        return None
-
-    today = timezone.localdate()
-    year_start = today.replace(month=1, day=1)
-    d_ini = _parse_date(request.GET.get("inicio")) or year_start
-    d_fim = _parse_date(request.GET.get("fim")) or today
-    if d_ini > d_fim:
-        d_ini, d_fim = d_fim, d_ini
-    dt_ini = timezone.make_aware(timezone.datetime(d_ini.year, d_ini.month, d_ini.day, 0, 0))
-    dt_fim_ex = timezone.make_aware(timezone.datetime(d_fim.year, d_fim.month, d_fim.day, 0, 0)) + timezone.timedelta(days=1)
-
-    # Filtros extras
-    status_list = [s for s in request.GET.getlist('status') if s]
-    forma_list = [f for f in request.GET.getlist('forma') if f]
-
-    base = AutoInfracao.objects.filter(prefeitura_id=prefeitura_id)
-    if status_list:
-        base = base.filter(status__in=status_list)
-
-    # Aplicada (por criada_em) — usa valor_infracao; se nulo, cai no somatório dos itens de multa
-    aplicada_qs = base.filter(criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex)
-    dec0 = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
-    items_sum_sq = (
-        AutoInfracaoMultaItem.objects
-        .filter(auto_infracao_id=OuterRef('pk'))
-        .values('auto_infracao_id')
-        .annotate(s=Coalesce(Sum('valor_unitario'), dec0))
-        .values('s')[:1]
-    )
-    aplicada_qs = aplicada_qs.annotate(
-        valor_items=Subquery(items_sum_sq, output_field=DecimalField(max_digits=12, decimal_places=2)),
-        valor_aplicado=Greatest(
-            Coalesce('valor_infracao', dec0),
-            Coalesce('valor_items', dec0),
-            Coalesce('valor_multa_homologado', dec0)
-        )
-    )
-    aplicada_month = (
-        aplicada_qs
-        .annotate(m=TruncMonth('criada_em'))
-        .values('m')
-        .annotate(v=Coalesce(Sum('valor_aplicado'), Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))), q=Count('id'))
-    )
-    applied_map = { (r['m'].year, r['m'].month): { 'v': r['v'] or 0, 'q': r['q'] } for r in aplicada_month }
-
-    # Homologada (por homologado_em se existir; senão criada_em), apenas com valor_multa_homologado definido
-    hom_filter = Q(valor_multa_homologado__isnull=False) & (
-        Q(homologado_em__gte=dt_ini, homologado_em__lt=dt_fim_ex) |
-        Q(homologado_em__isnull=True, criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex)
-    )
-    homolog_qs = base.filter(hom_filter)
-    homolog_month = (
-        homolog_qs
-        .annotate(ref_dt=Coalesce('homologado_em', 'criada_em'))
-        .annotate(m=TruncMonth('ref_dt'))
-        .values('m')
-        .annotate(v=Coalesce(Sum('valor_multa_homologado'), Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))), q=Count('id'))
-    )
-    homolog_map = { (r['m'].year, r['m'].month): { 'v': r['v'] or 0, 'q': r['q'] } for r in homolog_month }
-
-    # Pago (por pago_em; pago=True)
-    pagos_qs = base.filter(pago=True, pago_em__isnull=False, pago_em__gte=d_ini, pago_em__lte=d_fim)
-    if forma_list:
-        pagos_qs = pagos_qs.filter(forma_pagamento__in=forma_list)
-    pagos_month = (
-        pagos_qs
-        .annotate(m=TruncMonth('pago_em'))
-        .values('m')
-        .annotate(v=Coalesce(Sum('valor_pago'), Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))), q=Count('id'))
-    )
-    pagos_map = { (r['m'].year, r['m'].month): { 'v': r['v'] or 0, 'q': r['q'] } for r in pagos_month }
-
-    # Linha do tempo mensal
-    months = []
-    cur = timezone.datetime(d_ini.year, d_ini.month, 1)
-    end = timezone.datetime(d_fim.year, d_fim.month, 1)
-    while cur <= end:
-        months.append((cur.year, cur.month))
-        cur = timezone.datetime(cur.year + (1 if cur.month == 12 else 0), 1 if cur.month == 12 else cur.month + 1, 1)
-
-    # Séries e tabela
-    series_labels = [f"{y}-{m:02d}" for (y, m) in months]
-    serie_apl = []
-    serie_hom = []
-    serie_pag = []
-    table_rows = []
-    total_apl_v = Decimal('0'); total_apl_q = 0
-    total_hom_v = Decimal('0'); total_hom_q = 0
-    total_pag_v = Decimal('0'); total_pag_q = 0
-
-    for (y, m) in months:
-        apl = applied_map.get((y, m), {'v': Decimal('0'), 'q': 0})
-        hom = homolog_map.get((y, m), {'v': Decimal('0'), 'q': 0})
-        pag = pagos_map.get((y, m), {'v': Decimal('0'), 'q': 0})
-        serie_apl.append(float(apl['v'] or 0))
-        serie_hom.append(float(hom['v'] or 0))
-        serie_pag.append(float(pag['v'] or 0))
-        total_apl_v += Decimal(apl['v'] or 0); total_apl_q += apl['q'] or 0
-        total_hom_v += Decimal(hom['v'] or 0); total_hom_q += hom['q'] or 0
-        total_pag_v += Decimal(pag['v'] or 0); total_pag_q += pag['q'] or 0
-        ticket = (Decimal(pag['v'] or 0) / pag['q']) if (pag['q'] or 0) > 0 else Decimal('0')
-        table_rows.append({
-            'mes': f"{y}-{m:02d}",
-            'apl_q': apl['q'] or 0, 'apl_v': apl['v'] or 0,
-            'hom_q': hom['q'] or 0, 'hom_v': hom['v'] or 0,
-            'pag_q': pag['q'] or 0, 'pag_v': pag['v'] or 0,
-            'ticket': ticket,
-        })
+    ctx = _arrecadacao_contexto(request, prefeitura_id)
 
     # CSV
     if (request.GET.get('format') or '').lower() == 'csv':
         resp = HttpResponse(content_type='text/csv; charset=utf-8')
         resp['Content-Disposition'] = 'attachment; filename="aif_arrecadacao_mensal.csv"'
-        w = csv.writer(resp)
-        w.writerow(["Periodo", d_ini.isoformat(), d_fim.isoformat()])
-        if status_list:
-            w.writerow(["Status", ",".join(status_list)])
-        if forma_list:
-            w.writerow(["Formas", ",".join(forma_list)])
-        w.writerow([])
-        w.writerow(["Mes", "Qtd Aplicados", "Valor Multa", "Qtd Homologados", "Valor Homologado", "Qtd Pagos", "Valor Pago", "Ticket Medio Pago"])
-        for r in table_rows:
-            w.writerow([
-                r['mes'], r['apl_q'], f"{Decimal(r['apl_v']):.2f}", r['hom_q'], f"{Decimal(r['hom_v']):.2f}", r['pag_q'], f"{Decimal(r['pag_v']):.2f}", f"{Decimal(r['ticket']):.2f}"
-            ])
-        w.writerow([])
-        tk = (total_pag_v / total_pag_q) if total_pag_q > 0 else Decimal('0')
-        w.writerow(["Totais", total_apl_q, f"{total_apl_v:.2f}", total_hom_q, f"{total_hom_v:.2f}", total_pag_q, f"{total_pag_v:.2f}", f"{tk:.2f}"])
+        arrecadacao.escrever_csv(csv.writer(resp), ctx, ctx['inicio'], ctx['fim'], ctx['status_sel'], ctx['forma_sel'])
         return resp
 
-    status_choices = AutoInfracao._meta.get_field('status').choices
-    from utils.choices import PAGAMENTO_FORMA_CHOICES
-    ctx = {
-        'inicio': d_ini, 'fim': d_fim,
-        'status_sel': status_list, 'forma_sel': forma_list,
-        'status_choices': status_choices, 'forma_choices': PAGAMENTO_FORMA_CHOICES,
-        'labels': series_labels, 'serie_apl': serie_apl, 'serie_hom': serie_hom, 'serie_pag': serie_pag,
-        'rows': table_rows,
-        'totais': {
-            'apl_q': total_apl_q, 'apl_v': total_apl_v,
-            'hom_q': total_hom_q, 'hom_v': total_hom_v,
-            'pag_q': total_pag_q, 'pag_v': total_pag_v,
-            'ticket': (total_pag_v / total_pag_q) if total_pag_q > 0 else Decimal('0'),
-        }
-    }
     return render(request, "autoinfracao/relatorio_arrecadacao.html", ctx)
 
 
 @login_required
+@le_da_replica
 def relatorio_arrecadacao_print(request):
     """Versão de impressão do relatório de Arrecadação AIF (mensal)."""
     prefeitura_id = _get_prefeitura_id(request)
@@ -272,135 +128,7 @@ def relatorio_arrecadacao_print(request):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    # Reaproveita a mesma lógica do relatório web (sem CSV)
-    # Copiamos o essencial para montar o mesmo contexto 'ctx'
-    def _parse_date(s):
-        if not s:
-            return None
-        s = s.strip()
-        for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
-            try:
-                return timezone.datetime.strptime(s, fmt).date()
-            except Exception:
-                pass
-        return None
-
-    today = timezone.localdate()
-    year_start = today.replace(month=1, day=1)
-    d_ini = _parse_date(request.GET.get("inicio")) or year_start
-    d_fim = _parse_date(request.GET.get("fim")) or today
-    if d_ini > d_fim:
-        d_ini, d_fim = d_fim, d_ini
-    dt_ini = timezone.make_aware(timezone.datetime(d_ini.year, d_ini.month, d_ini.day, 0, 0))
-    dt_fim_ex = timezone.make_aware(timezone.datetime(d_fim.year, d_fim.month, d_fim.day, 0, 0)) + timezone.timedelta(days=1)
-
-    status_list = [s for s in request.GET.getlist('status') if s]
-    forma_list = [f for f in request.GET.getlist('forma') if f]
-
-    base = AutoInfracao.objects.filter(prefeitura_id=prefeitura_id)
-    if status_list:
-        base = base.filter(status__in=status_list)
-
-    aplicada_qs = base.filter(criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex)
-    dec0 = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
-    items_sum_sq = (
-        AutoInfracaoMultaItem.objects
-        .filter(auto_infracao_id=OuterRef('pk'))
-        .values('auto_infracao_id')
-        .annotate(s=Coalesce(Sum('valor_unitario'), dec0))
-        .values('s')[:1]
-    )
-    aplicada_qs = aplicada_qs.annotate(
-        valor_items=Subquery(items_sum_sq, output_field=DecimalField(max_digits=12, decimal_places=2)),
-        valor_aplicado=Greatest(
-            Coalesce('valor_infracao', dec0),
-            Coalesce('valor_items', dec0),
-            Coalesce('valor_multa_homologado', dec0)
-        )
-    )
-    aplicada_month = (
-        aplicada_qs
-        .annotate(m=TruncMonth('criada_em'))
-        .values('m')
-        .annotate(v=Coalesce(Sum('valor_aplicado'), Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))), q=Count('id'))
-    )
-    applied_map = { (r['m'].year, r['m'].month): { 'v': r['v'] or 0, 'q': r['q'] } for r in aplicada_month }
-
-    hom_filter = Q(valor_multa_homologado__isnull=False) & (
-        Q(homologado_em__gte=dt_ini, homologado_em__lt=dt_fim_ex) |
-        Q(homologado_em__isnull=True, criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex)
-    )
-    homolog_qs = base.filter(hom_filter)
-    homolog_month = (
-        homolog_qs
-        .annotate(ref_dt=Coalesce('homologado_em', 'criada_em'))
-        .annotate(m=TruncMonth('ref_dt'))
-        .values('m')
-        .annotate(v=Coalesce(Sum('valor_multa_homologado'), Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))), q=Count('id'))
-    )
-    homolog_map = { (r['m'].year, r['m'].month): { 'v': r['v'] or 0, 'q': r['q'] } for r in homolog_month }
-
-    pagos_qs = base.filter(pago=True, pago_em__isnull=False, pago_em__gte=d_ini, pago_em__lte=d_fim)
-    if forma_list:
-        pagos_qs = pagos_qs.filter(forma_pagamento__in=forma_list)
-    pagos_month = (
-        pagos_qs
-        .annotate(m=TruncMonth('pago_em'))
-        .values('m')
-        .annotate(v=Coalesce(Sum('valor_pago'), Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))), q=Count('id'))
-    )
-    pagos_map = { (r['m'].year, r['m'].month): { 'v': r['v'] or 0, 'q': r['q'] } for r in pagos_month }
-
-    months = []
-    cur = timezone.datetime(d_ini.year, d_ini.month, 1)
-    end = timezone.datetime(d_fim.year, d_fim.month, 1)
-    while cur <= end:
-        months.append((cur.year, cur.month))
-        cur = timezone.datetime(cur.year + (1 if cur.month == 12 else 0), 1 if cur.month == 12 else cur.month + 1, 1)
-
-    series_labels = [f"{y}-{m:02d}" for (y, m) in months]
-    serie_apl = []
-    serie_hom = []
-    serie_pag = []
-    table_rows = []
-    total_apl_v = Decimal('0'); total_apl_q = 0
-    total_hom_v = Decimal('0'); total_hom_q = 0
-    total_pag_v = Decimal('0'); total_pag_q = 0
-
-    for (y, m) in months:
-        apl = applied_map.get((y, m), {'v': Decimal('0'), 'q': 0})
-        hom = homolog_map.get((y, m), {'v': Decimal('0'), 'q': 0})
-        pag = pagos_map.get((y, m), {'v': Decimal('0'), 'q': 0})
-        serie_apl.append(float(apl['v'] or 0))
-        serie_hom.append(float(hom['v'] or 0))
-        serie_pag.append(float(pag['v'] or 0))
-        total_apl_v += Decimal(apl['v'] or 0); total_apl_q += apl['q'] or 0
-        total_hom_v += Decimal(hom['v'] or 0); total_hom_q += hom['q'] or 0
-        total_pag_v += Decimal(pag['v'] or 0); total_pag_q += pag['q'] or 0
-        ticket = (Decimal(pag['v'] or 0) / pag['q']) if (pag['q'] or 0) > 0 else Decimal('0')
-        table_rows.append({
-            'mes': f"{y}-{m:02d}",
-            'apl_q': apl['q'] or 0, 'apl_v': apl['v'] or 0,
-            'hom_q': hom['q'] or 0, 'hom_v': hom['v'] or 0,
-            'pag_q': pag['q'] or 0, 'pag_v': pag['v'] or 0,
-            'ticket': ticket,
-        })
-
-    status_choices = AutoInfracao._meta.get_field('status').choices
-    from utils.choices import PAGAMENTO_FORMA_CHOICES
-    ctx = {
-        'inicio': d_ini, 'fim': d_fim,
-        'status_sel': status_list, 'forma_sel': forma_list,
-        'status_choices': status_choices, 'forma_choices': PAGAMENTO_FORMA_CHOICES,
-        'labels': series_labels, 'serie_apl': serie_apl, 'serie_hom': serie_hom, 'serie_pag': serie_pag,
-        'rows': table_rows,
-        'totais': {
-            'apl_q': total_apl_q, 'apl_v': total_apl_v,
-            'hom_q': total_hom_q, 'hom_v': total_hom_v,
-            'pag_q': total_pag_q, 'pag_v': total_pag_v,
-            'ticket': (total_pag_v / total_pag_q) if total_pag_q > 0 else Decimal('0'),
-        }
-    }
+    ctx = _arrecadacao_contexto(request, prefeitura_id)
     return render(request, "autoinfracao/imprimir_arrecadacao.html", ctx)
 
 
@@ -518,9 +246,7 @@ def cadastrar(request):
 # Helpers de detecção de vínculos (AIF)
 # ---------------------------------------------
 def _norm_doc(doc: str) -> str:
-    if not doc:
-        return ""
-    return "".join([c for c in str(doc) if c.isdigit()])
+    return so_digitos(doc)
 
 
 def _find_pessoa_candidata(prefeitura_id: int, cpf_cnpj: str):
@@ -586,7 +312,7 @@ def confirmar_vinculos(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(AutoInfracao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(AutoInfracao.tenant(request), pk=pk)
 
     # Se já possuir vínculos (ou origem), não confirmar
     if obj.pessoa_id or obj.imovel_id or obj.denuncia_id or obj.notificacao_id:
@@ -668,20 +394,16 @@ def editar(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(AutoInfracao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(AutoInfracao.tenant(request), pk=pk)
 
     # exclusão simples de item via GET
     del_id = request.GET.get("del_item")
     if del_id:
-        mi = AutoInfracaoMultaItem.objects.filter(pk=del_id, auto_infracao=obj).first()
+        mi = obj.multas.filter(pk=del_id).first()
         if mi:
             mi.delete()
-            # atualizar total homologado do AIF após remoção
-            total = sum([
-                (it.valor_homologado if it.valor_homologado is not None else it.valor_unitario) or Decimal('0')
-                for it in obj.multas.all()
-            ])
-            obj.valor_multa_homologado = total
+            # atualizar total homologado do AIF após remoção (totais já recalculados pelo item)
+            obj.valor_multa_homologado = obj.total_homologado
             obj.atualizada_por = request.user
             obj.save(update_fields=["valor_multa_homologado", "atualizada_por", "atualizada_em"])
             log_event(request, 'UPDATE', instance=obj, extra={'remove_item': del_id})
@@ -716,11 +438,7 @@ def editar(request, pk):
                 it.save()
                 # atualizar total homologado do AIF
                 try:
-                    total = sum([
-                        (mi.valor_homologado if mi.valor_homologado is not None else mi.valor_unitario) or Decimal('0')
-                        for mi in obj.multas.all()
-                    ])
-                    obj.valor_multa_homologado = total
+                    obj.valor_multa_homologado = obj.total_homologado
                     obj.atualizada_por = request.user
                     obj.save(update_fields=["valor_multa_homologado", "atualizada_por", "atualizada_em"])
                 except Exception:
@@ -753,11 +471,7 @@ def editar(request, pk):
             it.valor_homologado = dh
             it.save()
             # atualizar total homologado do AIF
-            total = sum([
-                (mi.valor_homologado if mi.valor_homologado is not None else mi.valor_unitario) or Decimal('0')
-                for mi in obj.multas.all()
-            ])
-            obj.valor_multa_homologado = total
+            obj.valor_multa_homologado = obj.total_homologado
             obj.homologado_por = request.user
             obj.homologado_em = timezone.localtime()
             obj.atualizada_por = request.user
@@ -782,18 +496,22 @@ def editar(request, pk):
                 messages.error(request, "Percentual deve estar entre 0 e 100.")
                 return redirect(request.path)
             fator = (Decimal('100') - p) / Decimal('100')
-            total = Decimal('0')
-            for it in obj.multas.all():
+            itens = list(obj.multas.all())
+            for it in itens:
                 base = it.valor_unitario or Decimal('0')
-                novo = (base * fator).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                it.valor_homologado = novo
-                it.save()
-                total += novo
-            obj.valor_multa_homologado = total
-            obj.homologado_por = request.user
-            obj.homologado_em = timezone.localtime()
-            obj.atualizada_por = request.user
-            obj.save(update_fields=["valor_multa_homologado", "homologado_por", "homologado_em", "atualizada_por", "atualizada_em"])
+                it.valor_homologado = (base * fator).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                it.valor_total = it.valor_homologado
+            # Um UPDATE em lote para os itens e um para os totais do AIF, na
+            # mesma transação (como AutoInfracaoMultaItem.save/delete)
+            with transaction.atomic():
+                AutoInfracaoMultaItem.objects.bulk_update(itens, ["valor_homologado", "valor_total"])
+                AutoInfracao.atualizar_totais(AutoInfracao.objects.filter(pk=obj.pk))
+                obj.refresh_from_db(fields=["total_itens", "total_homologado"])
+                obj.valor_multa_homologado = obj.total_homologado
+                obj.homologado_por = request.user
+                obj.homologado_em = timezone.localtime()
+                obj.atualizada_por = request.user
+                obj.save(update_fields=["valor_multa_homologado", "homologado_por", "homologado_em", "atualizada_por", "atualizada_em"])
             messages.success(request, f"Desconto de {p}% aplicado. Total homologado atualizado.")
             return redirect(request.path)
         elif action == "add_aif_anexo":
@@ -898,18 +616,15 @@ def editar(request, pk):
         anexo_aif_form = AutoInfracaoAnexoForm()
 
     anexos_existentes = obj.anexos.all().order_by("-criada_em")
-    try:
-        tipos_qs = form.fields["tipos"].queryset
-    except Exception:
-        tipos_qs = InfracaoTipo.objects.none()
     return render(request, "autoinfracao/editar_autoinfracao.html", {
         "form": form,
         "obj": obj,
         "anexos_existentes": anexos_existentes,
-        "itens_multa": obj.multas.all(),
+        "itens_multa": obj.multas.select_related("enquadramento"),
         "item_form": item_form,
         "anexo_aif_form": anexo_aif_form if request.method == "GET" else AutoInfracaoAnexoForm(),
-        "tipos_qs": tipos_qs,
+        "tipos_qs": form.tipos_opcoes,
+        "tipos_marcados": form.tipos_marcados,
     })
 
 
@@ -923,7 +638,7 @@ def imprimir(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(AutoInfracao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(_com_itens_multa(AutoInfracao.tenant(request)), pk=pk)
     anexos = obj.anexos.all().order_by("-criada_em")
     valor_homologado_total = obj.valor_multa_homologado or obj.total_multa
     # Galeria Hierárquica (AIF + NTF + Denúncia + Apontamentos) sem duplicar
@@ -936,12 +651,11 @@ def imprimir(request, pk):
             seen.add(h)
             gal.append({'url': fx.arquivo.url if fx.arquivo else '', 'label': 'Denúncia', 'id': fx.id, 'owner': 'DEN'})
         try:
-            for ap in getattr(den, 'apontamentos').all().order_by('-criado_em'):
-                for ax in ap.anexos.all().order_by('-criada_em'):
-                    h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
-                    if h in seen: continue
-                    seen.add(h)
-                    gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento', 'id': ax.id, 'owner': 'APONT'})
+            for ax in den.fotos_apontamentos():
+                h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
+                if h in seen: continue
+                seen.add(h)
+                gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento', 'id': ax.id, 'owner': 'APONT'})
         except Exception:
             pass
         return gal
@@ -994,6 +708,7 @@ def imprimir(request, pk):
 
 
 @login_required
+@le_da_replica
 def medidas_listar(request):
     prefeitura_id = _get_prefeitura_id(request)
     if not prefeitura_id:
@@ -1007,7 +722,8 @@ def medidas_listar(request):
         if not proto:
             messages.error(request, "Informe o protocolo do AIF.")
             return redirect(request.path)
-        aif = AutoInfracao.objects.filter(prefeitura_id=prefeitura_id, protocolo__iexact=proto).first()
+        aif_id = objeto_id_exato(prefeitura_id, "AIF", proto)
+        aif = AutoInfracao.objects.filter(prefeitura_id=prefeitura_id, pk=aif_id).first() if aif_id else None
         if not aif:
             messages.error(request, "AIF não encontrado para este protocolo.")
             return redirect(request.path)
@@ -1031,27 +747,30 @@ def medidas_listar(request):
     it_qs = Interdicao.objects.filter(prefeitura_id=prefeitura_id)
 
     if protocolo:
-        emb_qs = emb_qs.filter(protocolo__icontains=protocolo)
-        it_qs = it_qs.filter(protocolo__icontains=protocolo)
+        emb_qs = emb_qs.filter(pk__in=ids_por_prefixo(prefeitura_id, "EMB", protocolo))
+        it_qs = it_qs.filter(pk__in=ids_por_prefixo(prefeitura_id, "ITD", protocolo))
     if status:
         emb_qs = emb_qs.filter(status=status)
         it_qs = it_qs.filter(status=status)
-    if nome_razao:
-        emb_qs = emb_qs.filter(auto_infracao__nome_razao__icontains=nome_razao)
-        it_qs = it_qs.filter(auto_infracao__nome_razao__icontains=nome_razao)
-
-    items = []
+    nome_norm = normalizar_texto(nome_razao)
+    if nome_norm:
+        # prefixo do nome do autuado (índice (prefeitura, nome_norm) do AIF)
+        emb_qs = emb_qs.filter(prefixo_q("auto_infracao__nome_norm", nome_norm))
+        it_qs = it_qs.filter(prefixo_q("auto_infracao__nome_norm", nome_norm))
+
+    # Embargos e Interdições mesclados por cursor (data desc); `_fonte` desempata entre as tabelas
+    fontes = []
     if tipo in ("", "EMB"):
-        for e in emb_qs:
-            items.append({"tipo": "EMB", "obj": e, "data": e.criada_em})
+        fontes.append(emb_qs.select_related("auto_infracao__denuncia", "auto_infracao__notificacao").annotate(_fonte=Value("EMB")))
     if tipo in ("", "ITD"):
-        for i in it_qs:
-            items.append({"tipo": "ITD", "obj": i, "data": i.criada_em})
-
-    items.sort(key=lambda x: x["data"], reverse=True)
-
-    page_obj = Paginator(items, 20).get_page(request.GET.get("page"))
-    params = request.GET.copy(); params.pop('page', None); querystring = params.urlencode()
+        fontes.append(it_qs.select_related("auto_infracao__denuncia", "auto_infracao__notificacao").annotate(_fonte=Value("ITD")))
+
+    paginator = KeysetPaginator(fontes, 20, ordenacao=("-criada_em", "-_fonte", "-id"), contagem="aproximada")
+    page_obj = paginator.get_page(request.GET.get("cursor"))
+    page_obj.object_list = [
+        {"tipo": m._fonte, "obj": m, "data": m.criada_em} for m in page_obj.object_list
+    ]
+    params = request.GET.copy(); params.pop('cursor', None); params.pop('page', None); querystring = params.urlencode()
     status_choices = Embargo._meta.get_field("status").choices
 
     context = {
@@ -1075,7 +794,7 @@ def detalhe(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(AutoInfracao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(_com_itens_multa(AutoInfracao.tenant(request)), pk=pk)
     anexos = obj.anexos.all().order_by("-criada_em")
 
     # Galeria Hierárquica (AIF + NTF + Denúncia + Apontamentos) sem duplicar
@@ -1089,13 +808,12 @@ def detalhe(request, pk):
             seen.add(h)
             gal.append({'url': fx.arquivo.url if fx.arquivo else '', 'label': 'Denúncia'})
         try:
-            for ap in getattr(den, 'apontamentos').all().order_by('-criado_em'):
-                for ax in ap.anexos.all().order_by('-criada_em'):
-                    h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
-                    if h in seen:
-                        continue
-                    seen.add(h)
-                    gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento'})
+            for ax in den.fotos_apontamentos():
+                h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
+                if h in seen:
+                    continue
+                seen.add(h)
+                gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento'})
         except Exception:
             pass
         return gal
@@ -1146,7 +864,7 @@ def gerar_embargo(request, aif_pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    aif = get_object_or_404(AutoInfracao, pk=aif_pk, prefeitura_id=prefeitura_id)
+    aif = get_object_or_404(AutoInfracao.tenant(request), pk=aif_pk)
     if aif.status == "REGULARIZADO":
         messages.info(request, "AIF já regularizado — não é possível gerar Embargo.")
         return redirect("autoinfracao:detalhe", pk=aif.pk)
@@ -1173,7 +891,7 @@ def gerar_interdicao(request, aif_pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    aif = get_object_or_404(AutoInfracao, pk=aif_pk, prefeitura_id=prefeitura_id)
+    aif = get_object_or_404(AutoInfracao.tenant(request), pk=aif_pk)
     if aif.status == "REGULARIZADO":
         messages.info(request, "AIF já regularizado — não é possível gerar Interdição.")
         return redirect("autoinfracao:detalhe", pk=aif.pk)
@@ -1196,7 +914,7 @@ def embargo_detalhe(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Embargo, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Embargo.tenant(request), pk=pk)
     return render(request, "autoinfracao/detalhe_embargo.html", {"obj": obj})
 
 
@@ -1207,7 +925,7 @@ def interdicao_detalhe(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Interdicao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Interdicao.tenant(request), pk=pk)
     return render(request, "autoinfracao/detalhe_interdicao.html", {"obj": obj})
 
 
@@ -1218,7 +936,7 @@ def embargo_editar(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Embargo, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Embargo.tenant(request), pk=pk)
 
     # excluir anexo via GET
     del_id = request.GET.get("del_anexo")
@@ -1290,7 +1008,7 @@ def interdicao_editar(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Interdicao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Interdicao.tenant(request), pk=pk)
 
     del_id = request.GET.get("del_anexo")
     if del_id:
@@ -1354,11 +1072,11 @@ def interdicao_editar(request, pk):
 # Vínculos via UI
 @login_required
 def vincular_pessoa(request, pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
-    obj = get_object_or_404(AutoInfracao, pk=pk, prefeitura_id=pref_id)
+    obj = get_object_or_404(AutoInfracao.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("autoinfracao:detalhe", pk=pk)
     tipo = (request.POST.get("tipo") or "PF").upper()
@@ -1390,11 +1108,11 @@ def vincular_pessoa(request, pk):
 
 @login_required
 def vincular_imovel(request, pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
-    obj = get_object_or_404(AutoInfracao, pk=pk, prefeitura_id=pref_id)
+    obj = get_object_or_404(AutoInfracao.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("autoinfracao:detalhe", pk=pk)
     inscricao = (request.POST.get("inscricao") or "").strip()
@@ -1581,7 +1299,7 @@ def tipos_editar(request, pk):
     prefeitura_id = _get_prefeitura_id(request)
     if not prefeitura_id:
         return redirect("/")
-    obj = get_object_or_404(InfracaoTipo, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(InfracaoTipo.tenant(request), pk=pk)
     if request.method == "POST":
         form = InfracaoTipoForm(request.POST, instance=obj)
         if form.is_valid():
@@ -1625,7 +1343,7 @@ def enq_editar(request, pk):
     prefeitura_id = _get_prefeitura_id(request)
     if not prefeitura_id:
         return redirect("/")
-    obj = get_object_or_404(Enquadramento, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Enquadramento.tenant(request), pk=pk)
     if request.method == "POST":
         form = EnquadramentoForm(request.POST, instance=obj)
         if form.is_valid():
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import IndiceBusca, RegistroProtocolo
+
+
+@admin.register(IndiceBusca)
+class IndiceBuscaAdmin(admin.ModelAdmin):
+    list_display = ('tipo', 'protocolo', 'resumo', 'prefeitura', 'atualizado_em')
+    list_filter = ('tipo', 'prefeitura')
+    search_fields = ('protocolo',)
+    readonly_fields = ('prefeitura', 'tipo', 'objeto_id', 'protocolo', 'resumo', 'texto', 'criado_em', 'atualizado_em')
+
+
+@admin.register(RegistroProtocolo)
+class RegistroProtocoloAdmin(admin.ModelAdmin):
+    list_display = ('protocolo', 'tipo', 'objeto_id', 'prefeitura', 'criado_em')
+    list_filter = ('tipo', 'prefeitura')
+    search_fields = ('=protocolo',)
+    readonly_fields = ('prefeitura', 'tipo', 'objeto_id', 'protocolo', 'sufixo', 'carimbo', 'criado_em')
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class BuscaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.busca'
+    verbose_name = 'Busca (Índice Textual)'
+
+    def ready(self):
+        # Mantém o índice textual sincronizado com Denúncias, Notificações e AIFs
+        from . import signals  # noqa: F401
@@ -0,0 +1,216 @@
+# apps/busca/indice.py
+"""
+Índice textual de Denúncias, Notificações e Autos de Infração.
+
+Cada registro vira uma linha em `busca_indice` com o texto normalizado de
+pessoa, endereço e descrição. A consulta usa o índice nativo do banco:
+
+- SQLite: tabela virtual FTS5 `busca_indice_fts` (external content), mantida
+  por triggers criados na migração 0002;
+- PostgreSQL: índice GIN sobre `to_tsvector('simple', texto)`.
+
+Outros bancos caem num filtro `icontains` por termo (funciona, mas sem índice).
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from utils.texto import normalizar_texto, so_digitos
+from .models import IndiceBusca
+
+
+# Campos indexados por tipo. "digitos" recebe também a versão só com números
+# (ex.: CPF 123.456.789-00 casa com a busca "12345678900").
+CAMPOS = {
+    "DEN": {
+        "modelo": ("denuncias", "Denuncia"),
+        "pessoa": ["denunciado_nome_razao", "denunciado_email"],
+        "digitos": ["denunciado_cpf_cnpj", "denunciado_rg_ie", "denunciado_telefone"],
+        "endereco": [
+            "local_oco_logradouro", "local_oco_numero", "local_oco_complemento",
+            "local_oco_bairro", "local_oco_cidade", "local_oco_uf", "local_oco_cep",
+            "local_oco_pontoref",
+        ],
+        "descricao": ["descricao_oco"],
+    },
+    "NOT": {
+        "modelo": ("notificacoes", "Notificacao"),
+        "pessoa": ["nome_razao", "email"],
+        "digitos": ["cpf_cnpj", "rg", "telefone"],
+        "endereco": [
+            "logradouro", "numero", "complemento", "bairro", "cidade", "uf", "cep",
+            "pontoref_oco",
+        ],
+        "descricao": ["descricao"],
+    },
+    "AIF": {
+        "modelo": ("autoinfracao", "AutoInfracao"),
+        "pessoa": ["nome_razao", "email"],
+        "digitos": ["cpf_cnpj", "rg", "telefone"],
+        "endereco": ["logradouro", "numero", "complemento", "bairro", "cidade", "uf", "cep"],
+        "descricao": ["descricao"],
+    },
+}
+
+
+def tipo_do_modelo(model):
+    label = (model._meta.app_label, model.__name__)
+    for tipo, cfg in CAMPOS.items():
+        if cfg["modelo"] == label:
+            return tipo
+    return None
+
+
+def campos_indexados(tipo):
+    cfg = CAMPOS[tipo]
+    return set(cfg["pessoa"] + cfg["digitos"] + cfg["endereco"] + cfg["descricao"] + ["protocolo", "prefeitura"])
+
+
+def _valores(obj, nomes):
+    return [str(v) for v in (getattr(obj, n, None) for n in nomes) if v not in (None, "")]
+
+
+def montar_texto(obj, tipo):
+    cfg = CAMPOS[tipo]
+    partes = [obj.protocolo or ""]
+    partes += _valores(obj, cfg["pessoa"])
+    for v in _valores(obj, cfg["digitos"]):
+        partes += [v, so_digitos(v)]
+    partes += _valores(obj, cfg["endereco"])
+    partes += _valores(obj, cfg["descricao"])
+    return normalizar_texto(" ".join(partes))
+
+
+def montar_resumo(obj, tipo):
+    cfg = CAMPOS[tipo]
+    nome = " ".join(_valores(obj, cfg["pessoa"][:1]))
+    end = ", ".join(_valores(obj, cfg["endereco"][:2]))
+    bairro = " ".join(_valores(obj, cfg["endereco"][3:4]))
+    resumo = " — ".join(p for p in (nome, end, bairro) if p)
+    return resumo[:200]
+
+
+def linha_indice(obj, tipo):
+    """Instância (não salva) de IndiceBusca para o objeto."""
+    return IndiceBusca(
+        prefeitura_id=obj.prefeitura_id,
+        tipo=tipo,
+        objeto_id=obj.pk,
+        protocolo=obj.protocolo or "",
+        resumo=montar_resumo(obj, tipo),
+        texto=montar_texto(obj, tipo),
+        criado_em=getattr(obj, "criada_em", None),
+    )
+
+
+def indexar(obj, tipo=None):
+    tipo = tipo or tipo_do_modelo(type(obj))
+    if not tipo or not obj.pk or not obj.prefeitura_id:
+        return
+    linha = linha_indice(obj, tipo)
+    IndiceBusca.objects.update_or_create(
+        tipo=tipo,
+        objeto_id=obj.pk,
+        defaults={
+            "prefeitura_id": linha.prefeitura_id,
+            "protocolo": linha.protocolo,
+            "resumo": linha.resumo,
+            "texto": linha.texto,
+            "criado_em": linha.criado_em,
+        },
+    )
+
+
+def remover(obj, tipo=None):
+    tipo = tipo or tipo_do_modelo(type(obj))
+    if tipo and obj.pk:
+        IndiceBusca.objects.filter(tipo=tipo, objeto_id=obj.pk).delete()
+
+
+# ----------------------------------------------------------
+# Consulta
+# ----------------------------------------------------------
+def termos(consulta):
+    """Tokens normalizados da consulta (somente [a-z0-9], seguros para FTS/tsquery)."""
+    return [t for t in normalizar_texto(consulta).split() if t][:12]
+
+
+def _sql_ids(prefeitura_id, tokens, tipos=None, ordenar=False, limite=None):
+    """SQL (e params) que devolve (id, objeto_id) das linhas que casam todos os tokens por prefixo."""
+    tipos = list(tipos or [])
+    tipos_sql = ""
+    if tipos:
+        tipos_sql = " AND i.tipo IN (%s)" % ", ".join(["%s"] * len(tipos))
+
+    if connection.vendor == "sqlite":
+        match = " ".join(f'"{t}"*' for t in tokens)
+        sql = (
+            "SELECT i.id, i.objeto_id FROM busca_indice_fts f "
+            "JOIN busca_indice i ON i.id = f.rowid "
+            "WHERE busca_indice_fts MATCH %s AND i.prefeitura_id = %s" + tipos_sql
+        )
+        params = [match, prefeitura_id] + tipos
+        if ordenar:
+            sql += " ORDER BY f.rank"
+    elif connection.vendor == "postgresql":
+        tsquery = " & ".join(f"{t}:*" for t in tokens)
+        sql = (
+            "SELECT i.id, i.objeto_id FROM busca_indice i "
+            "WHERE to_tsvector('simple', i.texto) @@ to_tsquery('simple', %s) "
+            "AND i.prefeitura_id = %s" + tipos_sql
+        )
+        params = [tsquery, prefeitura_id] + tipos
+        if ordenar:
+            sql += " ORDER BY ts_rank(to_tsvector('simple', i.texto), to_tsquery('simple', %s)) DESC"
+            params.append(tsquery)
+    else:
+        return None, None
+    if limite:
+        sql += " LIMIT %d" % int(limite)
+    return sql, params
+
+
+def filtrar_queryset(qs, tipo, prefeitura_id, consulta):
+    """
+    Restringe `qs` (Denuncia/Notificacao/AutoInfracao) aos registros que
+    casam com a consulta no índice. Usa subquery — nada de listas de IDs na memória.
+    """
+    tokens = termos(consulta)
+    if not tokens:
+        return qs
+    sql, params = _sql_ids(prefeitura_id, tokens, tipos=[tipo])
+    if sql is None:
+        sub = IndiceBusca.objects.filter(prefeitura_id=prefeitura_id, tipo=tipo)
+        for t in tokens:
+            sub = sub.filter(texto__icontains=t)
+        return qs.filter(pk__in=sub.values("objeto_id"))
+    sql = "SELECT objeto_id FROM (%s) busca_sub" % sql
+    return qs.filter(pk__in=RawSQL(sql, params))
+
+
+def buscar(prefeitura_id, consulta, tipos=None, limite=50):
+    """Busca global: lista de IndiceBusca ordenada por relevância."""
+    tokens = termos(consulta)
+    if not tokens or not prefeitura_id:
+        return []
+    sql, params = _sql_ids(prefeitura_id, tokens, tipos=tipos, ordenar=True, limite=limite)
+    if sql is None:
+        qs = IndiceBusca.objects.filter(prefeitura_id=prefeitura_id)
+        if tipos:
+            qs = qs.filter(tipo__in=tipos)
+        for t in tokens:
+            qs = qs.filter(texto__icontains=t)
+        return list(qs.order_by("-criado_em")[:limite])
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        ids = [r[0] for r in cur.fetchall()]
+    linhas = IndiceBusca.objects.in_bulk(ids)
+    return [linhas[i] for i in ids if i in linhas]
+
+
+def reconstruir_fts():
+    """Recria o conteúdo da tabela FTS5 a partir de `busca_indice` (somente SQLite)."""
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cur:
+        cur.execute("INSERT INTO busca_indice_fts(busca_indice_fts) VALUES('rebuild')")
+    return True
@@ -0,0 +1,49 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.busca.models import RegistroProtocolo
+from apps.busca.protocolos import MODELOS, linha_registro
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o registro global de protocolos (Processo, Denúncia, Notificação, AIF, Embargo, Interdição)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefeitura', type=int, help='ID da prefeitura (padrão: todas)')
+        parser.add_argument('--lote', type=int, default=2000, help='Tamanho do lote de gravação')
+
+    def handle(self, *args, **options):
+        pref_id = options.get('prefeitura')
+        lote_max = max(100, options['lote'])
+
+        for tipo, label in MODELOS.items():
+            Model = apps.get_model(*label)
+            qs = Model.objects.exclude(prefeitura_id=None).exclude(protocolo='').only('pk', 'prefeitura_id', 'protocolo')
+            orfaos = RegistroProtocolo.objects.filter(tipo=tipo)
+            if pref_id:
+                qs = qs.filter(prefeitura_id=pref_id)
+                orfaos = orfaos.filter(prefeitura_id=pref_id)
+
+            total = 0
+            lote = []
+            for obj in qs.iterator(chunk_size=lote_max):
+                lote.append(linha_registro(obj, tipo))
+                if len(lote) >= lote_max:
+                    total += self._gravar(lote)
+                    lote = []
+            if lote:
+                total += self._gravar(lote)
+
+            removidos, _ = orfaos.exclude(objeto_id__in=qs.values('pk')).delete()
+            self.stdout.write(f'{tipo}: {total} registrados, {removidos} removidos.')
+
+        self.stdout.write(self.style.SUCCESS('Registro de protocolos atualizado.'))
+
+    def _gravar(self, lote):
+        RegistroProtocolo.objects.bulk_create(
+            lote,
+            update_conflicts=True,
+            unique_fields=['tipo', 'objeto_id'],
+            update_fields=['prefeitura', 'protocolo', 'sufixo', 'carimbo'],
+        )
+        return len(lote)
@@ -0,0 +1,55 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.busca.indice import CAMPOS, linha_indice, reconstruir_fts
+from apps.busca.models import IndiceBusca
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice de busca textual (Denúncias, Notificações e AIFs)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefeitura', type=int, help='ID da prefeitura (padrão: todas)')
+        parser.add_argument('--tipo', choices=list(CAMPOS.keys()), help='Reindexa só um tipo')
+        parser.add_argument('--lote', type=int, default=2000, help='Tamanho do lote de gravação')
+
+    def handle(self, *args, **options):
+        tipos = [options['tipo']] if options.get('tipo') else list(CAMPOS.keys())
+        pref_id = options.get('prefeitura')
+        lote_max = max(100, options['lote'])
+        campos_upd = ['prefeitura', 'protocolo', 'resumo', 'texto', 'criado_em']
+
+        for tipo in tipos:
+            Model = apps.get_model(*CAMPOS[tipo]['modelo'])
+            qs = Model.objects.exclude(prefeitura_id=None)
+            orfaos = IndiceBusca.objects.filter(tipo=tipo)
+            if pref_id:
+                qs = qs.filter(prefeitura_id=pref_id)
+                orfaos = orfaos.filter(prefeitura_id=pref_id)
+
+            total = 0
+            lote = []
+            for obj in qs.iterator(chunk_size=lote_max):
+                lote.append(linha_indice(obj, tipo))
+                if len(lote) >= lote_max:
+                    total += self._gravar(lote, campos_upd)
+                    lote = []
+            if lote:
+                total += self._gravar(lote, campos_upd)
+
+            # Remove entradas de registros que não existem mais
+            removidos, _ = orfaos.exclude(objeto_id__in=qs.values('pk')).delete()
+            self.stdout.write(f'{tipo}: {total} indexados, {removidos} removidos.')
+
+        if reconstruir_fts():
+            self.stdout.write('Tabela FTS5 reconstruída.')
+        self.stdout.write(self.style.SUCCESS('Índice de busca atualizado.'))
+
+    def _gravar(self, lote, campos_upd):
+        IndiceBusca.objects.bulk_create(
+            lote,
+            update_conflicts=True,
+            unique_fields=['tipo', 'objeto_id'],
+            update_fields=campos_upd,
+        )
+        return len(lote)
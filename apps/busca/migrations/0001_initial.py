@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('DEN', 'Denúncia'), ('NOT', 'Notificação'), ('AIF', 'Auto de Infração')], max_length=3)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('protocolo', models.CharField(blank=True, max_length=64)),
+                ('resumo', models.CharField(blank=True, max_length=200)),
+                ('texto', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(blank=True, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('prefeitura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indice_busca', to='prefeituras.prefeitura')),
+            ],
+            options={
+                'verbose_name': 'Índice de busca',
+                'verbose_name_plural': 'Índice de busca',
+                'db_table': 'busca_indice',
+                'indexes': [models.Index(fields=['prefeitura', 'tipo'], name='busca_indic_prefeit_d4e824_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='busca_indice_tipo_objeto_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+
+SQLITE_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS busca_indice_fts USING fts5(
+        texto,
+        content='busca_indice',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS busca_indice_ai AFTER INSERT ON busca_indice BEGIN
+        INSERT INTO busca_indice_fts(rowid, texto) VALUES (new.id, new.texto);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS busca_indice_ad AFTER DELETE ON busca_indice BEGIN
+        INSERT INTO busca_indice_fts(busca_indice_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS busca_indice_au AFTER UPDATE OF texto ON busca_indice BEGIN
+        INSERT INTO busca_indice_fts(busca_indice_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+        INSERT INTO busca_indice_fts(rowid, texto) VALUES (new.id, new.texto);
+    END
+    """,
+]
+
+SQLITE_REMOVER = [
+    "DROP TRIGGER IF EXISTS busca_indice_au",
+    "DROP TRIGGER IF EXISTS busca_indice_ad",
+    "DROP TRIGGER IF EXISTS busca_indice_ai",
+    "DROP TABLE IF EXISTS busca_indice_fts",
+]
+
+PG_CRIAR = [
+    "CREATE INDEX IF NOT EXISTS busca_indice_texto_gin ON busca_indice USING GIN (to_tsvector('simple', texto))",
+]
+
+PG_REMOVER = [
+    "DROP INDEX IF EXISTS busca_indice_texto_gin",
+]
+
+
+def _executar(schema_editor, por_vendor):
+    for sql in por_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def criar_indice(apps, schema_editor):
+    _executar(schema_editor, {"sqlite": SQLITE_CRIAR, "postgresql": PG_CRIAR})
+
+
+def remover_indice(apps, schema_editor):
+    _executar(schema_editor, {"sqlite": SQLITE_REMOVER, "postgresql": PG_REMOVER})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,99 @@
+from django.db import migrations
+
+from utils.texto import normalizar_texto, so_digitos
+
+# Cópia de apps.busca.indice na data desta migração: o índice é populado com
+# o formato de então, mesmo que o código da busca mude depois.
+CAMPOS = {
+    'DEN': {
+        'modelo': ('denuncias', 'Denuncia'),
+        'pessoa': ['denunciado_nome_razao', 'denunciado_email'],
+        'digitos': ['denunciado_cpf_cnpj', 'denunciado_rg_ie', 'denunciado_telefone'],
+        'endereco': [
+            'local_oco_logradouro', 'local_oco_numero', 'local_oco_complemento',
+            'local_oco_bairro', 'local_oco_cidade', 'local_oco_uf', 'local_oco_cep',
+            'local_oco_pontoref',
+        ],
+        'descricao': ['descricao_oco'],
+    },
+    'NOT': {
+        'modelo': ('notificacoes', 'Notificacao'),
+        'pessoa': ['nome_razao', 'email'],
+        'digitos': ['cpf_cnpj', 'rg', 'telefone'],
+        'endereco': [
+            'logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'uf', 'cep',
+            'pontoref_oco',
+        ],
+        'descricao': ['descricao'],
+    },
+    'AIF': {
+        'modelo': ('autoinfracao', 'AutoInfracao'),
+        'pessoa': ['nome_razao', 'email'],
+        'digitos': ['cpf_cnpj', 'rg', 'telefone'],
+        'endereco': ['logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'uf', 'cep'],
+        'descricao': ['descricao'],
+    },
+}
+
+
+def _valores(obj, nomes):
+    return [str(v) for v in (getattr(obj, n, None) for n in nomes) if v not in (None, '')]
+
+
+def montar_texto(obj, tipo):
+    cfg = CAMPOS[tipo]
+    partes = [obj.protocolo or '']
+    partes += _valores(obj, cfg['pessoa'])
+    for v in _valores(obj, cfg['digitos']):
+        partes += [v, so_digitos(v)]
+    partes += _valores(obj, cfg['endereco'])
+    partes += _valores(obj, cfg['descricao'])
+    return normalizar_texto(' '.join(partes))
+
+
+def montar_resumo(obj, tipo):
+    cfg = CAMPOS[tipo]
+    nome = ' '.join(_valores(obj, cfg['pessoa'][:1]))
+    end = ', '.join(_valores(obj, cfg['endereco'][:2]))
+    bairro = ' '.join(_valores(obj, cfg['endereco'][3:4]))
+    return ' — '.join(p for p in (nome, end, bairro) if p)[:200]
+
+
+def popular(apps, schema_editor):
+    IndiceBusca = apps.get_model('busca', 'IndiceBusca')
+    for tipo, cfg in CAMPOS.items():
+        Model = apps.get_model(*cfg['modelo'])
+        lote = []
+        for obj in Model.objects.exclude(prefeitura_id=None).iterator(chunk_size=2000):
+            lote.append(IndiceBusca(
+                prefeitura_id=obj.prefeitura_id,
+                tipo=tipo,
+                objeto_id=obj.pk,
+                protocolo=obj.protocolo or '',
+                resumo=montar_resumo(obj, tipo),
+                texto=montar_texto(obj, tipo),
+                criado_em=obj.criada_em,
+            ))
+            if len(lote) >= 2000:
+                IndiceBusca.objects.bulk_create(lote, ignore_conflicts=True)
+                lote = []
+        if lote:
+            IndiceBusca.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+def limpar(apps, schema_editor):
+    apps.get_model('busca', 'IndiceBusca').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0002_indice_nativo'),
+        ('denuncias', '0012_denuncia_processo'),
+        ('notificacoes', '0010_notificacao_processo'),
+        ('autoinfracao', '0015_autoinfracao_processo'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular, limpar),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0003_popular_indice'),
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroProtocolo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('PRO', 'Processo'), ('DEN', 'Denúncia'), ('NOT', 'Notificação'), ('AIF', 'Auto de Infração'), ('EMB', 'Embargo'), ('ITD', 'Interdição')], max_length=3)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('protocolo', models.CharField(max_length=64)),
+                ('sufixo', models.CharField(blank=True, max_length=64)),
+                ('carimbo', models.CharField(blank=True, max_length=64)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('prefeitura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='protocolos', to='prefeituras.prefeitura')),
+            ],
+            options={
+                'verbose_name': 'Registro de protocolo',
+                'verbose_name_plural': 'Registro de protocolos',
+                'db_table': 'busca_protocolo',
+                'indexes': [models.Index(fields=['prefeitura', 'protocolo'], name='busca_proto_prefeit_643ae8_idx'), models.Index(fields=['prefeitura', 'sufixo'], name='busca_proto_prefeit_764b8c_idx'), models.Index(fields=['prefeitura', 'carimbo'], name='busca_proto_prefeit_c23820_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='busca_protocolo_tipo_objeto_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+def popular(apps, schema_editor):
+    from apps.busca.protocolos import MODELOS, decompor
+
+    RegistroProtocolo = apps.get_model('busca', 'RegistroProtocolo')
+    for tipo, label in MODELOS.items():
+        Model = apps.get_model(*label)
+        lote = []
+        qs = (Model.objects
+              .exclude(prefeitura_id=None).exclude(protocolo='')
+              .values_list('pk', 'prefeitura_id', 'protocolo'))
+        for pk, pref_id, proto in qs.iterator(chunk_size=2000):
+            protocolo, sufixo, carimbo = decompor(proto)
+            lote.append(RegistroProtocolo(
+                prefeitura_id=pref_id, tipo=tipo, objeto_id=pk,
+                protocolo=protocolo, sufixo=sufixo, carimbo=carimbo,
+            ))
+            if len(lote) >= 2000:
+                RegistroProtocolo.objects.bulk_create(lote, ignore_conflicts=True)
+                lote = []
+        if lote:
+            RegistroProtocolo.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+def limpar(apps, schema_editor):
+    apps.get_model('busca', 'RegistroProtocolo').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0004_registroprotocolo'),
+        ('processos', '0001_initial'),
+        ('denuncias', '0015_denuncia_denuncias_d_prefeit_685034_idx'),
+        ('notificacoes', '0013_notificacao_notif_pref_prazo_ordem_idx'),
+        ('autoinfracao', '0018_autoinfracao_aif_pref_prazo_ordem_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular, limpar),
+    ]
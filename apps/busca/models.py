@@ -0,0 +1,87 @@
+# apps/busca/models.py
+from django.db import models
+
+
+BUSCA_TIPO_CHOICES = [
+    ('DEN', 'Denúncia'),
+    ('NOT', 'Notificação'),
+    ('AIF', 'Auto de Infração'),
+]
+
+
+class IndiceBusca(models.Model):
+    """
+    Uma linha por registro indexado (Denúncia/Notificação/AIF).
+
+    `texto` guarda pessoa, endereço e descrição já normalizados (minúsculas,
+    sem acentos). A busca em si é feita pelo índice do banco criado na
+    migração 0002: FTS5 no SQLite ou GIN sobre to_tsvector no PostgreSQL.
+    """
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.CASCADE, related_name='indice_busca')
+    tipo = models.CharField(max_length=3, choices=BUSCA_TIPO_CHOICES)
+    objeto_id = models.PositiveBigIntegerField()
+    protocolo = models.CharField(max_length=64, blank=True)
+    resumo = models.CharField(max_length=200, blank=True)
+    texto = models.TextField(blank=True)
+    criado_em = models.DateTimeField(null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'busca_indice'
+        verbose_name = 'Índice de busca'
+        verbose_name_plural = 'Índice de busca'
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='busca_indice_tipo_objeto_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['prefeitura', 'tipo']),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.objeto_id} — {self.protocolo}"
+
+
+PROTOCOLO_TIPO_CHOICES = [
+    ('PRO', 'Processo'),
+    ('DEN', 'Denúncia'),
+    ('NOT', 'Notificação'),
+    ('AIF', 'Auto de Infração'),
+    ('EMB', 'Embargo'),
+    ('ITD', 'Interdição'),
+]
+
+
+class RegistroProtocolo(models.Model):
+    """
+    Registro único de protocolos (IBGE-SIGLA-AAAAMMDDhhmmss-SSSSS[-MATRICULA];
+    os anteriores à sequência não têm o -SSSSS) de todos os módulos, para
+    localizar qualquer documento por parte do protocolo com uma consulta
+    indexada.
+
+    Além do protocolo completo, guarda `sufixo` (sem o IBGE, ex.: DEN-2025...)
+    e `carimbo` (só o AAAAMMDDhhmmss...), para prefixos digitados a partir
+    da sigla ou da data.
+    """
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.CASCADE, related_name='protocolos')
+    tipo = models.CharField(max_length=3, choices=PROTOCOLO_TIPO_CHOICES)
+    objeto_id = models.PositiveBigIntegerField()
+    protocolo = models.CharField(max_length=64)
+    sufixo = models.CharField(max_length=64, blank=True)
+    carimbo = models.CharField(max_length=64, blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'busca_protocolo'
+        verbose_name = 'Registro de protocolo'
+        verbose_name_plural = 'Registro de protocolos'
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='busca_protocolo_tipo_objeto_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['prefeitura', 'protocolo']),
+            models.Index(fields=['prefeitura', 'sufixo']),
+            models.Index(fields=['prefeitura', 'carimbo']),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.protocolo}"
@@ -0,0 +1,130 @@
+# apps/busca/protocolos.py
+"""
+Registro global de protocolos (tabela busca_protocolo).
+
+Todo documento com protocolo (Processo, Denúncia, Notificação, AIF, Embargo,
+Interdição) ganha uma linha na criação. A busca por parte do protocolo é uma
+única consulta por faixa [prefixo, prefixo+1) sobre índices (prefeitura, col),
+sem LIKE e sem consultar cada módulo.
+"""
+import re
+
+from django.urls import reverse
+
+from utils.texto import prefixo_q
+from .models import RegistroProtocolo
+
+
+MODELOS = {
+    "PRO": ("processos", "Processo"),
+    "DEN": ("denuncias", "Denuncia"),
+    "NOT": ("notificacoes", "Notificacao"),
+    "AIF": ("autoinfracao", "AutoInfracao"),
+    "EMB": ("autoinfracao", "Embargo"),
+    "ITD": ("autoinfracao", "Interdicao"),
+}
+
+URL_DETALHE = {
+    "DEN": "denuncias:detalhe",
+    "NOT": "notificacoes:detalhe",
+    "AIF": "autoinfracao:detalhe",
+    "EMB": "autoinfracao:embargo_detalhe",
+    "ITD": "autoinfracao:interdicao_detalhe",
+}
+
+
+def normalizar_protocolo(valor):
+    """Maiúsculas, sem espaços; mantém apenas [0-9A-Z-]."""
+    return re.sub(r"[^0-9A-Z-]+", "", str(valor or "").upper())
+
+
+def decompor(protocolo):
+    """(protocolo, sufixo, carimbo) normalizados a partir do protocolo completo."""
+    proto = normalizar_protocolo(protocolo)
+    partes = proto.split("-")
+    sufixo = "-".join(partes[1:]) if len(partes) > 1 else ""
+    carimbo = "-".join(partes[2:]) if len(partes) > 2 else ""
+    return proto, sufixo, carimbo
+
+
+def tipo_do_modelo(model):
+    label = (model._meta.app_label, model.__name__)
+    for tipo, lbl in MODELOS.items():
+        if lbl == label:
+            return tipo
+    return None
+
+
+def linha_registro(obj, tipo):
+    proto, sufixo, carimbo = decompor(obj.protocolo)
+    return RegistroProtocolo(
+        prefeitura_id=obj.prefeitura_id,
+        tipo=tipo,
+        objeto_id=obj.pk,
+        protocolo=proto,
+        sufixo=sufixo,
+        carimbo=carimbo,
+    )
+
+
+def registrar(obj, tipo, criado=True):
+    if not obj.pk or not obj.prefeitura_id or not obj.protocolo:
+        return
+    linha = linha_registro(obj, tipo)
+    if criado:
+        RegistroProtocolo.objects.bulk_create([linha], ignore_conflicts=True)
+        return
+    # Protocolo alterado após a criação (raro): um UPDATE indexado, no-op se igual
+    (RegistroProtocolo.objects
+        .filter(tipo=tipo, objeto_id=obj.pk)
+        .exclude(protocolo=linha.protocolo)
+        .update(protocolo=linha.protocolo, sufixo=linha.sufixo, carimbo=linha.carimbo))
+
+
+def remover(obj, tipo):
+    if obj.pk:
+        RegistroProtocolo.objects.filter(tipo=tipo, objeto_id=obj.pk).delete()
+
+
+# ----------------------------------------------------------
+# Consulta
+# ----------------------------------------------------------
+def q_prefixo(termo):
+    """Q que casa o termo como prefixo do protocolo, do sufixo (SIGLA-...) ou do carimbo (data)."""
+    t = normalizar_protocolo(termo)
+    if not t:
+        return None
+    return prefixo_q("protocolo", t) | prefixo_q("sufixo", t) | prefixo_q("carimbo", t)
+
+
+def localizar(prefeitura_id, termo, tipos=None, limite=10):
+    """Registros cujo protocolo começa com `termo` (em qualquer das três formas)."""
+    q = q_prefixo(termo)
+    if q is None or not prefeitura_id:
+        return []
+    qs = RegistroProtocolo.objects.filter(q, prefeitura_id=prefeitura_id)
+    if tipos:
+        qs = qs.filter(tipo__in=tipos)
+    return list(qs.order_by("-protocolo", "tipo")[:limite])
+
+
+def ids_por_prefixo(prefeitura_id, tipo, termo):
+    """Subquery de objeto_id do `tipo` cujo protocolo casa com o prefixo (para filtrar listagens)."""
+    q = q_prefixo(termo)
+    qs = RegistroProtocolo.objects.filter(prefeitura_id=prefeitura_id, tipo=tipo)
+    if q is None:
+        return qs.none().values("objeto_id")
+    return qs.filter(q).values("objeto_id")
+
+
+def objeto_id_exato(prefeitura_id, tipo, protocolo):
+    """objeto_id do documento com exatamente este protocolo (ou None)."""
+    return (RegistroProtocolo.objects
+            .filter(prefeitura_id=prefeitura_id, tipo=tipo, protocolo=normalizar_protocolo(protocolo))
+            .values_list("objeto_id", flat=True)
+            .first())
+
+
+def url_do_registro(reg):
+    nome = URL_DETALHE.get(reg.tipo)
+    return reverse(nome, args=[reg.objeto_id]) if nome else None
@@ -0,0 +1,46 @@
+# apps/busca/signals.py
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from . import protocolos
+from .indice import CAMPOS, campos_indexados, indexar, remover
+
+
+# ---- Índice textual (Denúncia/Notificação/AIF)
+def _on_save(sender, instance, update_fields=None, **kwargs):
+    tipo = _TIPOS[sender]
+    # save(update_fields=[...]) que não toca campos indexados não precisa reindexar
+    if update_fields and not (set(update_fields) & campos_indexados(tipo)):
+        return
+    indexar(instance, tipo)
+
+
+def _on_delete(sender, instance, **kwargs):
+    remover(instance, _TIPOS[sender])
+
+
+_TIPOS = {}
+for _tipo, _cfg in CAMPOS.items():
+    _model = apps.get_model(*_cfg["modelo"])
+    _TIPOS[_model] = _tipo
+    post_save.connect(_on_save, sender=_model, dispatch_uid=f"busca_indexar_{_tipo}")
+    post_delete.connect(_on_delete, sender=_model, dispatch_uid=f"busca_remover_{_tipo}")
+
+
+# ---- Registro de protocolos (todos os módulos)
+def _on_save_protocolo(sender, instance, created=False, update_fields=None, **kwargs):
+    if not created and update_fields and "protocolo" not in update_fields:
+        return
+    protocolos.registrar(instance, _TIPOS_PROTOCOLO[sender], criado=created)
+
+
+def _on_delete_protocolo(sender, instance, **kwargs):
+    protocolos.remover(instance, _TIPOS_PROTOCOLO[sender])
+
+
+_TIPOS_PROTOCOLO = {}
+for _tipo, _label in protocolos.MODELOS.items():
+    _model = apps.get_model(*_label)
+    _TIPOS_PROTOCOLO[_model] = _tipo
+    post_save.connect(_on_save_protocolo, sender=_model, dispatch_uid=f"busca_protocolo_{_tipo}")
+    post_delete.connect(_on_delete_protocolo, sender=_model, dispatch_uid=f"busca_protocolo_rm_{_tipo}")
@@ -0,0 +1,9 @@
+# apps/busca/urls.py
+from django.urls import path
+from . import views
+
+app_name = "busca"
+
+urlpatterns = [
+    path("", views.busca_geral, name="geral"),
+]
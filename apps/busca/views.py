@@ -0,0 +1,46 @@
+# apps/busca/views.py
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.urls import reverse
+
+from .indice import buscar
+from .models import BUSCA_TIPO_CHOICES
+
+
+_URL_DETALHE = {
+    "DEN": "denuncias:detalhe",
+    "NOT": "notificacoes:detalhe",
+    "AIF": "autoinfracao:detalhe",
+}
+
+
+@login_required
+def busca_geral(request):
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        messages.error(request, "Prefeitura não definida na sessão.")
+        return redirect("home")
+
+    q = request.GET.get("q", "").strip()
+    tipo = request.GET.get("tipo", "").strip()
+    tipos = [tipo] if tipo in _URL_DETALHE else None
+
+    resultados = []
+    for linha in buscar(prefeitura_id, q, tipos=tipos, limite=100):
+        resultados.append({
+            "tipo": linha.tipo,
+            "tipo_display": linha.get_tipo_display(),
+            "protocolo": linha.protocolo,
+            "resumo": linha.resumo,
+            "criado_em": linha.criado_em,
+            "url": reverse(_URL_DETALHE[linha.tipo], args=[linha.objeto_id]),
+        })
+
+    context = {
+        "q": q,
+        "tipo": tipo,
+        "tipo_choices": BUSCA_TIPO_CHOICES,
+        "resultados": resultados,
+    }
+    return render(request, "busca/resultados.html", context)
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cadastros', '0002_rename_cad_imove_prefeitu_eab0d7_idx_cad_imovel_prefeit_4fc6bf_idx_and_more'),
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pessoa',
+            name='nome_norm',
+            field=models.CharField(blank=True, editable=False, max_length=180),
+        ),
+        migrations.AddField(
+            model_name='pessoa',
+            name='tel_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='pessoa',
+            index=models.Index(fields=['prefeitura', 'tel_digitos'], name='cad_pessoa_prefeit_39e1e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pessoa',
+            index=models.Index(fields=['prefeitura', 'nome_norm'], name='cad_pessoa_prefeit_f21672_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from utils.texto import normalizar_texto, so_digitos
+
+
+def popular(apps, schema_editor):
+    Model = apps.get_model('cadastros', 'Pessoa')
+    # Lotes por pk (não itera e grava a mesma tabela no mesmo cursor)
+    ultimo = 0
+    while True:
+        lote = list(Model.objects.filter(pk__gt=ultimo).order_by('pk')[:2000])
+        if not lote:
+            break
+        for obj in lote:
+            if obj.doc_tipo in ('CPF', 'CNPJ'):
+                obj.doc_num = so_digitos(obj.doc_num)
+            obj.tel_digitos = so_digitos(obj.telefone)[:20]
+            obj.nome_norm = normalizar_texto(obj.nome_razao)[:180]
+        Model.objects.bulk_update(lote, ['doc_num', 'tel_digitos', 'nome_norm'])
+        ultimo = lote[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cadastros', '0003_pessoa_nome_norm_pessoa_tel_digitos_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular, migrations.RunPython.noop),
+    ]
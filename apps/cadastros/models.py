@@ -1,5 +1,7 @@
 from django.db import models
 
+from utils.texto import incluir_campos_derivados, normalizar_texto, so_digitos
+
 TIPO_PESSOA_CHOICES = (
     ("PF", "Pessoa Física"),
     ("PJ", "Pessoa Jurídica"),
@@ -31,6 +33,10 @@ class Pessoa(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    # Colunas normalizadas para busca (doc_num já é só dígitos)
+    tel_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    nome_norm = models.CharField(max_length=180, blank=True, editable=False)
+
     class Meta:
         db_table = 'cad_pessoa'
         verbose_name = 'Pessoa'
@@ -38,12 +44,22 @@ class Pessoa(models.Model):
         indexes = [
             models.Index(fields=['prefeitura', 'doc_num']),
             models.Index(fields=['prefeitura', 'nome_razao']),
+            models.Index(fields=['prefeitura', 'tel_digitos']),
+            models.Index(fields=['prefeitura', 'nome_norm']),
         ]
         ordering = ['nome_razao']
 
     def __str__(self):
         return f"{self.nome_razao} ({self.get_tipo_display()})"
 
+    def save(self, *args, **kwargs):
+        if self.doc_tipo in ('CPF', 'CNPJ'):
+            self.doc_num = so_digitos(self.doc_num)
+        self.tel_digitos = so_digitos(self.telefone)[:20]
+        self.nome_norm = normalizar_texto(self.nome_razao)[:180]
+        incluir_campos_derivados(kwargs, ('doc_num', 'telefone', 'nome_razao'), ('doc_num', 'tel_digitos', 'nome_norm'))
+        super().save(*args, **kwargs)
+
 
 class Imovel(models.Model):
     prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.PROTECT, related_name='imoveis')
@@ -0,0 +1,43 @@
+# apps/denuncias/filtros.py
+"""Filtros da listagem de Denúncias (reaproveitados pela exportação)."""
+from apps.busca.indice import filtrar_queryset
+from apps.busca.protocolos import ids_por_prefixo
+from utils.texto import normalizar_texto, prefixo_q, so_digitos
+
+from .models import Denuncia
+
+
+CAMPOS_FILTRO = ("q", "protocolo", "cpf_cnpj", "nome", "rg", "telefone", "endereco", "pontoref")
+
+
+def filtrar_denuncias(prefeitura_id, params):
+    """(queryset, filtros) a partir dos parâmetros GET da listagem."""
+    filtros = {k: (params.get(k) or "").strip() for k in CAMPOS_FILTRO}
+    qs = Denuncia.objects.filter(prefeitura_id=prefeitura_id)
+
+    # Busca textual (índice FTS) — pessoa, endereço e descrição
+    if filtros["q"]:
+        qs = filtrar_queryset(qs, "DEN", prefeitura_id, filtros["q"])
+    if filtros["protocolo"]:
+        # prefixo do protocolo (completo, a partir da sigla ou da data) via registro indexado
+        qs = qs.filter(pk__in=ids_por_prefixo(prefeitura_id, "DEN", filtros["protocolo"]))
+    # Documento/telefone: só dígitos, exato ou por prefixo (usa índice)
+    if filtros["cpf_cnpj"]:
+        d = so_digitos(filtros["cpf_cnpj"])
+        qs = qs.filter(prefixo_q("doc_digitos", d)) if d else qs.filter(denunciado_cpf_cnpj__icontains=filtros["cpf_cnpj"])
+    if filtros["nome"]:
+        # sem acentos/maiúsculas, por prefixo: "jose" encontra "José da Silva" (índice (prefeitura, nome_norm))
+        nome = normalizar_texto(filtros["nome"])
+        qs = qs.filter(prefixo_q("nome_norm", nome)) if nome else qs
+    if filtros["rg"]:
+        qs = qs.filter(denunciado_rg_ie__icontains=filtros["rg"])
+    if filtros["telefone"]:
+        d = so_digitos(filtros["telefone"])
+        qs = qs.filter(prefixo_q("tel_digitos", d)) if d else qs.filter(denunciado_telefone__icontains=filtros["telefone"])
+    if filtros["endereco"]:
+        # início do endereço normalizado (logradouro, nº, bairro...): usa o índice (prefeitura, endereco_norm)
+        endereco = normalizar_texto(filtros["endereco"])
+        qs = qs.filter(prefixo_q("endereco_norm", endereco)) if endereco else qs
+    if filtros["pontoref"]:
+        qs = qs.filter(local_oco_pontoref__icontains=filtros["pontoref"])
+    return qs, filtros
@@ -150,7 +150,9 @@ AnexoFormSet = inlineformset_factory(
 
 # ---- Config do pipeline ----
 from PIL import Image, ImageOps
-import io, hashlib, imghdr, os
+import io, hashlib, imghdr, os, time
+
+from utils import metricas
 
 TARGET_W = 1000
 TARGET_H = 667            # 3:2
@@ -251,11 +253,13 @@ def _make_inmemory_uploaded_jpg(data: bytes, name_hint: str) -> InMemoryUploaded
 def process_photo_file(file_obj):
     if not _is_image_file(file_obj):
         raise ValidationError("Arquivo não reconhecido como imagem válida.")
+    t0 = time.perf_counter()
     img = Image.open(file_obj)
     img = _auto_orient(img)
     img = _crop_to_ratio(img, TARGET_W, TARGET_H)
     img = _resize(img, TARGET_W, TARGET_H)
     data = _binary_search_quality(img, TARGET_KB, TOL_KB_MIN, TOL_KB_MAX)
+    metricas.foto_processada("denuncia", time.perf_counter() - t0, getattr(file_obj, "size", 0) or 0, len(data))
     largura, altura = img.size
     file_hash = _hash_sha256(data)
     uploaded = _make_inmemory_uploaded_jpg(data, getattr(file_obj, "name", "foto"))
@@ -265,11 +269,13 @@ def process_photo_file(file_obj):
 def process_photo_file_custom(file_obj, *, target_kb: int = 95, tol_max_kb: int = 100, name_hint: str = 'foto'):
     if not _is_image_file(file_obj):
         raise ValidationError("Arquivo não reconhecido como imagem válida.")
+    t0 = time.perf_counter()
     img = Image.open(file_obj)
     img = _auto_orient(img)
     img = _crop_to_ratio(img, TARGET_W, TARGET_H)
     img = _resize(img, TARGET_W, TARGET_H)
     data = _binary_search_quality(img, target_kb, max(target_kb-20, 40), tol_max_kb)
+    metricas.foto_processada("denuncia", time.perf_counter() - t0, getattr(file_obj, "size", 0) or 0, len(data))
     # Enforce hard limit
     if (len(data) // 1024) > tol_max_kb:
         raise ValidationError(f"Arquivo acima de {tol_max_kb} KB após otimização.")
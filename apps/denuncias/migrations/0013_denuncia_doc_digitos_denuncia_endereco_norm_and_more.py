@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cadastros', '0003_pessoa_nome_norm_pessoa_tel_digitos_and_more'),
+        ('denuncias', '0012_denuncia_processo'),
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('processos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='denuncia',
+            name='doc_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='denuncia',
+            name='endereco_norm',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='denuncia',
+            name='nome_norm',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='denuncia',
+            name='tel_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['prefeitura', 'doc_digitos'], name='denuncias_d_prefeit_ab534a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['prefeitura', 'tel_digitos'], name='denuncias_d_prefeit_9da739_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['prefeitura', 'nome_norm'], name='denuncias_d_prefeit_450b13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['prefeitura', 'endereco_norm'], name='denuncias_d_prefeit_454cf3_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('denuncias', '0014_popular_colunas_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='denuncia',
+            index=models.Index(fields=['prefeitura', 'criada_em', 'id'], name='denuncias_d_prefeit_685034_idx'),
+        ),
+    ]
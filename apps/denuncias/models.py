@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
 
+from apps.prefeituras.models import EscopoPrefeitura
 from utils.choices import (
     PESSOA_TIPO_CHOICES,
     ORIGEM_DENUNCIA_CHOICES,
@@ -15,7 +16,8 @@ from utils.choices import (
     CANAL_REGISTRO_CHOICES,
     HIST_ACAO_CHOICES,
 )
-from utils.protocolo import gerar_protocolo
+from utils.protocolo import gerar_protocolo_para_instance
+from utils.texto import incluir_campos_derivados, normalizar_texto, so_digitos
 
 
 def upload_doc_imovel_path(instance, filename):
@@ -29,7 +31,19 @@ def upload_anexo_path(instance, filename):
     return f"denuncias/anexos/{did}/{filename}"
 
 
-class Denuncia(models.Model):
+_CAMPOS_BUSCA = ("doc_digitos", "tel_digitos", "nome_norm", "endereco_norm")
+_CAMPOS_BUSCA_ORIGEM = (
+    'denunciado_cpf_cnpj',
+    'denunciado_telefone',
+    'denunciado_nome_razao',
+    'local_oco_logradouro',
+    'local_oco_numero',
+    'local_oco_bairro',
+    'local_oco_cidade',
+)
+
+
+class Denuncia(EscopoPrefeitura, models.Model):
     # Amarrações
     prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.PROTECT, related_name='denuncias')
     processo = models.ForeignKey('processos.Processo', on_delete=models.SET_NULL, null=True, blank=True, related_name='denuncias')
@@ -97,15 +111,34 @@ class Denuncia(models.Model):
     criada_em = models.DateTimeField(auto_now_add=True)
     atualizada_em = models.DateTimeField(auto_now=True)
 
+    # Colunas normalizadas para busca (mantidas no save(); não editáveis)
+    doc_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    tel_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    nome_norm = models.CharField(max_length=255, blank=True, editable=False)
+    endereco_norm = models.CharField(max_length=255, blank=True, editable=False)
+
     class Meta:
         db_table = 'denuncias_denuncia'
         verbose_name = 'Denúncia'
         verbose_name_plural = 'Denúncias'
         ordering = ['-criada_em']
+        indexes = [
+            models.Index(fields=['prefeitura', 'doc_digitos']),
+            models.Index(fields=['prefeitura', 'tel_digitos']),
+            models.Index(fields=['prefeitura', 'nome_norm']),
+            models.Index(fields=['prefeitura', 'endereco_norm']),
+            models.Index(fields=['prefeitura', 'criada_em', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.protocolo or 'SEM-PROTOCOLO'} — {self.denunciado_nome_razao}"
 
+    def fotos_apontamentos(self):
+        """Fotos de todos os apontamentos em uma consulta (apontamento mais recente primeiro)."""
+        return DenunciaApontamentoAnexo.objects.filter(apontamento__denuncia=self).order_by(
+            '-apontamento__criado_em', '-criada_em'
+        )
+
     def save(self, *args, **kwargs):
         # Normaliza lat/lng do local da ocorrência
         def _coerce_float6(val, lo=None, hi=None):
@@ -120,15 +153,18 @@ class Denuncia(models.Model):
                 return None
         self.local_oco_lat = _coerce_float6(self.local_oco_lat, -90.0, 90.0)
         self.local_oco_lng = _coerce_float6(self.local_oco_lng, -180.0, 180.0)
+        # Colunas normalizadas de busca
+        self.doc_digitos = so_digitos(self.denunciado_cpf_cnpj)[:20]
+        self.tel_digitos = so_digitos(self.denunciado_telefone)[:20]
+        self.nome_norm = normalizar_texto(self.denunciado_nome_razao)[:255]
+        self.endereco_norm = normalizar_texto(" ".join(
+            str(v) for v in (self.local_oco_logradouro, self.local_oco_numero, self.local_oco_bairro, self.local_oco_cidade) if v
+        ))[:255]
+        incluir_campos_derivados(kwargs, _CAMPOS_BUSCA_ORIGEM, _CAMPOS_BUSCA)
         # Geração de protocolo (somente na criação)
         if not self.pk and not self.protocolo:
-            ibge = (self.prefeitura.codigo_ibge if self.prefeitura else '') or ''
-            matricula = None
-            # Se houver usuário que está criando e você quiser protocolar com matrícula:
-            if self.criado_por and getattr(self.criado_por, 'matricula', None):
-                matricula = self.criado_por.matricula
-            # sigla fixa para denúncia
-            self.protocolo = gerar_protocolo(ibge, 'DEN', matricula=matricula)
+            # sigla fixa para denúncia; matrícula do criador (se houver) ao final
+            self.protocolo = gerar_protocolo_para_instance(self, 'DEN', user_field_names=('criado_por',))
         super().save(*args, **kwargs)
 
 
@@ -1,3 +1,136 @@
+import base64
+import datetime
+
+from django.db.models import Value
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.notificacoes.models import Notificacao
+from utils.paginacao import KeysetPaginator, _codificar
+from utils.testes import ConsultasTestMixin, criar_prefeitura, criar_usuario, semear, um_caso
+
+from .filtros import filtrar_denuncias
+from .models import Denuncia
+
+
+class ConsultasDenunciasTests(ConsultasTestMixin, TestCase):
+    """Número de consultas das telas de denúncia não cresce com a quantidade de dados."""
+
+    def test_listar(self):
+        self.assertConsultasConstantes(lambda casos: reverse("denuncias:listar"), limite=8)
+
+    def test_detalhe(self):
+        # fotos e apontamentos (com fotos e autor) em consultas fixas
+        self.assertConsultasConstantes(lambda caso: reverse("denuncias:detalhe", args=[caso["denuncia"].pk]),
+                                       limite=17, preparar=um_caso)
+
+    def test_imprimir(self):
+        self.assertConsultasConstantes(lambda caso: reverse("denuncias:imprimir", args=[caso["denuncia"].pk]),
+                                       limite=13, preparar=um_caso)
+
+    def test_editar_completo(self):
+        self.assertConsultasConstantes(lambda caso: reverse("denuncias:editar_completo", args=[caso["denuncia"].pk]),
+                                       limite=11, preparar=um_caso)
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor com datas iguais, fontes mescladas, ida e volta e cursor adulterado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        prefeitura = criar_prefeitura()
+        semear(prefeitura, criar_usuario(prefeitura), 12, filhos=0)
+        # metade com a mesma data: só o desempate (fonte, id) ordena
+        cls.mesma_data = timezone.now().replace(microsecond=0)
+        ids = list(Denuncia.objects.order_by("id").values_list("id", flat=True))
+        Denuncia.objects.filter(id__in=ids[::2]).update(criada_em=cls.mesma_data)
+        Denuncia.objects.filter(id__in=ids[1::2]).update(criada_em=cls.mesma_data - datetime.timedelta(days=1))
+        Notificacao.objects.update(criada_em=cls.mesma_data)
+
+    def _paginas(self, paginator):
+        """Todas as páginas indo com next_cursor e voltando com previous_cursor."""
+        ida, cursor = [], None
+        while True:
+            pagina = paginator.get_page(cursor)
+            ida.append([self._chave(o) for o in pagina])
+            if not pagina.has_next:
+                break
+            cursor = pagina.next_cursor
+        volta = [ida[-1]]
+        while pagina.has_previous:
+            pagina = paginator.get_page(pagina.previous_cursor)
+            volta.insert(0, [self._chave(o) for o in pagina])
+        return ida, volta
+
+    def _chave(self, obj):
+        return (getattr(obj, "_fonte", "DEN"), obj.pk)
+
+    def test_datas_iguais_ida_e_volta(self):
+        paginator = KeysetPaginator(Denuncia.objects.all(), 5, ordenacao=("-criada_em", "-id"))
+        ida, volta = self._paginas(paginator)
+        esperado = [("DEN", pk) for pk in Denuncia.objects.order_by("-criada_em", "-id").values_list("id", flat=True)]
+        self.assertEqual([c for pagina in ida for c in pagina], esperado)
+        self.assertEqual([len(p) for p in ida], [5, 5, 2])
+        self.assertEqual(volta, ida)
+        self.assertFalse(paginator.get_page().has_previous)
+
+    def test_fontes_mescladas_com_ids_repetidos(self):
+        fontes = [Denuncia.objects.annotate(_fonte=Value("DEN")), Notificacao.objects.annotate(_fonte=Value("NOT"))]
+        paginator = KeysetPaginator(fontes, 5, ordenacao=("-criada_em", "-_fonte", "-id"), contagem="exata")
+        ida, volta = self._paginas(paginator)
+        itens = [(o.criada_em, "DEN", o.pk) for o in Denuncia.objects.all()]
+        itens += [(o.criada_em, "NOT", o.pk) for o in Notificacao.objects.all()]
+        esperado = [(fonte, pk) for _, fonte, pk in sorted(itens, reverse=True)]
+        self.assertEqual([c for pagina in ida for c in pagina], esperado)
+        self.assertEqual(len(set(esperado)), 24)
+        self.assertEqual(volta, ida)
+        self.assertEqual(paginator.get_page().total, 24)
+
+    def test_cursor_invalido_volta_para_a_primeira_pagina(self):
+        paginator = KeysetPaginator(Denuncia.objects.all(), 5, ordenacao=("-criada_em", "-id"))
+        primeira = [o.pk for o in paginator.get_page()]
+        adulterados = [
+            "lixo!!",
+            base64.urlsafe_b64encode(b"nao e json").decode(),
+            base64.urlsafe_b64encode(b'{"d":"n"}').decode(),
+            _codificar("n", [self.mesma_data]),               # chave curta
+            _codificar("n", ["ontem", 10]),                    # data inválida
+            _codificar("p", [self.mesma_data, "abc"]),         # id inválido
+        ]
+        for cursor in adulterados:
+            with self.subTest(cursor=cursor):
+                pagina = paginator.get_page(cursor)
+                self.assertEqual([o.pk for o in pagina], primeira)
+                self.assertFalse(pagina.has_previous)
+
+
+class FiltrosDenunciaTests(TestCase):
+    """Nome e endereço por prefixo da coluna normalizada (faixa indexada, sem LIKE '%x%')."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.usuario = criar_usuario(cls.prefeitura)
+        for nome, rua in (("José da Silva", "Rua São João"), ("Maria José", "Avenida Central")):
+            Denuncia.objects.create(prefeitura=cls.prefeitura, criado_por=cls.usuario, denunciado_nome_razao=nome,
+                                    local_oco_logradouro=rua, local_oco_numero="10", descricao_oco="Obra")
+
+    def _nomes(self, **params):
+        qs, _ = filtrar_denuncias(self.prefeitura.pk, params)
+        return sorted(qs.values_list("denunciado_nome_razao", flat=True)), str(qs.query)
+
+    def test_nome_por_prefixo(self):
+        nomes, sql = self._nomes(nome="JOSE da")
+        self.assertEqual(nomes, ["José da Silva"])
+        self.assertNotIn("LIKE", sql)
+        self.assertEqual(self._nomes(nome="silva")[0], [])
+
+    def test_endereco_por_prefixo(self):
+        nomes, sql = self._nomes(endereco="rua sao joao 1")
+        self.assertEqual(nomes, ["José da Silva"])
+        self.assertNotIn("LIKE", sql)
+        self.assertEqual(self._nomes(endereco="central")[0], [])
 
-# Create your tests here.
+    def test_so_pontuacao_nao_filtra(self):
+        self.assertEqual(len(self._nomes(nome="--", endereco="!")[0]), 2)
@@ -5,7 +5,6 @@ from django.shortcuts import redirect, render, get_object_or_404
 from django.urls import reverse
 from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.db.models import F, Value as V
 from django.db.models.functions import Concat, Coalesce
 
@@ -20,9 +19,11 @@ from apps.cadastros.models import Pessoa, Imovel
 from apps.usuarios.audit import log_event
 from .models import DenunciaHistorico
 from apps.notificacoes.models import Notificacao
-from utils.protocolo import gerar_protocolo
-from apps.prefeituras.models import Prefeitura
+from utils.protocolo import novo_protocolo
 from apps.autoinfracao.models import AutoInfracao
+from .filtros import filtrar_denuncias
+from utils.paginacao import KeysetPaginator
+from utils.replica import le_da_replica
 
 # ==========================================================
 # Mapa de campos (centraliza nomes do model para filtros/annotate)
@@ -58,7 +59,7 @@ DocumentoImovelFormSet = inlineformset_factory(
 # ==========================================================
 @login_required
 def denuncia_nova_step1(request):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.error(request, "Sessão sem prefeitura. Faça login e selecione a prefeitura.")
         return redirect("/")
@@ -85,9 +86,8 @@ def denuncia_nova_step1(request):
                 # Gera o protocolo já na view usando a matrícula do usuário logado
                 # para evitar qualquer interferência posterior.
                 try:
-                    pref = Prefeitura.objects.only("codigo_ibge").get(pk=pref_id)
                     mat = getattr(request.user, "matricula", None) or None
-                    obj.protocolo = gerar_protocolo(pref.codigo_ibge or "", "DEN", matricula=mat)
+                    obj.protocolo = novo_protocolo(request.prefeitura, "DEN", matricula=mat)
                 except Exception:
                     # Se algo falhar, o model.save() ainda gerará o protocolo.
                     pass
@@ -218,37 +218,17 @@ def denuncia_nova_step1(request):
 # LISTAR (com filtros e paginação) — NOVO
 # ==========================================================
 @login_required
+@le_da_replica
 def denuncia_list(request):
-    prefeitura_id = request.session.get("prefeitura_id")
+    prefeitura_id = request.prefeitura_id
     if not prefeitura_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("usuarios:home")
 
-    qs = Denuncia.objects.filter(prefeitura_id=prefeitura_id)
-
-    # Filtros GET
-    protocolo = request.GET.get("protocolo", "").strip()
-    cpf_cnpj  = request.GET.get("cpf_cnpj", "").strip()
-    nome      = request.GET.get("nome", "").strip()
-    rg        = request.GET.get("rg", "").strip()
-    telefone  = request.GET.get("telefone", "").strip()
-    endereco  = request.GET.get("endereco", "").strip()
-    pontoref  = request.GET.get("pontoref", "").strip()
-
+    qs, filtros = filtrar_denuncias(prefeitura_id, request.GET)
     f = DEN_FIELD
 
-    if protocolo:
-        qs = qs.filter(**{f"{f['protocolo']}__icontains": protocolo})
-    if cpf_cnpj:
-        qs = qs.filter(**{f"{f['cpf_cnpj']}__icontains": cpf_cnpj})
-    if nome:
-        qs = qs.filter(**{f"{f['nome']}__icontains": nome})
-    if rg:
-        qs = qs.filter(**{f"{f['rg']}__icontains": rg})
-    if telefone:
-        qs = qs.filter(**{f"{f['telefone']}__icontains": telefone})
-
-    # Endereço concatenado para exibição e busca
+    # Endereço concatenado para exibição
     qs = qs.annotate(
         endereco_concat=Concat(
             Coalesce(F(f["end_logradouro"]), V("")),
@@ -260,27 +240,19 @@ def denuncia_list(request):
             Coalesce(F(f["end_cidade"]), V("")),
         )
     )
-    if endereco:
-        qs = qs.filter(endereco_concat__icontains=endereco)
-    if pontoref:
-        qs = qs.filter(local_oco_pontoref__icontains=pontoref)
 
-    # Ordenação por data desc
-    qs = qs.order_by(f"-{f['data_registro']}")
+    # Paginação por cursor (data desc, id desc) — custo constante em qualquer página
+    paginator = KeysetPaginator(qs, 20, ordenacao=(f"-{f['data_registro']}", "-id"), contagem="aproximada")
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
-    # Paginação
-    paginator = Paginator(qs, 20)
-    page_obj = paginator.get_page(request.GET.get("page"))
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    params.pop("page", None)
 
     context = {
         "page_obj": page_obj,
-        "protocolo": protocolo,
-        "cpf_cnpj": cpf_cnpj,
-        "nome": nome,
-        "rg": rg,
-        "telefone": telefone,
-        "endereco": endereco,
-        "pontoref": pontoref,
+        "querystring": params.urlencode(),
+        **filtros,
     }
     return render(request, "denuncias/listar_denuncias.html", context)
 
@@ -290,12 +262,12 @@ def denuncia_list(request):
 # ==========================================================
 @login_required
 def denuncia_edit_basico(request, pk):
-    prefeitura_id = request.session.get("prefeitura_id")
+    prefeitura_id = request.prefeitura_id
     if not prefeitura_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("usuarios:home")
 
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
 
     if request.method == "POST":
         form = DenunciaOrigemForm(request.POST, instance=obj)
@@ -347,12 +319,12 @@ def denuncia_edit_basico(request, pk):
 # ==========================================================
 @login_required
 def denuncia_editar_completo(request, pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=pref_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
 
     # Remoção simples de anexo (foto) via GET
     del_ax = request.GET.get('del_anexo')
@@ -445,12 +417,12 @@ def denuncia_editar_completo(request, pk):
 # ==========================================================
 @login_required
 def denuncia_detail(request, pk):
-    prefeitura_id = request.session.get("prefeitura_id")
+    prefeitura_id = request.prefeitura_id
     if not prefeitura_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("usuarios:home")
 
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
 
     # Monta endereço do ocorrido (string pronta pro template)
     endereco_oco = obj.local_oco_logradouro or ""
@@ -491,18 +463,17 @@ def denuncia_detail(request, pk):
             })
         # Fotos de Apontamentos
         try:
-            for ap in getattr(den, 'apontamentos').all().order_by('-criado_em'):
-                for ax in ap.anexos.all().order_by('-criada_em'):
-                    h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
-                    if h in seen:
-                        continue
-                    seen.add(h)
-                    gal.append({
-                        'url': ax.arquivo.url if ax.arquivo else '',
-                        'label': 'Apontamento',
-                        'id': ax.id,
-                        'owner': 'APONT',
-                    })
+            for ax in den.fotos_apontamentos():
+                h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
+                if h in seen:
+                    continue
+                seen.add(h)
+                gal.append({
+                    'url': ax.arquivo.url if ax.arquivo else '',
+                    'label': 'Apontamento',
+                    'id': ax.id,
+                    'owner': 'APONT',
+                })
         except Exception:
             pass
         return gal
@@ -512,7 +483,7 @@ def denuncia_detail(request, pk):
     # Apontamentos de Campo
     ap_list = []
     try:
-        ap_list = list(getattr(obj, 'apontamentos').all().order_by('-criado_em'))
+        ap_list = list(obj.apontamentos.select_related('criado_por').prefetch_related('anexos').order_by('-criado_em'))
     except Exception:
         ap_list = []
 
@@ -530,11 +501,11 @@ def denuncia_detail(request, pk):
 
 @login_required
 def denuncia_set_procedencia(request, pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("denuncias:listar")
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=pref_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("denuncias:detalhe", pk=pk)
     proc = (request.POST.get("procedencia") or "").upper().strip()
@@ -573,11 +544,11 @@ def denuncia_set_procedencia(request, pk):
 # ===============================
 @login_required
 def denuncia_vincular_pessoa(request, pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("denuncias:listar")
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=pref_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("denuncias:detalhe", pk=pk)
     pessoa_id = request.POST.get("pessoa_id")
@@ -617,11 +588,11 @@ def denuncia_vincular_pessoa(request, pk):
 
 @login_required
 def denuncia_vincular_imovel(request, pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("denuncias:listar")
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=pref_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("denuncias:detalhe", pk=pk)
     imovel_id = request.POST.get("imovel_id")
@@ -667,12 +638,12 @@ def denuncia_vincular_imovel(request, pk):
 # ==========================================================
 @login_required
 def denuncia_imprimir(request, pk):
-    prefeitura_id = request.session.get("prefeitura_id")
+    prefeitura_id = request.prefeitura_id
     if not prefeitura_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("usuarios:home")
 
-    obj = get_object_or_404(Denuncia, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Denuncia.tenant(request), pk=pk)
     anexos = obj.anexos.all().order_by('-criada_em')
 
     # Endereço do ocorrido (string montada)
@@ -715,13 +686,12 @@ def denuncia_imprimir(request, pk):
             seen.add(h)
             gal.append({'url': fx.arquivo.url if fx.arquivo else '', 'label': 'Denúncia'})
         try:
-            for ap in getattr(den, 'apontamentos').all().order_by('-criado_em'):
-                for ax in ap.anexos.all().order_by('-criada_em'):
-                    h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
-                    if h in seen:
-                        continue
-                    seen.add(h)
-                    gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento'})
+            for ax in den.fotos_apontamentos():
+                h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
+                if h in seen:
+                    continue
+                seen.add(h)
+                gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento'})
         except Exception:
             pass
         return gal
@@ -746,11 +716,11 @@ def denuncia_imprimir(request, pk):
 # ==========================================================
 @login_required
 def apontamento_novo(request, den_pk):
-    pref_id = request.session.get("prefeitura_id")
+    pref_id = request.prefeitura_id
     if not pref_id:
         messages.error(request, "Prefeitura não definida na sessão.")
         return redirect("denuncias:listar")
-    den = get_object_or_404(Denuncia, pk=den_pk, prefeitura_id=pref_id)
+    den = get_object_or_404(Denuncia.tenant(request), pk=den_pk)
 
     if request.method == 'POST':
         observacao = (request.POST.get('observacao') or '').strip()[:280]
@@ -0,0 +1,68 @@
+import os
+
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import PerfilRequisicao, RequisicaoLenta
+
+
+@admin.register(RequisicaoLenta)
+class RequisicaoLentaAdmin(admin.ModelAdmin):
+    list_display = ('criado_em', 'view', 'metodo', 'status', 'consultas', 'tempo_sql_ms', 'duracao_ms', 'prefeitura')
+    list_filter = ('view', 'metodo', 'prefeitura')
+    search_fields = ('view', 'url')
+    date_hierarchy = 'criado_em'
+    readonly_fields = ('criado_em', 'view', 'url', 'metodo', 'status', 'usuario', 'prefeitura', 'consultas',
+                       'tempo_sql_ms', 'duracao_ms', 'motivo', 'mais_lentas', 'repetidas')
+
+
+@admin.register(PerfilRequisicao)
+class PerfilRequisicaoAdmin(admin.ModelAdmin):
+    list_display = ('criado_em', 'view', 'metodo', 'status', 'duracao_ms', 'consultas', 'tempo_sql_ms', 'motor',
+                    'usuario', 'download')
+    list_filter = ('motor', 'view', 'prefeitura')
+    search_fields = ('view', 'url')
+    date_hierarchy = 'criado_em'
+    readonly_fields = ('criado_em', 'view', 'url', 'metodo', 'status', 'usuario', 'prefeitura', 'motor',
+                       'duracao_ms', 'consultas', 'tempo_sql_ms', 'download', 'resumo', 'mais_lentas', 'repetidas')
+    exclude = ('arquivo',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_view_permission(self, request, obj=None):
+        # o perfil expõe SQL e caminhos do código: só superusuário
+        return request.user.is_superuser
+
+    def has_change_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='monitoramento_perfilrequisicao_download'),
+        ] + super().get_urls()
+
+    @admin.display(description='Arquivo')
+    def download(self, obj):
+        if not obj.arquivo:
+            return '-'
+        url = reverse('admin:monitoramento_perfilrequisicao_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, os.path.basename(obj.arquivo.name))
+
+    def download_view(self, request, pk):
+        if not request.user.is_superuser:
+            raise Http404
+        perfil = get_object_or_404(PerfilRequisicao, pk=pk)
+        if not perfil.arquivo:
+            raise Http404("Arquivo indisponível.")
+        # .html do pyinstrument abre no navegador; .prof é baixado
+        html = perfil.arquivo.name.endswith('.html')
+        return FileResponse(perfil.arquivo.open('rb'), as_attachment=not html,
+                            filename=os.path.basename(perfil.arquivo.name))
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class MonitoramentoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.monitoramento'
+    verbose_name = 'Monitoramento (SQL e perfis)'
@@ -0,0 +1,90 @@
+"""
+Métricas de requisição e o endpoint /metrics (formato do Prometheus).
+
+O MetricasMiddleware registra, por nome de rota, a duração de cada
+requisição (histograma), o status e as consultas SQL (quantidade e tempo).
+As demais métricas (cache, fotos, auditoria) são registradas onde
+acontecem; ver utils.metricas.
+
+O /metrics só responde com o token de METRICAS_TOKEN
+(Authorization: Bearer ...) ou, sem token configurado, a chamadas diretas
+dos endereços de METRICAS_IPS (padrão: a própria máquina). Chamadas
+repassadas por proxy (com X-Forwarded-For) precisam do token.
+"""
+import hmac
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from utils import metricas
+
+from .middleware import IGNORAR_PREFIXOS
+
+METODOS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _ContadorSQL:
+    """execute_wrapper que só soma quantidade e tempo (sem guardar o SQL)."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - t0
+            self.consultas += 1
+
+
+class MetricasMiddleware:
+    """Duração e consultas por rota (logo depois do WhiteNoiseMiddleware, para medir a pilha toda)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "METRICAS_ATIVAS", True) or request.path.startswith(IGNORAR_PREFIXOS):
+            return self.get_response(request)
+
+        contador = _ContadorSQL()
+        t0 = time.perf_counter()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(contador))
+            response = self.get_response(request)
+        duracao = time.perf_counter() - t0
+
+        match = getattr(request, "resolver_match", None)
+        # sem rota (404) tudo cai num rótulo só, para não criar uma série por URL
+        view = (match.view_name if match else "") or "nao_resolvida"
+        metodo = request.method if request.method in METODOS else "outro"
+        metricas.observar("sisalv_http_request_duration_seconds", duracao, view=view, metodo=metodo)
+        metricas.contar("sisalv_http_requests_total", view=view, metodo=metodo, status=response.status_code)
+        metricas.contar("sisalv_db_queries_total", contador.consultas, view=view)
+        metricas.contar("sisalv_db_query_seconds_total", contador.segundos, view=view)
+        metricas.gravar_se_preciso()
+        return response
+
+
+def _autorizado(request):
+    token = getattr(settings, "METRICAS_TOKEN", "")
+    if token:
+        return hmac.compare_digest(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}")
+    if request.META.get("HTTP_X_FORWARDED_FOR"):
+        return False
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICAS_IPS", ("127.0.0.1", "::1"))
+
+
+@require_GET
+def metrics_view(request):
+    if not _autorizado(request):
+        return HttpResponseForbidden("Acesso às métricas não autorizado.")
+    return HttpResponse(metricas.exposicao(), content_type=TIPO_CONTEUDO)
@@ -0,0 +1,151 @@
+"""
+Instrumentação de consultas SQL por requisição.
+
+Liga com SQL_INSTRUMENTACAO=1 (todas as requisições) ou, só para usuários
+staff, com o cabeçalho "X-Instrumentar-SQL: 1" numa requisição avulsa.
+
+Para cada requisição medida, o logger "sisalvweb.sql" recebe uma linha
+chave=valor (e os mesmos campos em `extra`, para formatadores JSON) com a
+view, o número de consultas, o tempo total de SQL e quantos SQLs se
+repetiram. Quem passa do orçamento da view (SQL_ORCAMENTOS, pelo nome da
+rota, com "padrao" para as demais) vira uma RequisicaoLenta, com as
+consultas mais lentas e as repetidas (o padrão N+1 aparece como o mesmo SQL
+executado dezenas de vezes com parâmetros diferentes).
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("sisalvweb.sql")
+
+CABECALHO = "HTTP_X_INSTRUMENTAR_SQL"
+IGNORAR_PREFIXOS = ("/static/", "/media/", "/favicon.ico")
+MAX_SQL = 2000
+MAX_ITENS = 5
+
+
+class ColetorConsultas:
+    """execute_wrapper que guarda (sql, ms, banco) de cada consulta executada."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.consultas.append((sql, ms, context["connection"].alias))
+
+    @property
+    def tempo_ms(self):
+        return sum(ms for _, ms, _ in self.consultas)
+
+    def mais_lentas(self, n=MAX_ITENS):
+        lentas = sorted(self.consultas, key=lambda c: c[1], reverse=True)[:n]
+        return [{"sql": sql[:MAX_SQL], "ms": round(ms, 2), "banco": banco} for sql, ms, banco in lentas]
+
+    def repetidas(self, n=MAX_ITENS):
+        """SQLs (mesmo texto, parâmetros quaisquer) executados mais de uma vez, os mais frequentes primeiro."""
+        grupos = {}
+        for sql, ms, _ in self.consultas:
+            vezes, total = grupos.get(sql, (0, 0.0))
+            grupos[sql] = (vezes + 1, total + ms)
+        repetidas = sorted(((sql, v, ms) for sql, (v, ms) in grupos.items() if v > 1),
+                           key=lambda r: (r[1], r[2]), reverse=True)
+        return [{"sql": sql[:MAX_SQL], "vezes": v, "ms": round(ms, 2)} for sql, v, ms in repetidas[:n]]
+
+
+def orcamento(view):
+    """{"consultas": n, "sql_ms": ms} da view, completando com o orçamento "padrao"."""
+    orcamentos = getattr(settings, "SQL_ORCAMENTOS", {})
+    return {**orcamentos.get("padrao", {}), **orcamentos.get(view, {})}
+
+
+def estouros(view, consultas, tempo_ms):
+    limites = orcamento(view)
+    motivos = []
+    if limites.get("consultas") is not None and consultas > limites["consultas"]:
+        motivos.append(f"consultas {consultas} > {limites['consultas']}")
+    if limites.get("sql_ms") is not None and tempo_ms > limites["sql_ms"]:
+        motivos.append(f"sql {tempo_ms:.0f} ms > {limites['sql_ms']} ms")
+    return motivos
+
+
+class InstrumentacaoSQLMiddleware:
+    """Mede as consultas SQL de cada requisição (depois do AuthenticationMiddleware)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _medir(self, request):
+        if any(request.path.startswith(p) for p in IGNORAR_PREFIXOS):
+            return False
+        if getattr(settings, "SQL_INSTRUMENTACAO", False):
+            return True
+        if request.META.get(CABECALHO) == "1":
+            user = getattr(request, "user", None)
+            return bool(user and user.is_authenticated and user.is_staff)
+        return False
+
+    def __call__(self, request):
+        if not self._medir(request):
+            return self.get_response(request)
+
+        coletor = ColetorConsultas()
+        t0 = time.perf_counter()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(coletor))
+            response = self.get_response(request)
+        duracao_ms = (time.perf_counter() - t0) * 1000
+
+        self._registrar(request, response, coletor, duracao_ms)
+        return response
+
+    def _registrar(self, request, response, coletor, duracao_ms):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else "") or ""
+        consultas = len(coletor.consultas)
+        tempo_ms = coletor.tempo_ms
+        repetidas = coletor.repetidas()
+        campos = {
+            "view": view or request.path,
+            "metodo": request.method,
+            "status": response.status_code,
+            "consultas": consultas,
+            "sql_ms": round(tempo_ms, 1),
+            "duracao_ms": round(duracao_ms, 1),
+            "repetidas": sum(r["vezes"] for r in repetidas),
+        }
+        logger.info(" ".join(f"{k}=%s" for k in campos), *campos.values(), extra={"sql": campos})
+
+        motivos = estouros(view, consultas, tempo_ms)
+        if not motivos:
+            return
+        logger.warning("orcamento_sql view=%s %s", campos["view"], "; ".join(motivos),
+                       extra={"sql": {**campos, "mais_lentas": coletor.mais_lentas(), "repetidas": repetidas}})
+        from .models import RequisicaoLenta
+        user = getattr(request, "user", None)
+        try:
+            RequisicaoLenta.objects.create(
+                view=view[:120],
+                url=request.get_full_path()[:300],
+                metodo=request.method[:8],
+                status=response.status_code,
+                usuario=user if user is not None and user.is_authenticated else None,
+                prefeitura_id=getattr(request, "prefeitura_id", None),
+                consultas=consultas,
+                tempo_sql_ms=round(tempo_ms, 2),
+                duracao_ms=round(duracao_ms, 2),
+                motivo="; ".join(motivos)[:200],
+                mais_lentas=coletor.mais_lentas(),
+                repetidas=repetidas,
+            )
+        except Exception:
+            # registro de diagnóstico: nunca derruba a requisição
+            logger.exception("falha ao gravar RequisicaoLenta view=%s", view)
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('prefeituras', '0004_sequencia_protocolo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequisicaoLenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('view', models.CharField(max_length=120)),
+                ('url', models.CharField(max_length=300)),
+                ('metodo', models.CharField(max_length=8)),
+                ('status', models.PositiveSmallIntegerField(default=200)),
+                ('consultas', models.PositiveIntegerField(default=0)),
+                ('tempo_sql_ms', models.FloatField(default=0)),
+                ('duracao_ms', models.FloatField(default=0)),
+                ('motivo', models.CharField(blank=True, max_length=200)),
+                ('mais_lentas', models.JSONField(blank=True, default=list)),
+                ('repetidas', models.JSONField(blank=True, default=list)),
+                ('prefeitura', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requisicoes_lentas', to='prefeituras.prefeitura')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requisicoes_lentas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Requisição lenta',
+                'verbose_name_plural': 'Requisições lentas',
+                'db_table': 'monitoramento_requisicao_lenta',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['view', 'criado_em'], name='monitoramen_view_e58149_idx'), models.Index(fields=['criado_em'], name='monitoramen_criado__d38499_idx')],
+            },
+        ),
+    ]
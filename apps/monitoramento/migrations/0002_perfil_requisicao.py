@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:26
+
+import apps.monitoramento.models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoramento', '0001_initial'),
+        ('prefeituras', '0004_sequencia_protocolo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfilRequisicao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('view', models.CharField(max_length=120)),
+                ('url', models.CharField(max_length=300)),
+                ('metodo', models.CharField(max_length=8)),
+                ('status', models.PositiveSmallIntegerField(default=200)),
+                ('motor', models.CharField(choices=[('cprofile', 'cProfile'), ('pyinstrument', 'pyinstrument (amostragem)')], default='cprofile', max_length=20)),
+                ('duracao_ms', models.FloatField(default=0)),
+                ('consultas', models.PositiveIntegerField(default=0)),
+                ('tempo_sql_ms', models.FloatField(default=0)),
+                ('arquivo', models.FileField(blank=True, upload_to=apps.monitoramento.models.upload_perfil_path)),
+                ('resumo', models.TextField(blank=True)),
+                ('mais_lentas', models.JSONField(blank=True, default=list)),
+                ('repetidas', models.JSONField(blank=True, default=list)),
+                ('prefeitura', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='perfis_requisicao', to='prefeituras.prefeitura')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='perfis_requisicao', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Perfil de requisição',
+                'verbose_name_plural': 'Perfis de requisição',
+                'db_table': 'monitoramento_perfil_requisicao',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['view', 'criado_em'], name='monitoramen_view_5ceaa3_idx')],
+            },
+        ),
+    ]
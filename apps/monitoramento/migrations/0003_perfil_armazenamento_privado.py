@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:00
+
+import os
+import shutil
+
+import apps.monitoramento.models
+from django.conf import settings
+from django.db import migrations, models
+
+PREFIXO_ANTIGO = 'monitoramento/perfis/'
+
+
+def mover_arquivos(apps, schema_editor):
+    """Tira do MEDIA_ROOT os perfis já gravados (monitoramento/perfis/...) para o PERFIS_DIR."""
+    PerfilRequisicao = apps.get_model('monitoramento', 'PerfilRequisicao')
+    for perfil in PerfilRequisicao.objects.filter(arquivo__startswith=PREFIXO_ANTIGO).iterator():
+        novo = perfil.arquivo.name[len(PREFIXO_ANTIGO):]
+        origem = os.path.join(settings.MEDIA_ROOT, perfil.arquivo.name)
+        destino = os.path.join(settings.PERFIS_DIR, novo)
+        if os.path.exists(origem):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            shutil.move(origem, destino)
+        PerfilRequisicao.objects.filter(pk=perfil.pk).update(arquivo=novo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoramento', '0002_perfil_requisicao'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='perfilrequisicao',
+            name='arquivo',
+            field=models.FileField(blank=True, storage=apps.monitoramento.models.ArmazenamentoPerfis(), upload_to=apps.monitoramento.models.upload_perfil_path),
+        ),
+        migrations.RunPython(mover_arquivos, migrations.RunPython.noop),
+    ]
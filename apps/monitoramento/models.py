@@ -0,0 +1,117 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+class RequisicaoLenta(models.Model):
+    """
+    Requisição que estourou o orçamento de consultas/tempo SQL da view
+    (ver apps.monitoramento.middleware e settings.SQL_ORCAMENTOS).
+    """
+    criado_em = models.DateTimeField(default=timezone.now)
+    view = models.CharField(max_length=120)  # nome da rota, ex.: denuncias:denuncia_detail
+    url = models.CharField(max_length=300)
+    metodo = models.CharField(max_length=8)
+    status = models.PositiveSmallIntegerField(default=200)
+    usuario = models.ForeignKey('usuarios.Usuario', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='requisicoes_lentas')
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='requisicoes_lentas')
+    consultas = models.PositiveIntegerField(default=0)
+    tempo_sql_ms = models.FloatField(default=0)
+    duracao_ms = models.FloatField(default=0)
+    motivo = models.CharField(max_length=200, blank=True)
+    # [{sql, ms, banco}] das consultas mais demoradas
+    mais_lentas = models.JSONField(default=list, blank=True)
+    # [{sql, vezes, ms}] do mesmo SQL executado várias vezes (N+1)
+    repetidas = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        db_table = 'monitoramento_requisicao_lenta'
+        verbose_name = 'Requisição lenta'
+        verbose_name_plural = 'Requisições lentas'
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['view', 'criado_em']),
+            models.Index(fields=['criado_em']),
+        ]
+
+    def __str__(self):
+        return f"{self.view or self.url}: {self.consultas} consultas, {self.tempo_sql_ms:.0f} ms de SQL"
+
+
+class ArmazenamentoPerfis(FileSystemStorage):
+    """
+    Arquivos de perfil em settings.PERFIS_DIR, fora do MEDIA_ROOT: não têm URL
+    pública, só o download do admin (PerfilRequisicaoAdmin.download_view).
+    """
+
+    @property
+    def base_location(self):
+        return settings.PERFIS_DIR
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("Arquivos de perfil não têm URL pública.")
+
+
+def upload_perfil_path(instance, filename):
+    # PERFIS_DIR/<aaaa>/<mm>/<filename>
+    return f"{timezone.localdate():%Y/%m}/{filename}"
+
+
+class PerfilRequisicao(models.Model):
+    """
+    Perfil de uma requisição avulsa pedida por um superusuário (ver
+    apps.monitoramento.perfil): o arquivo do profiler (.prof do cProfile ou
+    .html do pyinstrument), o resumo em texto e as consultas SQL da requisição.
+    """
+    MOTOR_CHOICES = [
+        ('cprofile', 'cProfile'),
+        ('pyinstrument', 'pyinstrument (amostragem)'),
+    ]
+
+    criado_em = models.DateTimeField(default=timezone.now)
+    view = models.CharField(max_length=120)
+    url = models.CharField(max_length=300)
+    metodo = models.CharField(max_length=8)
+    status = models.PositiveSmallIntegerField(default=200)
+    usuario = models.ForeignKey('usuarios.Usuario', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='perfis_requisicao')
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='perfis_requisicao')
+    motor = models.CharField(max_length=20, choices=MOTOR_CHOICES, default='cprofile')
+    duracao_ms = models.FloatField(default=0)
+    consultas = models.PositiveIntegerField(default=0)
+    tempo_sql_ms = models.FloatField(default=0)
+    arquivo = models.FileField(upload_to=upload_perfil_path, storage=ArmazenamentoPerfis(), blank=True)
+    # funções com mais tempo acumulado (pstats) ou a árvore do pyinstrument
+    resumo = models.TextField(blank=True)
+    mais_lentas = models.JSONField(default=list, blank=True)
+    repetidas = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        db_table = 'monitoramento_perfil_requisicao'
+        verbose_name = 'Perfil de requisição'
+        verbose_name_plural = 'Perfis de requisição'
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['view', 'criado_em']),
+        ]
+
+    def __str__(self):
+        return f"{self.view or self.url}: {self.duracao_ms:.0f} ms ({self.get_motor_display()})"
+
+
+@receiver(post_delete, sender=PerfilRequisicao, dispatch_uid="monitoramento_perfil_arquivo_rm")
+def _remover_arquivo(sender, instance, **kwargs):
+    if instance.arquivo:
+        instance.arquivo.delete(save=False)
@@ -0,0 +1,170 @@
+"""
+Perfil sob demanda de uma requisição, para superusuários.
+
+Em produção, com os dados reais, um superusuário acrescenta `?_perfil=1` à
+URL (ou manda o cabeçalho "X-Perfil: 1") e a requisição roda sob o cProfile.
+Com `_perfil=pyinstrument` o perfil é por amostragem (pyinstrument, se
+instalado; senão cai no cProfile), mais leve e com relatório HTML.
+
+O resultado vira um PerfilRequisicao: o arquivo .prof (abrir com snakeviz
+ou `python -m pstats`) ou .html, o resumo das funções mais caras e as
+consultas SQL da requisição. A resposta leva o cabeçalho X-Perfil com o
+endereço do registro no admin. Só mede o tempo da view até a resposta ser
+montada: o conteúdo de respostas em streaming é gerado depois e fica de fora.
+"""
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .middleware import ColetorConsultas
+
+logger = logging.getLogger("sisalvweb.sql")
+
+PARAMETRO = "_perfil"
+CABECALHO = "HTTP_X_PERFIL"
+MOTORES = ("cprofile", "pyinstrument")
+LINHAS_RESUMO = 40
+
+
+def motor_pedido(request):
+    """'cprofile', 'pyinstrument' ou None (requisição sem perfil)."""
+    if not getattr(settings, "PERFIL_SOB_DEMANDA", True):
+        return None
+    valor = (request.GET.get(PARAMETRO) or request.META.get(CABECALHO) or "").strip().lower()
+    if not valor or valor == "0":
+        return None
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated and user.is_superuser):
+        return None
+    return valor if valor in MOTORES else "cprofile"
+
+
+class _CProfile:
+    motor = "cprofile"
+    extensao = "prof"
+
+    def __init__(self):
+        self.perfil = cProfile.Profile()
+
+    def iniciar(self):
+        self.perfil.enable()
+
+    def parar(self):
+        self.perfil.disable()
+
+    def arquivo(self):
+        # mesmo formato de pstats.Stats.dump_stats
+        self.perfil.create_stats()
+        return marshal.dumps(self.perfil.stats)
+
+    def resumo(self):
+        saida = io.StringIO()
+        pstats.Stats(self.perfil, stream=saida).sort_stats("cumulative").print_stats(LINHAS_RESUMO)
+        return saida.getvalue()
+
+
+class _Pyinstrument:
+    motor = "pyinstrument"
+    extensao = "html"
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.perfil = Profiler(interval=0.001)
+
+    def iniciar(self):
+        self.perfil.start()
+
+    def parar(self):
+        self.perfil.stop()
+
+    def arquivo(self):
+        return self.perfil.output_html().encode("utf-8")
+
+    def resumo(self):
+        return self.perfil.output_text(unicode=True, color=False)
+
+
+def _profiler(motor):
+    if motor == "pyinstrument":
+        try:
+            return _Pyinstrument()
+        except ImportError:
+            logger.warning("perfil: pyinstrument não instalado, usando cProfile")
+    return _CProfile()
+
+
+class PerfilMiddleware:
+    """Roda a requisição sob um profiler quando um superusuário pede (depois do AuthenticationMiddleware)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        motor = motor_pedido(request)
+        if motor is None:
+            return self.get_response(request)
+
+        profiler = _profiler(motor)
+        coletor = ColetorConsultas()
+        t0 = time.perf_counter()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(coletor))
+            try:
+                profiler.iniciar()
+            except ValueError:
+                # outro profiler já ativo no processo (ex.: depurador)
+                logger.warning("perfil: profiler indisponível em %s", request.path)
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.parar()
+        duracao_ms = (time.perf_counter() - t0) * 1000
+
+        perfil = self._gravar(request, response, profiler, coletor, duracao_ms)
+        if perfil is not None:
+            response["X-Perfil"] = reverse("admin:monitoramento_perfilrequisicao_change", args=[perfil.pk])
+        return response
+
+    def _gravar(self, request, response, profiler, coletor, duracao_ms):
+        from .models import PerfilRequisicao
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else "") or ""
+        try:
+            perfil = PerfilRequisicao(
+                view=view[:120],
+                url=request.get_full_path()[:300],
+                metodo=request.method[:8],
+                status=response.status_code,
+                usuario=request.user,
+                prefeitura_id=getattr(request, "prefeitura_id", None),
+                motor=profiler.motor,
+                duracao_ms=round(duracao_ms, 2),
+                consultas=len(coletor.consultas),
+                tempo_sql_ms=round(coletor.tempo_ms, 2),
+                resumo=profiler.resumo(),
+                mais_lentas=coletor.mais_lentas(),
+                repetidas=coletor.repetidas(),
+            )
+            nome = f"{slugify(view.replace(':', '-')) or 'requisicao'}-{timezone.now():%Y%m%d-%H%M%S}.{profiler.extensao}"
+            perfil.arquivo.save(nome, ContentFile(profiler.arquivo()), save=False)
+            perfil.save()
+        except Exception:
+            # diagnóstico: nunca derruba a requisição
+            logger.exception("falha ao gravar PerfilRequisicao view=%s", view)
+            return None
+        logger.info("perfil view=%s duracao_ms=%.1f consultas=%s id=%s", view or request.path, duracao_ms,
+                    perfil.consultas, perfil.pk)
+        return perfil
@@ -0,0 +1,179 @@
+import json
+import marshal
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from utils import metricas
+from utils.testes import criar_prefeitura, criar_usuario
+
+from .models import PerfilRequisicao
+
+
+class PerfilSobDemandaTests(TestCase):
+    """?_perfil=1 gera um PerfilRequisicao só para superusuário."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp()
+        cls.perfis = tempfile.mkdtemp()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media, PERFIS_DIR=cls.perfis))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        shutil.rmtree(cls.perfis, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.admin = criar_usuario(cls.prefeitura, email="admin@teste.gov.br", is_superuser=True)
+        cls.fiscal = criar_usuario(cls.prefeitura)
+
+    def _entrar(self, usuario):
+        self.client.force_login(usuario)
+        session = self.client.session
+        session["prefeitura_id"] = self.prefeitura.pk
+        session.save()
+
+    def test_superusuario_gera_perfil(self):
+        self._entrar(self.admin)
+        resposta = self.client.get(reverse("denuncias:listar") + "?_perfil=1")
+        self.assertEqual(resposta.status_code, 200)
+        perfil = PerfilRequisicao.objects.get()
+        self.assertEqual(resposta["X-Perfil"], reverse("admin:monitoramento_perfilrequisicao_change", args=[perfil.pk]))
+        self.assertEqual((perfil.view, perfil.motor, perfil.usuario), ("denuncias:listar", "cprofile", self.admin))
+        self.assertGreater(perfil.consultas, 0)
+        self.assertIn("cumulative", perfil.resumo)
+
+        download = self.client.get(reverse("admin:monitoramento_perfilrequisicao_download", args=[perfil.pk]))
+        self.assertEqual(download.status_code, 200)
+        self.assertIsInstance(marshal.loads(b"".join(download.streaming_content)), dict)
+
+        # fora do MEDIA_ROOT e sem URL pública
+        self.assertTrue(os.path.isfile(os.path.join(self.perfis, perfil.arquivo.name)))
+        self.assertEqual(os.listdir(self.media), [])
+        with self.assertRaises(ValueError):
+            perfil.arquivo.url
+
+        nome = perfil.arquivo.name
+        perfil.delete()
+        self.assertFalse(perfil.arquivo.storage.exists(nome))
+
+    def test_admin_so_para_superusuario(self):
+        self._entrar(self.admin)
+        self.client.get(reverse("home") + "?_perfil=1")
+        perfil = PerfilRequisicao.objects.get()
+        self._entrar(self.fiscal)
+        for nome in ("change", "delete", "download"):
+            url = reverse(f"admin:monitoramento_perfilrequisicao_{nome}", args=[perfil.pk])
+            self.assertIn(self.client.get(url).status_code, (403, 404), nome)
+        self.assertIn(self.client.post(reverse("admin:monitoramento_perfilrequisicao_delete", args=[perfil.pk]),
+                                       {"post": "yes"}).status_code, (403, 404))
+        self.assertTrue(PerfilRequisicao.objects.exists())
+
+    def test_cabecalho_e_pyinstrument_ausente(self):
+        self._entrar(self.admin)
+        self.client.get(reverse("home"), headers={"X-Perfil": "pyinstrument"})
+        self.assertEqual(PerfilRequisicao.objects.count(), 1)
+
+    def test_sem_superusuario_nao_gera(self):
+        self._entrar(self.fiscal)
+        resposta = self.client.get(reverse("home") + "?_perfil=1")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotIn("X-Perfil", resposta)
+        self.assertFalse(PerfilRequisicao.objects.exists())
+
+    @override_settings(PERFIL_SOB_DEMANDA=False)
+    def test_desligado(self):
+        self._entrar(self.admin)
+        self.client.get(reverse("home") + "?_perfil=1")
+        self.assertFalse(PerfilRequisicao.objects.exists())
+
+
+class MetricasTests(TestCase):
+    """/metrics no formato do Prometheus, somando os retratos dos processos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.usuario = criar_usuario(cls.prefeitura)
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, ignore_errors=True)
+        self.client.force_login(self.usuario)
+        session = self.client.session
+        session["prefeitura_id"] = self.prefeitura.pk
+        session.save()
+
+    def _metricas(self, **extra):
+        resposta = self.client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1", **extra)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return resposta.content.decode()
+
+    def test_requisicao_cache_e_auditoria(self):
+        cache.clear()
+        with override_settings(METRICAS_DIR=self.pasta):
+            self.client.get(reverse("home"))
+            texto = self._metricas()
+        self.assertIn('sisalv_http_request_duration_seconds_bucket{metodo="GET",view="home",le="+Inf"}', texto)
+        self.assertIn('sisalv_http_requests_total{metodo="GET",status="200",view="home"}', texto)
+        self.assertIn('sisalv_db_queries_total{view="home"}', texto)
+        self.assertIn('sisalv_cache_total{grupo="relatorios:resumo_anual",resultado="miss"}', texto)
+        self.assertIn("# TYPE sisalv_auditoria_fila gauge", texto)
+        self.assertTrue(os.path.exists(os.path.join(self.pasta, f"{os.getpid()}.json")))
+
+    def test_soma_retratos_de_outros_processos(self):
+        morto = {"pid": 2 ** 22 + 1, "medidores": [["sisalv_auditoria_fila", {}, 7.0]],
+                 "contadores": [["sisalv_auditoria_gravados_total", {}, 1000]],
+                 "histogramas": [["sisalv_foto_processamento_seconds", {"modulo": "denuncia"},
+                                  [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0.3]]]}
+        with open(os.path.join(self.pasta, f"{morto['pid']}.json"), "w") as f:
+            json.dump(morto, f)
+        with override_settings(METRICAS_DIR=self.pasta):
+            texto = self._metricas()
+        self.assertIn("sisalv_auditoria_gravados_total 1000", texto)
+        self.assertIn('sisalv_foto_processamento_seconds_bucket{modulo="denuncia",le="0.25"} 1', texto)
+        self.assertIn('sisalv_foto_processamento_seconds_count{modulo="denuncia"} 1', texto)
+        # medidor de processo que já terminou não entra
+        self.assertNotIn("sisalv_auditoria_fila 7", texto)
+
+    def test_retrato_de_processo_encerrado_vai_para_encerrados(self):
+        for pid, gravados in ((2 ** 22 + 1, 1000), (2 ** 22 + 2, 500)):
+            with open(os.path.join(self.pasta, f"{pid}.json"), "w") as f:
+                json.dump({"pid": pid, "contadores": [["sisalv_auditoria_gravados_total", {}, gravados]],
+                           "histogramas": [], "medidores": []}, f)
+            with override_settings(METRICAS_DIR=self.pasta):
+                texto = self._metricas()
+            self.assertFalse(os.path.exists(os.path.join(self.pasta, f"{pid}.json")))
+        self.assertIn("sisalv_auditoria_gravados_total 1500.0", texto)
+        self.assertEqual(sorted(os.listdir(self.pasta)), [f"{os.getpid()}.json", metricas.ENCERRADOS])
+        # leituras seguintes não contam de novo
+        with override_settings(METRICAS_DIR=self.pasta):
+            self.assertIn("sisalv_auditoria_gravados_total 1500.0", self._metricas())
+
+    def test_trava_ocupada_so_soma(self):
+        morto = os.path.join(self.pasta, f"{2 ** 22 + 1}.json")
+        with open(morto, "w") as f:
+            json.dump({"pid": 2 ** 22 + 1, "contadores": [["sisalv_auditoria_gravados_total", {}, 10]]}, f)
+        open(os.path.join(self.pasta, metricas.TRAVA), "w").close()
+        with override_settings(METRICAS_DIR=self.pasta):
+            self.assertIn("sisalv_auditoria_gravados_total 10", self._metricas())
+        self.assertTrue(os.path.exists(morto))
+
+    def test_acesso(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.0.0.9").status_code, 403)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR="1.2.3.4").status_code, 403)
+        with override_settings(METRICAS_TOKEN="segredo"):
+            self.assertEqual(self.client.get(url, REMOTE_ADDR="127.0.0.1").status_code, 403)
+            self.assertEqual(self.client.get(url, REMOTE_ADDR="10.0.0.9",
+                                             HTTP_AUTHORIZATION="Bearer segredo").status_code, 200)
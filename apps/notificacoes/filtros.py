@@ -0,0 +1,41 @@
+# apps/notificacoes/filtros.py
+"""Filtros da listagem de Notificações (reaproveitados pela exportação)."""
+from apps.busca.indice import filtrar_queryset
+from apps.busca.protocolos import ids_por_prefixo
+from utils.texto import normalizar_texto, prefixo_q, so_digitos
+
+from .models import Notificacao
+
+
+CAMPOS_FILTRO = ("q", "protocolo", "cpf_cnpj", "nome_razao", "rg", "telefone", "endereco", "status")
+
+
+def filtrar_notificacoes(prefeitura_id, params):
+    """(queryset, filtros) a partir dos parâmetros GET da listagem."""
+    filtros = {k: (params.get(k) or "").strip() for k in CAMPOS_FILTRO}
+    qs = Notificacao.objects.filter(prefeitura_id=prefeitura_id)
+
+    if filtros["q"]:
+        qs = filtrar_queryset(qs, "NOT", prefeitura_id, filtros["q"])
+    if filtros["protocolo"]:
+        qs = qs.filter(pk__in=ids_por_prefixo(prefeitura_id, "NOT", filtros["protocolo"]))
+    # documento/telefone por dígitos (exato ou prefixo, indexado); nome/endereço sem acentos
+    if filtros["cpf_cnpj"]:
+        d = so_digitos(filtros["cpf_cnpj"])
+        qs = qs.filter(prefixo_q("doc_digitos", d)) if d else qs.filter(cpf_cnpj__icontains=filtros["cpf_cnpj"])
+    if filtros["nome_razao"]:
+        # sem acentos, por prefixo (índice (prefeitura, nome_norm))
+        nome = normalizar_texto(filtros["nome_razao"])
+        qs = qs.filter(prefixo_q("nome_norm", nome)) if nome else qs
+    if filtros["rg"]:
+        qs = qs.filter(rg__icontains=filtros["rg"])
+    if filtros["telefone"]:
+        d = so_digitos(filtros["telefone"])
+        qs = qs.filter(prefixo_q("tel_digitos", d)) if d else qs.filter(telefone__icontains=filtros["telefone"])
+    if filtros["endereco"]:
+        # início do endereço normalizado (logradouro, nº, bairro...): usa o índice (prefeitura, endereco_norm)
+        endereco = normalizar_texto(filtros["endereco"])
+        qs = qs.filter(prefixo_q("endereco_norm", endereco)) if endereco else qs
+    if filtros["status"]:
+        qs = qs.filter(status=filtros["status"])
+    return qs, filtros
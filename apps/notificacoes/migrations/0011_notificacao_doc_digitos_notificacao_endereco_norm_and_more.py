@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cadastros', '0003_pessoa_nome_norm_pessoa_tel_digitos_and_more'),
+        ('denuncias', '0013_denuncia_doc_digitos_denuncia_endereco_norm_and_more'),
+        ('notificacoes', '0010_notificacao_processo'),
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('processos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacao',
+            name='doc_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='endereco_norm',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='nome_norm',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='tel_digitos',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['prefeitura', 'doc_digitos'], name='notificacoe_prefeit_913906_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['prefeitura', 'tel_digitos'], name='notificacoe_prefeit_7b8748_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['prefeitura', 'nome_norm'], name='notificacoe_prefeit_4a60c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['prefeitura', 'endereco_norm'], name='notificacoe_prefeit_6f38e9_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:33
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificacoes', '0012_popular_colunas_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(models.F('prefeitura'), django.db.models.functions.comparison.Coalesce('prazo_regularizacao', django.db.models.expressions.RawSQL("'9999-12-31'", []), output_field=models.DateField()), models.OrderBy(models.F('criada_em'), descending=True), models.OrderBy(models.F('id'), descending=True), name='notif_pref_prazo_ordem_idx'),
+        ),
+    ]
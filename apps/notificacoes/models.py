@@ -1,10 +1,11 @@
 from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
-from apps.prefeituras.models import Prefeitura
+from apps.prefeituras.models import EscopoPrefeitura, Prefeitura
 from apps.usuarios.models import Usuario
 import os
 import hashlib
+import time
 from PIL import Image
 from io import BytesIO
 from django.core.files.base import ContentFile
@@ -17,14 +18,29 @@ def upload_anexo_path_notificacao(instance, filename):
     return f"notificacoes/anexos/{instance.notificacao.id}/{filename}"
 
 
+from utils import metricas
 from utils.protocolo import gerar_protocolo_para_instance
+from utils.texto import incluir_campos_derivados, normalizar_texto, so_digitos
+from utils.paginacao import prazo_ordem
 from utils.choices import (
     PESSOA_TIPO_CHOICES,
     NOTIFICACAO_STATUS_CHOICES,
     DOC_TIPO_CHOICES,
 )
 
-class Notificacao(models.Model):
+_CAMPOS_BUSCA = ("doc_digitos", "tel_digitos", "nome_norm", "endereco_norm")
+_CAMPOS_BUSCA_ORIGEM = (
+    'cpf_cnpj',
+    'telefone',
+    'nome_razao',
+    'logradouro',
+    'numero',
+    'bairro',
+    'cidade',
+)
+
+
+class Notificacao(EscopoPrefeitura, models.Model):
     # 🔹 Identificação
     # Aumentado para 64 para comportar matrícula no protocolo (ex.: IBGE-SIGLA-DATA-MATRICULA)
     protocolo = models.CharField(max_length=64, unique=True, editable=False)
@@ -92,6 +108,28 @@ class Notificacao(models.Model):
     pessoa = models.ForeignKey('cadastros.Pessoa', null=True, blank=True, on_delete=models.SET_NULL, related_name='notificacoes')
     imovel = models.ForeignKey('cadastros.Imovel', null=True, blank=True, on_delete=models.SET_NULL, related_name='notificacoes')
 
+    # Colunas normalizadas para busca (mantidas no save(); não editáveis)
+    doc_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    tel_digitos = models.CharField(max_length=20, blank=True, editable=False)
+    nome_norm = models.CharField(max_length=255, blank=True, editable=False)
+    endereco_norm = models.CharField(max_length=255, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['prefeitura', 'doc_digitos']),
+            models.Index(fields=['prefeitura', 'tel_digitos']),
+            models.Index(fields=['prefeitura', 'nome_norm']),
+            models.Index(fields=['prefeitura', 'endereco_norm']),
+            # Listagem paginada por cursor: (prazo, -criada_em, -id)
+            models.Index(
+                models.F('prefeitura'), prazo_ordem('prazo_regularizacao'),
+                models.F('criada_em').desc(), models.F('id').desc(),
+                name='notif_pref_prazo_ordem_idx',
+            ),
+            # Relatório de prazos (casos em aberto por faixa de prazo)
+            models.Index(fields=['prefeitura', 'status', 'prazo_regularizacao']),
+        ]
+
     def save(self, *args, **kwargs):
         # Normaliza lat/lng para float com 6 casas e ponto
         def _coerce_float6(val, lo=None, hi=None):
@@ -106,6 +144,14 @@ class Notificacao(models.Model):
                 return None
         self.latitude = _coerce_float6(self.latitude, -90.0, 90.0)
         self.longitude = _coerce_float6(self.longitude, -180.0, 180.0)
+        # Colunas normalizadas de busca
+        self.doc_digitos = so_digitos(self.cpf_cnpj)[:20]
+        self.tel_digitos = so_digitos(self.telefone)[:20]
+        self.nome_norm = normalizar_texto(self.nome_razao)[:255]
+        self.endereco_norm = normalizar_texto(" ".join(
+            str(v) for v in (self.logradouro, self.numero, self.bairro, self.cidade) if v
+        ))[:255]
+        incluir_campos_derivados(kwargs, _CAMPOS_BUSCA_ORIGEM, _CAMPOS_BUSCA)
         # Geração de protocolo (somente na criação)
         if not self.pk and not self.protocolo:
             # sigla fixa para NOTIFICAÇÃO
@@ -181,6 +227,8 @@ class NotificacaoAnexo(models.Model):
             return
 
         try:
+            t0 = time.perf_counter()
+            bytes_recebidos = self.arquivo.size
             MAX_KB = 100
             TARGET_KB = 95
 
@@ -222,6 +270,7 @@ class NotificacaoAnexo(models.Model):
             new_name = f"{base}.jpg"
             self.arquivo.save(new_name, ContentFile(best), save=False)
             self.otimizada = True
+            metricas.foto_processada("notificacao", time.perf_counter() - t0, bytes_recebidos, len(best))
 
             # Gerar hash SHA256
             hash_obj = hashlib.sha256()
@@ -1,3 +1,24 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from utils.testes import ConsultasTestMixin, um_caso
+
+
+class ConsultasNotificacoesTests(ConsultasTestMixin, TestCase):
+    """Número de consultas das telas de notificação não cresce com a quantidade de dados."""
+
+    def test_listar(self):
+        self.assertConsultasConstantes(lambda casos: reverse("notificacoes:listar"), limite=8)
+
+    def test_detalhe(self):
+        # galeria herdada da denúncia (fotos dos apontamentos em uma consulta)
+        self.assertConsultasConstantes(lambda caso: reverse("notificacoes:detalhe", args=[caso["notificacao"].pk]),
+                                       limite=13, preparar=um_caso)
+
+    def test_imprimir(self):
+        self.assertConsultasConstantes(lambda caso: reverse("notificacoes:imprimir", args=[caso["notificacao"].pk]),
+                                       limite=13, preparar=um_caso)
+
+    def test_editar(self):
+        self.assertConsultasConstantes(lambda caso: reverse("notificacoes:editar", args=[caso["notificacao"].pk]),
+                                       limite=8, preparar=um_caso)
@@ -1,8 +1,6 @@
 # apps/notificacoes/views.py
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
@@ -15,15 +13,17 @@ from .forms import NotificacaoCreateForm, NotificacaoEditForm
 from apps.cadastros.models import Pessoa, Imovel
 from decimal import Decimal
 from apps.usuarios.audit import log_event
+from .filtros import filtrar_notificacoes
+from utils.texto import so_digitos
+from utils.paginacao import KeysetPaginator, prazo_ordem
+from utils.replica import le_da_replica
 
 
 # ---------------------------------------------
 # Helpers de detecção de vínculos candidatos
 # ---------------------------------------------
 def _norm_doc(doc: str) -> str:
-    if not doc:
-        return ""
-    return "".join([c for c in str(doc) if c.isdigit()])
+    return so_digitos(doc)
 
 
 def _find_pessoa_candidata(prefeitura_id: int, cpf_cnpj: str):
@@ -88,7 +88,7 @@ def _find_imovel_candidato(prefeitura_id: int, *,
 
 
 def _get_prefeitura_id(request):
-    return request.session.get("prefeitura_id")
+    return request.prefeitura_id
 
 
 def _normalize_decimal_inputs(data):
@@ -119,57 +119,30 @@ def _normalize_decimal_inputs(data):
 
 
 @login_required
+@le_da_replica
 def listar(request):
     prefeitura_id = _get_prefeitura_id(request)
     if not prefeitura_id:
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    qs = Notificacao.objects.filter(prefeitura_id=prefeitura_id).order_by("-criada_em")
-
-    # filtros
-    protocolo = request.GET.get("protocolo", "").strip()
-    cpf_cnpj = request.GET.get("cpf_cnpj", "").strip()
-    nome_razao = request.GET.get("nome_razao", "").strip()
-    rg = request.GET.get("rg", "").strip()
-    telefone = request.GET.get("telefone", "").strip()
-    endereco = request.GET.get("endereco", "").strip()
-    status = request.GET.get("status", "").strip()
-    # campo de ponto de referência removido do filtro/listagem
-
-    if protocolo: qs = qs.filter(protocolo__icontains=protocolo)
-    if cpf_cnpj: qs = qs.filter(cpf_cnpj__icontains=cpf_cnpj)
-    if nome_razao: qs = qs.filter(nome_razao__icontains=nome_razao)
-    if rg: qs = qs.filter(rg__icontains=rg)
-    if telefone: qs = qs.filter(telefone__icontains=telefone)
-    if endereco:
-        qs = qs.filter(
-            Q(logradouro__icontains=endereco)
-            | Q(numero__icontains=endereco)
-            | Q(bairro__icontains=endereco)
-            | Q(cidade__icontains=endereco)
-        )
-    if status: qs = qs.filter(status=status)
+    qs, filtros = filtrar_notificacoes(prefeitura_id, request.GET)
 
-    # Ordenação: crescente por dias de prazo (negativos primeiro, sem prazo no final)
-    itens = list(qs)
-    def _key(n):
-        d = getattr(n, 'dias_restantes', None)
-        return d if d is not None else 10**9
-    itens.sort(key=_key)
-    page_obj = Paginator(itens, 20).get_page(request.GET.get("page"))
+    # Ordenação: crescente por prazo (vencidos primeiro, sem prazo no final),
+    # paginada por cursor no banco em vez de ordenar tudo em memória
+    qs = qs.annotate(prazo_ordem=prazo_ordem("prazo_regularizacao"))
+    paginator = KeysetPaginator(qs, 20, ordenacao=("prazo_ordem", "-criada_em", "-id"), contagem="aproximada")
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
-    # Monta querystring sem o parâmetro 'page' para paginação estável
+    # Monta querystring sem o cursor para paginação estável
     params = request.GET.copy()
+    params.pop('cursor', None)
     params.pop('page', None)
     querystring = params.urlencode()
 
     context = {
         "page_obj": page_obj,
-        "filtros": {
-            "protocolo": protocolo, "cpf_cnpj": cpf_cnpj, "nome_razao": nome_razao,
-            "rg": rg, "telefone": telefone, "endereco": endereco, "status": status,
-        },
+        "filtros": filtros,
         "status_choices": Notificacao._meta.get_field("status").choices,
         "querystring": querystring,
     }
@@ -276,7 +249,7 @@ def editar(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Notificacao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
 
     # Exclusão de anexo via GET
     del_ax = request.GET.get("del_anexo")
@@ -359,7 +332,7 @@ def detalhe(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Notificacao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
     anexos = obj.anexos.all().order_by("-criada_em")
     # AIF relacionado (se existir)
     aif = AutoInfracao.objects.filter(notificacao_id=obj.pk, prefeitura_id=prefeitura_id).order_by("-criada_em").first()
@@ -374,12 +347,11 @@ def detalhe(request, pk):
             seen.add(h)
             gal.append({'url': fx.arquivo.url if fx.arquivo else '', 'label': 'Denúncia', 'id': fx.id, 'owner': 'DEN'})
         try:
-            for ap in getattr(den, 'apontamentos').all().order_by('-criado_em'):
-                for ax in ap.anexos.all().order_by('-criada_em'):
-                    h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
-                    if h in seen: continue
-                    seen.add(h)
-                    gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento', 'id': ax.id, 'owner': 'APONT'})
+            for ax in den.fotos_apontamentos():
+                h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
+                if h in seen: continue
+                seen.add(h)
+                gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento', 'id': ax.id, 'owner': 'APONT'})
         except Exception:
             pass
         return gal
@@ -418,7 +390,7 @@ def vincular_pessoa(request, pk):
     if not prefeitura_id:
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
-    obj = get_object_or_404(Notificacao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("notificacoes:detalhe", pk=pk)
     tipo = (request.POST.get("tipo") or "PF").upper()
@@ -454,7 +426,7 @@ def vincular_imovel(request, pk):
     if not prefeitura_id:
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
-    obj = get_object_or_404(Notificacao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
     if request.method != "POST":
         return redirect("notificacoes:detalhe", pk=pk)
     inscricao = (request.POST.get("inscricao") or "").strip()
@@ -498,7 +470,7 @@ def confirmar_vinculos(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Notificacao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
 
     # Se já estiver vinculado (ou originado de denúncia), não precisa confirmar
     if obj.pessoa_id or obj.imovel_id or obj.denuncia_id:
@@ -588,7 +560,7 @@ def imprimir(request, pk):
         messages.warning(request, "Nenhuma prefeitura selecionada para a sessão.")
         return redirect("/")
 
-    obj = get_object_or_404(Notificacao, pk=pk, prefeitura_id=prefeitura_id)
+    obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
     anexos = obj.anexos.all().order_by("-criada_em")
     # Relacionados
     den = obj.denuncia  # pode ser None
@@ -605,13 +577,12 @@ def imprimir(request, pk):
             seen.add(h)
             gal.append({'url': fx.arquivo.url if fx.arquivo else '', 'label': 'Denúncia'})
         try:
-            for ap in getattr(den_obj, 'apontamentos').all().order_by('-criado_em'):
-                for ax in ap.anexos.all().order_by('-criada_em'):
-                    h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
-                    if h in seen:
-                        continue
-                    seen.add(h)
-                    gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento'})
+            for ax in den_obj.fotos_apontamentos():
+                h = ax.hash_sha256 or f"path:{getattr(ax.arquivo, 'name', '')}"
+                if h in seen:
+                    continue
+                seen.add(h)
+                gal.append({'url': ax.arquivo.url if ax.arquivo else '', 'label': 'Apontamento'})
         except Exception:
             pass
         return gal
@@ -1,6 +1,6 @@
 # apps/prefeituras/admin.py
 from django.contrib import admin
-from .models import Prefeitura
+from .models import Prefeitura, SequenciaProtocolo
 
 @admin.register(Prefeitura)
 class PrefeituraAdmin(admin.ModelAdmin):
@@ -20,3 +20,10 @@ class PrefeituraAdmin(admin.ModelAdmin):
             'description': "Defina as coordenadas para centralizar o mapa na sua prefeitura.",
         }),
     )
+
+
+@admin.register(SequenciaProtocolo)
+class SequenciaProtocoloAdmin(admin.ModelAdmin):
+    list_display = ("prefeitura", "sigla", "ano", "ultimo")
+    list_filter = ("sigla", "ano", "prefeitura")
+    readonly_fields = ("prefeitura", "sigla", "ano", "ultimo")
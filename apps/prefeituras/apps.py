@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PrefeiturasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.prefeituras'
+
+    def ready(self):
+        # PRAGMAs do SQLite (WAL, busy_timeout, mmap...) em toda conexão nova
+        from utils import sqlite  # noqa: F401
+        # Invalida a prefeitura em memória (PrefeituraMiddleware) quando ela muda
+        from . import tenant  # noqa: F401
@@ -0,0 +1,92 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+
+from apps.prefeituras.models import Prefeitura, SequenciaProtocolo
+from utils.protocolo import alocar_sequencia
+
+SIGLA_BENCH = "BENCH"
+ANO_BENCH = 1900
+
+
+def _ms(amostras):
+    amostras = sorted(amostras)
+    p95 = amostras[min(len(amostras) - 1, int(len(amostras) * 0.95))]
+    return f"média {statistics.mean(amostras):.2f} ms · p50 {statistics.median(amostras):.2f} ms · p95 {p95:.2f} ms"
+
+
+class Command(BaseCommand):
+    help = ("Mede o custo de conexão por requisição e a vazão de escritas concorrentes no banco configurado "
+            "(compare: settings padrão/SQLite x --settings=sisalvweb.settings_producao)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=200, help='Ciclos de requisição simulados (padrão: 200)')
+        parser.add_argument('--threads', type=int, default=8, help='Escritores concorrentes (padrão: 8)')
+        parser.add_argument('--escritas', type=int, default=50, help='Escritas por thread (padrão: 50)')
+        parser.add_argument('--prefeitura', type=int, help='ID da prefeitura usada nas escritas (padrão: a primeira)')
+
+    def handle(self, *args, **options):
+        pref = (Prefeitura.objects.filter(pk=options['prefeitura']) if options.get('prefeitura')
+                else Prefeitura.objects.order_by('pk')).first()
+        if pref is None:
+            raise CommandError('Nenhuma prefeitura cadastrada para o benchmark.')
+
+        db = connection.settings_dict
+        pool = bool((db.get('OPTIONS') or {}).get('pool'))
+        self.stdout.write(f"Banco: {connection.vendor} · CONN_MAX_AGE={db.get('CONN_MAX_AGE')} · pool={'sim' if pool else 'não'}")
+
+        # 1) Ciclo de requisição: request_started → consulta → request_finished
+        #    (fecha ou devolve a conexão conforme CONN_MAX_AGE / pool)
+        amostras = []
+        for _ in range(options['requisicoes']):
+            t0 = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            request_finished.send(sender=self.__class__)
+            amostras.append((time.perf_counter() - t0) * 1000)
+        self.stdout.write(f"Requisição (conexão + SELECT 1): {_ms(amostras)}")
+
+        # 2) Escritas concorrentes: alocação de protocolo (UPDATE em transação curta)
+        latencias, erros = [], []
+        lock = threading.Lock()
+
+        def escritor():
+            locais = []
+            try:
+                for _ in range(options['escritas']):
+                    t0 = time.perf_counter()
+                    try:
+                        alocar_sequencia(pref.pk, SIGLA_BENCH, ANO_BENCH)
+                    except Exception as exc:
+                        with lock:
+                            erros.append(exc.__class__.__name__)
+                        continue
+                    locais.append((time.perf_counter() - t0) * 1000)
+            finally:
+                connections.close_all()
+                with lock:
+                    latencias.extend(locais)
+
+        threads = [threading.Thread(target=escritor) for _ in range(options['threads'])]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        total = time.perf_counter() - t0
+        ok = len(latencias)
+        self.stdout.write(
+            f"Escritas concorrentes ({options['threads']} threads): {ok} ok, {len(erros)} erro(s), "
+            f"{ok / total:.0f} escritas/s" + (f" · {_ms(latencias)}" if latencias else "")
+        )
+        if erros:
+            self.stdout.write(self.style.WARNING(f"Erros: {', '.join(sorted(set(erros)))}"))
+
+        SequenciaProtocolo.objects.filter(sigla=SIGLA_BENCH, ano=ANO_BENCH).delete()
+        self.stdout.write(self.style.SUCCESS('Benchmark concluído.'))
@@ -0,0 +1,143 @@
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+# Comportamento padrão do Django/SQLite: journal DELETE, timeout de 5 s do
+# driver e transações DEFERRED.
+MODO_PADRAO = {
+    'OPTIONS': {},
+    'SQLITE_PRAGMAS': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+}
+
+
+def _ms(amostras):
+    if not amostras:
+        return "—"
+    amostras = sorted(amostras)
+    p95 = amostras[min(len(amostras) - 1, int(len(amostras) * 0.95))]
+    return f"p50 {statistics.median(amostras):.1f} ms · p95 {p95:.1f} ms · máx {amostras[-1]:.1f} ms"
+
+
+class Command(BaseCommand):
+    help = ("Compara o SQLite padrão com o ajustado (WAL, busy_timeout, mmap, transações IMMEDIATE) "
+            "sob leitores e escritores concorrentes, em bancos temporários")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escritores', type=int, default=4, help='Threads escrevendo (padrão: 4)')
+        parser.add_argument('--leitores', type=int, default=8, help='Threads lendo (padrão: 8)')
+        parser.add_argument('--escritas', type=int, default=100, help='Transações por escritor (padrão: 100)')
+        parser.add_argument('--linhas', type=int, default=20000, help='Linhas iniciais da tabela (padrão: 20000)')
+
+    def handle(self, *args, **options):
+        ajustado = {
+            'OPTIONS': dict(settings.SQLITE_OPTIONS),
+            'SQLITE_PRAGMAS': dict(settings.SQLITE_PRAGMAS),
+        }
+        if not settings.SQLITE_PRAGMAS:
+            self.stdout.write(self.style.WARNING('SQLITE_AJUSTES=0: os dois modos ficam iguais.'))
+        with tempfile.TemporaryDirectory() as pasta:
+            for nome, modo in (('padrão', MODO_PADRAO), ('ajustado', ajustado)):
+                self._rodar(nome, modo, Path(pasta) / f'{nome}.sqlite3', options)
+        self.stdout.write(self.style.SUCCESS('Benchmark concluído.'))
+
+    def _rodar(self, nome, modo, arquivo, options):
+        alias = f'benchmark_sqlite_{arquivo.stem}'
+        config = dict(connections.settings['default'], ENGINE='django.db.backends.sqlite3', NAME=str(arquivo),
+                      CONN_MAX_AGE=0, **modo)
+        connections.settings[alias] = config
+        try:
+            self._preparar(alias, options['linhas'])
+            resultado = self._carga(alias, options)
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+
+        duracao = resultado['duracao']
+        self.stdout.write(self.style.MIGRATE_HEADING(f"SQLite {nome}"))
+        self.stdout.write(
+            f"  Escritas: {len(resultado['escritas'])} ok, {len(resultado['erros_escrita'])} erro(s), "
+            f"{len(resultado['escritas']) / duracao:.0f} transações/s · {_ms(resultado['escritas'])}"
+        )
+        self.stdout.write(
+            f"  Leituras: {len(resultado['leituras'])} ok, {len(resultado['erros_leitura'])} erro(s), "
+            f"{len(resultado['leituras']) / duracao:.0f} consultas/s · {_ms(resultado['leituras'])}"
+        )
+        erros = resultado['erros_escrita'] + resultado['erros_leitura']
+        if erros:
+            self.stdout.write(self.style.WARNING(f"  Erros: {', '.join(sorted(set(erros)))}"))
+
+    def _preparar(self, alias, linhas):
+        with connections[alias].cursor() as cur:
+            cur.execute("CREATE TABLE evento (id INTEGER PRIMARY KEY, prefeitura_id INTEGER, "
+                        "status TEXT, criado_em REAL, texto TEXT)")
+            cur.execute("CREATE INDEX evento_pref_status ON evento (prefeitura_id, status)")
+        with transaction.atomic(using=alias), connections[alias].cursor() as cur:
+            cur.executemany("INSERT INTO evento (prefeitura_id, status, criado_em, texto) VALUES (%s, %s, %s, %s)",
+                            [(i % 5, ('ABERTO', 'FECHADO')[i % 2], time.time(), 'x' * 200) for i in range(linhas)])
+
+    def _carga(self, alias, options):
+        resultado = {'escritas': [], 'leituras': [], 'erros_escrita': [], 'erros_leitura': []}
+        lock = threading.Lock()
+        fim_escritas = threading.Event()
+
+        def escritor(n):
+            locais, erros = [], []
+            try:
+                for i in range(options['escritas']):
+                    t0 = time.perf_counter()
+                    try:
+                        # lê e depois escreve na mesma transação, como as views
+                        with transaction.atomic(using=alias), connections[alias].cursor() as cur:
+                            cur.execute("SELECT COUNT(*) FROM evento WHERE prefeitura_id = %s AND status = %s",
+                                        [n % 5, 'ABERTO'])
+                            cur.fetchone()
+                            cur.execute("INSERT INTO evento (prefeitura_id, status, criado_em, texto) "
+                                        "VALUES (%s, %s, %s, %s)", [n % 5, 'ABERTO', time.time(), 'y' * 200])
+                    except Exception as exc:
+                        erros.append(str(exc) or exc.__class__.__name__)
+                        continue
+                    locais.append((time.perf_counter() - t0) * 1000)
+            finally:
+                connections[alias].close()
+                with lock:
+                    resultado['escritas'].extend(locais)
+                    resultado['erros_escrita'].extend(erros)
+
+        def leitor(n):
+            locais, erros = [], []
+            try:
+                while not fim_escritas.is_set():
+                    t0 = time.perf_counter()
+                    try:
+                        with connections[alias].cursor() as cur:
+                            cur.execute("SELECT status, COUNT(*) FROM evento WHERE prefeitura_id = %s "
+                                        "GROUP BY status", [n % 5])
+                            cur.fetchall()
+                    except Exception as exc:
+                        erros.append(str(exc) or exc.__class__.__name__)
+                        continue
+                    locais.append((time.perf_counter() - t0) * 1000)
+            finally:
+                connections[alias].close()
+                with lock:
+                    resultado['leituras'].extend(locais)
+                    resultado['erros_leitura'].extend(erros)
+
+        escritores = [threading.Thread(target=escritor, args=(i,)) for i in range(options['escritores'])]
+        leitores = [threading.Thread(target=leitor, args=(i,)) for i in range(options['leitores'])]
+        t0 = time.perf_counter()
+        for t in leitores + escritores:
+            t.start()
+        for t in escritores:
+            t.join()
+        fim_escritas.set()
+        for t in leitores:
+            t.join()
+        resultado['duracao'] = time.perf_counter() - t0
+        return resultado
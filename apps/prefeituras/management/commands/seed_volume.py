@@ -0,0 +1,360 @@
+import hashlib
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from apps.autoinfracao.models import (
+    AutoInfracao, AutoInfracaoAnexo, AutoInfracaoMultaItem, Embargo, EmbargoAnexo, Enquadramento, InfracaoTipo,
+    Interdicao, InterdicaoAnexo,
+)
+from apps.cadastros.models import Imovel, ImovelVinculo, Pessoa
+from apps.denuncias.models import (
+    Denuncia, DenunciaAnexo, DenunciaApontamento, DenunciaApontamentoAnexo, DenunciaHistorico,
+)
+from apps.notificacoes.models import Notificacao, NotificacaoAnexo
+from apps.prefeituras.models import Prefeitura
+from apps.relatorios import motor
+from apps.usuarios.models import Usuario
+from utils import cache as cache_compartilhado
+from utils.choices import (
+    AIF_STATUS_CHOICES, DENUNCIA_PROCEDENCIA_CHOICES, DENUNCIA_STATUS_CHOICES, INTERDICAO_MOTIVO_CHOICES,
+    LICENCA_TIPO_CHOICES, MEDIDA_STATUS_CHOICES, NOTIFICACAO_STATUS_CHOICES, ORIGEM_DENUNCIA_CHOICES,
+    PAGAMENTO_FORMA_CHOICES,
+)
+from utils.protocolo import BlocoProtocolos
+from utils.texto import normalizar_texto, so_digitos
+
+# E-mails dos usuários gerados: fiscalN@pID.seed.local (o teste_carga os encontra por esse domínio)
+DOMINIO_SEED = "seed.local"
+PASTA_FOTOS = "seed_volume"
+IBGE_INICIAL = 9900001
+
+NOMES = ("Maria", "José", "Ana", "Francisco", "Antônia", "João", "Francisca", "Antônio", "Adriana", "Carlos",
+         "Juliana", "Paulo", "Márcia", "Pedro", "Aline", "Lucas", "Sandra", "Luiz", "Camila", "Marcos")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Ferreira", "Costa", "Rodrigues",
+              "Almeida", "Nascimento", "Carvalho", "Araújo", "Ribeiro", "Gomes", "Barbosa", "Sousa", "Holanda")
+RUAS = ("Rua José de Alencar", "Avenida Central", "Rua 24 de Maio", "Rua Padre Cícero", "Travessa São José",
+        "Rua Dom Pedro II", "Avenida Beira Rio", "Rua das Flores", "Rua Santa Luzia", "Rua Tiradentes")
+BAIRROS = ("Centro", "Jereissati", "Pajuçara", "Timbó", "Novo Maracanaú", "Piratininga", "Acaracuzinho",
+           "Mucunã", "Alto Alegre", "Jardim Bandeirantes")
+DESCRICOES = ("Construção sem alvará", "Ocupação de calçada", "Som acima do permitido", "Descarte irregular de entulho",
+              "Publicidade sem licença", "Funcionamento sem alvará", "Desmatamento de APP", "Obra invadindo recuo")
+
+
+def _chaves(choices):
+    return [k for k, _ in choices]
+
+
+class Command(BaseCommand):
+    help = ("Gera volume sintético para planejamento de capacidade: prefeituras, usuários, pessoas, imóveis e o "
+            "fluxo Denúncia→Notificação→AIF→medidas com coordenadas e fotos, em lotes (bulk_create)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefeituras', type=int, default=1, help='Prefeituras a criar (padrão: 1)')
+        parser.add_argument('--usuarios', type=int, default=10, help='Usuários por prefeitura (padrão: 10)')
+        parser.add_argument('--pessoas', type=int, default=1000, help='Pessoas por prefeitura (padrão: 1000)')
+        parser.add_argument('--imoveis', type=int, default=1000, help='Imóveis por prefeitura (padrão: 1000)')
+        parser.add_argument('--denuncias', type=int, default=5000, help='Denúncias por prefeitura (padrão: 5000)')
+        parser.add_argument('--fotos', type=int, default=2, help='Fotos por registro (padrão: 2)')
+        parser.add_argument('--lote', type=int, default=1000, help='Registros por lote de gravação (padrão: 1000)')
+        parser.add_argument('--senha', default='carga-sisalv', help='Senha dos usuários gerados')
+        parser.add_argument('--semente', type=int, default=42, help='Semente aleatória (mesmos dados a cada execução)')
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['semente'])
+        self.lote = max(100, options['lote'])
+        self.qtd_fotos = max(0, options['fotos'])
+        t0 = time.perf_counter()
+
+        self.fotos = self._gerar_fotos(24) if self.qtd_fotos else []
+        senha = make_password(options['senha'])  # um hash só: o PBKDF2 por usuário dominaria o tempo
+
+        prefeituras = []
+        for _ in range(options['prefeituras']):
+            t_pref = time.perf_counter()
+            with transaction.atomic():
+                pref = self._prefeitura()
+                usuarios = self._usuarios(pref, options['usuarios'], senha)
+                pessoas, imoveis = self._cadastros(pref, options['pessoas'], options['imoveis'])
+                catalogo = self._catalogos(pref)
+                totais = self._fluxo(pref, usuarios, pessoas, imoveis, catalogo, options['denuncias'])
+            prefeituras.append(pref)
+            resumo = ", ".join(f"{v} {k}" for k, v in totais.items())
+            self.stdout.write(f"{pref.nome} (IBGE {pref.codigo_ibge}, login {usuarios[0].email}): {len(usuarios)} usuários, "
+                              f"{len(pessoas)} pessoas, {len(imoveis)} imóveis, {resumo} em {time.perf_counter() - t_pref:.1f} s")
+
+        # bulk_create não dispara save()/sinais: derivados recalculados pelos comandos de manutenção
+        for pref in prefeituras:
+            for comando, extra in (('reconciliar_totais_aif', {}), ('reindexar_busca', {}),
+                                   ('reconstruir_protocolos', {}), ('reconciliar_estatisticas', {'dias': 0})):
+                call_command(comando, prefeitura=pref.pk, stdout=self.stdout, **extra)
+            motor.invalidar(pref.pk)
+        cache_compartilhado.invalidar("catalogos")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Volume gerado em {time.perf_counter() - t0:.1f} s (senha dos usuários: {options['senha']})."
+        ))
+
+    # ------------------------------------------------------------------
+    def _gerar_fotos(self, quantidade):
+        """JPEGs distintos (~40 KB) gravados uma vez no storage e compartilhados pelos anexos: [(nome, sha256)]."""
+        fotos = []
+        for i in range(quantidade):
+            nome = f"{PASTA_FOTOS}/foto-{i:03d}.jpg"
+            if not default_storage.exists(nome):
+                img = Image.new("RGB", (800, 600), tuple(self.rnd.randrange(256) for _ in range(3)))
+                desenho = ImageDraw.Draw(img)
+                for _ in range(12):
+                    x, y = self.rnd.randrange(700), self.rnd.randrange(500)
+                    desenho.rectangle((x, y, x + self.rnd.randrange(20, 200), y + self.rnd.randrange(20, 200)),
+                                      fill=tuple(self.rnd.randrange(256) for _ in range(3)))
+                buf = BytesIO()
+                img.save(buf, format="JPEG", quality=70)
+                nome = default_storage.save(nome, ContentFile(buf.getvalue()))
+            with default_storage.open(nome, "rb") as f:
+                fotos.append((nome, hashlib.sha256(f.read()).hexdigest()))
+        return fotos
+
+    def _amostra_fotos(self):
+        return self.rnd.sample(self.fotos, min(self.qtd_fotos, len(self.fotos)))
+
+    def _nome(self):
+        return f"{self.rnd.choice(NOMES)} {self.rnd.choice(SOBRENOMES)} {self.rnd.choice(SOBRENOMES)}"
+
+    def _doc(self):
+        return "".join(str(self.rnd.randrange(10)) for _ in range(11))
+
+    def _telefone(self):
+        return f"(85) 9{self.rnd.randrange(8000, 9999)}-{self.rnd.randrange(1000, 9999)}"
+
+    def _coordenada(self, pref):
+        return (round(float(pref.latitude) + self.rnd.gauss(0, 0.03), 6),
+                round(float(pref.longitude) + self.rnd.gauss(0, 0.03), 6))
+
+    def _momento(self):
+        """Data de criação espalhada pelos últimos 2 anos (mais registros nos meses recentes)."""
+        dias = int(abs(self.rnd.gauss(0, 240))) % 730
+        return timezone.now() - timedelta(days=dias, minutes=self.rnd.randrange(24 * 60))
+
+    def _gravar(self, model, objs):
+        return model.objects.bulk_create(objs, batch_size=self.lote)
+
+    # ------------------------------------------------------------------
+    def _prefeitura(self):
+        usados = set(Prefeitura.objects.filter(codigo_ibge__startswith="99").values_list("codigo_ibge", flat=True))
+        ibge = IBGE_INICIAL
+        while str(ibge) in usados:
+            ibge += 1
+        n = ibge - IBGE_INICIAL + 1
+        return Prefeitura.objects.create(
+            nome=f"Prefeitura Sintética {n}", cidade=f"Cidade Sintética {n}", sigla_cidade=f"SN{n}"[:10],
+            codigo_ibge=str(ibge), dominio_email=f"p{n}.{DOMINIO_SEED}",
+            latitude=Decimal("-3.876000") - Decimal(n % 10) / 10, longitude=Decimal("-38.625000") + Decimal(n % 7) / 10,
+        )
+
+    def _usuarios(self, pref, quantidade, senha):
+        objs = [
+            Usuario(email=f"fiscal{i}@p{pref.pk}.{DOMINIO_SEED}", password=senha, prefeitura=pref,
+                    tipo="ADMIN" if i == 1 else "FISCAL", matricula=f"S{pref.pk}{i:04d}",
+                    first_name=self.rnd.choice(NOMES), last_name=self.rnd.choice(SOBRENOMES))
+            for i in range(1, max(1, quantidade) + 1)
+        ]
+        return self._gravar(Usuario, objs)
+
+    def _cadastros(self, pref, n_pessoas, n_imoveis):
+        pessoas = []
+        for _ in range(n_pessoas):
+            nome, tel = self._nome(), self._telefone()
+            pessoas.append(Pessoa(prefeitura=pref, tipo="PF", nome_razao=nome, doc_tipo="CPF", doc_num=self._doc(),
+                                  telefone=tel, tel_digitos=so_digitos(tel)[:20], nome_norm=normalizar_texto(nome)[:180]))
+        pessoas = self._gravar(Pessoa, pessoas)
+
+        imoveis = []
+        for i in range(n_imoveis):
+            lat, lng = self._coordenada(pref)
+            imoveis.append(Imovel(prefeitura=pref, inscricao=f"{pref.pk:03d}{i:07d}", logradouro=self.rnd.choice(RUAS),
+                                  numero=str(self.rnd.randrange(1, 3000)), bairro=self.rnd.choice(BAIRROS),
+                                  cidade=pref.cidade, uf="CE", latitude=Decimal(str(lat)), longitude=Decimal(str(lng))))
+        imoveis = self._gravar(Imovel, imoveis)
+        if pessoas:
+            self._gravar(ImovelVinculo, [ImovelVinculo(imovel=im, pessoa=self.rnd.choice(pessoas)) for im in imoveis])
+        return pessoas, imoveis
+
+    def _catalogos(self, pref):
+        tipos = self._gravar(InfracaoTipo, [
+            InfracaoTipo(prefeitura=pref, codigo=f"T{i:02d}", nome=d) for i, d in enumerate(DESCRICOES, 1)
+        ])
+        enquadramentos = self._gravar(Enquadramento, [
+            Enquadramento(prefeitura=pref, codigo=f"E{i:02d}", artigo=f"Art. {10 + i}", descricao=d,
+                          valor_base=Decimal(self.rnd.randrange(200, 5000)))
+            for i, d in enumerate(DESCRICOES, 1)
+        ])
+        return tipos, enquadramentos
+
+    # ------------------------------------------------------------------
+    def _fluxo(self, pref, usuarios, pessoas, imoveis, catalogo, quantidade):
+        totais = dict.fromkeys(("denúncias", "notificações", "AIFs", "embargos", "interdições", "fotos"), 0)
+        blocos = {sigla: BlocoProtocolos(pref, sigla, min(quantidade, self.lote) or 1)
+                  for sigla in ("DEN", "NOT", "AIF", "EMB", "ITD")}
+        for inicio in range(0, quantidade, self.lote):
+            n = min(self.lote, quantidade - inicio)
+            self._lote_fluxo(pref, usuarios, pessoas, imoveis, catalogo, blocos, n, totais)
+        return totais
+
+    def _lote_fluxo(self, pref, usuarios, pessoas, imoveis, catalogo, blocos, n, totais):
+        rnd = self.rnd
+        tipos, enquadramentos = catalogo
+
+        # Denúncias
+        denuncias = []
+        for _ in range(n):
+            autor = rnd.choice(usuarios)
+            nome, tel, doc = self._nome(), self._telefone(), self._doc()
+            lat, lng = self._coordenada(pref)
+            rua, numero, bairro = rnd.choice(RUAS), str(rnd.randrange(1, 3000)), rnd.choice(BAIRROS)
+            den = Denuncia(
+                prefeitura=pref, criado_por=autor, protocolo=blocos["DEN"].proximo(autor.matricula),
+                origem_denuncia=rnd.choice(_chaves(ORIGEM_DENUNCIA_CHOICES)), denunciante_anonimo=rnd.random() < 0.4,
+                denunciado_nome_razao=nome, denunciado_cpf_cnpj=doc, denunciado_telefone=tel,
+                local_oco_logradouro=rua, local_oco_numero=numero, local_oco_bairro=bairro, local_oco_cidade=pref.cidade,
+                local_oco_uf="CE", local_oco_lat=lat, local_oco_lng=lng, descricao_oco=rnd.choice(DESCRICOES),
+                status=rnd.choice(_chaves(DENUNCIA_STATUS_CHOICES)),
+                procedencia=rnd.choice(_chaves(DENUNCIA_PROCEDENCIA_CHOICES)),
+                pessoa=rnd.choice(pessoas) if pessoas and rnd.random() < 0.3 else None,
+                imovel=rnd.choice(imoveis) if imoveis and rnd.random() < 0.3 else None,
+                # colunas de busca que o save() manteria
+                doc_digitos=so_digitos(doc)[:20], tel_digitos=so_digitos(tel)[:20], nome_norm=normalizar_texto(nome)[:255],
+                endereco_norm=normalizar_texto(f"{rua} {numero} {bairro} {pref.cidade}")[:255],
+            )
+            den._momento = self._momento()
+            denuncias.append(den)
+        denuncias = self._gravar(Denuncia, denuncias)
+        # criada_em é auto_now_add: a data espalhada entra num UPDATE em lote
+        for den in denuncias:
+            den.criada_em = den._momento
+        Denuncia.objects.bulk_update(denuncias, ["criada_em"], batch_size=self.lote)
+        self._gravar(Denuncia.fiscais.through, [
+            Denuncia.fiscais.through(denuncia_id=den.pk, usuario_id=den.criado_por_id) for den in denuncias
+        ])
+        self._gravar(DenunciaHistorico, [
+            DenunciaHistorico(denuncia=den, acao="CRIACAO", feito_por_id=den.criado_por_id, feito_em=den.criada_em)
+            for den in denuncias
+        ])
+        anexos = [DenunciaAnexo(denuncia=den, tipo="FOTO", arquivo=nome, hash_sha256=sha, otimizada=True)
+                  for den in denuncias for nome, sha in self._amostra_fotos()]
+        apontamentos = self._gravar(DenunciaApontamento, [
+            DenunciaApontamento(denuncia=den, observacao="Vistoria no local", criado_por_id=den.criado_por_id,
+                                criado_em=den.criada_em + timedelta(days=rnd.randrange(1, 10)))
+            for den in denuncias if rnd.random() < 0.5
+        ])
+        fotos_ap = [DenunciaApontamentoAnexo(apontamento=ap, arquivo=nome, hash_sha256=sha, otimizada=True)
+                    for ap in apontamentos for nome, sha in self._amostra_fotos()]
+        self._gravar(DenunciaAnexo, anexos)
+        self._gravar(DenunciaApontamentoAnexo, fotos_ap)
+        totais["denúncias"] += len(denuncias)
+        totais["fotos"] += len(anexos) + len(fotos_ap)
+
+        # Notificações (60% das denúncias)
+        notificacoes = []
+        for den in denuncias:
+            if rnd.random() >= 0.6:
+                continue
+            criada = den.criada_em + timedelta(days=rnd.randrange(1, 20))
+            notificacoes.append(Notificacao(
+                prefeitura=pref, denuncia=den, criado_por_id=den.criado_por_id,
+                protocolo=blocos["NOT"].proximo(), pessoa_tipo="PF", nome_razao=den.denunciado_nome_razao,
+                cpf_cnpj=den.denunciado_cpf_cnpj, telefone=den.denunciado_telefone,
+                logradouro=den.local_oco_logradouro, numero=den.local_oco_numero, bairro=den.local_oco_bairro,
+                cidade=den.local_oco_cidade, uf="CE", latitude=den.local_oco_lat, longitude=den.local_oco_lng,
+                descricao=den.descricao_oco, status=rnd.choice(_chaves(NOTIFICACAO_STATUS_CHOICES)),
+                prazo_regularizacao=(criada + timedelta(days=rnd.choice((15, 30, 60)))).date(), criada_em=criada,
+                doc_digitos=den.doc_digitos, tel_digitos=den.tel_digitos, nome_norm=den.nome_norm,
+                endereco_norm=den.endereco_norm,
+            ))
+        notificacoes = self._gravar(Notificacao, notificacoes)
+        fotos_not = [NotificacaoAnexo(notificacao=nt, tipo="FOTO", arquivo=nome, hash_sha256=sha, otimizada=True)
+                     for nt in notificacoes for nome, sha in self._amostra_fotos()]
+        self._gravar(NotificacaoAnexo, fotos_not)
+        totais["notificações"] += len(notificacoes)
+        totais["fotos"] += len(fotos_not)
+
+        # AIFs (metade das notificações), com itens de multa, tipos e fiscais
+        aifs, itens_por_aif = [], []
+        for nt in notificacoes:
+            if rnd.random() >= 0.5:
+                continue
+            criada = nt.criada_em + timedelta(days=rnd.randrange(1, 30))
+            itens = [(enq, enq.valor_base) for enq in rnd.sample(enquadramentos, rnd.randint(1, 3))]
+            total = sum(v for _, v in itens)
+            pago = rnd.random() < 0.35
+            aif = AutoInfracao(
+                prefeitura=pref, denuncia_id=nt.denuncia_id, notificacao=nt, criado_por_id=nt.criado_por_id,
+                protocolo=blocos["AIF"].proximo(), pessoa_tipo="PF", nome_razao=nt.nome_razao, cpf_cnpj=nt.cpf_cnpj,
+                telefone=nt.telefone, logradouro=nt.logradouro, numero=nt.numero, bairro=nt.bairro, cidade=nt.cidade,
+                uf="CE", latitude=nt.latitude, longitude=nt.longitude, descricao=nt.descricao,
+                status=rnd.choice(_chaves(AIF_STATUS_CHOICES)), criada_em=criada,
+                prazo_regularizacao_data=(criada + timedelta(days=30)).date(), valor_infracao=total,
+                pago=pago, valor_pago=total if pago else None,
+                pago_em=(criada + timedelta(days=rnd.randrange(1, 60))).date() if pago else None,
+                forma_pagamento=rnd.choice(_chaves(PAGAMENTO_FORMA_CHOICES)) if pago else None,
+                total_itens=total, total_homologado=total,
+                doc_digitos=nt.doc_digitos, tel_digitos=nt.tel_digitos, nome_norm=nt.nome_norm,
+                endereco_norm=nt.endereco_norm,
+            )
+            aifs.append(aif)
+            itens_por_aif.append(itens)
+        aifs = self._gravar(AutoInfracao, aifs)
+        self._gravar(AutoInfracaoMultaItem, [
+            AutoInfracaoMultaItem(auto_infracao=aif, enquadramento=enq, descricao=enq.descricao, valor_unitario=valor,
+                                  valor_homologado=valor, valor_total=valor)
+            for aif, itens in zip(aifs, itens_por_aif) for enq, valor in itens
+        ])
+        self._gravar(AutoInfracao.tipos.through, [
+            AutoInfracao.tipos.through(autoinfracao_id=aif.pk, infracaotipo_id=tipo.pk)
+            for aif in aifs for tipo in rnd.sample(tipos, rnd.randint(1, 2))
+        ])
+        self._gravar(AutoInfracao.fiscais.through, [
+            AutoInfracao.fiscais.through(autoinfracao_id=aif.pk, usuario_id=aif.criado_por_id) for aif in aifs
+        ])
+        fotos_aif = [AutoInfracaoAnexo(auto_infracao=aif, tipo="FOTO", arquivo=nome, hash_sha256=sha, otimizada=True)
+                     for aif in aifs for nome, sha in self._amostra_fotos()]
+        self._gravar(AutoInfracaoAnexo, fotos_aif)
+        totais["AIFs"] += len(aifs)
+        totais["fotos"] += len(fotos_aif)
+
+        # Medidas: embargo em 30% e interdição em 15% dos AIFs
+        embargos, interdicoes = [], []
+        for aif in aifs:
+            if rnd.random() < 0.3:
+                embargos.append(Embargo(
+                    prefeitura=pref, auto_infracao=aif, criado_por_id=aif.criado_por_id, protocolo=blocos["EMB"].proximo(),
+                    status=rnd.choice(_chaves(MEDIDA_STATUS_CHOICES)), licenca_tipo=rnd.choice(_chaves(LICENCA_TIPO_CHOICES)),
+                    prazo_regularizacao_data=aif.prazo_regularizacao_data, criada_em=aif.criada_em + timedelta(days=1),
+                ))
+            if rnd.random() < 0.15:
+                interdicoes.append(Interdicao(
+                    prefeitura=pref, auto_infracao=aif, criado_por_id=aif.criado_por_id, protocolo=blocos["ITD"].proximo(),
+                    status=rnd.choice(_chaves(MEDIDA_STATUS_CHOICES)),
+                    motivo_tipo=rnd.choice(_chaves(INTERDICAO_MOTIVO_CHOICES)),
+                    prazo_regularizacao_data=aif.prazo_regularizacao_data, criada_em=aif.criada_em + timedelta(days=1),
+                ))
+        embargos = self._gravar(Embargo, embargos)
+        interdicoes = self._gravar(Interdicao, interdicoes)
+        self._gravar(EmbargoAnexo, [EmbargoAnexo(embargo=e, tipo="FOTO", arquivo=nome, hash_sha256=sha, otimizada=True)
+                                    for e in embargos for nome, sha in self._amostra_fotos()[:1]])
+        self._gravar(InterdicaoAnexo, [InterdicaoAnexo(interdicao=i, tipo="FOTO", arquivo=nome, hash_sha256=sha,
+                                                       otimizada=True)
+                                       for i in interdicoes for nome, sha in self._amostra_fotos()[:1]])
+        totais["embargos"] += len(embargos)
+        totais["interdições"] += len(interdicoes)
@@ -0,0 +1,245 @@
+import random
+import threading
+import time
+import uuid
+from http.cookiejar import CookieJar
+from io import BytesIO
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from apps.autoinfracao.models import AutoInfracao
+from apps.denuncias.models import Denuncia
+from apps.notificacoes.models import Notificacao
+from apps.prefeituras.management.commands.seed_volume import DOMINIO_SEED
+from apps.prefeituras.models import Prefeitura
+from apps.usuarios.models import Usuario
+
+AMOSTRA_IDS = 500
+TIMEOUT = 60
+
+
+def _percentil(amostras, p):
+    """Percentil por posição mais próxima (amostras ordenadas)."""
+    if not amostras:
+        return 0.0
+    return amostras[min(len(amostras) - 1, max(0, int(round(p / 100 * len(amostras) + 0.5)) - 1))]
+
+
+def _multipart(campos, arquivos):
+    limite = uuid.uuid4().hex
+    partes = [f'--{limite}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode() for k, v in campos.items()]
+    for campo, nome, dados in arquivos:
+        partes.append(f'--{limite}\r\nContent-Disposition: form-data; name="{campo}"; filename="{nome}"\r\n'
+                      f'Content-Type: image/jpeg\r\n\r\n'.encode() + dados + b'\r\n')
+    partes.append(f'--{limite}--\r\n'.encode())
+    return b"".join(partes), f"multipart/form-data; boundary={limite}"
+
+
+class Falha(Exception):
+    pass
+
+
+class UsuarioVirtual:
+    """Sessão de um fiscal: login e depois tarefas sorteadas pelo peso, com pausa entre elas."""
+
+    def __init__(self, comando, email):
+        self.cmd = comando
+        self.email = email
+        self.rnd = random.Random()
+        self.cookies = CookieJar()
+        self.http = build_opener(HTTPCookieProcessor(self.cookies))
+        self.centro = comando.centro
+        self.bbox_atual = None
+
+    def _csrf(self):
+        return next((c.value for c in self.cookies if c.name == "csrftoken"), "")
+
+    def pedir(self, caminho, dados=None, tipo=None):
+        url = urljoin(self.cmd.base, caminho)
+        req = Request(url, data=dados, headers={"Referer": self.cmd.base, "User-Agent": "sisalv-teste-carga"})
+        if tipo:
+            req.add_header("Content-Type", tipo)
+        try:
+            with self.http.open(req, timeout=TIMEOUT) as resp:
+                resp.read()
+                final = resp.geturl()
+        except HTTPError as exc:
+            raise Falha(f"HTTP {exc.code}")
+        except (URLError, OSError) as exc:
+            raise Falha(exc.__class__.__name__)
+        if "/login/" in final and "/login/" not in caminho:
+            raise Falha("sessão perdida")
+
+    def login(self):
+        self.pedir("/login/")
+        dados = urlencode({"email": self.email, "password": self.cmd.senha, "codigo_ibge": self.cmd.ibge,
+                           "csrfmiddlewaretoken": self._csrf()}).encode()
+        url = urljoin(self.cmd.base, "/login/")
+        req = Request(url, data=dados, headers={"Referer": url, "Content-Type": "application/x-www-form-urlencoded"})
+        try:
+            with self.http.open(req, timeout=TIMEOUT) as resp:
+                resp.read()
+                final = resp.geturl()
+        except (HTTPError, URLError, OSError) as exc:
+            raise Falha(getattr(exc, "code", None) and f"HTTP {exc.code}" or exc.__class__.__name__)
+        if final.rstrip("/").endswith("/login"):
+            raise Falha("login recusado")
+
+    # ---- tarefas
+    def _id(self, nome):
+        return self.rnd.choice(self.cmd.ids[nome])
+
+    def mapa(self):
+        """Arrasto do mapa: a janela anda um pouco a cada pedido, como um fiscal navegando."""
+        if self.bbox_atual is None or self.rnd.random() < 0.2:
+            lat, lng = self.centro
+            self.bbox_atual = [lng - 0.02, lat - 0.015, lng + 0.02, lat + 0.015]
+        dx, dy = self.rnd.uniform(-0.01, 0.01), self.rnd.uniform(-0.008, 0.008)
+        self.bbox_atual = [self.bbox_atual[0] + dx, self.bbox_atual[1] + dy, self.bbox_atual[2] + dx, self.bbox_atual[3] + dy]
+        self.pedir("/api/mapa/processos/?bbox=" + ",".join(f"{v:.5f}" for v in self.bbox_atual))
+
+    def upload(self):
+        den_id = self._id("denuncia")
+        corpo, tipo = _multipart(
+            {"observacao": "Apontamento do teste de carga", "csrfmiddlewaretoken": self._csrf()},
+            [("fotos", "carga.jpg", self.cmd.foto)],
+        )
+        self.pedir(f"/denuncias/apontamentos/novo/{den_id}/", corpo, tipo)
+
+    def tarefas(self):
+        t = [
+            ("home", 1, lambda: self.pedir("/")),
+            ("denuncias:listar", 3, lambda: self.pedir("/denuncias/listar/")),
+            ("notificacoes:listar", 2, lambda: self.pedir("/notificacoes/listar/")),
+            ("autoinfracao:listar", 2, lambda: self.pedir("/autoinfracao/listar/")),
+            ("denuncias:detalhe", 3, lambda: self.pedir(f"/denuncias/{self._id('denuncia')}/")),
+            ("notificacoes:detalhe", 1, lambda: self.pedir(f"/notificacoes/detalhe/{self._id('notificacao')}/")),
+            ("autoinfracao:detalhe", 2, lambda: self.pedir(f"/autoinfracao/detalhe/{self._id('aif')}/")),
+            ("autoinfracao:imprimir", 1, lambda: self.pedir(f"/autoinfracao/imprimir/{self._id('aif')}/")),
+            ("mapa:arrastar", 4, self.mapa),
+            ("relatorio_operacional", 1, lambda: self.pedir("/relatorios/operacional/")),
+        ]
+        if self.cmd.upload:
+            t.append(("apontamento:upload", 1, self.upload))
+        return [(n, p, f) for n, p, f in t if n.split(":")[0] not in self.cmd.sem_ids]
+
+    def executar(self, fim):
+        self.cmd.medir("login", self.login)
+        tarefas = self.tarefas()
+        nomes, pesos = [n for n, _, _ in tarefas], [p for _, p, _ in tarefas]
+        funcoes = {n: f for n, _, f in tarefas}
+        while time.monotonic() < fim:
+            nome = self.rnd.choices(nomes, pesos)[0]
+            self.cmd.medir(nome, funcoes[nome])
+            if self.cmd.espera:
+                time.sleep(min(self.rnd.expovariate(1 / self.cmd.espera), self.cmd.espera * 5))
+
+
+class Command(BaseCommand):
+    help = ("Teste de carga HTTP contra um servidor em execução (runserver ou gunicorn): login, listas, detalhes, "
+            "arrasto do mapa e upload de fotos, com p50/p95/p99 por endpoint. Use os dados do seed_volume.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Endereço do servidor (padrão: %(default)s)')
+        parser.add_argument('--usuarios', type=int, default=10, help='Usuários simultâneos (padrão: 10)')
+        parser.add_argument('--duracao', type=int, default=60, help='Segundos de carga (padrão: 60)')
+        parser.add_argument('--rampa', type=float, default=10, help='Segundos para subir todos os usuários (padrão: 10)')
+        parser.add_argument('--espera', type=float, default=1.0,
+                            help='Pausa média entre ações de um usuário, em segundos (padrão: 1; 0 = sem pausa)')
+        parser.add_argument('--prefeitura', type=int, help='ID da prefeitura (padrão: a última gerada pelo seed_volume)')
+        parser.add_argument('--senha', default='carga-sisalv', help='Senha dos usuários do seed_volume')
+        parser.add_argument('--sem-upload', action='store_true', help='Não envia fotos (o upload grava apontamentos)')
+
+    def handle(self, *args, **options):
+        self._preparar(options)
+        self.resultados = {}
+        self.lock = threading.Lock()
+
+        emails = self.emails
+        fim = time.monotonic() + options['rampa'] + options['duracao']
+        intervalo = options['rampa'] / max(1, options['usuarios'])
+        threads = []
+        self.stdout.write(f"{options['usuarios']} usuário(s) contra {self.base} por {options['duracao']} s "
+                          f"(+{options['rampa']:.0f} s de rampa)...")
+        t0 = time.monotonic()
+        for i in range(options['usuarios']):
+            uv = UsuarioVirtual(self, emails[i % len(emails)])
+            t = threading.Thread(target=uv.executar, args=(fim,), daemon=True)
+            t.start()
+            threads.append(t)
+            time.sleep(intervalo)
+        for t in threads:
+            t.join()
+        self._relatorio(time.monotonic() - t0)
+
+    def _preparar(self, options):
+        self.base = options['url'].rstrip('/') + '/'
+        self.senha = options['senha']
+        self.espera = max(0.0, options['espera'])
+        self.upload = not options['sem_upload']
+
+        prefeituras = Prefeitura.objects.filter(dominio_email__endswith=DOMINIO_SEED)
+        if options.get('prefeitura'):
+            prefeituras = Prefeitura.objects.filter(pk=options['prefeitura'])
+        pref = prefeituras.order_by('-pk').first()
+        if pref is None:
+            raise CommandError('Nenhuma prefeitura do seed_volume encontrada. Rode "manage.py seed_volume" antes.')
+        self.ibge = pref.codigo_ibge
+        self.centro = (float(pref.latitude or -3.876), float(pref.longitude or -38.625))
+
+        self.emails = list(Usuario.objects.filter(prefeitura=pref, is_active=True, email__endswith=DOMINIO_SEED)
+                           .order_by('pk').values_list('email', flat=True))
+        if not self.emails:
+            raise CommandError(f'A prefeitura {pref.pk} não tem usuários do seed_volume (@...{DOMINIO_SEED}).')
+
+        # ids sorteados de antemão: o teste mede o servidor, não consultas deste processo
+        self.ids = {}
+        for nome, model in (('denuncia', Denuncia), ('notificacao', Notificacao), ('aif', AutoInfracao)):
+            ids = list(model.objects.filter(prefeitura=pref).order_by('?').values_list('pk', flat=True)[:AMOSTRA_IDS])
+            self.ids[nome] = ids
+        self.sem_ids = {app for app, nome in (('denuncias', 'denuncia'), ('notificacoes', 'notificacao'),
+                                              ('autoinfracao', 'aif')) if not self.ids[nome]}
+
+        buf = BytesIO()
+        Image.new('RGB', (1200, 900), (90, 140, 60)).save(buf, format='JPEG', quality=85)
+        self.foto = buf.getvalue()
+
+    def medir(self, nome, funcao):
+        t0 = time.perf_counter()
+        erro = None
+        try:
+            funcao()
+        except Falha as exc:
+            erro = str(exc)
+        ms = (time.perf_counter() - t0) * 1000
+        with self.lock:
+            r = self.resultados.setdefault(nome, {'ms': [], 'erros': {}})
+            if erro:
+                r['erros'][erro] = r['erros'].get(erro, 0) + 1
+            else:
+                r['ms'].append(ms)
+
+    def _relatorio(self, duracao):
+        cab = f"{'endpoint':<24} {'ok':>6} {'erros':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8}"
+        self.stdout.write(self.style.MIGRATE_HEADING(cab))
+        total_ok = total_erros = 0
+        for nome in sorted(self.resultados):
+            r = self.resultados[nome]
+            ms = sorted(r['ms'])
+            erros = sum(r['erros'].values())
+            total_ok += len(ms)
+            total_erros += erros
+            linha = (f"{nome:<24} {len(ms):>6} {erros:>6} {len(ms) / duracao:>7.1f} {_percentil(ms, 50):>8.0f} "
+                     f"{_percentil(ms, 95):>8.0f} {_percentil(ms, 99):>8.0f} {(ms[-1] if ms else 0):>8.0f}")
+            self.stdout.write(self.style.WARNING(linha) if erros else linha)
+            if erros:
+                detalhes = ", ".join(f"{k}: {v}" for k, v in sorted(r['erros'].items()))
+                self.stdout.write(f"{'':<24} {detalhes}")
+        self.stdout.write(f"Tempos em ms. {total_ok} requisições ok, {total_erros} erro(s), "
+                          f"{total_ok / duracao:.1f} req/s em {duracao:.0f} s.")
+        estilo = self.style.SUCCESS if not total_erros else self.style.WARNING
+        self.stdout.write(estilo('Teste de carga concluído.'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenciaProtocolo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sigla', models.CharField(max_length=10)),
+                ('ano', models.PositiveSmallIntegerField()),
+                ('ultimo', models.PositiveIntegerField(default=0)),
+                ('prefeitura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sequencias_protocolo', to='prefeituras.prefeitura')),
+            ],
+            options={
+                'verbose_name': 'Sequência de protocolo',
+                'verbose_name_plural': 'Sequências de protocolo',
+                'db_table': 'prefeituras_sequencia_protocolo',
+                'constraints': [models.UniqueConstraint(fields=('prefeitura', 'sigla', 'ano'), name='pref_seq_protocolo_uniq')],
+            },
+        ),
+    ]
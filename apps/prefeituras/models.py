@@ -4,6 +4,24 @@ from django.db import models
 def upload_logo_path(instance, filename):
     return f"prefeituras/logos/{instance.sigla_cidade}/{filename}"
 
+class EscopoPrefeitura:
+    """
+    Mixin para modelos com FK `prefeitura`: consultas já filtradas pela
+    prefeitura da requisição (request.prefeitura_id, ver tenant.py).
+
+        obj = get_object_or_404(Notificacao.tenant(request), pk=pk)
+
+    Sem prefeitura válida na requisição devolve um queryset vazio.
+    """
+
+    @classmethod
+    def tenant(cls, request):
+        prefeitura_id = getattr(request, "prefeitura_id", None)
+        if not prefeitura_id:
+            return cls._default_manager.none()
+        return cls._default_manager.filter(prefeitura_id=prefeitura_id)
+
+
 class Prefeitura(models.Model):
     nome = models.CharField("Nome da Prefeitura", max_length=120)
     cidade = models.CharField("Cidade", max_length=120)
@@ -47,3 +65,26 @@ class Prefeitura(models.Model):
 
     def __str__(self):
         return f"{self.nome} - {self.cidade} ({self.sigla_cidade})"
+
+
+class SequenciaProtocolo(models.Model):
+    """
+    Último número de protocolo emitido por (prefeitura, sigla, ano).
+    Alocação em utils/protocolo.py: UPDATE ultimo = ultimo + n e leitura na
+    mesma transação (a linha fica bloqueada até o commit).
+    """
+    prefeitura = models.ForeignKey(Prefeitura, on_delete=models.CASCADE, related_name="sequencias_protocolo")
+    sigla = models.CharField(max_length=10)
+    ano = models.PositiveSmallIntegerField()
+    ultimo = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "prefeituras_sequencia_protocolo"
+        verbose_name = "Sequência de protocolo"
+        verbose_name_plural = "Sequências de protocolo"
+        constraints = [
+            models.UniqueConstraint(fields=["prefeitura", "sigla", "ano"], name="pref_seq_protocolo_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.prefeitura_id} {self.sigla}/{self.ano}: {self.ultimo}"
@@ -0,0 +1,79 @@
+# apps/prefeituras/tenant.py
+"""
+Prefeitura da requisição.
+
+O PrefeituraMiddleware resolve a prefeitura da sessão e deixa em
+`request.prefeitura` (objeto) e `request.prefeitura_id`. Os dois ficam None
+quando a sessão não tem prefeitura, a prefeitura está inativa ou o usuário
+logado não pertence a ela (superusuário pertence a todas). As views usam
+`request.prefeitura_id` no lugar de `request.session.get("prefeitura_id")`
+e `Model.tenant(request)` (ver models.EscopoPrefeitura) para consultar.
+
+O objeto fica em memória no processo, sem consulta por requisição. Cada
+gravação/exclusão da prefeitura muda a versão dela no cache compartilhado
+(utils.cache), então todos os processos recarregam na requisição seguinte.
+"""
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils import cache as cache_compartilhado
+
+from .models import Prefeitura
+
+_em_memoria = {}
+_lock = threading.Lock()
+
+
+def _grupo(prefeitura_id):
+    return f"prefeitura:{prefeitura_id}"
+
+
+def obter(prefeitura_id):
+    """Prefeitura ativa com esse id (ou None), da memória do processo enquanto a versão não mudar."""
+    if not prefeitura_id:
+        return None
+    versao = cache_compartilhado.versao(_grupo(prefeitura_id))
+    item = _em_memoria.get(prefeitura_id)
+    if item is not None and item[0] == versao:
+        return item[1]
+    prefeitura = Prefeitura.objects.filter(pk=prefeitura_id, ativo=True).first()
+    with _lock:
+        _em_memoria[prefeitura_id] = (versao, prefeitura)
+    return prefeitura
+
+
+def pertence(user, prefeitura):
+    if prefeitura is None or not getattr(user, "is_authenticated", False):
+        return False
+    return user.is_superuser or getattr(user, "prefeitura_id", None) == prefeitura.pk
+
+
+@receiver(post_save, sender=Prefeitura, dispatch_uid="tenant_prefeitura_save")
+@receiver(post_delete, sender=Prefeitura, dispatch_uid="tenant_prefeitura_delete")
+def _nova_versao(sender, instance, **kwargs):
+    prefeitura_id = instance.pk
+    with _lock:
+        _em_memoria.pop(prefeitura_id, None)
+    transaction.on_commit(lambda: cache_compartilhado.invalidar(_grupo(prefeitura_id)))
+
+
+class PrefeituraMiddleware:
+    """Define request.prefeitura / request.prefeitura_id (depois do AuthenticationMiddleware)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        prefeitura = None
+        session = getattr(request, "session", None)
+        prefeitura_id = session.get("prefeitura_id") if session is not None else None
+        if prefeitura_id:
+            prefeitura = obter(prefeitura_id)
+            if not pertence(request.user, prefeitura):
+                prefeitura = None
+        request.prefeitura = prefeitura
+        request.prefeitura_id = prefeitura.pk if prefeitura else None
+        return self.get_response(request)
@@ -1,3 +1,100 @@
+import datetime
+from unittest import mock
+
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
+
+from utils.protocolo import BlocoProtocolos, alocar_sequencia, novo_protocolo
+from utils.testes import criar_prefeitura
+
+from .models import SequenciaProtocolo
+
+
+class AlocarSequenciaTests(TestCase):
+    """Sequência de protocolos por (prefeitura, sigla, ano)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+
+    def test_primeira_alocacao_cria_a_linha(self):
+        self.assertEqual(alocar_sequencia(self.prefeitura.pk, "den", 2026), 1)
+        seq = SequenciaProtocolo.objects.get()
+        self.assertEqual((seq.sigla, seq.ano, seq.ultimo), ("DEN", 2026, 1))
+        self.assertEqual(alocar_sequencia(self.prefeitura.pk, "DEN", 2026), 2)
+
+    def test_bloco_reserva_numeros_seguidos(self):
+        alocar_sequencia(self.prefeitura.pk, "NOT", 2026)
+        self.assertEqual(alocar_sequencia(self.prefeitura.pk, "NOT", 2026, quantidade=10), 2)
+        self.assertEqual(alocar_sequencia(self.prefeitura.pk, "NOT", 2026), 12)
+
+    def test_sequencias_independentes(self):
+        outra = criar_prefeitura(codigo_ibge="2304400")
+        alocar_sequencia(self.prefeitura.pk, "AIF", 2026, quantidade=5)
+        self.assertEqual(alocar_sequencia(outra.pk, "AIF", 2026), 1)
+        self.assertEqual(alocar_sequencia(self.prefeitura.pk, "EMB", 2026), 1)
+        self.assertEqual(alocar_sequencia(self.prefeitura.pk, "AIF", 2027), 1)
+
+    def test_insert_concorrente_tenta_de_novo(self):
+        criar = SequenciaProtocolo.objects.create
+        tentativas = []
+
+        def insert(**campos):
+            # 1ª tentativa: outra alocação inseriu a mesma linha antes (a
+            # savepoint desfaz o INSERT); na 2ª o laço recomeça pelo UPDATE
+            tentativas.append(campos)
+            if len(tentativas) == 1:
+                raise IntegrityError("pref_seq_protocolo_uniq")
+            return criar(**campos)
+
+        with mock.patch.object(SequenciaProtocolo.objects, "create", side_effect=insert):
+            self.assertEqual(alocar_sequencia(self.prefeitura.pk, "DEN", 2026, quantidade=2), 1)
+        self.assertEqual(len(tentativas), 2)
+        self.assertEqual(SequenciaProtocolo.objects.get().ultimo, 2)
+        # com a linha já criada, a alocação seguinte é só o UPDATE
+        with mock.patch.object(SequenciaProtocolo.objects, "create", side_effect=AssertionError):
+            self.assertEqual(alocar_sequencia(self.prefeitura.pk, "DEN", 2026), 3)
+
+    def test_desiste_depois_de_tres_tentativas(self):
+        with mock.patch.object(SequenciaProtocolo.objects, "create", side_effect=IntegrityError), \
+                self.assertRaises(RuntimeError):
+            alocar_sequencia(self.prefeitura.pk, "DEN", 2026)
+
+
+class BlocoProtocolosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+
+    def _com_relogio(self, momentos):
+        relogio = iter(momentos)
+        real = timezone.localtime
+        return mock.patch("utils.protocolo.timezone.localtime",
+                          side_effect=lambda valor=None: real(valor) if valor else next(relogio))
+
+    def _sequencial(self, protocolo):
+        return int(protocolo.split("-")[3])
+
+    def test_numeros_seguidos_e_unicos(self):
+        novo_protocolo(self.prefeitura, "DEN")
+        bloco = BlocoProtocolos(self.prefeitura, "DEN", 3)
+        protocolos = [bloco.proximo("M1") for _ in range(7)]
+        self.assertEqual([self._sequencial(p) for p in protocolos], list(range(2, 9)))
+        self.assertEqual(len(set(protocolos)), 7)
+        self.assertTrue(protocolos[0].startswith("2307650-DEN-") and protocolos[0].endswith("-M1"))
+        # sobra do último bloco vira lacuna: a próxima alocação avulsa vem depois dele
+        self.assertEqual(self._sequencial(novo_protocolo(self.prefeitura, "DEN")), 11)
 
-# Create your tests here.
+    def test_virada_do_ano_reinicia_a_sequencia(self):
+        tz = timezone.get_current_timezone()
+        dezembro = datetime.datetime(2026, 12, 31, 23, 59, 58, tzinfo=tz)
+        janeiro = datetime.datetime(2027, 1, 1, 0, 0, 1, tzinfo=tz)
+        bloco = BlocoProtocolos(self.prefeitura, "NOT", 10)
+        with self._com_relogio([dezembro, dezembro, janeiro, janeiro]):
+            protocolos = [bloco.proximo() for _ in range(4)]
+        self.assertEqual([self._sequencial(p) for p in protocolos], [1, 2, 1, 2])
+        self.assertIn("-20270101", protocolos[2])
+        self.assertEqual(
+            dict(SequenciaProtocolo.objects.values_list("ano", "ultimo")), {2026: 10, 2027: 10})
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import EstatisticaDiaria, RelatorioJob
+
+
+@admin.register(EstatisticaDiaria)
+class EstatisticaDiariaAdmin(admin.ModelAdmin):
+    list_display = ('data', 'modulo', 'status', 'quantidade', 'prefeitura')
+    list_filter = ('modulo', 'prefeitura')
+    date_hierarchy = 'data'
+    readonly_fields = ('prefeitura', 'modulo', 'data', 'status', 'quantidade')
+
+
+@admin.register(RelatorioJob)
+class RelatorioJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'status', 'prefeitura', 'solicitado_por', 'criado_em', 'concluido_em')
+    list_filter = ('tipo', 'status', 'prefeitura')
+    search_fields = ('parametros',)
+    date_hierarchy = 'criado_em'
+    readonly_fields = ('chave', 'criado_em', 'iniciado_em', 'concluido_em', 'erro')
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class RelatoriosConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.relatorios'
+    verbose_name = 'Relatórios e Estatísticas'
+
+    def ready(self):
+        # Mantém a estatística diária sincronizada com os módulos do painel
+        from . import signals  # noqa: F401
@@ -0,0 +1,152 @@
+# apps/relatorios/arrecadacao.py
+"""
+Arrecadação AIF mensal: multa aplicada, homologada e paga.
+
+- Aplicada: por criada_em; maior entre valor_infracao, total dos itens e
+  valor homologado
+- Homologada: por homologado_em (ou criada_em se ausente), com valor
+  homologado definido
+- Paga: por pago_em, pago=True (filtro opcional por forma de pagamento)
+
+As três séries são calculadas uma vez por (prefeitura, período, status,
+formas, versão de dados) e reaproveitadas pela tela, impressão e CSV.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncMonth
+from django.utils import timezone
+
+from apps.autoinfracao.models import AutoInfracao
+
+from .motor import em_cache, periodo
+
+
+def _dec0():
+    return Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _por_mes(qs, campo_mes, campo_valor):
+    linhas = (qs.annotate(m=TruncMonth(campo_mes))
+                .values('m')
+                .annotate(v=Coalesce(Sum(campo_valor), _dec0()), q=Count('id'))
+                .order_by())
+    return {(r['m'].year, r['m'].month): {'v': r['v'] or 0, 'q': r['q']} for r in linhas}
+
+
+def _meses(d_ini, d_fim):
+    meses = []
+    y, m = d_ini.year, d_ini.month
+    while (y, m) <= (d_fim.year, d_fim.month):
+        meses.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return meses
+
+
+def calcular(prefeitura_id, d_ini, d_fim, status_list=(), forma_list=()):
+    dt_ini = timezone.make_aware(datetime.datetime.combine(d_ini, datetime.time.min))
+    dt_fim_ex = timezone.make_aware(datetime.datetime.combine(d_fim, datetime.time.min)) + datetime.timedelta(days=1)
+
+    base = AutoInfracao.objects.filter(prefeitura_id=prefeitura_id)
+    if status_list:
+        base = base.filter(status__in=status_list)
+
+    # Aplicada (por criada_em) — total dos itens vem da coluna persistida
+    aplicada_qs = base.filter(criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex).annotate(
+        valor_aplicado=Greatest(
+            Coalesce('valor_infracao', _dec0()),
+            'total_itens',
+            Coalesce('valor_multa_homologado', _dec0()),
+        )
+    )
+    applied_map = _por_mes(aplicada_qs, 'criada_em', 'valor_aplicado')
+
+    # Homologada (por homologado_em se existir; senão criada_em)
+    hom_filter = Q(valor_multa_homologado__isnull=False) & (
+        Q(homologado_em__gte=dt_ini, homologado_em__lt=dt_fim_ex) |
+        Q(homologado_em__isnull=True, criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex)
+    )
+    homolog_qs = base.filter(hom_filter).annotate(ref_dt=Coalesce('homologado_em', 'criada_em'))
+    homolog_map = _por_mes(homolog_qs, 'ref_dt', 'valor_multa_homologado')
+
+    # Pago (por pago_em; pago=True)
+    pagos_qs = base.filter(pago=True, pago_em__isnull=False, pago_em__gte=d_ini, pago_em__lte=d_fim)
+    if forma_list:
+        pagos_qs = pagos_qs.filter(forma_pagamento__in=forma_list)
+    pagos_map = _por_mes(pagos_qs, 'pago_em', 'valor_pago')
+
+    # Séries e tabela
+    meses = _meses(d_ini, d_fim)
+    zero = {'v': Decimal('0'), 'q': 0}
+    serie_apl, serie_hom, serie_pag, rows = [], [], [], []
+    total_apl_v = Decimal('0'); total_apl_q = 0
+    total_hom_v = Decimal('0'); total_hom_q = 0
+    total_pag_v = Decimal('0'); total_pag_q = 0
+
+    for (y, m) in meses:
+        apl = applied_map.get((y, m), zero)
+        hom = homolog_map.get((y, m), zero)
+        pag = pagos_map.get((y, m), zero)
+        serie_apl.append(float(apl['v'] or 0))
+        serie_hom.append(float(hom['v'] or 0))
+        serie_pag.append(float(pag['v'] or 0))
+        total_apl_v += Decimal(apl['v'] or 0); total_apl_q += apl['q'] or 0
+        total_hom_v += Decimal(hom['v'] or 0); total_hom_q += hom['q'] or 0
+        total_pag_v += Decimal(pag['v'] or 0); total_pag_q += pag['q'] or 0
+        ticket = (Decimal(pag['v'] or 0) / pag['q']) if (pag['q'] or 0) > 0 else Decimal('0')
+        rows.append({
+            'mes': f"{y}-{m:02d}",
+            'apl_q': apl['q'] or 0, 'apl_v': apl['v'] or 0,
+            'hom_q': hom['q'] or 0, 'hom_v': hom['v'] or 0,
+            'pag_q': pag['q'] or 0, 'pag_v': pag['v'] or 0,
+            'ticket': ticket,
+        })
+
+    return {
+        'labels': [f"{y}-{m:02d}" for (y, m) in meses],
+        'serie_apl': serie_apl, 'serie_hom': serie_hom, 'serie_pag': serie_pag,
+        'rows': rows,
+        'totais': {
+            'apl_q': total_apl_q, 'apl_v': total_apl_v,
+            'hom_q': total_hom_q, 'hom_v': total_hom_v,
+            'pag_q': total_pag_q, 'pag_v': total_pag_v,
+            'ticket': (total_pag_v / total_pag_q) if total_pag_q > 0 else Decimal('0'),
+        },
+    }
+
+
+def relatorio(prefeitura_id, d_ini, d_fim, status_list=(), forma_list=()):
+    status_list = sorted(set(status_list))
+    forma_list = sorted(set(forma_list))
+    return em_cache(
+        "arrecadacao", prefeitura_id,
+        [d_ini.isoformat(), d_fim.isoformat(), ",".join(status_list) or "-", ",".join(forma_list) or "-"],
+        lambda: calcular(prefeitura_id, d_ini, d_fim, status_list, forma_list),
+    )
+
+
+def parametros(params):
+    """(d_ini, d_fim, status_list, forma_list) do GET; padrão: ano corrente."""
+    d_ini, d_fim = periodo(params, timezone.localdate().replace(month=1, day=1))
+    status_list = [s for s in params.getlist('status') if s]
+    forma_list = [f for f in params.getlist('forma') if f]
+    return d_ini, d_fim, status_list, forma_list
+
+
+def escrever_csv(w, dados, d_ini, d_fim, status_list=(), forma_list=()):
+    w.writerow(["Periodo", d_ini.isoformat(), d_fim.isoformat()])
+    if status_list:
+        w.writerow(["Status", ",".join(status_list)])
+    if forma_list:
+        w.writerow(["Formas", ",".join(forma_list)])
+    w.writerow([])
+    w.writerow(["Mes", "Qtd Aplicados", "Valor Multa", "Qtd Homologados", "Valor Homologado", "Qtd Pagos", "Valor Pago", "Ticket Medio Pago"])
+    for r in dados['rows']:
+        w.writerow([
+            r['mes'], r['apl_q'], f"{Decimal(r['apl_v']):.2f}", r['hom_q'], f"{Decimal(r['hom_v']):.2f}",
+            r['pag_q'], f"{Decimal(r['pag_v']):.2f}", f"{Decimal(r['ticket']):.2f}",
+        ])
+    w.writerow([])
+    t = dados['totais']
+    w.writerow(["Totais", t['apl_q'], f"{t['apl_v']:.2f}", t['hom_q'], f"{t['hom_v']:.2f}", t['pag_q'], f"{t['pag_v']:.2f}", f"{t['ticket']:.2f}"])
@@ -0,0 +1,130 @@
+# apps/relatorios/estatisticas.py
+"""
+Estatística diária (tabela relatorios_estatistica_diaria).
+
+- `ajustar` soma/subtrai uma unidade na chave (prefeitura, módulo, dia, status);
+  usado pelos sinais a cada criação, troca de status ou exclusão.
+- `reconciliar` recalcula as linhas a partir das tabelas de origem (comando
+  noturno e migração de carga inicial).
+- `resumo_anual` devolve, em uma consulta, totais por status e série mensal
+  de cada módulo para o painel.
+"""
+import datetime
+
+from django.apps import apps as django_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, TruncDate
+from django.utils import timezone
+
+
+MODULOS = {
+    "DEN": ("denuncias", "Denuncia"),
+    "NOT": ("notificacoes", "Notificacao"),
+    "AIF": ("autoinfracao", "AutoInfracao"),
+    "EMB": ("autoinfracao", "Embargo"),
+    "ITD": ("autoinfracao", "Interdicao"),
+}
+
+# Campos que definem a chave de um registro na estatística
+CAMPOS_CHAVE = {"prefeitura", "prefeitura_id", "status", "criada_em"}
+
+
+def dia_local(dt):
+    if dt is None:
+        return None
+    if timezone.is_aware(dt):
+        dt = timezone.localtime(dt)
+    return dt.date()
+
+
+def chave(prefeitura_id, criada_em, status):
+    """(prefeitura_id, dia, status) de um registro, ou None se incompleto."""
+    dia = dia_local(criada_em)
+    if not prefeitura_id or dia is None:
+        return None
+    return prefeitura_id, dia, status or ""
+
+
+def ajustar(modulo, chave_registro, delta):
+    if chave_registro is None or not delta:
+        return
+    from .models import EstatisticaDiaria
+
+    prefeitura_id, dia, status = chave_registro
+    qs = EstatisticaDiaria.objects.filter(prefeitura_id=prefeitura_id, modulo=modulo, data=dia, status=status)
+    if qs.update(quantidade=F("quantidade") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            EstatisticaDiaria.objects.create(
+                prefeitura_id=prefeitura_id, modulo=modulo, data=dia, status=status, quantidade=delta,
+            )
+    except IntegrityError:
+        # Outra requisição criou a linha entre o UPDATE e o INSERT
+        qs.update(quantidade=F("quantidade") + delta)
+
+
+def reconciliar(prefeitura_id=None, desde=None, registro=None):
+    """
+    Recalcula a estatística a partir das tabelas de origem.
+
+    desde: date; limita o recálculo aos dias >= desde (None = tudo).
+    registro: app registry (migrações passam o `apps` histórico).
+    Retorna o número de linhas gravadas.
+    """
+    registro = registro or django_apps
+    Estatistica = registro.get_model("relatorios", "EstatisticaDiaria")
+    gravadas = 0
+    for modulo, label in MODULOS.items():
+        Model = registro.get_model(*label)
+        origem = Model.objects.exclude(prefeitura_id=None)
+        destino = Estatistica.objects.filter(modulo=modulo)
+        if prefeitura_id:
+            origem = origem.filter(prefeitura_id=prefeitura_id)
+            destino = destino.filter(prefeitura_id=prefeitura_id)
+        if desde:
+            inicio = timezone.make_aware(datetime.datetime.combine(desde, datetime.time.min))
+            origem = origem.filter(criada_em__gte=inicio)
+            destino = destino.filter(data__gte=desde)
+
+        linhas = (origem.order_by()
+                  .annotate(dia=TruncDate("criada_em"))
+                  .values("prefeitura_id", "dia", "status")
+                  .annotate(n=Count("id")))
+        novas = [
+            Estatistica(prefeitura_id=r["prefeitura_id"], modulo=modulo, data=r["dia"],
+                        status=r["status"] or "", quantidade=r["n"])
+            for r in linhas if r["dia"] is not None
+        ]
+        with transaction.atomic():
+            destino.delete()
+            Estatistica.objects.bulk_create(novas, batch_size=1000)
+        gravadas += len(novas)
+    return gravadas
+
+
+def resumo_anual(prefeitura_id, ano):
+    """
+    {modulo: {"por_status": {status: n}, "mensal": [12 ints], "total": n}}
+    para o ano informado, em uma única consulta agregada.
+    """
+    from .models import EstatisticaDiaria
+
+    resumo = {m: {"por_status": {}, "mensal": [0] * 12, "total": 0} for m in MODULOS}
+    linhas = (EstatisticaDiaria.objects
+              .filter(prefeitura_id=prefeitura_id,
+                      data__gte=datetime.date(ano, 1, 1), data__lt=datetime.date(ano + 1, 1, 1))
+              .annotate(mes=ExtractMonth("data"))
+              .values("modulo", "status", "mes")
+              .annotate(n=Sum("quantidade"))
+              .order_by())
+    for r in linhas:
+        n = r["n"] or 0
+        if not n or r["modulo"] not in resumo:
+            continue
+        item = resumo[r["modulo"]]
+        item["por_status"][r["status"]] = item["por_status"].get(r["status"], 0) + n
+        item["mensal"][r["mes"] - 1] += n
+        item["total"] += n
+    return resumo
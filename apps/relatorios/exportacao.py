@@ -0,0 +1,147 @@
+# apps/relatorios/exportacao.py
+"""
+Exportação de registros completos (CSV ou JSON Lines) em streaming.
+
+Lê com values() + iterator(chunk_size=...) e gera linha a linha, então a
+memória fica constante e o download começa de imediato, inclusive para a
+prefeitura inteira. Os filtros são os mesmos das listagens (filtros.py de
+cada módulo).
+"""
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from apps.autoinfracao.filtros import filtrar_autos
+from apps.denuncias.filtros import filtrar_denuncias
+from apps.notificacoes.filtros import filtrar_notificacoes
+
+
+TAMANHO_LOTE = 2000
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson; charset=utf-8", "jsonl"),
+}
+
+_PESSOA = [
+    ("pessoa_id", "pessoa_id"),
+    ("pessoa_nome_razao", "pessoa__nome_razao"),
+    ("pessoa_doc_tipo", "pessoa__doc_tipo"),
+    ("pessoa_doc_num", "pessoa__doc_num"),
+    ("pessoa_telefone", "pessoa__telefone"),
+    ("pessoa_email", "pessoa__email"),
+]
+
+_IMOVEL = [
+    ("imovel_id", "imovel_id"),
+    ("imovel_inscricao", "imovel__inscricao"),
+    ("imovel_logradouro", "imovel__logradouro"),
+    ("imovel_numero", "imovel__numero"),
+    ("imovel_bairro", "imovel__bairro"),
+    ("imovel_cidade", "imovel__cidade"),
+    ("imovel_uf", "imovel__uf"),
+    ("imovel_cep", "imovel__cep"),
+]
+
+_ENDERECO = [
+    ("cep", "cep"), ("logradouro", "logradouro"), ("numero", "numero"), ("complemento", "complemento"),
+    ("bairro", "bairro"), ("cidade", "cidade"), ("uf", "uf"), ("latitude", "latitude"), ("longitude", "longitude"),
+]
+
+# (nome da coluna, lookup do values())
+MODULOS = {
+    "denuncias": {
+        "filtrar": filtrar_denuncias,
+        "colunas": [
+            ("id", "id"), ("protocolo", "protocolo"), ("criada_em", "criada_em"), ("atualizada_em", "atualizada_em"),
+            ("status", "status"), ("procedencia", "procedencia"), ("origem", "origem_denuncia"),
+            ("canal_registro", "canal_registro"), ("processo_id", "processo_id"),
+            ("denunciante_anonimo", "denunciante_anonimo"), ("denunciante_nome", "denunciante_nome"),
+            ("denunciado_tipo_pessoa", "denunciado_tipo_pessoa"), ("denunciado_nome_razao", "denunciado_nome_razao"),
+            ("denunciado_cpf_cnpj", "denunciado_cpf_cnpj"), ("denunciado_rg_ie", "denunciado_rg_ie"),
+            ("denunciado_telefone", "denunciado_telefone"), ("denunciado_email", "denunciado_email"),
+            ("local_logradouro", "local_oco_logradouro"), ("local_numero", "local_oco_numero"),
+            ("local_complemento", "local_oco_complemento"), ("local_pontoref", "local_oco_pontoref"),
+            ("local_bairro", "local_oco_bairro"), ("local_cidade", "local_oco_cidade"), ("local_uf", "local_oco_uf"),
+            ("local_cep", "local_oco_cep"), ("local_lat", "local_oco_lat"), ("local_lng", "local_oco_lng"),
+            ("descricao", "descricao_oco"),
+        ] + _PESSOA + _IMOVEL,
+    },
+    "notificacoes": {
+        "filtrar": filtrar_notificacoes,
+        "colunas": [
+            ("id", "id"), ("protocolo", "protocolo"), ("criada_em", "criada_em"), ("atualizada_em", "atualizada_em"),
+            ("status", "status"), ("prazo_regularizacao", "prazo_regularizacao"),
+            ("processo_id", "processo_id"), ("denuncia_id", "denuncia_id"),
+            ("pessoa_tipo", "pessoa_tipo"), ("nome_razao", "nome_razao"), ("cpf_cnpj", "cpf_cnpj"), ("rg", "rg"),
+            ("telefone", "telefone"), ("email", "email"),
+        ] + _ENDERECO + [
+            ("pontoref", "pontoref_oco"), ("documento_tipo", "documento_tipo"), ("descricao", "descricao"),
+            ("area_m2", "area_m2"), ("testada_m", "testada_m"), ("pe_direito_m", "pe_direito_m"),
+        ] + _PESSOA + _IMOVEL,
+    },
+    "autoinfracao": {
+        "filtrar": filtrar_autos,
+        "colunas": [
+            ("id", "id"), ("protocolo", "protocolo"), ("criada_em", "criada_em"), ("atualizada_em", "atualizada_em"),
+            ("status", "status"), ("prazo_regularizacao", "prazo_regularizacao_data"),
+            ("processo_id", "processo_id"), ("denuncia_id", "denuncia_id"), ("notificacao_id", "notificacao_id"),
+            ("pessoa_tipo", "pessoa_tipo"), ("nome_razao", "nome_razao"), ("cpf_cnpj", "cpf_cnpj"), ("rg", "rg"),
+            ("telefone", "telefone"), ("email", "email"),
+        ] + _ENDERECO + [
+            ("descricao", "descricao"), ("valor_infracao", "valor_infracao"),
+            ("valor_multa_homologado", "valor_multa_homologado"), ("total_itens", "total_itens"),
+            ("total_homologado", "total_homologado"), ("homologado_em", "homologado_em"),
+            ("regularizado_em", "regularizado_em"), ("pago", "pago"), ("valor_pago", "valor_pago"),
+            ("pago_em", "pago_em"), ("forma_pagamento", "forma_pagamento"), ("guia_numero", "guia_numero"),
+        ] + _PESSOA + _IMOVEL,
+    },
+}
+
+
+def _valor(v):
+    if isinstance(v, datetime):
+        return timezone.localtime(v).isoformat() if timezone.is_aware(v) else v.isoformat()
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+class _Eco:
+    """Pseudo-arquivo para csv.writer: devolve a linha em vez de gravar."""
+    def write(self, valor):
+        return valor
+
+
+def consultar(modulo, prefeitura_id, params):
+    """Queryset values() (em ordem de id) com os filtros da listagem do módulo."""
+    cfg = MODULOS[modulo]
+    qs, _filtros = cfg["filtrar"](prefeitura_id, params)
+    return qs.order_by("id").values(*[lookup for _nome, lookup in cfg["colunas"]])
+
+
+def gerar_linhas(modulo, linhas, formato):
+    """Gera o arquivo (str por linha) a partir de um iterável de dicts do values()."""
+    colunas = MODULOS[modulo]["colunas"]
+    if formato == "csv":
+        w = csv.writer(_Eco())
+        yield "\ufeff" + w.writerow([nome for nome, _ in colunas])
+        for r in linhas:
+            yield w.writerow(["" if r[lookup] is None else _valor(r[lookup]) for _nome, lookup in colunas])
+    else:
+        for r in linhas:
+            yield json.dumps({nome: _valor(r[lookup]) for nome, lookup in colunas}, ensure_ascii=False) + "\n"
+
+
+def exportar(modulo, prefeitura_id, params, formato="csv", lote=TAMANHO_LOTE):
+    qs = consultar(modulo, prefeitura_id, params)
+    return gerar_linhas(modulo, qs.iterator(chunk_size=lote), formato)
+
+
+def nome_arquivo(modulo, formato):
+    return f"{modulo}_{timezone.localdate():%Y%m%d}.{FORMATOS[formato][1]}"
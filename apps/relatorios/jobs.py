@@ -0,0 +1,146 @@
+# apps/relatorios/jobs.py
+"""
+Relatórios em segundo plano (RelatorioJob).
+
+- `solicitar` grava o pedido, ou devolve o já existente na fila com os
+  mesmos parâmetros.
+- `reservar` pega o próximo pedido da fila com um UPDATE condicional
+  (seguro com vários workers, sem SELECT ... FOR UPDATE).
+- `executar` gera o arquivo e o salva em MEDIA_ROOT.
+"""
+import csv
+import datetime
+import hashlib
+import io
+import tempfile
+import traceback
+from urllib.parse import urlencode
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from utils.replica import usar_replica
+
+from . import arrecadacao, exportacao, operacional
+from .models import JOB_STATUS_ATIVOS, RelatorioJob
+
+# Parâmetros de navegação/formato que não mudam o resultado
+_IGNORADOS = {"cursor", "page", "format", "csrfmiddlewaretoken"}
+
+
+def normalizar_parametros(tipo, params):
+    """
+    Querystring canônica (ordenada, sem vazios). Para relatórios com período,
+    fixa inicio/fim já resolvidos, para que o job gere exatamente o que foi
+    visto na tela mesmo se processado no dia seguinte.
+    """
+    q = QueryDict(mutable=True)
+    for k in sorted(params.keys()):
+        if k in _IGNORADOS:
+            continue
+        valores = sorted({v.strip() for v in params.getlist(k) if v and v.strip()})
+        if valores:
+            q.setlist(k, valores)
+    if tipo == "OPERACIONAL":
+        d_ini, d_fim = operacional.parametros(q)
+        q["inicio"], q["fim"] = d_ini.isoformat(), d_fim.isoformat()
+    elif tipo == "ARRECADACAO":
+        d_ini, d_fim, _s, _f = arrecadacao.parametros(q)
+        q["inicio"], q["fim"] = d_ini.isoformat(), d_fim.isoformat()
+    elif tipo == "EXPORTACAO":
+        if q.get("modulo") not in exportacao.MODULOS:
+            raise ValueError("Módulo de exportação inválido.")
+        if q.get("formato", "csv") not in exportacao.FORMATOS:
+            raise ValueError("Formato inválido (use csv ou jsonl).")
+    return urlencode(sorted((k, v) for k in q.keys() for v in q.getlist(k)))
+
+
+def _chave(prefeitura_id, tipo, parametros):
+    return hashlib.sha256(f"{prefeitura_id}|{tipo}|{parametros}".encode()).hexdigest()
+
+
+def solicitar(prefeitura_id, usuario, tipo, params):
+    """(job, criado). Reaproveita um pedido idêntico ainda na fila/processando."""
+    parametros = normalizar_parametros(tipo, params)
+    chave = _chave(prefeitura_id, tipo, parametros)
+    ativo = RelatorioJob.objects.filter(chave=chave, status__in=JOB_STATUS_ATIVOS).first()
+    if ativo:
+        return ativo, False
+    try:
+        with transaction.atomic():
+            job = RelatorioJob.objects.create(
+                prefeitura_id=prefeitura_id, solicitado_por=usuario,
+                tipo=tipo, parametros=parametros, chave=chave,
+            )
+        return job, True
+    except IntegrityError:
+        # outro pedido idêntico entrou entre a consulta e o INSERT
+        return RelatorioJob.objects.get(chave=chave, status__in=JOB_STATUS_ATIVOS), False
+
+
+def reservar():
+    """Próximo job PENDENTE marcado como PROCESSANDO por este worker (ou None)."""
+    while True:
+        pk = (RelatorioJob.objects.filter(status="PENDENTE")
+              .order_by("criado_em", "pk").values_list("pk", flat=True).first())
+        if pk is None:
+            return None
+        agora = timezone.now()
+        if RelatorioJob.objects.filter(pk=pk, status="PENDENTE").update(status="PROCESSANDO", iniciado_em=agora):
+            return RelatorioJob.objects.get(pk=pk)
+        # outro worker pegou este; tenta o próximo
+
+
+def liberar_travados(minutos):
+    """Devolve à fila jobs PROCESSANDO há mais de `minutos` (worker interrompido)."""
+    limite = timezone.now() - datetime.timedelta(minutes=minutos)
+    return RelatorioJob.objects.filter(status="PROCESSANDO", iniciado_em__lt=limite).update(status="PENDENTE")
+
+
+def _csv(escrever):
+    buf = io.StringIO()
+    buf.write("\ufeff")
+    escrever(csv.writer(buf))
+    return ContentFile(buf.getvalue().encode("utf-8"))
+
+
+def executar(job):
+    """Gera o arquivo do job; em caso de falha marca ERRO com o traceback."""
+    params = QueryDict(job.parametros)
+    carimbo = timezone.localtime().strftime("%Y%m%d%H%M%S")
+    try:
+        # leituras na réplica, se houver: a carga analítica não disputa com os cadastros
+        with usar_replica():
+            if job.tipo == "OPERACIONAL":
+                d_ini, d_fim = operacional.parametros(params)
+                data = operacional.calcular(job.prefeitura_id, d_ini, d_fim)
+                job.arquivo.save(f"operacional_{job.pk}_{carimbo}.csv",
+                                 _csv(lambda w: operacional.escrever_csv(w, data)), save=False)
+            elif job.tipo == "ARRECADACAO":
+                d_ini, d_fim, status_list, forma_list = arrecadacao.parametros(params)
+                dados = arrecadacao.calcular(job.prefeitura_id, d_ini, d_fim, status_list, forma_list)
+                job.arquivo.save(f"arrecadacao_{job.pk}_{carimbo}.csv",
+                                 _csv(lambda w: arrecadacao.escrever_csv(w, dados, d_ini, d_fim, status_list, forma_list)),
+                                 save=False)
+            elif job.tipo == "EXPORTACAO":
+                modulo = params.get("modulo")
+                formato = params.get("formato") or "csv"
+                # grava em arquivo temporário linha a linha (memória constante)
+                with tempfile.TemporaryFile(mode="w+b") as tmp:
+                    for linha in exportacao.exportar(modulo, job.prefeitura_id, params, formato):
+                        tmp.write(linha.encode("utf-8"))
+                    tmp.seek(0)
+                    job.arquivo.save(f"{modulo}_{job.pk}_{carimbo}.{exportacao.FORMATOS[formato][1]}", File(tmp), save=False)
+            else:
+                raise ValueError(f"Tipo de relatório desconhecido: {job.tipo}")
+        job.status = "CONCLUIDO"
+        job.erro = ""
+    except Exception:
+        job.status = "ERRO"
+        job.erro = traceback.format_exc()[-4000:]
+    job.concluido_em = timezone.now()
+    job.save(update_fields=["arquivo", "status", "erro", "concluido_em"])
+    return job
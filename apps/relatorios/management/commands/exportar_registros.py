@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from apps.relatorios import exportacao
+
+
+class Command(BaseCommand):
+    help = "Exporta registros completos (CSV ou JSON Lines) de Denúncias, Notificações ou AIFs em streaming"
+
+    def add_arguments(self, parser):
+        parser.add_argument('modulo', choices=sorted(exportacao.MODULOS))
+        parser.add_argument('--prefeitura', type=int, required=True, help='ID da prefeitura')
+        parser.add_argument('--formato', choices=sorted(exportacao.FORMATOS), default='csv')
+        parser.add_argument('--saida', help='Arquivo de saída (padrão: stdout)')
+        parser.add_argument('--filtro', action='append', default=[], metavar='CAMPO=VALOR',
+                            help='Filtro da listagem (ex.: --filtro status=ABERTA); pode repetir')
+        parser.add_argument('--lote', type=int, default=exportacao.TAMANHO_LOTE, help='Linhas lidas por lote')
+
+    def handle(self, *args, **options):
+        params = QueryDict(mutable=True)
+        for item in options['filtro']:
+            campo, sep, valor = item.partition('=')
+            if not sep:
+                raise CommandError(f'Filtro inválido: {item!r} (use CAMPO=VALOR)')
+            params[campo.strip()] = valor
+
+        linhas = exportacao.exportar(options['modulo'], options['prefeitura'], params,
+                                     options['formato'], lote=max(100, options['lote']))
+        destino = open(options['saida'], 'w', encoding='utf-8', newline='') if options['saida'] else sys.stdout
+        escritas = 0
+        try:
+            for linha in linhas:
+                destino.write(linha)
+                escritas += 1
+        finally:
+            if destino is not sys.stdout:
+                destino.close()
+
+        if options['saida']:
+            total = escritas - 1 if options['formato'] == 'csv' else escritas  # sem o cabeçalho
+            self.stdout.write(self.style.SUCCESS(f'{total} registro(s) exportado(s) para {options["saida"]}.'))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.relatorios.jobs import executar, liberar_travados, reservar
+
+
+class Command(BaseCommand):
+    help = "Worker dos relatórios em segundo plano: processa a fila de RelatorioJob"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Esvazia a fila e termina (ex.: cron)')
+        parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos entre consultas à fila vazia')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Termina após N jobs (0 = sem limite)')
+        parser.add_argument('--travado-minutos', type=int, default=60,
+                            help='Devolve à fila jobs em processamento há mais de N minutos')
+
+    def handle(self, *args, **options):
+        liberados = liberar_travados(options['travado_minutos'])
+        if liberados:
+            self.stdout.write(self.style.WARNING(f'{liberados} job(s) travado(s) devolvido(s) à fila.'))
+
+        feitos = 0
+        while True:
+            job = reservar()
+            if job is None:
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+            job = executar(job)
+            feitos += 1
+            if job.status == 'CONCLUIDO':
+                self.stdout.write(self.style.SUCCESS(f'Job #{job.pk} ({job.tipo}) concluído: {job.arquivo.name}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Job #{job.pk} ({job.tipo}) falhou.'))
+            if options['max_jobs'] and feitos >= options['max_jobs']:
+                break
+        self.stdout.write(f'{feitos} job(s) processado(s).')
@@ -0,0 +1,22 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.relatorios.estatisticas import reconciliar
+
+
+class Command(BaseCommand):
+    help = "Recalcula a estatística diária do painel a partir dos módulos (agendar diariamente)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefeitura', type=int, help='ID da prefeitura (padrão: todas)')
+        parser.add_argument('--dias', type=int, default=3,
+                            help='Recalcula apenas os últimos N dias (padrão: 3; 0 = todo o histórico)')
+
+    def handle(self, *args, **options):
+        dias = max(0, options['dias'])
+        desde = timezone.localdate() - datetime.timedelta(days=dias - 1) if dias else None
+        linhas = reconciliar(prefeitura_id=options.get('prefeitura'), desde=desde)
+        periodo = f"desde {desde:%d/%m/%Y}" if desde else "todo o histórico"
+        self.stdout.write(self.style.SUCCESS(f'Estatística diária reconciliada ({periodo}): {linhas} linhas.'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modulo', models.CharField(choices=[('DEN', 'Denúncia'), ('NOT', 'Notificação'), ('AIF', 'Auto de Infração'), ('EMB', 'Embargo'), ('ITD', 'Interdição')], max_length=3)),
+                ('data', models.DateField()),
+                ('status', models.CharField(max_length=30)),
+                ('quantidade', models.IntegerField(default=0)),
+                ('prefeitura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estatisticas_diarias', to='prefeituras.prefeitura')),
+            ],
+            options={
+                'verbose_name': 'Estatística diária',
+                'verbose_name_plural': 'Estatísticas diárias',
+                'db_table': 'relatorios_estatistica_diaria',
+                'indexes': [models.Index(fields=['prefeitura', 'data'], name='relatorios__prefeit_71a129_idx')],
+                'constraints': [models.UniqueConstraint(fields=('prefeitura', 'modulo', 'data', 'status'), name='relatorios_estat_dia_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def popular(apps, schema_editor):
+    from apps.relatorios.estatisticas import reconciliar
+
+    reconciliar(registro=apps)
+
+
+def limpar(apps, schema_editor):
+    apps.get_model('relatorios', 'EstatisticaDiaria').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relatorios', '0001_initial'),
+        ('denuncias', '0015_denuncia_denuncias_d_prefeit_685034_idx'),
+        ('notificacoes', '0013_notificacao_notif_pref_prazo_ordem_idx'),
+        ('autoinfracao', '0018_autoinfracao_aif_pref_prazo_ordem_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular, limpar),
+    ]
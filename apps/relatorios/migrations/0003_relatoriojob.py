@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:47
+
+import apps.relatorios.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('relatorios', '0002_popular_estatisticas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatorioJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('OPERACIONAL', 'Relatório Operacional'), ('ARRECADACAO', 'Arrecadação AIF'), ('EXPORTACAO', 'Exportação de registros')], max_length=20)),
+                ('parametros', models.CharField(blank=True, max_length=1000)),
+                ('chave', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Na fila'), ('PROCESSANDO', 'Processando'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro')], default='PENDENTE', max_length=20)),
+                ('arquivo', models.FileField(blank=True, upload_to=apps.relatorios.models.upload_job_path)),
+                ('erro', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('prefeitura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relatorio_jobs', to='prefeituras.prefeitura')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='relatorio_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Relatório em segundo plano',
+                'verbose_name_plural': 'Relatórios em segundo plano',
+                'db_table': 'relatorios_job',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['status', 'criado_em'], name='relatorios__status_3622d5_idx'), models.Index(fields=['prefeitura', 'solicitado_por', 'criado_em'], name='relatorios__prefeit_571358_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ('PENDENTE', 'PROCESSANDO'))), fields=('chave',), name='relatorios_job_chave_ativa_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# apps/relatorios/models.py
+from django.db import models
+
+from apps.prefeituras.models import EscopoPrefeitura
+
+
+MODULO_CHOICES = [
+    ('DEN', 'Denúncia'),
+    ('NOT', 'Notificação'),
+    ('AIF', 'Auto de Infração'),
+    ('EMB', 'Embargo'),
+    ('ITD', 'Interdição'),
+]
+
+
+class EstatisticaDiaria(models.Model):
+    """
+    Contagem de registros por (prefeitura, módulo, dia de criação, status).
+
+    Mantida de forma incremental pelos sinais (apps/relatorios/signals.py) e
+    reconciliada com as tabelas de origem pelo comando
+    `reconciliar_estatisticas` (agendar diariamente). O painel inicial lê as
+    séries mensais e os totais por status daqui, sem agregar os módulos.
+    """
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.CASCADE, related_name='estatisticas_diarias')
+    modulo = models.CharField(max_length=3, choices=MODULO_CHOICES)
+    data = models.DateField()
+    status = models.CharField(max_length=30)
+    quantidade = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'relatorios_estatistica_diaria'
+        verbose_name = 'Estatística diária'
+        verbose_name_plural = 'Estatísticas diárias'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['prefeitura', 'modulo', 'data', 'status'],
+                name='relatorios_estat_dia_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['prefeitura', 'data']),
+        ]
+
+    def __str__(self):
+        return f"{self.modulo} {self.data} {self.status}: {self.quantidade}"
+
+
+JOB_TIPO_CHOICES = [
+    ('OPERACIONAL', 'Relatório Operacional'),
+    ('ARRECADACAO', 'Arrecadação AIF'),
+    ('EXPORTACAO', 'Exportação de registros'),
+]
+
+JOB_STATUS_CHOICES = [
+    ('PENDENTE', 'Na fila'),
+    ('PROCESSANDO', 'Processando'),
+    ('CONCLUIDO', 'Concluído'),
+    ('ERRO', 'Erro'),
+]
+
+JOB_STATUS_ATIVOS = ('PENDENTE', 'PROCESSANDO')
+
+
+def upload_job_path(instance, filename):
+    # media/relatorios/jobs/<prefeitura_id>/<filename>
+    return f"relatorios/jobs/{instance.prefeitura_id}/{filename}"
+
+
+class RelatorioJob(EscopoPrefeitura, models.Model):
+    """
+    Relatório pesado gerado fora da requisição web.
+
+    A tela grava o pedido (tipo + parâmetros normalizados); o comando
+    `processar_relatorios` calcula e salva o arquivo em MEDIA_ROOT. Pedidos
+    idênticos (mesma `chave`) ainda na fila ou em processamento são
+    reaproveitados em vez de duplicados.
+    """
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.CASCADE, related_name='relatorio_jobs')
+    solicitado_por = models.ForeignKey('usuarios.Usuario', on_delete=models.SET_NULL, null=True, blank=True, related_name='relatorio_jobs')
+    tipo = models.CharField(max_length=20, choices=JOB_TIPO_CHOICES)
+    parametros = models.CharField(max_length=1000, blank=True)  # querystring normalizada
+    chave = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=JOB_STATUS_CHOICES, default='PENDENTE')
+    arquivo = models.FileField(upload_to=upload_job_path, blank=True)
+    erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'relatorios_job'
+        verbose_name = 'Relatório em segundo plano'
+        verbose_name_plural = 'Relatórios em segundo plano'
+        ordering = ['-criado_em']
+        constraints = [
+            # no máximo um pedido ativo por chave (deduplicação)
+            models.UniqueConstraint(
+                fields=['chave'], condition=models.Q(status__in=JOB_STATUS_ATIVOS),
+                name='relatorios_job_chave_ativa_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'criado_em']),
+            models.Index(fields=['prefeitura', 'solicitado_por', 'criado_em']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.pk} ({self.status})"
+
+    @property
+    def ativo(self):
+        return self.status in JOB_STATUS_ATIVOS
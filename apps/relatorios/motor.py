@@ -0,0 +1,69 @@
+# apps/relatorios/motor.py
+"""
+Base comum dos relatórios: cache por versão de dados da prefeitura.
+
+Cada gravação/exclusão nos módulos monitorados (ver signals.py) incrementa a
+versão da prefeitura após o commit. Os relatórios guardam o resultado sob a
+chave (nome, prefeitura, parâmetros, versão), então um resultado em cache
+nunca é servido depois de uma alteração — só expira ou é substituído.
+O cálculo passa por utils.cache.obter_ou_calcular (um recálculo por vez).
+"""
+import datetime
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from utils import cache as cache_compartilhado
+from utils import replica
+
+
+TIMEOUT_PADRAO = 60 * 30
+
+
+def versao_dados(prefeitura_id):
+    return cache_compartilhado.versao(f"relatorios:{prefeitura_id}")
+
+
+def invalidar(prefeitura_id):
+    """Nova versão de dados para a prefeitura (resultados anteriores deixam de valer)."""
+    if not prefeitura_id:
+        return
+    cache_compartilhado.invalidar(f"relatorios:{prefeitura_id}")
+
+
+def em_cache(nome, prefeitura_id, partes, calcular, timeout=TIMEOUT_PADRAO):
+    """Resultado de `calcular()` guardado por (nome, prefeitura, partes, versão)."""
+    chave = ":".join(["relatorios", nome, str(prefeitura_id), str(versao_dados(prefeitura_id))]
+                     + [str(p) for p in partes])
+    if replica.em_uso():
+        # a réplica pode ainda não ter a gravação que gerou esta versão
+        timeout = min(timeout, settings.REPLICA_CACHE_TIMEOUT)
+    return cache_compartilhado.obter_ou_calcular(chave, calcular, timeout)
+
+
+def contar(qs, **filtros):
+    """Várias contagens condicionais em uma única consulta: contar(qs, a=Q(...), b=Q(...))."""
+    return qs.order_by().aggregate(**{nome: Count("id", filter=q) for nome, q in filtros.items()})
+
+
+def parse_data(s):
+    """Data em AAAA-MM-DD ou DD/MM/AAAA (ou None)."""
+    if not s:
+        return None
+    s = s.strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.datetime.strptime(s, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def periodo(params, inicio_padrao):
+    """(d_ini, d_fim) dos parâmetros ?inicio=&fim=; fim padrão = hoje, invertidos se necessário."""
+    d_ini = parse_data(params.get("inicio")) or inicio_padrao
+    d_fim = parse_data(params.get("fim")) or timezone.localdate()
+    if d_ini > d_fim:
+        d_ini, d_fim = d_fim, d_ini
+    return d_ini, d_fim
@@ -0,0 +1,89 @@
+# apps/relatorios/operacional.py
+"""
+Relatório operacional: entradas, saídas e processos ativos por módulo.
+
+- Entradas: criadas no período (criada_em)
+- Saídas: encerradas no período (status de fechamento + atualizada_em;
+  AIF regularizado usa regularizado_em)
+- Ativos: status não-encerrado, criados até o fim do período
+
+Uma consulta por módulo (Count com filter=Q(...)), com cache por versão de
+dados da prefeitura.
+"""
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.autoinfracao.models import AutoInfracao
+from apps.denuncias.models import Denuncia
+from apps.notificacoes.models import Notificacao
+
+from .motor import contar, em_cache, periodo
+
+
+# Conjuntos de status de encerramento por módulo
+DEN_FECHADOS = {"ARQUIVADA", "CANCELADA"}
+NOT_FECHADOS = {"CONCLUIDA", "CANCELADA"}
+AIF_FECHADOS = {"REGULARIZADO", "CONCLUIDO", "CANCELADO"}
+
+
+def _janela(d_ini, d_fim):
+    # início inclusivo, fim exclusivo (+1 dia)
+    dt_ini = timezone.make_aware(datetime.datetime.combine(d_ini, datetime.time.min))
+    dt_fim_ex = timezone.make_aware(datetime.datetime.combine(d_fim, datetime.time.min)) + datetime.timedelta(days=1)
+    return dt_ini, dt_fim_ex
+
+
+def _modulo(model, prefeitura_id, fechados, dt_ini, dt_fim_ex):
+    return contar(
+        model.objects.filter(prefeitura_id=prefeitura_id),
+        entradas=Q(criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex),
+        saidas=Q(status__in=fechados, atualizada_em__gte=dt_ini, atualizada_em__lt=dt_fim_ex),
+        ativos=Q(criada_em__lt=dt_fim_ex) & ~Q(status__in=fechados),
+    )
+
+
+def _aif(prefeitura_id, d_ini, d_fim, dt_ini, dt_fim_ex):
+    r = contar(
+        AutoInfracao.objects.filter(prefeitura_id=prefeitura_id),
+        entradas=Q(criada_em__gte=dt_ini, criada_em__lt=dt_fim_ex),
+        saidas_regularizado=Q(status="REGULARIZADO", regularizado_em__isnull=False,
+                              regularizado_em__date__gte=d_ini, regularizado_em__date__lte=d_fim),
+        saidas_concluido=Q(status="CONCLUIDO", atualizada_em__gte=dt_ini, atualizada_em__lt=dt_fim_ex),
+        saidas_cancelado=Q(status="CANCELADO", atualizada_em__gte=dt_ini, atualizada_em__lt=dt_fim_ex),
+        ativos=Q(criada_em__lt=dt_fim_ex) & ~Q(status__in=AIF_FECHADOS),
+    )
+    r["saidas"] = r["saidas_regularizado"] + r["saidas_concluido"] + r["saidas_cancelado"]
+    return r
+
+
+def calcular(prefeitura_id, d_ini, d_fim):
+    dt_ini, dt_fim_ex = _janela(d_ini, d_fim)
+    return {
+        "periodo": {"inicio": d_ini, "fim": d_fim},
+        "denuncias": _modulo(Denuncia, prefeitura_id, DEN_FECHADOS, dt_ini, dt_fim_ex),
+        "notificacoes": _modulo(Notificacao, prefeitura_id, NOT_FECHADOS, dt_ini, dt_fim_ex),
+        "aif": _aif(prefeitura_id, d_ini, d_fim, dt_ini, dt_fim_ex),
+    }
+
+
+def relatorio(prefeitura_id, d_ini, d_fim):
+    return em_cache(
+        "operacional", prefeitura_id, [d_ini.isoformat(), d_fim.isoformat()],
+        lambda: calcular(prefeitura_id, d_ini, d_fim),
+    )
+
+
+def parametros(params):
+    """(d_ini, d_fim) do GET; padrão: mês corrente."""
+    return periodo(params, timezone.localdate().replace(day=1))
+
+
+def escrever_csv(w, data):
+    d_ini, d_fim = data["periodo"]["inicio"], data["periodo"]["fim"]
+    w.writerow(["Período", d_ini.isoformat(), d_fim.isoformat()])
+    w.writerow([])
+    w.writerow(["Módulo", "Entradas", "Saídas", "Processos Ativos"])
+    for chave, rotulo in (("denuncias", "Denúncias"), ("notificacoes", "Notificações"), ("aif", "Autos de Infração")):
+        w.writerow([rotulo, data[chave]["entradas"], data[chave]["saidas"], data[chave]["ativos"]])
@@ -0,0 +1,130 @@
+# apps/relatorios/prazos.py
+"""
+Envelhecimento (aging) dos prazos de regularização dos casos em aberto.
+
+Mesmas faixas do badge de prazo das listagens (`dias_restantes` /
+`prazo_badge_class`), só que calculadas no banco com CASE sobre a data do
+prazo: uma consulta agrupada por status e outra por fiscal, por módulo.
+O resultado fica em cache por versão de dados da prefeitura e pelo dia
+(as faixas mudam à meia-noite mesmo sem gravações).
+
+Fiscal responsável por módulo (não há um campo único):
+- Auto de Infração: `fiscais` (um auto conta para cada fiscal vinculado)
+- Embargo / Interdição: `fiscais` do auto de infração de origem
+- Notificação: `criado_por` (a notificação não tem fiscais vinculados)
+"""
+import datetime
+
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.utils import timezone
+
+from apps.autoinfracao.models import AutoInfracao, Embargo, Interdicao
+from apps.notificacoes.models import Notificacao
+
+from .motor import em_cache
+from .operacional import AIF_FECHADOS, NOT_FECHADOS
+
+
+MED_FECHADOS = {"REGULARIZADO", "REVOGADO", "ARQUIVADO"}
+
+FAIXAS = [
+    ("VENCIDO", "Vencido"),
+    ("ATE_5", "1 a 5 dias"),
+    ("MAIS_5", "Mais de 5 dias"),
+    ("SEM_PRAZO", "Sem prazo"),
+]
+
+# codigo -> (nome, model, campo do prazo, status encerrados, caminho do fiscal)
+MODULOS = {
+    "NOT": ("Notificações", Notificacao, "prazo_regularizacao", NOT_FECHADOS, "criado_por"),
+    "AIF": ("Autos de Infração", AutoInfracao, "prazo_regularizacao_data", AIF_FECHADOS, "fiscais"),
+    "EMB": ("Embargos", Embargo, "prazo_regularizacao_data", MED_FECHADOS, "auto_infracao__fiscais"),
+    "ITD": ("Interdições", Interdicao, "prazo_regularizacao_data", MED_FECHADOS, "auto_infracao__fiscais"),
+}
+
+
+def faixa(campo, hoje):
+    """CASE do prazo em faixas; vencido inclui o próprio dia (badge vermelho)."""
+    return Case(
+        When(**{f"{campo}__isnull": True}, then=Value("SEM_PRAZO")),
+        When(**{f"{campo}__lte": hoje}, then=Value("VENCIDO")),
+        When(**{f"{campo}__lte": hoje + datetime.timedelta(days=5)}, then=Value("ATE_5")),
+        default=Value("MAIS_5"),
+        output_field=CharField(),
+    )
+
+
+def _contagens():
+    return {codigo: 0 for codigo, _ in FAIXAS} | {"total": 0}
+
+
+def _somar(destino, faixa_codigo, n):
+    destino[faixa_codigo] += n
+    destino["total"] += n
+
+
+def _nome_fiscal(row):
+    nome = " ".join(p for p in (row["f_nome"], row["f_sobrenome"]) if p)
+    return nome or row["f_email"] or "Sem fiscal"
+
+
+def _modulo(codigo, prefeitura_id, hoje):
+    nome, model, campo, fechados, fiscal = MODULOS[codigo]
+    base = (model.objects
+            .filter(prefeitura_id=prefeitura_id)
+            .exclude(status__in=fechados)
+            .annotate(faixa=faixa(campo, hoje))
+            .order_by())
+    rotulos = dict(model._meta.get_field("status").choices)
+
+    total = _contagens()
+    por_status = {}
+    for row in base.values("status", "faixa").annotate(n=Count("pk")):
+        item = por_status.setdefault(row["status"], {
+            "status": row["status"], "status_display": rotulos.get(row["status"], row["status"]), **_contagens(),
+        })
+        _somar(item, row["faixa"], row["n"])
+        _somar(total, row["faixa"], row["n"])
+
+    por_fiscal = {}
+    linhas = (base
+              .annotate(f_id=F(f"{fiscal}__id"), f_nome=F(f"{fiscal}__first_name"),
+                        f_sobrenome=F(f"{fiscal}__last_name"), f_email=F(f"{fiscal}__email"))
+              .values("f_id", "f_nome", "f_sobrenome", "f_email", "faixa")
+              .annotate(n=Count("pk", distinct=True)))
+    for row in linhas:
+        item = por_fiscal.setdefault(row["f_id"], {"id": row["f_id"], "nome": _nome_fiscal(row), **_contagens()})
+        _somar(item, row["faixa"], row["n"])
+
+    return {
+        "codigo": codigo,
+        "nome": nome,
+        "total": total,
+        "por_status": sorted(por_status.values(), key=lambda r: -r["total"]),
+        "por_fiscal": sorted(por_fiscal.values(), key=lambda r: (r["id"] is None, -r["VENCIDO"], -r["total"])),
+    }
+
+
+def calcular(prefeitura_id, hoje=None):
+    hoje = hoje or timezone.localdate()
+    modulos = [_modulo(codigo, prefeitura_id, hoje) for codigo in MODULOS]
+
+    # Consolidado por fiscal (soma dos módulos, sem novas consultas)
+    fiscais = {}
+    for m in modulos:
+        for f in m["por_fiscal"]:
+            item = fiscais.setdefault(f["id"], {"id": f["id"], "nome": f["nome"], **_contagens()})
+            for codigo, _ in FAIXAS:
+                _somar(item, codigo, f[codigo])
+
+    return {
+        "hoje": hoje,
+        "faixas": FAIXAS,
+        "modulos": modulos,
+        "fiscais": sorted(fiscais.values(), key=lambda r: (r["id"] is None, -r["VENCIDO"], -r["total"])),
+    }
+
+
+def relatorio(prefeitura_id):
+    hoje = timezone.localdate()
+    return em_cache("prazos", prefeitura_id, [hoje.isoformat()], lambda: calcular(prefeitura_id, hoje))
@@ -0,0 +1,86 @@
+# apps/relatorios/signals.py
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from .estatisticas import CAMPOS_CHAVE, MODULOS, ajustar, chave
+from .motor import invalidar
+
+_INALTERADO = object()
+
+
+def _chave_atual(instance):
+    return chave(instance.prefeitura_id, instance.criada_em, instance.status)
+
+
+def _on_pre_save(sender, instance, update_fields=None, **kwargs):
+    # Só consulta a chave anterior quando o save pode alterá-la
+    if instance.pk is None:
+        instance._estatistica_anterior = None
+    elif update_fields and not (set(update_fields) & CAMPOS_CHAVE):
+        instance._estatistica_anterior = _INALTERADO
+    else:
+        anterior = (sender._default_manager
+                    .filter(pk=instance.pk)
+                    .values_list("prefeitura_id", "criada_em", "status")
+                    .first())
+        instance._estatistica_anterior = chave(*anterior) if anterior else None
+
+
+def _nova_versao(prefeitura_id):
+    # Após o commit, para um leitor concorrente não gravar resultado antigo na versão nova
+    transaction.on_commit(lambda: invalidar(prefeitura_id))
+
+
+def _on_post_save(sender, instance, created=False, **kwargs):
+    _nova_versao(instance.prefeitura_id)
+    anterior = getattr(instance, "_estatistica_anterior", None)
+    instance._estatistica_anterior = None
+    if anterior is _INALTERADO:
+        return
+    atual = _chave_atual(instance)
+    if anterior == atual:
+        return
+    modulo = _MODULOS[sender]
+    ajustar(modulo, anterior, -1)
+    ajustar(modulo, atual, +1)
+
+
+def _on_delete(sender, instance, **kwargs):
+    _nova_versao(instance.prefeitura_id)
+    ajustar(_MODULOS[sender], _chave_atual(instance), -1)
+
+
+_MODULOS = {}
+for _modulo, _label in MODULOS.items():
+    _model = apps.get_model(*_label)
+    _MODULOS[_model] = _modulo
+    pre_save.connect(_on_pre_save, sender=_model, dispatch_uid=f"relatorios_estat_pre_{_modulo}")
+    post_save.connect(_on_post_save, sender=_model, dispatch_uid=f"relatorios_estat_{_modulo}")
+    post_delete.connect(_on_delete, sender=_model, dispatch_uid=f"relatorios_estat_rm_{_modulo}")
+
+
+# Itens de multa alteram os totais do AIF (relatório de arrecadação)
+def _on_item_multa(sender, instance, **kwargs):
+    if sender.auto_infracao.is_cached(instance):
+        prefeitura_id = instance.auto_infracao.prefeitura_id
+    else:
+        prefeitura_id = (apps.get_model("autoinfracao", "AutoInfracao").objects
+                         .filter(pk=instance.auto_infracao_id)
+                         .values_list("prefeitura_id", flat=True).first())
+    _nova_versao(prefeitura_id)
+
+
+_ItemMulta = apps.get_model("autoinfracao", "AutoInfracaoMultaItem")
+post_save.connect(_on_item_multa, sender=_ItemMulta, dispatch_uid="relatorios_versao_item_multa")
+post_delete.connect(_on_item_multa, sender=_ItemMulta, dispatch_uid="relatorios_versao_item_multa_rm")
+
+
+def _on_fiscais_changed(sender, instance, action, **kwargs):
+    # Relatório de prazos agrupa por fiscal do AIF
+    if action in ("post_add", "post_remove", "post_clear") and hasattr(instance, "prefeitura_id"):
+        _nova_versao(instance.prefeitura_id)
+
+
+m2m_changed.connect(_on_fiscais_changed, sender=apps.get_model("autoinfracao", "AutoInfracao").fiscais.through,
+                    dispatch_uid="relatorios_aif_fiscais")
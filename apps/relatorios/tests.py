@@ -0,0 +1,240 @@
+import datetime
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.autoinfracao.models import AutoInfracao
+from apps.denuncias.models import Denuncia
+from apps.usuarios.models import Usuario
+from utils import cache as cache_compartilhado
+from utils import replica
+from utils.testes import ConsultasTestMixin, criar_prefeitura, criar_usuario, semear
+
+from . import motor, operacional, prazos
+from .estatisticas import reconciliar, resumo_anual
+from .models import EstatisticaDiaria
+
+
+class ConsultasRelatoriosTests(ConsultasTestMixin, TestCase):
+    """Relatórios e mapa com número de consultas fixo, qualquer que seja o volume."""
+
+    def test_api_mapa_processos(self):
+        self.assertConsultasConstantes(lambda casos: reverse("core_api_mapa_processos") + "?bbox=-39,-4,-38,-3",
+                                       limite=7)
+
+    def test_relatorio_operacional(self):
+        self.assertConsultasConstantes(lambda casos: reverse("relatorio_operacional"), limite=8)
+
+    def test_prazos(self):
+        self.assertConsultasConstantes(lambda casos: reverse("relatorios:prazos"), limite=13)
+
+    def test_api_prazos(self):
+        self.assertConsultasConstantes(lambda casos: reverse("relatorios:api_prazos"), limite=13)
+
+    def test_jobs(self):
+        self.assertConsultasConstantes(lambda casos: reverse("relatorios:jobs"), limite=6)
+
+
+class EstatisticaDiariaTests(TestCase):
+    """Os sinais mantêm a estatística igual ao que `reconciliar` recalcula das tabelas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.casos = semear(cls.prefeitura, criar_usuario(cls.prefeitura), 3, filhos=0)
+
+    def _linhas(self):
+        return sorted(EstatisticaDiaria.objects.filter(quantidade__gt=0)
+                      .values_list("prefeitura_id", "modulo", "data", "status", "quantidade"))
+
+    def assertIgualAoReconciliado(self):
+        pelos_sinais = self._linhas()
+        reconciliar()
+        self.assertEqual(pelos_sinais, self._linhas())
+
+    def test_criacao(self):
+        hoje = timezone.localdate()
+        self.assertIn((self.prefeitura.pk, "DEN", hoje, "ABERTA", 3), self._linhas())
+        self.assertIgualAoReconciliado()
+
+    def test_troca_de_status_e_de_data(self):
+        den = self.casos[0]["denuncia"]
+        den.status = "ARQUIVADA"
+        den.save()
+        aif = AutoInfracao.objects.get(pk=self.casos[1]["aif"].pk)
+        aif.criada_em -= datetime.timedelta(days=40)
+        aif.status = "CONCLUIDO"
+        aif.save()
+        self.assertIgualAoReconciliado()
+
+    def test_update_fields_fora_da_chave_nao_consulta(self):
+        den = self.casos[0]["denuncia"]
+        den.descricao_oco = "Nova descrição"
+        with CaptureQueriesContext(connection) as ctx:
+            den.save(update_fields=["descricao_oco"])
+        # o pre_save não relê a chave anterior (prefeitura, criada_em, status)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith('SELECT "denuncias_denuncia"')])
+        self.assertIgualAoReconciliado()
+
+    def test_exclusao(self):
+        self.casos[2]["embargo"].delete()
+        self.casos[2]["interdicao"].delete()
+        self.assertIgualAoReconciliado()
+
+    def test_resumo_anual(self):
+        Denuncia.objects.filter(pk=self.casos[0]["denuncia"].pk).update(status="CANCELADA")
+        reconciliar(prefeitura_id=self.prefeitura.pk)
+        hoje = timezone.localdate()
+        resumo = resumo_anual(self.prefeitura.pk, hoje.year)
+        self.assertEqual(resumo["DEN"]["por_status"], {"ABERTA": 2, "CANCELADA": 1})
+        self.assertEqual(resumo["DEN"]["mensal"][hoje.month - 1], 3)
+        self.assertEqual(resumo["EMB"]["total"], 3)
+        self.assertEqual(resumo_anual(self.prefeitura.pk, hoje.year - 1)["DEN"]["total"], 0)
+
+
+class RoteadorReplicaTests(TestCase):
+    """Roteamento para a réplica e leitura do primário logo após gravar."""
+
+    def setUp(self):
+        configurada = mock.patch("utils.replica.replica_configurada", return_value=True)
+        configurada.start()
+        self.addCleanup(configurada.stop)
+        self.roteador = replica.RoteadorReplica()
+        self.factory = RequestFactory()
+
+    def _request(self, metodo="get", **sessao):
+        request = getattr(self.factory, metodo)("/")
+        request.session = dict(sessao)
+        request.user = AnonymousUser()
+        return request
+
+    def test_db_for_read(self):
+        from django.core.cache.backends.db import Options
+        self.assertIsNone(self.roteador.db_for_read(Denuncia))
+        with replica.usar_replica():
+            self.assertEqual(self.roteador.db_for_read(Denuncia), replica.ALIAS)
+            self.assertEqual(self.roteador.db_for_read(EstatisticaDiaria), replica.ALIAS)
+            # o DatabaseCache consulta o roteador com este "model"
+            entrada_cache = type("CacheEntry", (), {"_meta": Options("django_cache")})
+            for model in (Usuario, entrada_cache):
+                with self.subTest(model=model):
+                    self.assertIsNone(self.roteador.db_for_read(model))
+        self.assertEqual(self.roteador.db_for_write(Denuncia), DEFAULT_DB_ALIAS)
+        self.assertFalse(self.roteador.allow_migrate(replica.ALIAS, "denuncias"))
+        self.assertIsNone(self.roteador.allow_migrate(DEFAULT_DB_ALIAS, "denuncias"))
+
+    def test_le_da_replica_so_em_get_sem_gravacao_recente(self):
+        view = replica.le_da_replica(lambda request: replica.em_uso())
+        self.assertTrue(view(self._request("get")))
+        self.assertTrue(view(self._request("head")))
+        self.assertFalse(view(self._request("post")))
+        self.assertFalse(view(self._request("get", **{replica.CHAVE_SESSAO: time.time() + 10})))
+        self.assertTrue(view(self._request("get", **{replica.CHAVE_SESSAO: time.time() - 1})))
+        self.assertFalse(replica.em_uso())
+
+    def test_middleware_marca_gravacao_de_usuario_logado(self):
+        middleware = replica.ReplicaMiddleware(lambda request: HttpResponse())
+        usuario = Usuario(email="x@teste.gov.br")
+        for metodo, logado, marca in (("post", True, True), ("get", True, False), ("post", False, False)):
+            with self.subTest(metodo=metodo, logado=logado):
+                request = self._request(metodo)
+                request.user = usuario if logado else AnonymousUser()
+                middleware(request)
+                self.assertEqual(replica.CHAVE_SESSAO in request.session, marca)
+                if marca:
+                    self.assertTrue(replica.gravou_recentemente(request))
+
+
+class CacheCompartilhadoTests(TestCase):
+    """obter_ou_calcular (um recálculo por vez) e versões de grupos de chaves."""
+
+    def setUp(self):
+        cache.clear()
+        self.calculos = 0
+
+    def _calcular(self, valor="novo"):
+        def calcular():
+            self.calculos += 1
+            return valor
+        return calcular
+
+    def test_calcula_uma_vez_e_serve_do_cache(self):
+        for _ in range(3):
+            self.assertEqual(cache_compartilhado.obter_ou_calcular("t:a", self._calcular(), 60), "novo")
+        self.assertEqual(self.calculos, 1)
+        self.assertIsNone(cache.get("t:a:trava"))
+
+    def test_valor_vencido_e_recalculado(self):
+        cache.set("t:a", ("velho", 0.01, time.time() - 1), 60)
+        self.assertEqual(cache_compartilhado.obter_ou_calcular("t:a", self._calcular(), 60), "novo")
+        self.assertEqual(self.calculos, 1)
+
+    def test_com_trava_de_outro_serve_o_valor_anterior(self):
+        cache.set("t:a", ("velho", 0.01, time.time() - 1), 60)
+        cache.add("t:a:trava", 1)
+        self.assertEqual(cache_compartilhado.obter_ou_calcular("t:a", self._calcular(), 60), "velho")
+        self.assertEqual(self.calculos, 0)
+
+    def test_com_trava_de_outro_espera_o_resultado(self):
+        cache.add("t:a:trava", 1)
+
+        def outro_processo_gravou(segundos):
+            cache.set("t:a", ("do outro", 0.01, time.time() + 60), 120)
+
+        with mock.patch("utils.cache.time.sleep", side_effect=outro_processo_gravou):
+            valor = cache_compartilhado.obter_ou_calcular("t:a", self._calcular(), 60)
+        self.assertEqual((valor, self.calculos), ("do outro", 0))
+
+    def test_espera_esgotada_calcula(self):
+        cache.add("t:a:trava", 1)
+        with mock.patch("utils.cache.time.sleep"):
+            valor = cache_compartilhado.obter_ou_calcular("t:a", self._calcular(), 60, espera=0)
+        self.assertEqual((valor, self.calculos), ("novo", 1))
+
+    def test_versao_e_invalidar(self):
+        v1 = cache_compartilhado.versao("grupo")
+        self.assertEqual(cache_compartilhado.versao("grupo"), v1)
+        cache_compartilhado.invalidar("grupo")
+        self.assertGreater(cache_compartilhado.versao("grupo"), v1)
+        # invalidar sem a chave no cache (expurgada) recria a versão
+        cache_compartilhado.invalidar("sumiu")
+        self.assertIsNotNone(cache.get("versao:sumiu"))
+
+    def test_relatorio_recalcula_depois_de_invalidar(self):
+        self.assertEqual(motor.em_cache("teste", 1, ["x"], self._calcular("a")), "a")
+        self.assertEqual(motor.em_cache("teste", 1, ["x"], self._calcular("b")), "a")
+        motor.invalidar(2)
+        self.assertEqual(motor.em_cache("teste", 1, ["x"], self._calcular("b")), "a")
+        motor.invalidar(1)
+        self.assertEqual(motor.em_cache("teste", 1, ["x"], self._calcular("b")), "b")
+        self.assertEqual(self.calculos, 2)
+
+
+class StatusEncerradosTests(TestCase):
+    """AIF concluído sai do acervo ativo e do relatório de prazos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        casos = semear(cls.prefeitura, criar_usuario(cls.prefeitura), 3, filhos=0)
+        for caso, status in zip(casos, ("ABERTO", "CONCLUIDO", "CANCELADO")):
+            AutoInfracao.objects.filter(pk=caso["aif"].pk).update(status=status)
+
+    def test_operacional(self):
+        hoje = timezone.localdate()
+        aif = operacional.calcular(self.prefeitura.pk, hoje, hoje)["aif"]
+        self.assertEqual((aif["entradas"], aif["ativos"], aif["saidas"]), (3, 1, 2))
+        self.assertEqual(aif["saidas_concluido"], 1)
+
+    def test_prazos(self):
+        modulos = {m["codigo"]: m for m in prazos.calcular(self.prefeitura.pk)["modulos"]}
+        self.assertEqual(modulos["AIF"]["total"]["total"], 1)
+        self.assertEqual([r["status"] for r in modulos["AIF"]["por_status"]], ["ABERTO"])
@@ -0,0 +1,17 @@
+# apps/relatorios/urls.py
+from django.urls import path
+from . import views
+
+app_name = "relatorios"
+
+urlpatterns = [
+    path("exportar/<str:modulo>/", views.exportar, name="exportar"),
+    # Prazos (aging)
+    path("prazos/", views.prazos_relatorio, name="prazos"),
+    path("api/prazos/", views.api_prazos, name="api_prazos"),
+    # Relatórios em segundo plano
+    path("jobs/", views.jobs_listar, name="jobs"),
+    path("jobs/solicitar/", views.job_solicitar, name="job_solicitar"),
+    path("jobs/<int:pk>/status/", views.job_status, name="job_status"),
+    path("jobs/<int:pk>/download/", views.job_download, name="job_download"),
+]
@@ -0,0 +1,133 @@
+# apps/relatorios/views.py
+import os
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import (
+    FileResponse, Http404, HttpResponseBadRequest, JsonResponse, QueryDict, StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+
+from apps.usuarios.audit import log_event
+from utils.replica import le_da_replica
+
+from . import exportacao, jobs, prazos
+from .models import JOB_TIPO_CHOICES, RelatorioJob
+
+
+@login_required
+@require_GET
+def exportar(request, modulo):
+    """Exporta os registros do módulo com os filtros da listagem (?formato=csv|jsonl)."""
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        return HttpResponseBadRequest("Prefeitura não definida na sessão.")
+    if modulo not in exportacao.MODULOS:
+        raise Http404("Módulo de exportação inexistente.")
+    formato = (request.GET.get("formato") or "csv").lower()
+    if formato not in exportacao.FORMATOS:
+        return HttpResponseBadRequest("Formato inválido (use csv ou jsonl).")
+
+    log_event(request, 'OTHER', recurso=modulo, extra={'exportacao': formato, 'filtros': request.GET.urlencode()})
+    resp = StreamingHttpResponse(
+        exportacao.exportar(modulo, prefeitura_id, request.GET, formato),
+        content_type=exportacao.FORMATOS[formato][0],
+    )
+    resp["Content-Disposition"] = f'attachment; filename="{exportacao.nome_arquivo(modulo, formato)}"'
+    return resp
+
+
+# ---------------------------------------------------------------------
+# Prazos (aging dos casos em aberto)
+# ---------------------------------------------------------------------
+@login_required
+@require_GET
+@le_da_replica
+def prazos_relatorio(request):
+    """Casos em aberto por faixa de prazo, por módulo, status e fiscal."""
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        return HttpResponseBadRequest("Prefeitura não definida na sessão.")
+    return render(request, "relatorios/prazos.html", {"data": prazos.relatorio(prefeitura_id)})
+
+
+@login_required
+@require_GET
+@le_da_replica
+def api_prazos(request):
+    """Mesmos dados do relatório de prazos em JSON (?modulo=NOT|AIF|EMB|ITD para filtrar)."""
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        return HttpResponseBadRequest("Prefeitura não definida na sessão.")
+    data = prazos.relatorio(prefeitura_id)
+    modulo = (request.GET.get("modulo") or "").upper()
+    if modulo and modulo not in prazos.MODULOS:
+        return HttpResponseBadRequest("Módulo inválido.")
+    modulos = [m for m in data["modulos"] if not modulo or m["codigo"] == modulo]
+    return JsonResponse({
+        "hoje": data["hoje"],
+        "faixas": [{"codigo": c, "rotulo": r} for c, r in data["faixas"]],
+        "modulos": modulos,
+        "fiscais": data["fiscais"] if not modulo else modulos[0]["por_fiscal"],
+    })
+
+
+# ---------------------------------------------------------------------
+# Relatórios em segundo plano
+# ---------------------------------------------------------------------
+@login_required
+def jobs_listar(request):
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        messages.error(request, "Prefeitura não definida na sessão.")
+        return redirect("home")
+    jobs = (RelatorioJob.objects
+            .filter(prefeitura_id=prefeitura_id)
+            .select_related("solicitado_por")
+            .order_by("-criado_em")[:50])
+    return render(request, "relatorios/jobs.html", {"jobs": jobs, "destaque": request.GET.get("job")})
+
+
+@login_required
+@require_POST
+def job_solicitar(request):
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        return HttpResponseBadRequest("Prefeitura não definida na sessão.")
+    tipo = (request.POST.get("tipo") or "").upper()
+    if tipo not in dict(JOB_TIPO_CHOICES):
+        return HttpResponseBadRequest("Tipo de relatório inválido.")
+    try:
+        job, criado = jobs.solicitar(prefeitura_id, request.user, tipo, QueryDict(request.POST.get("parametros") or ""))
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    if criado:
+        messages.success(request, f"{job.get_tipo_display()} colocado na fila. O arquivo ficará disponível aqui.")
+    else:
+        messages.info(request, "Um pedido idêntico já está na fila; acompanhe abaixo.")
+    return redirect(f"{reverse('relatorios:jobs')}?job={job.pk}")
+
+
+@login_required
+@require_GET
+def job_status(request, pk):
+    job = get_object_or_404(RelatorioJob.tenant(request), pk=pk)
+    return JsonResponse({
+        "id": job.pk,
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "download": reverse("relatorios:job_download", args=[job.pk]) if job.status == "CONCLUIDO" else None,
+    })
+
+
+@login_required
+@require_GET
+def job_download(request, pk):
+    job = get_object_or_404(RelatorioJob.tenant(request), pk=pk, status="CONCLUIDO")
+    if not job.arquivo:
+        raise Http404("Arquivo indisponível.")
+    log_event(request, 'OTHER', instance=job, recurso='relatorios', extra={'download': job.arquivo.name})
+    return FileResponse(job.arquivo.open("rb"), as_attachment=True, filename=os.path.basename(job.arquivo.name))
@@ -1,7 +1,7 @@
 # apps/usuarios/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Usuario, UsuarioLoginLog, AuditLog
+from .models import Usuario, UsuarioLoginLog, AuditLog, AuditResumoDiario
 from django.utils.translation import gettext_lazy as _
 from .forms import UsuarioCreationForm, UsuarioChangeForm
 
@@ -67,5 +67,18 @@ class AuditLogAdmin(admin.ModelAdmin):
     ordering = ("-criado_em",)
     date_hierarchy = "criado_em"
     readonly_fields = ("usuario", "prefeitura", "acao", "recurso", "app_label", "model", "object_id", "url", "metodo", "ip", "user_agent", "extra", "criado_em")
+    list_select_related = ("usuario", "prefeitura")
+    # Sem COUNT(*) da tabela inteira a cada página (a contagem filtrada continua)
+    show_full_result_count = False
 
     # sem add_fieldsets aqui (não aplicável a AuditLog)
+
+
+@admin.register(AuditResumoDiario)
+class AuditResumoDiarioAdmin(admin.ModelAdmin):
+    list_display = ("data", "acao", "recurso", "usuario", "prefeitura", "quantidade")
+    list_filter = ("acao", "recurso", "prefeitura")
+    search_fields = ("usuario__email", "usuario__first_name", "usuario__last_name")
+    date_hierarchy = "data"
+    list_select_related = ("usuario", "prefeitura")
+    readonly_fields = ("data", "prefeitura", "usuario", "recurso", "acao", "quantidade")
@@ -1,7 +1,16 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
 from django.utils import timezone
-from django.urls import resolve
 
 from apps.usuarios.models import AuditLog
+from utils import metricas
+
+logger = logging.getLogger(__name__)
 
 
 def _get_client_ip(req):
@@ -11,6 +20,101 @@ def _get_client_ip(req):
     return req.META.get('REMOTE_ADDR')
 
 
+class BufferAuditoria:
+    """
+    Fila em memória de eventos de auditoria, gravada com bulk_create.
+
+    A requisição só enfileira o AuditLog (sem INSERT/fsync no caminho da
+    página). Uma thread do processo grava o lote quando a fila atinge
+    `tamanho` ou a cada `intervalo` segundos; o que sobrar é gravado no
+    encerramento do processo (atexit).
+
+    Eventos ainda na fila se perdem se o processo morrer sem encerrar
+    (kill -9); com AUDIT_BUFFER_ATIVO = False cada evento é gravado na hora.
+    """
+
+    def __init__(self, tamanho=100, intervalo=5.0):
+        self.tamanho = tamanho
+        self.intervalo = intervalo
+        self._fila = []
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def adicionar(self, evento):
+        with self._lock:
+            self._fila.append(evento)
+            cheia = len(self._fila) >= self.tamanho
+        self._garantir_thread()
+        if cheia:
+            self._acordar.set()
+
+    def descarregar(self):
+        """Grava tudo o que está na fila (retorna a quantidade gravada)."""
+        with self._lock:
+            lote, self._fila = self._fila, []
+        if not lote:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(lote, batch_size=500)
+        except Exception:
+            logger.exception("Falha ao gravar %d evento(s) de auditoria", len(lote))
+            metricas.contar("sisalv_auditoria_falhas_total", len(lote))
+            return 0
+        metricas.contar("sisalv_auditoria_gravados_total", len(lote))
+        return len(lote)
+
+    @property
+    def pendentes(self):
+        return len(self._fila)
+
+    def _garantir_thread(self):
+        # Também recria a thread após fork (workers do gunicorn com --preload)
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._laco, name="audit-buffer", daemon=True)
+            self._thread.start()
+
+    def _laco(self):
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                self.descarregar()
+            finally:
+                close_old_connections()
+
+
+_buffer = BufferAuditoria(
+    tamanho=getattr(settings, 'AUDIT_BUFFER_TAMANHO', 100),
+    intervalo=getattr(settings, 'AUDIT_BUFFER_INTERVALO', 5.0),
+)
+atexit.register(_buffer.descarregar)
+metricas.medidor("sisalv_auditoria_fila", lambda: _buffer.pendentes)
+
+
+def registrar(**campos):
+    """
+    Grava um AuditLog com os campos informados: enfileirado no buffer
+    (padrão) ou imediatamente se AUDIT_BUFFER_ATIVO = False.
+    """
+    evento = AuditLog(**campos)
+    if getattr(settings, 'AUDIT_BUFFER_ATIVO', True):
+        _buffer.adicionar(evento)
+    else:
+        evento.save()
+
+
+def descarregar():
+    """Força a gravação dos eventos pendentes (ex.: testes, comandos)."""
+    return _buffer.descarregar()
+
+
 def log_event(request, acao: str, instance=None, recurso: str | None = None, extra: dict | None = None):
     """
     Registra um evento de auditoria com precisão do objeto (app/model/pk).
@@ -45,8 +149,8 @@ def log_event(request, acao: str, instance=None, recurso: str | None = None, ext
                         recurso = p
                         break
 
-        AuditLog.objects.create(
-            usuario=user,
+        registrar(
+            usuario_id=user.pk,
             prefeitura_id=request.session.get('prefeitura_id'),
             acao=acao,
             recurso=recurso or '',
@@ -63,4 +167,3 @@ def log_event(request, acao: str, instance=None, recurso: str | None = None, ext
     except Exception:
         # Auditoria nunca deve quebrar o fluxo de negócio
         pass
-
@@ -0,0 +1,97 @@
+# apps/usuarios/auditoria.py
+"""
+Consultas de auditoria para a gestão.
+
+- eventos(): histórico de acessos filtrado por objeto (app_label, model,
+  object_id) e/ou usuário/período, sobre o índice
+  (app_label, model, object_id, criado_em) ou (prefeitura, usuario, ...).
+- atividade_mensal(): eventos por usuário, mês e ação, somando o resumo
+  diário (eventos já arquivados) e o AuditLog (eventos recentes). Os dois
+  conjuntos são disjuntos: arquivar_auditoria remove do AuditLog o que
+  soma no resumo.
+"""
+import datetime
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import AUDIT_ACOES, AuditLog, AuditResumoDiario
+
+# Modelo principal de cada namespace: eventos do AuditMiddleware anteriores à
+# gravação do `model` ficaram com model='' e equivalem a este modelo.
+MODELO_PADRAO = {
+    'denuncias': 'denuncia',
+    'notificacoes': 'notificacao',
+    'autoinfracao': 'autoinfracao',
+}
+
+
+def _inicio_dia(d):
+    return timezone.make_aware(datetime.datetime.combine(d, datetime.time.min))
+
+
+def eventos(prefeitura_id, app_label=None, model=None, object_id=None, usuario_id=None,
+            d_ini=None, d_fim=None, acoes=None):
+    """
+    Queryset de AuditLog com os filtros informados (ordene/pagine por -criado_em, -id).
+
+    object_id só identifica um objeto junto com app_label e model; sem model
+    vale o MODELO_PADRAO do app_label (ValueError se não houver).
+    """
+    qs = AuditLog.objects.filter(prefeitura_id=prefeitura_id)
+    if object_id:
+        model = model or MODELO_PADRAO.get(app_label)
+        if not app_label or not model:
+            raise ValueError("object_id exige app_label e model")
+        q_model = Q(model=model)
+        if MODELO_PADRAO.get(app_label) == model:
+            q_model |= Q(model='')
+        qs = qs.filter(q_model, app_label=app_label, object_id=str(object_id))
+    if usuario_id:
+        qs = qs.filter(usuario_id=usuario_id)
+    if acoes:
+        qs = qs.filter(acao__in=acoes)
+    if d_ini:
+        qs = qs.filter(criado_em__gte=_inicio_dia(d_ini))
+    if d_fim:
+        qs = qs.filter(criado_em__lt=_inicio_dia(d_fim + datetime.timedelta(days=1)))
+    return qs.select_related('usuario')
+
+
+def atividade_mensal(prefeitura_id, d_ini, d_fim, usuario_id=None):
+    """
+    [{mes, usuario_id, usuario, total, por_acao: {acao: n}}] entre d_ini e
+    d_fim (inclusive), em duas consultas agrupadas.
+    """
+    resumo = AuditResumoDiario.objects.filter(prefeitura_id=prefeitura_id, data__gte=d_ini, data__lte=d_fim)
+    recentes = AuditLog.objects.filter(prefeitura_id=prefeitura_id, criado_em__gte=_inicio_dia(d_ini),
+                                       criado_em__lt=_inicio_dia(d_fim + datetime.timedelta(days=1)))
+    if usuario_id:
+        resumo = resumo.filter(usuario_id=usuario_id)
+        recentes = recentes.filter(usuario_id=usuario_id)
+
+    linhas = list(resumo.annotate(mes=TruncMonth('data'))
+                  .values('mes', 'usuario_id', 'usuario__email', 'usuario__first_name', 'usuario__last_name', 'acao')
+                  .annotate(n=Sum('quantidade')).order_by())
+    linhas += list(recentes.annotate(mes=TruncMonth('criado_em'))
+                   .values('mes', 'usuario_id', 'usuario__email', 'usuario__first_name', 'usuario__last_name', 'acao')
+                   .annotate(n=Count('id')).order_by())
+
+    acoes = dict(AUDIT_ACOES)
+    agrupado = {}
+    for r in linhas:
+        mes = r['mes'].date() if isinstance(r['mes'], datetime.datetime) else r['mes']
+        mes = mes.replace(day=1)
+        item = agrupado.setdefault((mes, r['usuario_id']), {
+            'mes': mes,
+            'usuario_id': r['usuario_id'],
+            'usuario': (" ".join(p for p in (r['usuario__first_name'], r['usuario__last_name']) if p)
+                        or r['usuario__email'] or '—'),
+            'total': 0,
+            'por_acao': {},
+        })
+        item['total'] += r['n']
+        rotulo = acoes.get(r['acao'], r['acao'])
+        item['por_acao'][rotulo] = item['por_acao'].get(rotulo, 0) + r['n']
+    return sorted(agrupado.values(), key=lambda i: (i['mes'], -i['total']))
@@ -0,0 +1,37 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.usuarios.models import AuditLog
+from apps.usuarios.retencao import arquivar, pasta_arquivo
+
+
+class Command(BaseCommand):
+    help = ("Retenção do AuditLog: resume por dia, arquiva em JSONL comprimido (MEDIA_ROOT/auditoria) "
+            "e remove os eventos antigos em lotes (agendar diariamente)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=90,
+                            help='Mantém na tabela os eventos dos últimos N dias (padrão: 90)')
+        parser.add_argument('--lote', type=int, default=5000, help='Eventos por transação (padrão: 5000)')
+        parser.add_argument('--sem-arquivo', action='store_true',
+                            help='Não grava os eventos brutos; mantém apenas o resumo diário')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas informa quantos eventos seriam arquivados')
+
+    def handle(self, *args, **options):
+        dias = max(1, options['dias'])
+        # Corte na meia-noite local: o resumo sempre recebe dias completos
+        corte = timezone.localdate() - datetime.timedelta(days=dias)
+        antes_de = timezone.make_aware(datetime.datetime.combine(corte, datetime.time.min))
+
+        if options['dry_run']:
+            n = AuditLog.objects.filter(criado_em__lt=antes_de).count()
+            self.stdout.write(f'{n} evento(s) anteriores a {corte:%d/%m/%Y} seriam arquivados.')
+            return
+
+        total, lotes = arquivar(antes_de, lote=max(1, options['lote']), com_arquivo=not options['sem_arquivo'])
+        destino = 'sem arquivo' if options['sem_arquivo'] else f'arquivo em {pasta_arquivo()}'
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} evento(s) anteriores a {corte:%d/%m/%Y} resumidos e removidos em {lotes} lote(s) ({destino}).'
+        ))
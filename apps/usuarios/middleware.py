@@ -1,15 +1,7 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.utils import timezone
-from django.urls import resolve
 
-from apps.usuarios.models import AuditLog
-
-
-def _get_client_ip(req):
-    xff = req.META.get('HTTP_X_FORWARDED_FOR')
-    if xff:
-        return xff.split(',')[0].strip()
-    return req.META.get('REMOTE_ADDR')
+from apps.usuarios.audit import _get_client_ip, registrar
 
 
 class AuditMiddleware(MiddlewareMixin):
@@ -18,11 +10,32 @@ class AuditMiddleware(MiddlewareMixin):
     - Registra VIEW para GET em rotas dos módulos
     - Classifica PRINT/CREATE/UPDATE/DELETE por heurística no path
     Não afeta performance de forma significativa e ignora arquivos estáticos/mídia/admin.
+    A gravação é enfileirada (apps.usuarios.audit.registrar), sem INSERT na requisição.
     """
 
     AUDIT_PREFIXES = ('/denuncias', '/notificacoes', '/autoinfracao', '/cadastros', '/prefeituras')
     IGNORE_PREFIXES = ('/static/', '/media/', '/admin/', '/__debug__')
 
+    # Objeto pela rota: kwargs específicos, prefixo do nome da URL ou namespace
+    OBJETO_POR_KWARG = {
+        'den_pk': ('denuncias', 'denuncia'),
+        'notif_pk': ('notificacoes', 'notificacao'),
+        'aif_pk': ('autoinfracao', 'autoinfracao'),
+    }
+    MODEL_POR_URL = (('embargo', 'embargo'), ('interdicao', 'interdicao'))
+    MODEL_POR_NAMESPACE = {'denuncias': 'denuncia', 'notificacoes': 'notificacao', 'autoinfracao': 'autoinfracao'}
+
+    def _objeto_da_rota(self, match, key):
+        """(app_label, model) do objeto identificado por `key` nos kwargs da rota."""
+        if key in self.OBJETO_POR_KWARG:
+            return self.OBJETO_POR_KWARG[key]
+        app_label = match.app_name or ''
+        url_name = match.url_name or ''
+        for prefixo, model in self.MODEL_POR_URL:
+            if url_name.startswith(prefixo):
+                return app_label, model
+        return app_label, self.MODEL_POR_NAMESPACE.get(app_label, '')
+
     def process_response(self, request, response):
         try:
             path = request.path or ''
@@ -56,9 +69,10 @@ class AuditMiddleware(MiddlewareMixin):
                 acao = 'DELETE'
 
             try:
-                match = resolve(path)
+                # Rota já resolvida pelo handler (None em 404)
+                match = getattr(request, 'resolver_match', None)
                 app_label = getattr(match, 'app_name', '') or ''
-                view_mod = match.func.__module__ if hasattr(match, 'func') else ''
+                view_mod = match.func.__module__ if match is not None else ''
                 recurso = ''
                 if path.startswith('/denuncias'):
                     recurso = 'denuncias'
@@ -71,10 +85,13 @@ class AuditMiddleware(MiddlewareMixin):
                 elif path.startswith('/prefeituras'):
                     recurso = 'prefeituras'
                 object_id = ''
+                model = ''
                 # Tenta captar PK comum
+                kwargs = match.kwargs if match is not None else {}
                 for key in ('pk', 'id', 'den_pk', 'notif_pk', 'aif_pk'):
-                    if key in match.kwargs:
-                        object_id = str(match.kwargs[key])
+                    if key in kwargs:
+                        object_id = str(kwargs[key])
+                        app_label, model = self._objeto_da_rota(match, key)
                         break
                 extra = None
                 if metodo == 'GET':
@@ -86,13 +103,13 @@ class AuditMiddleware(MiddlewareMixin):
                     if keys:
                         extra = {'post_keys': keys[:50]}
 
-                AuditLog.objects.create(
-                    usuario=user,
+                registrar(
+                    usuario_id=user.pk,
                     prefeitura_id=request.session.get('prefeitura_id'),
                     acao=acao,
                     recurso=recurso,
                     app_label=app_label or view_mod,
-                    model='',
+                    model=model,
                     object_id=object_id,
                     url=path,
                     metodo=metodo,
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('usuarios', '0004_alter_usuariologinlog_options_auditlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditResumoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('recurso', models.CharField(blank=True, max_length=60)),
+                ('acao', models.CharField(choices=[('VIEW', 'Visualizou'), ('CREATE', 'Criou'), ('UPDATE', 'Editou'), ('DELETE', 'Excluiu'), ('PRINT', 'Imprimiu'), ('LINK', 'Vinculou'), ('UNLINK', 'Desvinculou'), ('OTHER', 'Outra Ação')], max_length=12)),
+                ('quantidade', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumo diário de auditoria',
+                'verbose_name_plural': 'Resumos diários de auditoria',
+                'db_table': 'usuarios_audit_resumo_diario',
+                'ordering': ['-data'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['criado_em'], name='usuarios_au_criado__c57b9f_idx'),
+        ),
+        migrations.AddField(
+            model_name='auditresumodiario',
+            name='prefeitura',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audits_resumo', to='prefeituras.prefeitura'),
+        ),
+        migrations.AddField(
+            model_name='auditresumodiario',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audits_resumo', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='auditresumodiario',
+            index=models.Index(fields=['data', 'prefeitura'], name='usuarios_au_data_715f4d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditresumodiario',
+            index=models.Index(fields=['prefeitura', 'usuario', 'data'], name='usuarios_au_prefeit_37b33f_idx'),
+        ),
+    ]
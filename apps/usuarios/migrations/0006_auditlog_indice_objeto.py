@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prefeituras', '0003_alter_prefeitura_latitude_alter_prefeitura_longitude'),
+        ('usuarios', '0005_auditoria_retencao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['app_label', 'model', 'object_id', 'criado_em'], name='usuarios_au_app_lab_cf8f72_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:46
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def juntar_duplicadas(apps, schema_editor):
+    """Soma numa linha só as duplicadas que execuções sobrepostas possam ter criado."""
+    AuditResumoDiario = apps.get_model('usuarios', 'AuditResumoDiario')
+    vistas = {}
+    for r in AuditResumoDiario.objects.order_by('id'):
+        chave = (r.data, r.prefeitura_id, r.usuario_id, r.recurso, r.acao)
+        primeira = vistas.get(chave)
+        if primeira is None:
+            vistas[chave] = r
+            continue
+        primeira.quantidade += r.quantidade
+        primeira.save(update_fields=['quantidade'])
+        r.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prefeituras', '0004_sequencia_protocolo'),
+        ('usuarios', '0006_auditlog_indice_objeto'),
+    ]
+
+    operations = [
+        migrations.RunPython(juntar_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='auditresumodiario',
+            constraint=models.UniqueConstraint(models.F('data'), django.db.models.functions.comparison.Coalesce('prefeitura', 0), django.db.models.functions.comparison.Coalesce('usuario', 0), models.F('recurso'), models.F('acao'), name='usuarios_audit_resumo_uniq'),
+        ),
+    ]
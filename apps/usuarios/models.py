@@ -5,6 +5,7 @@ from utils.choices import TIPO_USUARIO_CHOICES
 from django.utils import timezone
 from django.db import models
 from django.db.models import JSONField
+from django.db.models.functions import Coalesce
 
 
 class UsuarioManager(BaseUserManager):
@@ -137,8 +138,46 @@ class AuditLog(models.Model):
         ordering = ['-criado_em']
         indexes = [
             models.Index(fields=['prefeitura', 'usuario', 'acao', 'criado_em']),
+            # date_hierarchy do admin e retenção (arquivar_auditoria) por período
+            models.Index(fields=['criado_em']),
+            # Histórico de acessos de um objeto (consulta de auditoria)
+            models.Index(fields=['app_label', 'model', 'object_id', 'criado_em']),
         ]
 
     def __str__(self):
         who = self.usuario and (self.usuario.get_full_name() or self.usuario.email) or '—'
         return f"{self.acao} {self.recurso} {self.model}#{self.object_id or '-'} por {who} em {timezone.localtime(self.criado_em).strftime('%d/%m/%Y %H:%M')}"
+
+
+class AuditResumoDiario(models.Model):
+    """
+    Contagem diária de eventos de auditoria já arquivados (ver comando
+    arquivar_auditoria): o AuditLog guarda só o período recente e o
+    histórico fica resumido aqui, com os eventos brutos em JSONL comprimido.
+    """
+    data = models.DateField()
+    prefeitura = models.ForeignKey('prefeituras.Prefeitura', on_delete=models.SET_NULL, null=True, blank=True, related_name='audits_resumo')
+    usuario = models.ForeignKey('usuarios.Usuario', on_delete=models.SET_NULL, null=True, blank=True, related_name='audits_resumo')
+    recurso = models.CharField(max_length=60, blank=True)
+    acao = models.CharField(max_length=12, choices=AUDIT_ACOES)
+    quantidade = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'usuarios_audit_resumo_diario'
+        verbose_name = 'Resumo diário de auditoria'
+        verbose_name_plural = 'Resumos diários de auditoria'
+        ordering = ['-data']
+        indexes = [
+            models.Index(fields=['data', 'prefeitura']),
+            models.Index(fields=['prefeitura', 'usuario', 'data']),
+        ]
+        constraints = [
+            # uma linha por chave; Coalesce porque NULL não colide num UNIQUE comum
+            models.UniqueConstraint(
+                'data', Coalesce('prefeitura', 0), Coalesce('usuario', 0), 'recurso', 'acao',
+                name='usuarios_audit_resumo_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.data:%d/%m/%Y} {self.acao} {self.recurso}: {self.quantidade}"
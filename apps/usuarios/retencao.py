@@ -0,0 +1,96 @@
+# apps/usuarios/retencao.py
+"""
+Retenção do AuditLog.
+
+Eventos anteriores ao corte saem da tabela em lotes. Cada lote, em uma
+transação:
+1. soma as contagens em AuditResumoDiario (dia, prefeitura, usuário,
+   recurso, ação);
+2. acrescenta as linhas brutas em MEDIA_ROOT/auditoria/AAAA-MM.jsonl.gz
+   (gzip em modo append: vários membros, lido normalmente por gzip/zcat);
+3. apaga o lote.
+
+Se o processo cair entre gravar o arquivo e o commit, o lote volta a ser
+processado e pode aparecer duas vezes no arquivo; o resumo e a tabela
+ficam sempre consistentes entre si.
+"""
+import gzip
+import json
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AuditLog, AuditResumoDiario
+
+CAMPOS = ('id', 'criado_em', 'usuario_id', 'prefeitura_id', 'acao', 'recurso', 'app_label', 'model',
+          'object_id', 'url', 'metodo', 'ip', 'user_agent', 'extra')
+
+
+def pasta_arquivo():
+    return Path(settings.MEDIA_ROOT) / 'auditoria'
+
+
+def _somar_resumo(contagens):
+    """
+    Soma `contagens` {(data, prefeitura_id, usuario_id, recurso, acao): n} no resumo diário.
+
+    Incremento no próprio UPDATE (F) e INSERT só quando a linha não existe:
+    duas execuções sobrepostas de `arquivar` não perdem contagem nem duplicam
+    a linha (a UniqueConstraint barra o segundo INSERT).
+    """
+    for (data, prefeitura_id, usuario_id, recurso, acao), n in contagens.items():
+        qs = AuditResumoDiario.objects.filter(data=data, prefeitura_id=prefeitura_id, usuario_id=usuario_id,
+                                              recurso=recurso, acao=acao)
+        if qs.update(quantidade=F('quantidade') + n):
+            continue
+        try:
+            with transaction.atomic():
+                AuditResumoDiario.objects.create(data=data, prefeitura_id=prefeitura_id, usuario_id=usuario_id,
+                                                 recurso=recurso, acao=acao, quantidade=n)
+        except IntegrityError:
+            # outra execução criou a linha entre o UPDATE e o INSERT
+            qs.update(quantidade=F('quantidade') + n)
+
+
+def _gravar_arquivo(linhas, pasta):
+    por_mes = {}
+    for row in linhas:
+        por_mes.setdefault(timezone.localtime(row['criado_em']).strftime('%Y-%m'), []).append(row)
+    pasta.mkdir(parents=True, exist_ok=True)
+    for mes, rows in por_mes.items():
+        with gzip.open(pasta / f'{mes}.jsonl.gz', 'at', encoding='utf-8') as fh:
+            for row in rows:
+                fh.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+
+
+def arquivar(antes_de, lote=5000, com_arquivo=True, pasta=None):
+    """
+    Resume, arquiva e remove os eventos com criado_em < `antes_de`.
+    Retorna (eventos removidos, lotes processados).
+    """
+    pasta = pasta or pasta_arquivo()
+    total = lotes = 0
+    while True:
+        with transaction.atomic():
+            linhas = list(AuditLog.objects
+                          .filter(criado_em__lt=antes_de)
+                          .order_by('id')
+                          .values(*CAMPOS)[:lote])
+            if not linhas:
+                break
+            contagens = Counter(
+                (timezone.localtime(r['criado_em']).date(), r['prefeitura_id'], r['usuario_id'], r['recurso'], r['acao'])
+                for r in linhas
+            )
+            _somar_resumo(contagens)
+            if com_arquivo:
+                _gravar_arquivo(linhas, pasta)
+            AuditLog.objects.filter(id__in=[r['id'] for r in linhas]).delete()
+        total += len(linhas)
+        lotes += 1
+    return total, lotes
@@ -1,3 +1,127 @@
+import datetime
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from utils.testes import ConsultasTestMixin, criar_prefeitura, criar_usuario
+
+from . import auditoria
+from .models import AuditLog, AuditResumoDiario
+from .retencao import _somar_resumo, arquivar
+
+
+class ConsultasPainelTests(ConsultasTestMixin, TestCase):
+    """Painel inicial com número de consultas fixo."""
+
+    def test_home(self):
+        self.assertConsultasConstantes(lambda casos: reverse("home"), limite=6)
+
+
+class RetencaoAuditoriaTests(TestCase):
+    """Resumo diário do AuditLog arquivado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.usuario = criar_usuario(cls.prefeitura)
+        cls.quando = timezone.now() - datetime.timedelta(days=400)
+        cls.dia = timezone.localtime(cls.quando).date()
+
+    def _eventos(self, n, usuario=True):
+        AuditLog.objects.bulk_create([
+            AuditLog(usuario=self.usuario if usuario else None, prefeitura=self.prefeitura, acao="VIEW",
+                     recurso="denuncias", url="/", metodo="GET", criado_em=self.quando)
+            for _ in range(n)
+        ])
+
+    def _arquivar(self):
+        return arquivar(timezone.now() - datetime.timedelta(days=365), com_arquivo=False)
+
+    def test_execucoes_seguidas_somam_na_mesma_linha(self):
+        self._eventos(3)
+        self._eventos(2, usuario=False)
+        self.assertEqual(self._arquivar(), (5, 1))
+        self._eventos(4)
+        self._eventos(1, usuario=False)
+        self._arquivar()
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertEqual(
+            dict(AuditResumoDiario.objects.values_list("usuario_id", "quantidade")),
+            {self.usuario.pk: 7, None: 3})
+
+    def test_unique_barra_linha_duplicada_mesmo_com_usuario_nulo(self):
+        campos = dict(data=self.dia, prefeitura=self.prefeitura, usuario=None, recurso="denuncias", acao="VIEW")
+        AuditResumoDiario.objects.create(quantidade=1, **campos)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AuditResumoDiario.objects.create(quantidade=1, **campos)
+
+    def test_insert_concorrente_vira_incremento(self):
+        AuditResumoDiario.objects.create(data=self.dia, prefeitura=self.prefeitura, usuario=self.usuario,
+                                         recurso="denuncias", acao="VIEW", quantidade=5)
+        update = QuerySet.update
+        chamadas = []
+
+        def update_atrasado(qs, **campos):
+            # 1º UPDATE não acha a linha: outra execução a inseriu logo depois
+            chamadas.append(campos)
+            return 0 if len(chamadas) == 1 else update(qs, **campos)
+
+        with mock.patch.object(QuerySet, "update", update_atrasado):
+            _somar_resumo({(self.dia, self.prefeitura.pk, self.usuario.pk, "denuncias", "VIEW"): 2})
+        self.assertEqual(len(chamadas), 2)
+        self.assertEqual(AuditResumoDiario.objects.get().quantidade, 7)
+
+
+class EventosObjetoTests(TestCase):
+    """Histórico de um objeto não mistura modelos do mesmo app_label."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.usuario = criar_usuario(cls.prefeitura)
+        for model in ("autoinfracao", "", "embargo", "interdicao"):
+            AuditLog.objects.create(prefeitura=cls.prefeitura, usuario=cls.usuario, app_label="autoinfracao",
+                                    model=model, object_id="7", url="/", metodo="GET")
+
+    def _modelos(self, **filtros):
+        return sorted(auditoria.eventos(self.prefeitura.pk, object_id=7, **filtros).values_list("model", flat=True))
+
+    def test_filtra_pelo_modelo(self):
+        self.assertEqual(self._modelos(app_label="autoinfracao", model="embargo"), ["embargo"])
+        self.assertEqual(self._modelos(app_label="autoinfracao", model="autoinfracao"), ["", "autoinfracao"])
+
+    def test_sem_model_usa_o_modelo_padrao(self):
+        self.assertEqual(self._modelos(app_label="autoinfracao"), ["", "autoinfracao"])
+
+    def test_sem_modelo_identificavel(self):
+        with self.assertRaises(ValueError):
+            self._modelos(app_label="cadastros")
+        with self.assertRaises(ValueError):
+            self._modelos(model="embargo")
+
+    def test_api_exige_modelo(self):
+        self.client.force_login(self.usuario)
+        sessao = self.client.session
+        sessao["prefeitura_id"] = self.prefeitura.pk
+        sessao.save()
+        url = reverse("usuarios:api_auditoria_eventos")
+        self.assertEqual(self.client.get(url, {"object_id": 7}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"app_label": "cadastros", "object_id": 7}).status_code, 400)
+        resposta = self.client.get(url, {"app_label": "autoinfracao", "model": "interdicao", "object_id": 7})
+        self.assertEqual([e["model"] for e in resposta.json()["eventos"]], ["interdicao"])
+        # sem model: modelo padrão do app, incluindo os eventos antigos com model=''
+        resposta = self.client.get(url, {"app_label": "autoinfracao", "object_id": 7})
+        self.assertEqual(sorted(e["model"] for e in resposta.json()["eventos"]), ["", "autoinfracao"])
 
-# Create your tests here.
+    def test_tela_sem_modelo_avisa_e_ignora_o_id(self):
+        self.client.force_login(self.usuario)
+        sessao = self.client.session
+        sessao["prefeitura_id"] = self.prefeitura.pk
+        sessao.save()
+        resposta = self.client.get(reverse("usuarios:auditoria"), {"app_label": "cadastros", "object_id": 7})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.context["page_obj"].object_list), 4)
@@ -1,6 +1,7 @@
 # apps/usuarios/urls.py
 from django.urls import path
 from django.contrib.auth import views as auth_views
+from . import views
 
 app_name = "usuarios"
 
@@ -13,4 +14,8 @@ urlpatterns = [
         ),
         name="password_reset",
     ),
+    # Consulta de auditoria (gestão)
+    path("auditoria/", views.auditoria_view, name="auditoria"),
+    path("auditoria/api/eventos/", views.api_auditoria_eventos, name="api_auditoria_eventos"),
+    path("auditoria/api/atividade/", views.api_auditoria_atividade, name="api_auditoria_atividade"),
 ]
@@ -1,17 +1,22 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from apps.prefeituras.models import Prefeitura  # evitar import circular
-from apps.usuarios.models import UsuarioLoginLog
+from apps.prefeituras import tenant
+from apps.usuarios.models import AUDIT_ACOES, Usuario, UsuarioLoginLog
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import HttpResponseBadRequest, JsonResponse
 import re
+from datetime import timedelta
 from django.utils import timezone
-from datetime import datetime
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
 from apps.denuncias.models import Denuncia
 from apps.notificacoes.models import Notificacao
-from apps.autoinfracao.models import AutoInfracao, Embargo, Interdicao
+from apps.autoinfracao.models import AutoInfracao, Embargo
+from apps.relatorios.estatisticas import resumo_anual
+from apps.relatorios.motor import em_cache, periodo
+from apps.usuarios import auditoria
+from utils.paginacao import KeysetPaginator
+from utils.replica import le_da_replica
 
 def login_view(request):
     # Já autenticado? Mantém seu comportamento
@@ -120,108 +125,62 @@ def logout_view(request):
 
 
 @login_required
+@le_da_replica
 def home_view(request):
-    pref_id = request.session.get("prefeitura_id")
-
-    # Fallback: se a sessão não tem prefeitura, tenta puxar do usuário logado
-    if not pref_id:
-        user_pref_id = getattr(request.user, "prefeitura_id", None)
-        if user_pref_id:
-            try:
-                prefeitura = Prefeitura.objects.get(id=user_pref_id, ativo=True)
-                request.session["prefeitura_id"] = prefeitura.id
-            except Prefeitura.DoesNotExist:
-                messages.error(request, "Sua prefeitura está inativa ou indisponível.")
-                logout(request)
-                request.session.flush()
-                return redirect("login")
+    prefeitura = request.prefeitura
+    if prefeitura is None:
+        if request.session.get("prefeitura_id"):
+            erro = "Prefeitura da sessão inválida ou inativa."
+        elif not getattr(request.user, "prefeitura_id", None):
+            erro = "Seu usuário não possui prefeitura vinculada."
         else:
-            messages.error(request, "Seu usuário não possui prefeitura vinculada.")
-            logout(request)
-            request.session.flush()
-            return redirect("login")
-    else:
-        try:
-            prefeitura = Prefeitura.objects.get(id=pref_id, ativo=True)
-        except Prefeitura.DoesNotExist:
-            messages.error(request, "Prefeitura da sessão inválida ou inativa.")
+            # Fallback: sessão sem prefeitura, usa a do usuário logado
+            prefeitura = tenant.obter(request.user.prefeitura_id)
+            erro = None if prefeitura else "Sua prefeitura está inativa ou indisponível."
+        if erro:
+            messages.error(request, erro)
             logout(request)
             request.session.flush()
             return redirect("login")
+        request.session["prefeitura_id"] = prefeitura.id
 
-    # Dashboard: contagens do ano corrente (ou ano do GET)
-    tz = timezone.get_current_timezone()
+    # Dashboard: contagens do ano corrente (ou ano do GET), lidas da
+    # estatística diária (apps.relatorios) em uma única consulta
     try:
         ano = int(request.GET.get("ano", timezone.localdate().year))
     except Exception:
         ano = timezone.localdate().year
-    dt_ini = datetime(ano, 1, 1, tzinfo=tz)
-    dt_fim = datetime(ano + 1, 1, 1, tzinfo=tz)
+    resumo = em_cache("resumo_anual", prefeitura.id, [ano], lambda: resumo_anual(prefeitura.id, ano),
+                      timeout=60 * 5)
 
-    def _counts_by_status(qs, field="status"):
-        counts = {r["status"]: r["c"] for r in qs.values("status").annotate(c=Count("id"))}
-        total = qs.count()
-        # choices para rótulos legíveis
-        try:
-            choices = dict(qs.model._meta.get_field(field).choices)
-        except Exception:
-            choices = {}
-        items = []
-        for code, label in choices.items():
-            items.append({"code": code, "label": label, "count": counts.get(code, 0)})
+    def _stats(modulos, choices):
+        counts = {}
+        mensal = [0] * 12
+        total = 0
+        for mod in modulos:
+            r = resumo[mod]
+            for code, c in r["por_status"].items():
+                counts[code] = counts.get(code, 0) + c
+            mensal = [a + b for a, b in zip(mensal, r["mensal"])]
+            total += r["total"]
+        items = [{"code": code, "label": label, "count": counts.get(code, 0)} for code, label in choices.items()]
         # adiciona quaisquer status não mapeados em choices
         for code, c in counts.items():
             if code not in choices:
                 items.append({"code": code, "label": code, "count": c})
-        return {"total": total, "por_status": items}
-
-    def _counts_by_month(qs, dt_field="criada_em"):
-        results = (
-            qs.annotate(m=TruncMonth(dt_field))
-              .values("m")
-              .annotate(c=Count("id"))
-              .order_by("m")
-        )
-        by_month = { (r["m"].month if hasattr(r["m"], "month") else r["m"]) : r["c"] for r in results }
-        return [by_month.get(m, 0) for m in range(1,13)]
-
-    den_qs = Denuncia.objects.filter(prefeitura_id=prefeitura.id, criada_em__gte=dt_ini, criada_em__lt=dt_fim)
-    not_qs = Notificacao.objects.filter(prefeitura_id=prefeitura.id, criada_em__gte=dt_ini, criada_em__lt=dt_fim)
-    aif_qs = AutoInfracao.objects.filter(prefeitura_id=prefeitura.id, criada_em__gte=dt_ini, criada_em__lt=dt_fim)
-
-    stats_den = _counts_by_status(den_qs)
-    stats_den["mensal"] = _counts_by_month(den_qs)
-    stats_not = _counts_by_status(not_qs)
-    stats_not["mensal"] = _counts_by_month(not_qs)
-    stats_aif = _counts_by_status(aif_qs)
-    stats_aif["mensal"] = _counts_by_month(aif_qs)
-
-    # Embargos / Interdições — estatística combinada por status
-    emb_qs = Embargo.objects.filter(prefeitura_id=prefeitura.id, criada_em__gte=dt_ini, criada_em__lt=dt_fim)
-    itd_qs = Interdicao.objects.filter(prefeitura_id=prefeitura.id, criada_em__gte=dt_ini, criada_em__lt=dt_fim)
-    # Contagens por status separadas
-    emb_counts = {r["status"]: r["c"] for r in emb_qs.values("status").annotate(c=Count("id"))}
-    itd_counts = {r["status"]: r["c"] for r in itd_qs.values("status").annotate(c=Count("id"))}
-    # Choices de status (usa Embargo como referência)
-    medida_choices = dict(Embargo._meta.get_field("status").choices)
-    medidas_items = []
-    total_medidas = emb_qs.count() + itd_qs.count()
-    for code, label in medida_choices.items():
-        c = emb_counts.get(code, 0) + itd_counts.get(code, 0)
-        medidas_items.append({"code": code, "label": label, "count": c})
-    # Adiciona quaisquer códigos fora dos choices (resiliência)
-    for src in (emb_counts, itd_counts):
-        for code, c in src.items():
-            if code not in medida_choices:
-                medidas_items.append({"code": code, "label": code, "count": c})
-    # Série mensal combinada (Embargo + Interdição)
-    emb_m = _counts_by_month(emb_qs)
-    itd_m = _counts_by_month(itd_qs)
-    med_m = [(emb_m[i] if i < len(emb_m) else 0) + (itd_m[i] if i < len(itd_m) else 0) for i in range(12)]
-
-    stats_medidas = {"total": total_medidas, "por_status": medidas_items, "mensal": med_m}
-
-    stats = { "ano": ano, "denuncias": stats_den, "notificacoes": stats_not, "aif": stats_aif, "medidas": stats_medidas }
+        return {"total": total, "por_status": items, "mensal": mensal}
+
+    def _choices(model):
+        return dict(model._meta.get_field("status").choices)
+
+    stats = {
+        "ano": ano,
+        "denuncias": _stats(["DEN"], _choices(Denuncia)),
+        "notificacoes": _stats(["NOT"], _choices(Notificacao)),
+        "aif": _stats(["AIF"], _choices(AutoInfracao)),
+        # Embargos / Interdições — estatística combinada (choices do Embargo como referência)
+        "medidas": _stats(["EMB", "ITD"], _choices(Embargo)),
+    }
 
     # Opções de ano (atual e 5 anteriores)
     years = list(range(timezone.localdate().year, timezone.localdate().year - 6, -1))
@@ -232,3 +191,117 @@ def home_view(request):
         "stats": stats,
         "years": years,
     })
+
+
+# ---------------------------------------------------------------------
+# Consulta de auditoria (gestão)
+# ---------------------------------------------------------------------
+def _pode_auditar(user):
+    return user.is_authenticated and (user.is_staff or getattr(user, "tipo", "") == "ADMIN")
+
+
+def _filtros_auditoria(request):
+    """Filtros comuns da tela e das APIs de auditoria (GET)."""
+    g = request.GET
+    hoje = timezone.localdate()
+    d_ini, d_fim = periodo(g, (hoje.replace(day=1) - timedelta(days=150)).replace(day=1))
+    try:
+        usuario_id = int(g.get("usuario") or 0) or None
+    except ValueError:
+        usuario_id = None
+    acoes = [a for a in g.getlist("acao") if a in dict(AUDIT_ACOES)]
+    return {
+        "app_label": (g.get("app_label") or "").strip(),
+        "model": (g.get("model") or "").strip().lower(),
+        "object_id": (g.get("object_id") or "").strip(),
+        "usuario_id": usuario_id,
+        "d_ini": d_ini,
+        "d_fim": d_fim,
+        "acoes": acoes,
+    }
+
+
+def _eventos_pagina(request, prefeitura_id, f):
+    qs = auditoria.eventos(prefeitura_id, f["app_label"], f["model"], f["object_id"], f["usuario_id"],
+                           f["d_ini"], f["d_fim"], f["acoes"])
+    return KeysetPaginator(qs, 50, ordenacao=("-criado_em", "-id")).get_page(request.GET.get("cursor"))
+
+
+@login_required
+@user_passes_test(_pode_auditar)
+def auditoria_view(request):
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        messages.error(request, "Prefeitura não definida na sessão.")
+        return redirect("home")
+    f = _filtros_auditoria(request)
+    try:
+        page_obj = _eventos_pagina(request, prefeitura_id, f)
+    except ValueError:
+        # object_id sem modelo identificável (eventos() usa o MODELO_PADRAO do app_label)
+        messages.error(request, "Informe o módulo e o tipo do registro junto com o ID.")
+        f["object_id"] = ""
+        page_obj = _eventos_pagina(request, prefeitura_id, f)
+    atividade = auditoria.atividade_mensal(prefeitura_id, f["d_ini"], f["d_fim"], f["usuario_id"])
+    maior = max((a["total"] for a in atividade), default=0)
+    for a in atividade:
+        a["pct"] = round(100 * a["total"] / maior) if maior else 0
+
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    return render(request, "usuarios/auditoria.html", {
+        "filtros": f,
+        "page_obj": page_obj,
+        "atividade": atividade,
+        "usuarios": Usuario.objects.filter(prefeitura_id=prefeitura_id).order_by("first_name", "email"),
+        "acoes_choices": AUDIT_ACOES,
+        "querystring": params.urlencode(),
+    })
+
+
+@login_required
+@user_passes_test(_pode_auditar)
+def api_auditoria_eventos(request):
+    """Histórico de acessos (?app_label=&model=&object_id= e/ou ?usuario=&inicio=&fim=&acao=)."""
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        return HttpResponseBadRequest("Prefeitura não definida na sessão.")
+    f = _filtros_auditoria(request)
+    if f["object_id"] and not f["app_label"]:
+        return HttpResponseBadRequest("Informe app_label junto com object_id.")
+    try:
+        page = _eventos_pagina(request, prefeitura_id, f)
+    except ValueError:
+        return HttpResponseBadRequest("Informe model junto com object_id para este app_label.")
+    return JsonResponse({
+        "eventos": [{
+            "id": e.pk,
+            "criado_em": e.criado_em,
+            "usuario_id": e.usuario_id,
+            "usuario": str(e.usuario) if e.usuario_id else None,
+            "acao": e.acao,
+            "acao_display": e.get_acao_display(),
+            "recurso": e.recurso,
+            "app_label": e.app_label,
+            "model": e.model,
+            "object_id": e.object_id,
+            "url": e.url,
+            "ip": e.ip,
+        } for e in page],
+        "proximo": page.next_cursor if page.has_next else None,
+    })
+
+
+@login_required
+@user_passes_test(_pode_auditar)
+def api_auditoria_atividade(request):
+    """Eventos por usuário, mês e ação no período (?usuario=&inicio=&fim=)."""
+    prefeitura_id = request.prefeitura_id
+    if not prefeitura_id:
+        return HttpResponseBadRequest("Prefeitura não definida na sessão.")
+    f = _filtros_auditoria(request)
+    return JsonResponse({
+        "inicio": f["d_ini"],
+        "fim": f["d_fim"],
+        "atividade": auditoria.atividade_mensal(prefeitura_id, f["d_ini"], f["d_fim"], f["usuario_id"]),
+    })
@@ -55,6 +55,9 @@ INSTALLED_APPS = [
     'apps.autoinfracao',
     'apps.cadastros',
     'apps.processos',
+    'apps.busca',
+    'apps.relatorios',
+    'apps.monitoramento',
 ]
 
 AUTH_USER_MODEL = 'usuarios.Usuario'
@@ -62,14 +65,19 @@ AUTH_USER_MODEL = 'usuarios.Usuario'
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.monitoramento.metricas.MetricasMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.monitoramento.middleware.InstrumentacaoSQLMiddleware',
+    'apps.monitoramento.perfil.PerfilMiddleware',
+    'apps.prefeituras.tenant.PrefeituraMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'apps.usuarios.middleware.AuditMiddleware',
+    'utils.replica.ReplicaMiddleware',
 ]
 
 # Proxy/ngrok: respeita X-Forwarded-Proto/Host
@@ -100,13 +108,50 @@ WSGI_APPLICATION = 'sisalvweb.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite ajustado para várias requisições simultâneas (ver utils/sqlite.py):
+# PRAGMAs aplicados a cada conexão nova e transações IMMEDIATE.
+# SQLITE_AJUSTES=0 volta ao comportamento padrão do Django.
+SQLITE_AJUSTES = os.environ.get('SQLITE_AJUSTES', '1') == '1'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '20000')),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_MB', '128')) * 1024 * 1024,
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_MB', '32')) * 1024,  # negativo = KiB
+    'temp_store': 'MEMORY',
+} if SQLITE_AJUSTES else {}
+SQLITE_OPTIONS = {
+    'transaction_mode': 'IMMEDIATE',
+    # espera pelo lock (segundos) do driver sqlite3, igual ao busy_timeout
+    'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '20000')) / 1000,
+} if SQLITE_AJUSTES else {}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': dict(SQLITE_OPTIONS),
     }
 }
 
+# Réplica de leitura opcional (utils/replica.py): relatórios, mapa, painel e
+# listagens leem dela; gravações sempre no default. DB_REPLICA_SQLITE aponta
+# para uma cópia do banco (para testar o roteamento sem PostgreSQL).
+if os.environ.get('DB_REPLICA_SQLITE'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['DB_REPLICA_SQLITE'],
+        # só leitura: sem transaction_mode IMMEDIATE
+        'OPTIONS': {k: v for k, v in SQLITE_OPTIONS.items() if k != 'transaction_mode'},
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['utils.replica.RoteadorReplica']
+# Segundos em que a sessão que gravou algo volta a ler do primário
+REPLICA_ATRASO_MAX = int(os.environ.get('REPLICA_ATRASO_MAX', '10'))
+# Teto do cache (segundos) para relatórios calculados na réplica, que podem
+# refletir dados de antes da última versão
+REPLICA_CACHE_TIMEOUT = int(os.environ.get('REPLICA_CACHE_TIMEOUT', '60'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -154,6 +199,99 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# `manage.py test` aplica os ajustes de sisalvweb.settings_test (cache local,
+# auditoria síncrona, métricas só em memória, log de SQL só com erros).
+TEST_RUNNER = 'utils.testes.ExecutorTestes'
+
+# Cache compartilhado entre os processos/workers (utils/cache.py). CACHE_BACKEND:
+#   arquivo   (padrão) pasta CACHE_DIR, sem serviço extra
+#   banco     tabela no próprio banco (rode `manage.py createcachetable`)
+#   redis     CACHE_URL=redis://127.0.0.1:6379/1 (requer o pacote redis)
+#   memcached CACHE_URL=127.0.0.1:11211 (requer o pacote pymemcache)
+#   local     memória do processo (não compartilha; usado nos testes)
+_CACHES = {
+    'arquivo': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache')),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'banco': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'sisalv_cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_URL', 'redis://127.0.0.1:6379/1'),
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.environ.get('CACHE_URL', '127.0.0.1:11211'),
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'arquivo')
+CACHES = {'default': dict(_CACHES[CACHE_BACKEND], KEY_PREFIX='sisalv')}
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "home"
 LOGOUT_REDIRECT_URL = "login"
+
+# Auditoria (apps.usuarios.audit): eventos enfileirados e gravados em lote.
+# AUDIT_BUFFER=0 volta à gravação síncrona (um INSERT por evento); nos testes
+# a gravação é sempre síncrona (sisalvweb.settings_test).
+AUDIT_BUFFER_ATIVO = os.environ.get('AUDIT_BUFFER', '1') == '1'
+AUDIT_BUFFER_TAMANHO = int(os.environ.get('AUDIT_BUFFER_TAMANHO', '100'))
+AUDIT_BUFFER_INTERVALO = float(os.environ.get('AUDIT_BUFFER_INTERVALO', '5'))
+
+# Instrumentação de consultas SQL (apps.monitoramento.middleware): com
+# SQL_INSTRUMENTACAO=1 mede toda requisição; sem ela, só as de usuários staff
+# com o cabeçalho "X-Instrumentar-SQL: 1". Quem passa do orçamento da view
+# (nome da rota; "padrao" para as demais) é gravado em RequisicaoLenta.
+SQL_INSTRUMENTACAO = os.environ.get('SQL_INSTRUMENTACAO', '0') == '1'
+SQL_ORCAMENTOS = {
+    'padrao': {'consultas': int(os.environ.get('SQL_ORCAMENTO_CONSULTAS', '60')),
+               'sql_ms': int(os.environ.get('SQL_ORCAMENTO_MS', '500'))},
+    'home': {'consultas': 40},
+    'core_api_mapa_processos': {'consultas': 20},
+    'denuncias:detalhe': {'consultas': 40},
+    'autoinfracao:detalhe': {'consultas': 40},
+    'autoinfracao:imprimir': {'consultas': 40},
+}
+
+# Perfil sob demanda (apps.monitoramento.perfil): superusuário acrescenta
+# ?_perfil=1 (cProfile) ou ?_perfil=pyinstrument à URL; o resultado fica em
+# Admin -> Monitoramento -> Perfis de requisição. PERFIL_SOB_DEMANDA=0 desliga.
+# Os arquivos ficam em PERFIS_DIR, fora do MEDIA_ROOT (não são servidos em
+# /media/): só se baixam pelo admin, por superusuário.
+PERFIL_SOB_DEMANDA = os.environ.get('PERFIL_SOB_DEMANDA', '1') == '1'
+PERFIS_DIR = os.environ.get('PERFIS_DIR', str(BASE_DIR / 'privado' / 'perfis'))
+
+# Métricas do Prometheus em /metrics (utils.metricas): cada processo grava
+# um retrato em METRICAS_DIR e o /metrics soma todos (os de processos
+# encerrados vão para encerrados.json). A pasta é a mesma para todos os
+# workers. Acesso
+# com METRICAS_TOKEN (Bearer) ou, sem token, só dos IPs de METRICAS_IPS.
+METRICAS_ATIVAS = os.environ.get('METRICAS', '1') == '1'
+METRICAS_DIR = os.environ.get('METRICAS_DIR', str(BASE_DIR / '.cache' / 'metricas'))
+METRICAS_INTERVALO = float(os.environ.get('METRICAS_INTERVALO', '5'))
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+METRICAS_IPS = [ip for ip in os.environ.get('METRICAS_IPS', '127.0.0.1,::1').split(',') if ip]
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # uma linha por requisição medida; WARNING só para quem estoura o orçamento
+        'sisalvweb.sql': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_LOG_NIVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,70 @@
+"""
+Perfil de produção: tudo de settings.py, com banco e segurança vindos do
+ambiente (ou de um arquivo .env na raiz do projeto).
+
+Uso:
+    DJANGO_SETTINGS_MODULE=sisalvweb.settings_producao gunicorn sisalvweb.wsgi
+    python manage.py migrate --settings=sisalvweb.settings_producao
+
+Variáveis:
+    DATABASE_URL        obrigatória (ex.: postgres://sisalv:senha@db:5432/sisalv)
+    DB_POOL             1 (padrão) = pool de conexões do psycopg 3 (só PostgreSQL)
+    DB_POOL_MIN/MAX     tamanho do pool por processo (padrão 2/10)
+    DB_CONN_MAX_AGE     conexões persistentes, em segundos, quando sem pool (padrão 600)
+    SQLITE_AJUSTES      com DATABASE_URL=sqlite:///...: 1 (padrão) = WAL, busy_timeout etc.
+    DATABASE_REPLICA_URL opcional: réplica de leitura (relatórios, mapa, painel, listagens)
+    SECRET_KEY, ALLOWED_HOSTS, CSRF_TRUSTED_ORIGINS, DEBUG (padrão 0)
+
+Ver docs/producao_postgres.md (Postgres local em Docker e benchmark).
+"""
+import os
+from pathlib import Path
+
+import dj_database_url
+from dotenv import load_dotenv
+
+# antes do import de settings.py: ele lê CACHE_BACKEND, SQL_*, METRICAS_*,
+# REPLICA_* etc. no import, e o .env precisa já estar no ambiente
+load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import SQLITE_OPTIONS  # noqa: E402
+
+DEBUG = os.environ.get("DEBUG", "0") == "1"
+
+SECRET_KEY = os.environ["SECRET_KEY"]
+ALLOWED_HOSTS = [h for h in os.environ.get("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",") if h]
+CSRF_TRUSTED_ORIGINS = [o for o in os.environ.get("CSRF_TRUSTED_ORIGINS", "").split(",") if o]
+
+# Banco de dados
+def _banco(url):
+    db = dj_database_url.parse(url)
+    if db["ENGINE"] == "django.db.backends.postgresql" and os.environ.get("DB_POOL", "1") == "1":
+        # Pool do psycopg 3 (Django 5.1+): a requisição pega uma conexão pronta do
+        # pool em vez de abrir uma nova. Não combina com CONN_MAX_AGE (fica 0).
+        db["CONN_MAX_AGE"] = 0
+        db.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX", "10")),
+            "timeout": int(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        }
+    elif db["ENGINE"] == "django.db.backends.sqlite3":
+        # SQLite em produção (municípios pequenos): mesmos ajustes de settings.py
+        db["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+        db.setdefault("OPTIONS", {}).update(SQLITE_OPTIONS)
+    else:
+        # Conexão persistente por thread, verificada antes de reutilizar
+        db["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+        db["CONN_HEALTH_CHECKS"] = True
+    return db
+
+
+DATABASES = {"default": _banco(os.environ["DATABASE_URL"])}
+if os.environ.get("DATABASE_REPLICA_URL"):
+    # Réplica de leitura (standby) para relatórios e listagens: utils/replica.py
+    DATABASES["replica"] = _banco(os.environ["DATABASE_REPLICA_URL"])
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+# HTTPS atrás do proxy (SECURE_PROXY_SSL_HEADER já vem de settings.py)
+SESSION_COOKIE_SECURE = os.environ.get("COOKIES_SEGUROS", "1") == "1"
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
@@ -0,0 +1,31 @@
+"""
+Perfil de testes: tudo de settings.py, com cache em memória, auditoria
+gravada na hora (sem o buffer), métricas sem retratos em disco e o log de
+SQL/perfil (sisalvweb.sql) só com erros.
+
+`manage.py test` já aplica AJUSTES_TESTES por cima das configurações em uso
+(TEST_RUNNER = utils.testes.ExecutorTestes), com qualquer --settings. Para
+outros executores (ex.: pytest-django):
+    DJANGO_SETTINGS_MODULE=sisalvweb.settings_test pytest
+"""
+import copy
+
+from .settings import *  # noqa: F401,F403
+from .settings import _CACHES, LOGGING as _LOGGING
+
+AJUSTES_TESTES = {
+    'CACHES': {'default': dict(_CACHES['local'], KEY_PREFIX='sisalv')},
+    'AUDIT_BUFFER_ATIVO': False,
+    'METRICAS_DIR': '',
+}
+
+CACHES = AJUSTES_TESTES['CACHES']
+AUDIT_BUFFER_ATIVO = AJUSTES_TESTES['AUDIT_BUFFER_ATIVO']
+METRICAS_DIR = AJUSTES_TESTES['METRICAS_DIR']
+
+# LOGGING não muda com override_settings: o ExecutorTestes ajusta os níveis
+NIVEIS_LOG_TESTES = {'sisalvweb.sql': 'ERROR'}
+
+LOGGING = copy.deepcopy(_LOGGING)
+for _nome, _nivel in NIVEIS_LOG_TESTES.items():
+    LOGGING['loggers'][_nome]['level'] = _nivel
@@ -3,6 +3,7 @@ from django.urls import path, include
 from apps.usuarios.views import login_view, logout_view, home_view
 from django.conf import settings
 from sisalvweb import core_views
+from apps.monitoramento.metricas import metrics_view
 from django.conf.urls.static import static
 
 urlpatterns = [
@@ -17,11 +18,18 @@ urlpatterns = [
 
     path("notificacoes/", include("apps.notificacoes.urls", namespace="notificacoes")),
     path("autoinfracao/", include(("apps.autoinfracao.urls", "autoinfracao"), namespace="autoinfracao")),
+    # Busca textual (Denúncias, Notificações, AIFs)
+    path("busca/", include(("apps.busca.urls", "busca"), namespace="busca")),
     # Mapa
     path("mapa/", core_views.mapa_view, name="core_mapa"),
     path("api/mapa/processos/", core_views.api_mapa_processos, name="core_api_mapa_processos"),
+    # Protocolos (typeahead)
+    path("api/protocolos/", core_views.api_protocolos, name="core_api_protocolos"),
     # Relatórios
     path("relatorios/operacional/", core_views.relatorio_operacional, name="relatorio_operacional"),
+    path("relatorios/", include(("apps.relatorios.urls", "relatorios"), namespace="relatorios")),
+    # Métricas (Prometheus)
+    path("metrics", metrics_view, name="metrics"),
     
     ]
 
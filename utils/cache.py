@@ -0,0 +1,102 @@
+"""
+Cache compartilhado com proteção contra estouro de recálculo (stampede).
+
+    valor = obter_ou_calcular("mapa:...", lambda: montar(), 60)
+
+- Single-flight: quando o valor falta ou vence, só quem consegue a trava
+  (cache.add, atômico no Redis/memcached/banco) recalcula. Os demais servem
+  o valor anterior, se houver, ou esperam até ESPERA_MAXIMA segundos pelo
+  resultado antes de calcular por conta própria.
+- Renovação antecipada probabilística (XFetch): perto do vencimento cada
+  leitura tem uma chance crescente — proporcional ao tempo que o cálculo
+  levou — de renovar o valor antes de ele vencer, então os acessos
+  simultâneos raramente encontram o valor vencido.
+
+O valor fica no backend pelo dobro do timeout: depois do vencimento ainda
+serve de resposta enquanto um único processo recalcula.
+
+No backend "arquivo" (padrão, ver settings.CACHES) o cache.add não é
+atômico entre processos: a trava reduz, mas não elimina, cálculos repetidos.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from utils import metricas
+
+ESPERA_MAXIMA = 5.0
+INTERVALO_ESPERA = 0.05
+TIMEOUT_TRAVA = 60
+BETA = 1.0
+
+
+def _grupo(chave):
+    # rótulo da métrica: "mapa:12:..." -> "mapa", "relatorios:prazos:12:..." -> "relatorios:prazos"
+    partes = chave.split(":")
+    return ":".join(partes[:2] if len(partes) > 1 and not partes[1].isdigit() else partes[:1])
+
+
+def _calcular_e_gravar(chave, calcular, timeout):
+    t0 = time.time()
+    valor = calcular()
+    agora = time.time()
+    cache.set(chave, (valor, agora - t0, agora + timeout), timeout * 2)
+    metricas.observar("sisalv_cache_calculo_seconds", agora - t0, grupo=_grupo(chave))
+    return valor
+
+
+def obter_ou_calcular(chave, calcular, timeout, beta=BETA, espera=ESPERA_MAXIMA):
+    """Valor em cache de `chave` ou o resultado de `calcular()` (guardado por `timeout` segundos)."""
+    item = cache.get(chave)
+    if item is not None:
+        valor, duracao, expira = item
+        # XFetch: -log(rand) >= 0, então quanto maior a duração do cálculo e
+        # mais perto do vencimento, maior a chance de renovar agora
+        if time.time() - duracao * beta * math.log(random.random() or 1e-12) < expira:
+            metricas.contar("sisalv_cache_total", grupo=_grupo(chave), resultado="hit")
+            return valor
+
+    trava = f"{chave}:trava"
+    if cache.add(trava, 1, TIMEOUT_TRAVA):
+        metricas.contar("sisalv_cache_total", grupo=_grupo(chave), resultado="miss")
+        try:
+            return _calcular_e_gravar(chave, calcular, timeout)
+        finally:
+            cache.delete(trava)
+
+    # outro processo está recalculando
+    if item is not None:
+        metricas.contar("sisalv_cache_total", grupo=_grupo(chave), resultado="obsoleto")
+        return item[0]
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        time.sleep(INTERVALO_ESPERA)
+        item = cache.get(chave)
+        if item is not None:
+            metricas.contar("sisalv_cache_total", grupo=_grupo(chave), resultado="espera")
+            return item[0]
+    metricas.contar("sisalv_cache_total", grupo=_grupo(chave), resultado="miss")
+    return _calcular_e_gravar(chave, calcular, timeout)
+
+
+def versao(nome):
+    """Versão atual de um grupo de chaves (ex.: catálogos); entra na chave do cache."""
+    chave = f"versao:{nome}"
+    atual = cache.get(chave)
+    if atual is None:
+        # inicia pelo relógio: se a chave sumir do cache (expurgo do backend),
+        # a nova versão não repete uma antiga
+        cache.add(chave, int(time.time() * 1000), None)
+        atual = cache.get(chave)
+    return atual
+
+
+def invalidar(nome):
+    """Nova versão do grupo: as chaves anteriores deixam de ser lidas."""
+    chave = f"versao:{nome}"
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.add(chave, int(time.time() * 1000), None)
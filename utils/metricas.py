@@ -0,0 +1,291 @@
+"""
+Métricas no formato texto do Prometheus, somadas entre processos.
+
+    metricas.contar("sisalv_cache_total", grupo="mapa", resultado="hit")
+    metricas.observar("sisalv_http_request_duration_seconds", 0.12, view="home", metodo="GET")
+    metricas.medidor("sisalv_auditoria_fila", lambda: len(fila))
+
+Cada processo acumula em memória (sem I/O no caminho da requisição) e grava
+um retrato em METRICAS_DIR/<pid>.json no máximo a cada METRICAS_INTERVALO
+segundos e no encerramento. O /metrics (apps.monitoramento.metricas) soma os
+retratos da pasta: contadores e histogramas de todos os arquivos, medidores
+só dos processos vivos. O retrato de um processo encerrado é somado em
+encerrados.json e apagado: o que um worker reciclado contou continua
+valendo, sem um arquivo por pid acumulando na pasta. Sem METRICAS_DIR, só o
+processo que atende o /metrics aparece.
+
+Toda métrica é declarada em METRICAS, com tipo, ajuda e (histogramas) os
+limites dos buckets.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+ENCERRADOS = "encerrados.json"
+TRAVA = ".trava"
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICAS = {
+    "sisalv_http_request_duration_seconds": (
+        "histogram", "Duração das requisições por nome de rota.", BUCKETS_SEGUNDOS),
+    "sisalv_http_requests_total": ("counter", "Requisições por nome de rota, método e status.", None),
+    "sisalv_db_queries_total": ("counter", "Consultas SQL executadas, por nome de rota.", None),
+    "sisalv_db_query_seconds_total": ("counter", "Tempo total em consultas SQL, por nome de rota.", None),
+    "sisalv_cache_total": (
+        "counter", "Leituras do cache compartilhado por grupo de chave e resultado "
+                   "(hit, miss, obsoleto, espera).", None),
+    "sisalv_cache_calculo_seconds": (
+        "histogram", "Tempo de cálculo dos valores do cache compartilhado.", BUCKETS_SEGUNDOS),
+    "sisalv_foto_processamento_seconds": (
+        "histogram", "Tempo para otimizar uma foto enviada, por módulo.", BUCKETS_SEGUNDOS),
+    "sisalv_foto_bytes_recebidos_total": ("counter", "Bytes das fotos como enviadas, por módulo.", None),
+    "sisalv_foto_bytes_economizados_total": ("counter", "Bytes a menos após otimizar as fotos, por módulo.", None),
+    "sisalv_auditoria_fila": ("gauge", "Eventos de auditoria na fila, ainda não gravados.", None),
+    "sisalv_auditoria_gravados_total": ("counter", "Eventos de auditoria gravados pelo buffer.", None),
+    "sisalv_auditoria_falhas_total": ("counter", "Eventos de auditoria perdidos por falha na gravação.", None),
+}
+
+_lock = threading.Lock()
+_contadores = {}   # (nome, rótulos) -> valor
+_histogramas = {}  # (nome, rótulos) -> [contagem por bucket..., +Inf, soma]
+_medidores = {}    # (nome, rótulos) -> função lida a cada retrato
+_estado = {"pid": None, "gravado_em": 0.0}
+
+
+def _rotulos(rotulos):
+    return tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+def _processo_atual():
+    # depois de um fork (gunicorn --preload) o filho começa do zero: o que o
+    # pai contou está no retrato do pai
+    pid = os.getpid()
+    if _estado["pid"] != pid:
+        if _estado["pid"] is None:
+            atexit.register(gravar)
+        _contadores.clear()
+        _histogramas.clear()
+        _estado.update(pid=pid, gravado_em=time.monotonic())
+
+
+def contar(nome, valor=1, **rotulos):
+    with _lock:
+        _processo_atual()
+        chave = (nome, _rotulos(rotulos))
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+
+def observar(nome, valor, **rotulos):
+    limites = METRICAS[nome][2]
+    with _lock:
+        _processo_atual()
+        chave = (nome, _rotulos(rotulos))
+        serie = _histogramas.get(chave)
+        if serie is None:
+            serie = _histogramas[chave] = [0] * (len(limites) + 1) + [0.0]
+        for i, limite in enumerate(limites):
+            if valor <= limite:
+                serie[i] += 1
+                break
+        else:
+            serie[len(limites)] += 1
+        serie[-1] += valor
+
+
+def medidor(nome, funcao, **rotulos):
+    """Registra uma função cujo valor atual entra em cada retrato (ex.: tamanho de uma fila)."""
+    with _lock:
+        _medidores[(nome, _rotulos(rotulos))] = funcao
+
+
+def foto_processada(modulo, segundos, bytes_recebidos, bytes_gravados):
+    observar("sisalv_foto_processamento_seconds", segundos, modulo=modulo)
+    contar("sisalv_foto_bytes_recebidos_total", bytes_recebidos, modulo=modulo)
+    contar("sisalv_foto_bytes_economizados_total", max(0, bytes_recebidos - bytes_gravados), modulo=modulo)
+
+
+def retrato():
+    """Estado deste processo, no formato gravado em METRICAS_DIR."""
+    with _lock:
+        _processo_atual()
+        contadores = [[n, dict(r), v] for (n, r), v in _contadores.items()]
+        histogramas = [[n, dict(r), list(s)] for (n, r), s in _histogramas.items()]
+        medidores = list(_medidores.items())
+    valores = []
+    for (nome, rotulos), funcao in medidores:
+        try:
+            valores.append([nome, dict(rotulos), float(funcao())])
+        except Exception:
+            pass
+    return {"pid": os.getpid(), "contadores": contadores, "histogramas": histogramas, "medidores": valores}
+
+
+def _pasta():
+    pasta = getattr(settings, "METRICAS_DIR", "")
+    return Path(pasta) if pasta else None
+
+
+def gravar():
+    """Grava o retrato deste processo em METRICAS_DIR (troca atômica do arquivo)."""
+    pasta = _pasta()
+    if pasta is None:
+        return
+    dados = retrato()
+    try:
+        pasta.mkdir(parents=True, exist_ok=True)
+        temporario = pasta / f".{dados['pid']}.tmp"
+        temporario.write_text(json.dumps(dados), encoding="utf-8")
+        os.replace(temporario, pasta / f"{dados['pid']}.json")
+    except OSError:
+        return
+    _estado["gravado_em"] = time.monotonic()
+
+
+def gravar_se_preciso():
+    if time.monotonic() - _estado["gravado_em"] >= getattr(settings, "METRICAS_INTERVALO", 5):
+        gravar()
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _obter_trava(caminho, espera, validade):
+    limite = time.monotonic() + espera
+    while True:
+        try:
+            os.close(os.open(caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                # trava de um processo que morreu no meio
+                if time.time() - caminho.stat().st_mtime > validade:
+                    caminho.unlink()
+                    continue
+            except OSError:
+                continue
+        except OSError:
+            return False
+        if time.monotonic() >= limite:
+            return False
+        time.sleep(0.01)
+
+
+@contextmanager
+def _trava(pasta, espera=1.0, validade=30.0):
+    """Exclusão entre processos para juntar os retratos (True se obteve a trava em `espera` segundos)."""
+    caminho = pasta / TRAVA
+    obtida = _obter_trava(caminho, espera, validade)
+    try:
+        yield obtida
+    finally:
+        if obtida:
+            caminho.unlink(missing_ok=True)
+
+
+def _ler(pasta):
+    arquivos = []
+    for arquivo in sorted(pasta.glob("*.json")):
+        try:
+            arquivos.append((arquivo, json.loads(arquivo.read_text(encoding="utf-8"))))
+        except (OSError, ValueError):
+            continue
+    return arquivos
+
+
+def _recolher_encerrados(pasta, arquivos):
+    """Soma os retratos de processos mortos em ENCERRADOS e apaga os arquivos deles."""
+    mortos = [(a, d) for a, d in arquivos if a.name != ENCERRADOS and not _vivo(d.get("pid") or 0)]
+    if not mortos:
+        return arquivos
+    anterior = [d for a, d in arquivos if a.name == ENCERRADOS]
+    contadores, histogramas, _ = _somar(anterior + [d for _, d in mortos])
+    dados = {"pid": None, "medidores": [],
+             "contadores": [[n, dict(r), v] for (n, r), v in contadores.items()],
+             "histogramas": [[n, dict(r), s] for (n, r), s in histogramas.items()]}
+    try:
+        temporario = pasta / f".{ENCERRADOS}.tmp"
+        temporario.write_text(json.dumps(dados), encoding="utf-8")
+        os.replace(temporario, pasta / ENCERRADOS)
+        for arquivo, _ in mortos:
+            arquivo.unlink(missing_ok=True)
+    except OSError:
+        return arquivos
+    apagados = {a for a, _ in mortos}
+    return [(a, d) for a, d in arquivos if a.name != ENCERRADOS and a not in apagados] + \
+        [(pasta / ENCERRADOS, dados)]
+
+
+def _retratos():
+    pasta = _pasta()
+    if pasta is None:
+        return [retrato()]
+    gravar()
+    with _trava(pasta) as obtida:
+        arquivos = _ler(pasta)
+        if obtida:
+            arquivos = _recolher_encerrados(pasta, arquivos)
+    return [dados for _, dados in arquivos]
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _serie(nome, rotulos, valor):
+    texto = ",".join(f'{k}="{_escapar(v)}"' for k, v in rotulos)
+    return f"{nome}{{{texto}}} {float(valor)!r}" if texto else f"{nome} {float(valor)!r}"
+
+
+def _somar(retratos):
+    """(contadores, histogramas, medidores) somados; medidores só dos processos vivos."""
+    contadores, histogramas, medidores = {}, {}, {}
+    for dados in retratos:
+        for nome, rotulos, valor in dados.get("contadores", []):
+            chave = (nome, _rotulos(rotulos))
+            contadores[chave] = contadores.get(chave, 0) + valor
+        for nome, rotulos, serie in dados.get("histogramas", []):
+            chave = (nome, _rotulos(rotulos))
+            atual = histogramas.get(chave)
+            histogramas[chave] = serie if atual is None else [a + b for a, b in zip(atual, serie)]
+        if dados.get("pid") and _vivo(dados["pid"]):
+            for nome, rotulos, valor in dados.get("medidores", []):
+                chave = (nome, _rotulos(rotulos))
+                medidores[chave] = medidores.get(chave, 0) + valor
+    return contadores, histogramas, medidores
+
+
+def exposicao():
+    """Texto do /metrics: soma dos retratos de todos os processos."""
+    contadores, histogramas, medidores = _somar(_retratos())
+
+    linhas = []
+    for nome, (tipo, ajuda, limites) in METRICAS.items():
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+        if tipo == "histogram":
+            for (n, rotulos), serie in sorted(histogramas.items()):
+                if n != nome:
+                    continue
+                acumulado = 0
+                for limite, quantidade in zip(list(limites) + ["+Inf"], serie[:-1]):
+                    acumulado += quantidade
+                    linhas.append(_serie(f"{nome}_bucket", rotulos + (("le", str(limite)),), acumulado))
+                linhas.append(_serie(f"{nome}_sum", rotulos, serie[-1]))
+                linhas.append(_serie(f"{nome}_count", rotulos, acumulado))
+        else:
+            series = contadores if tipo == "counter" else medidores
+            linhas += [_serie(nome, rotulos, valor) for (n, rotulos), valor in sorted(series.items()) if n == nome]
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,217 @@
+"""
+Paginação por cursor (keyset) para as listagens.
+
+Em vez de OFFSET + COUNT(*), cada página é buscada com um filtro "depois da
+última chave vista" sobre a ordenação (ex.: criada_em desc, id desc), de modo
+que a página N custa o mesmo que a página 1 — desde que exista índice
+compatível com a ordenação.
+
+Uso:
+    pag = KeysetPaginator(qs, 20, ordenacao=("-criada_em", "-id"))
+    page_obj = pag.get_page(request.GET.get("cursor"))
+
+`page_obj` é iterável e expõe has_next/has_previous, next_cursor/previous_cursor
+e (opcional) total/total_aproximado.
+
+Também aceita uma lista de querysets de modelos diferentes (ex.: Embargo +
+Interdição) desde que todos tenham os campos/anotações da ordenação; o
+desempate entre fontes deve fazer parte da ordenação (ex.: anotação `_fonte`).
+
+`prazo_ordem` é a expressão da ordenação por prazo das Notificações e dos
+AIFs, usada tanto na anotação da listagem quanto no índice funcional.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import DateField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+
+def prazo_ordem(campo):
+    """
+    Prazo para ordenação "vencidos primeiro, sem prazo por último".
+    Literal em SQL (não parâmetro) para casar com o índice funcional.
+    """
+    return Coalesce(campo, RawSQL("'9999-12-31'", []), output_field=DateField())
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _codificar(direcao, chave):
+    bruto = json.dumps({"d": direcao, "k": [_serializar(v) for v in chave]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def _decodificar(cursor):
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(cursor + pad).decode())
+        return dados["d"], dados["k"]
+    except Exception as exc:
+        raise CursorInvalido(str(exc)) from exc
+
+
+def contar_aproximado(qs, limite=1000):
+    """
+    Contagem barata para exibição: (total, aproximado?).
+
+    PostgreSQL: estimativa do planner (EXPLAIN), sem varrer a tabela.
+    Outros bancos: COUNT limitado a `limite`+1 linhas; acima disso devolve
+    (limite, True) para exibir "mais de N".
+    """
+    if connection.vendor == "postgresql":
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cur:
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plano = cur.fetchone()[0]
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        return int(plano[0]["Plan"]["Plan Rows"]), True
+    n = qs.order_by()[: limite + 1].count()
+    if n > limite:
+        return limite, True
+    return n, False
+
+
+class PaginaKeyset:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total=None, total_aproximado=False):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+        self.total_aproximado = total_aproximado
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, i):
+        return self.object_list[i]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page=20, ordenacao=("-criada_em", "-id"), contagem=None, limite_contagem=1000):
+        """
+        queryset: QuerySet ou lista/tupla de QuerySets (fontes mescladas).
+        ordenacao: campos (ou anotações) com "-" para decrescente; o último
+                   deve ser único (ex.: "-id") para a chave ser total.
+        contagem: None (não conta), "exata" ou "aproximada".
+        """
+        self.fontes = list(queryset) if isinstance(queryset, (list, tuple)) else [queryset]
+        self.per_page = int(per_page)
+        self.ordenacao = [(c.lstrip("-"), c.startswith("-")) for c in ordenacao]
+        self.contagem = contagem
+        self.limite_contagem = limite_contagem
+
+    # ---- chave / filtros
+    def _campo_saida(self, qs, nome):
+        anot = qs.query.annotations.get(nome)
+        if anot is not None:
+            return anot.output_field
+        if nome == "pk":
+            return qs.model._meta.pk
+        return qs.model._meta.get_field(nome)
+
+    def _chave(self, obj):
+        return [getattr(obj, nome) for nome, _ in self.ordenacao]
+
+    def _converter(self, qs, valores):
+        if len(valores) != len(self.ordenacao):
+            raise CursorInvalido("chave com tamanho inesperado")
+        try:
+            return [
+                self._campo_saida(qs, nome).to_python(v) if v is not None else None
+                for (nome, _), v in zip(self.ordenacao, valores)
+            ]
+        except Exception as exc:
+            raise CursorInvalido(str(exc)) from exc
+
+    def _q_apos(self, chave, invertido=False):
+        """Q de "vem depois de `chave`" na ordenação (ou antes, se invertido)."""
+        q = Q()
+        iguais = {}
+        for (nome, desc), valor in zip(self.ordenacao, chave):
+            para_tras = desc != invertido
+            q |= Q(**iguais, **{f"{nome}__{'lt' if para_tras else 'gt'}": valor})
+            iguais[nome] = valor
+        return q
+
+    def _order_by(self, invertido=False):
+        return [("-" if desc != invertido else "") + nome for nome, desc in self.ordenacao]
+
+    def _ordenar_memoria(self, itens, invertido=False):
+        # ordenação estável de trás pra frente para suportar direções mistas
+        for nome, desc in reversed(self.ordenacao):
+            itens.sort(key=lambda o: getattr(o, nome), reverse=(desc != invertido))
+        return itens
+
+    def _buscar(self, chave_bruta, invertido):
+        itens = []
+        for qs in self.fontes:
+            sub = qs
+            if chave_bruta is not None:
+                sub = sub.filter(self._q_apos(self._converter(qs, chave_bruta), invertido))
+            itens.extend(sub.order_by(*self._order_by(invertido))[: self.per_page + 1])
+        if len(self.fontes) > 1:
+            self._ordenar_memoria(itens, invertido)
+        return itens[: self.per_page + 1]
+
+    # ---- API
+    def get_page(self, cursor=None):
+        direcao, chave = "n", None
+        if cursor:
+            try:
+                direcao, chave = _decodificar(cursor)
+                self._converter(self.fontes[0], chave)
+            except CursorInvalido:
+                direcao, chave = "n", None
+
+        if direcao == "p" and chave is not None:
+            itens = self._buscar(chave, invertido=True)
+            tem_mais_antes = len(itens) > self.per_page
+            itens = list(reversed(itens[: self.per_page]))
+            anterior = _codificar("p", self._chave(itens[0])) if (itens and tem_mais_antes) else None
+            proximo = _codificar("n", self._chave(itens[-1])) if itens else None
+        else:
+            itens = self._buscar(chave, invertido=False)
+            tem_mais = len(itens) > self.per_page
+            itens = itens[: self.per_page]
+            proximo = _codificar("n", self._chave(itens[-1])) if (itens and tem_mais) else None
+            anterior = _codificar("p", self._chave(itens[0])) if (itens and chave is not None) else None
+
+        total, aprox = None, False
+        if self.contagem == "exata":
+            total = sum(qs.count() for qs in self.fontes)
+        elif self.contagem == "aproximada":
+            for qs in self.fontes:
+                n, a = contar_aproximado(qs, self.limite_contagem)
+                total = (total or 0) + n
+                aprox = aprox or a
+        return PaginaKeyset(itens, proximo, anterior, total, aprox)
@@ -1,5 +1,7 @@
 # utils/protocolo.py
 import re
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.utils import timezone
 
 def _digits_only(texto: str) -> str:
@@ -8,14 +10,18 @@ def _digits_only(texto: str) -> str:
 def _alnum_upper(texto: str) -> str:
     return re.sub(r"[^0-9A-Za-z]+", "", (texto or "")).upper()
 
-def gerar_protocolo(codigo_ibge: str, sigla: str, matricula: str | None = None) -> str:
+def gerar_protocolo(codigo_ibge: str, sigla: str, matricula: str | None = None,
+                    sequencial: int | None = None, momento=None) -> str:
     """
     Formato:
-      IBGE-SIGLA-AAAAMMDDhhmmss[-MATRICULA]
+      IBGE-SIGLA-AAAAMMDDhhmmss-SSSSS[-MATRICULA]
 
     Regras:
     - IBGE: apenas dígitos
     - SIGLA: maiúscula (ex.: DEN, NOT, INF...)
+    - SSSSS: sequencial da prefeitura/sigla/ano (ver alocar_sequencia); é o
+      que garante a unicidade quando dois protocolos caem no mesmo segundo.
+      Sem `sequencial` sai o formato antigo, sem essa parte.
     - MATRÍCULA: opcional; se informada, vai ao final.
     """
     ibge = _digits_only(codigo_ibge)
@@ -26,28 +32,100 @@ def gerar_protocolo(codigo_ibge: str, sigla: str, matricula: str | None = None)
     if not sigla_up:
         raise ValueError("SIGLA inválida.")
 
-    ts = timezone.localtime().strftime("%Y%m%d%H%M%S")
+    ts = timezone.localtime(momento).strftime("%Y%m%d%H%M%S")
+    partes = [ibge, sigla_up, ts]
+    if sequencial is not None:
+        partes.append(f"{sequencial:05d}")
 
     matricula_up = _alnum_upper(matricula) if matricula else ""
     if matricula_up:
-        return f"{ibge}-{sigla_up}-{ts}-{matricula_up}"
-    return f"{ibge}-{sigla_up}-{ts}"
+        partes.append(matricula_up)
+    return "-".join(partes)
+
+
+def alocar_sequencia(prefeitura_id, sigla: str, ano: int, quantidade: int = 1) -> int:
+    """
+    Reserva `quantidade` números seguidos para (prefeitura, sigla, ano) e
+    devolve o primeiro.
+
+    UPDATE ultimo = ultimo + n seguido da leitura na mesma transação: a
+    linha fica bloqueada até o commit (no SQLite, o banco), então duas
+    alocações concorrentes nunca recebem o mesmo número.
+    """
+    from apps.prefeituras.models import SequenciaProtocolo
+
+    sigla_up = _alnum_upper(sigla)
+    filtro = SequenciaProtocolo.objects.filter(prefeitura_id=prefeitura_id, sigla=sigla_up, ano=ano)
+    for _ in range(3):
+        with transaction.atomic():
+            if filtro.update(ultimo=F("ultimo") + quantidade):
+                return filtro.values_list("ultimo", flat=True).get() - quantidade + 1
+            try:
+                with transaction.atomic():
+                    SequenciaProtocolo.objects.create(prefeitura_id=prefeitura_id, sigla=sigla_up, ano=ano,
+                                                      ultimo=quantidade)
+                return 1
+            except IntegrityError:
+                # outra alocação criou a linha entre o UPDATE e o INSERT: tenta de novo
+                continue
+    raise RuntimeError(f"Não foi possível alocar protocolo {sigla_up}/{ano}.")
+
+
+def novo_protocolo(prefeitura, sigla: str, matricula: str | None = None) -> str:
+    """Protocolo com sequencial alocado para a prefeitura (instância com id e codigo_ibge)."""
+    agora = timezone.localtime()
+    seq = alocar_sequencia(prefeitura.id, sigla, agora.year)
+    return gerar_protocolo(prefeitura.codigo_ibge or "", sigla, matricula=matricula, sequencial=seq, momento=agora)
+
+
+class BlocoProtocolos:
+    """
+    Protocolos pré-alocados para cargas em lote (importações, bulk_create):
+    uma única alocação para `quantidade` registros.
+
+        bloco = BlocoProtocolos(prefeitura, "NOT", len(linhas))
+        for obj in objs:
+            obj.protocolo = bloco.proximo(matricula)
+
+    Se o bloco acabar, reserva outro do mesmo tamanho. Números não usados
+    ficam como lacunas na sequência (não são reaproveitados).
+    """
+
+    def __init__(self, prefeitura, sigla: str, quantidade: int):
+        self.prefeitura = prefeitura
+        self.sigla = sigla
+        self.quantidade = max(1, int(quantidade))
+        self._proximo = self._fim = 0
+        self._ano = None
+
+    def proximo(self, matricula: str | None = None) -> str:
+        agora = timezone.localtime()
+        if self._proximo >= self._fim or self._ano != agora.year:
+            self._ano = agora.year
+            self._proximo = alocar_sequencia(self.prefeitura.id, self.sigla, self._ano, self.quantidade)
+            self._fim = self._proximo + self.quantidade
+        seq = self._proximo
+        self._proximo += 1
+        return gerar_protocolo(self.prefeitura.codigo_ibge or "", self.sigla, matricula=matricula,
+                               sequencial=seq, momento=agora)
 
 
 def gerar_protocolo_para_instance(instance, sigla: str, user_field_names=("criado_por", "criada_por")) -> str:
     """Gera protocolo a partir de uma instance que possua `prefeitura` e
     possivelmente `criado_por` (ou `criada_por`) com `matricula`.
 
-    - Busca `codigo_ibge` em `instance.prefeitura`.
+    - Usa `codigo_ibge` e a sequência de protocolos de `instance.prefeitura`.
     - Tenta encontrar matrícula do usuário criador, checando campos em `user_field_names`.
-    - Usa `gerar_protocolo` para compor no padrão IBGE-SIGLA-AAAA...-MATRICULA.
+    - Usa `novo_protocolo` para compor no padrão IBGE-SIGLA-AAAA...-SSSSS-MATRICULA.
     """
     pref = getattr(instance, "prefeitura", None)
-    ibge = getattr(pref, "codigo_ibge", "") or ""
     matricula = None
     for field in user_field_names:
         user = getattr(instance, field, None)
         if user and getattr(user, "matricula", None):
             matricula = user.matricula
             break
-    return gerar_protocolo(ibge, sigla, matricula=matricula)
+    if pref is None:
+        # Sem prefeitura não há sequência: mantém o comportamento anterior (IBGE vazio é recusado)
+        return gerar_protocolo("", sigla, matricula=matricula)
+    return novo_protocolo(pref, sigla, matricula=matricula)
@@ -0,0 +1,107 @@
+"""
+Réplica de leitura para relatórios, mapa, painel e listagens.
+
+Quando DATABASES tem o alias "replica", as views marcadas com @le_da_replica
+(ou o código dentro de `with usar_replica():`) fazem as leituras na réplica;
+todas as gravações continuam no "default". Sem o alias, nada muda.
+
+Ler o que acabou de gravar: o ReplicaMiddleware anota na sessão o horário de
+cada POST/PUT/PATCH/DELETE e, durante REPLICA_ATRASO_MAX segundos, as views
+dessa sessão voltam a ler do primário (a réplica pode estar atrasada).
+
+Sessões, usuários/auditoria, contenttypes e a tabela do cache (CACHE_BACKEND
+=banco, com as versões dos relatórios e catálogos) são sempre lidos do
+primário: logo após o login a sessão ainda pode não ter chegado à réplica, e
+uma versão atrasada serviria resultado antigo.
+
+Configuração: DB_REPLICA_SQLITE (settings.py, um segundo arquivo SQLite) ou
+DATABASE_REPLICA_URL (settings_producao.py, ex.: standby do PostgreSQL).
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ALIAS = "replica"
+APPS_NO_PRIMARIO = {"sessions", "auth", "contenttypes", "usuarios", "django_cache"}
+CHAVE_SESSAO = "_replica_primario_ate"
+METODOS_LEITURA = {"GET", "HEAD", "OPTIONS", "TRACE"}
+
+_em_uso = contextvars.ContextVar("usar_replica", default=False)
+
+
+def replica_configurada():
+    return ALIAS in settings.DATABASES
+
+
+def em_uso():
+    """True se as leituras do contexto atual vão para a réplica."""
+    return _em_uso.get() and replica_configurada()
+
+
+@contextmanager
+def usar_replica(ativo=True):
+    token = _em_uso.set(ativo)
+    try:
+        yield
+    finally:
+        _em_uso.reset(token)
+
+
+def gravou_recentemente(request):
+    session = getattr(request, "session", None)
+    return session is not None and session.get(CHAVE_SESSAO, 0) > time.time()
+
+
+def le_da_replica(view):
+    """
+    Decorator de view de leitura: consultas de GET/HEAD na réplica, salvo logo
+    após uma gravação da sessão. Outros métodos (ex.: o POST de busca por
+    protocolo em medidas_listar) leem do primário.
+    """
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        with usar_replica(request.method in ("GET", "HEAD") and not gravou_recentemente(request)):
+            return view(request, *args, **kwargs)
+    return _view
+
+
+class RoteadorReplica:
+    def db_for_read(self, model, **hints):
+        if em_uso() and model._meta.app_label not in APPS_NO_PRIMARIO:
+            return ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # explícito: sem isso um objeto lido da réplica seria salvo nela
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # réplica e primário têm os mesmos dados
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # a réplica recebe o esquema pela replicação, não por migrate
+        if db == ALIAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Marca na sessão as gravações para a leitura seguinte sair do primário (depois do SessionMiddleware)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if (request.method not in METODOS_LEITURA and replica_configurada()
+                and user is not None and user.is_authenticated):
+            request.session[CHAVE_SESSAO] = time.time() + settings.REPLICA_ATRASO_MAX
+        return response
@@ -0,0 +1,42 @@
+"""
+Ajustes do SQLite para instalações pequenas (um servidor, poucos usuários).
+
+A cada conexão nova aplica os PRAGMAs de settings.SQLITE_PRAGMAS:
+
+- journal_mode=WAL: leitores não bloqueiam o escritor nem são bloqueados
+  por ele (no modo padrão, DELETE, uma escrita trava o arquivo inteiro);
+- synchronous=NORMAL: em WAL continua seguro contra queda do processo;
+  só o último commit pode se perder numa queda de energia;
+- busy_timeout: espera o lock em vez de falhar na hora com
+  "database is locked";
+- mmap_size / cache_size / temp_store: leituras por memória mapeada e
+  cache de páginas maior por conexão.
+
+Completa o OPTIONS do banco (settings.SQLITE_OPTIONS): transaction_mode
+IMMEDIATE faz toda transação (transaction.atomic) reservar a escrita no
+BEGIN. Sem isso a transação começa como leitura e, ao tentar escrever com
+outra escrita em andamento, falha com "database is locked" sem respeitar o
+busy_timeout.
+
+Um banco pode sobrescrever os PRAGMAs com a chave SQLITE_PRAGMAS no próprio
+DATABASES (usado pelo comando benchmark_sqlite para comparar os modos).
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def pragmas_da_conexao(connection):
+    return connection.settings_dict.get("SQLITE_PRAGMAS", getattr(settings, "SQLITE_PRAGMAS", {}))
+
+
+@receiver(connection_created, dispatch_uid="utils.sqlite.ajustar_conexao")
+def ajustar_conexao(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = pragmas_da_conexao(connection)
+    if not pragmas:
+        return
+    with connection.cursor() as cur:
+        for nome, valor in pragmas.items():
+            cur.execute(f"PRAGMA {nome}={valor}")
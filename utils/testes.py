@@ -0,0 +1,190 @@
+"""
+Apoio aos testes de número de consultas (apps/*/tests.py).
+
+    class MinhaViewTests(ConsultasTestMixin, TestCase):
+        def test_lista(self):
+            self.assertConsultasConstantes(lambda casos: reverse("..."), limite=20)
+
+`semear` cria dados realistas de uma prefeitura: cada "caso" é uma Denúncia
+com apontamentos e fotos, a Notificação gerada dela, o AIF com tipos, itens
+de multa e fotos, e um Embargo e uma Interdição do AIF. `filhos` é quantos
+registros relacionados cada objeto recebe (apontamentos, fotos, itens...).
+
+`assertConsultasConstantes` mede a mesma view com poucos e com muitos dados
+e falha se o número de consultas crescer: uma consulta por linha (N+1)
+quebra o teste em vez de passar despercebida.
+
+`ExecutorTestes` é o TEST_RUNNER do projeto: aplica os ajustes de
+sisalvweb.settings_test durante a execução.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+TAMANHOS = (1, 6)
+
+
+class ExecutorTestes(DiscoverRunner):
+    """DiscoverRunner com AJUSTES_TESTES (cache local, auditoria síncrona, sem METRICAS_DIR) e NIVEIS_LOG_TESTES."""
+
+    def setup_test_environment(self, **kwargs):
+        from sisalvweb.settings_test import AJUSTES_TESTES, NIVEIS_LOG_TESTES
+        super().setup_test_environment(**kwargs)
+        for nome, nivel in NIVEIS_LOG_TESTES.items():
+            logging.getLogger(nome).setLevel(nivel)
+        # fica ativo até o fim do processo: o atexit de utils.metricas ainda
+        # lê METRICAS_DIR depois do teardown
+        override_settings(**AJUSTES_TESTES).enable()
+
+
+def criar_prefeitura(**extra):
+    from apps.prefeituras.models import Prefeitura
+    dados = dict(nome="Prefeitura de Teste", cidade="Maracanaú", sigla_cidade="MRC", codigo_ibge="2307650",
+                 latitude=Decimal("-3.876000"), longitude=Decimal("-38.625000"))
+    dados.update(extra)
+    return Prefeitura.objects.create(**dados)
+
+
+def criar_usuario(prefeitura, email="fiscal@teste.gov.br", **extra):
+    from apps.usuarios.models import Usuario
+    dados = dict(prefeitura=prefeitura, tipo="ADMIN", is_staff=True, matricula=None,
+                 first_name="Fiscal", last_name="Teste")
+    dados.update(extra)
+    return Usuario.objects.create_user(email=email, password="senha-de-teste", **dados)
+
+
+def _arquivo(pasta, i, j):
+    return f"{pasta}/teste-{i}-{j}.jpg"
+
+
+def criar_caso(prefeitura, usuario, i=0, filhos=2):
+    """Denúncia -> Notificação -> AIF -> Embargo/Interdição, cada um com `filhos` relacionados."""
+    from apps.autoinfracao.models import (
+        AutoInfracao, AutoInfracaoAnexo, AutoInfracaoMultaItem, Embargo, EmbargoAnexo, Enquadramento,
+        InfracaoTipo, Interdicao, InterdicaoAnexo,
+    )
+    from apps.denuncias.models import (
+        Denuncia, DenunciaAnexo, DenunciaApontamento, DenunciaApontamentoAnexo, DenunciaHistorico,
+    )
+    from apps.notificacoes.models import Notificacao, NotificacaoAnexo
+
+    agora = timezone.now()
+    lat, lng = -3.87 - i * 0.001, -38.62 - i * 0.001
+    endereco = dict(logradouro=f"Rua {i}", numero=str(100 + i), bairro="Centro", cidade=prefeitura.cidade, uf="CE")
+
+    den = Denuncia.objects.create(
+        prefeitura=prefeitura, criado_por=usuario, denunciado_nome_razao=f"Denunciado {i}",
+        denunciado_cpf_cnpj=f"{i:011d}", denunciado_telefone="85999990000",
+        local_oco_logradouro=endereco["logradouro"], local_oco_numero=endereco["numero"],
+        local_oco_bairro="Centro", local_oco_cidade=prefeitura.cidade, local_oco_uf="CE",
+        local_oco_lat=lat, local_oco_lng=lng, descricao_oco="Obra sem alvará",
+    )
+    den.fiscais.add(usuario)
+    DenunciaHistorico.objects.create(denuncia=den, acao="CRIACAO", feito_por=usuario)
+    for j in range(filhos):
+        DenunciaAnexo.objects.create(denuncia=den, tipo="FOTO", arquivo=_arquivo("denuncias/anexos", i, j),
+                                     hash_sha256=f"den-{i}-{j}")
+        ap = DenunciaApontamento.objects.create(denuncia=den, observacao=f"Vistoria {j}", criado_por=usuario,
+                                                criado_em=agora - timedelta(hours=j))
+        for k in range(filhos):
+            DenunciaApontamentoAnexo.objects.create(apontamento=ap, arquivo=_arquivo("denuncias/apontamentos", i, f"{j}{k}"),
+                                                    hash_sha256=f"ap-{i}-{j}-{k}")
+    DenunciaAnexo.objects.create(denuncia=den, tipo="DOCUMENTO", arquivo=f"denuncias/anexos/doc-{i}.pdf")
+
+    notif = Notificacao.objects.create(
+        prefeitura=prefeitura, denuncia=den, criado_por=usuario, pessoa_tipo="PF",
+        nome_razao=den.denunciado_nome_razao, cpf_cnpj=den.denunciado_cpf_cnpj, descricao="Regularizar a obra",
+        latitude=lat, longitude=lng, prazo_regularizacao=timezone.localdate() + timedelta(days=i % 10 - 3),
+        **endereco,
+    )
+    for j in range(filhos):
+        NotificacaoAnexo.objects.create(notificacao=notif, tipo="FOTO", arquivo=_arquivo("notificacoes/anexos", i, j),
+                                        hash_sha256=f"not-{i}-{j}")
+
+    aif = AutoInfracao.objects.create(
+        prefeitura=prefeitura, denuncia=den, notificacao=notif, criado_por=usuario, pessoa_tipo="PF",
+        nome_razao=den.denunciado_nome_razao, descricao="Auto de infração", latitude=lat, longitude=lng,
+        prazo_regularizacao_data=timezone.localdate() + timedelta(days=30), pago=bool(i % 2),
+        valor_pago=Decimal("150.00") if i % 2 else None, pago_em=timezone.localdate() if i % 2 else None,
+        **endereco,
+    )
+    aif.fiscais.add(usuario)
+    for j in range(filhos):
+        tipo = InfracaoTipo.objects.create(prefeitura=prefeitura, codigo=f"T{i}-{j}", nome=f"Tipo {i}-{j}")
+        aif.tipos.add(tipo)
+        enq = Enquadramento.objects.create(prefeitura=prefeitura, codigo=f"E{i}-{j}", artigo=f"Art. {j}",
+                                           descricao=f"Enquadramento {i}-{j}", valor_base=Decimal("100.00"))
+        AutoInfracaoMultaItem.objects.create(auto_infracao=aif, enquadramento=enq, valor_unitario=Decimal("100.00"))
+        AutoInfracaoAnexo.objects.create(auto_infracao=aif, tipo="FOTO", arquivo=_arquivo("autoinfracao/anexos", i, j),
+                                         hash_sha256=f"aif-{i}-{j}")
+
+    embargo = Embargo.objects.create(prefeitura=prefeitura, auto_infracao=aif, criado_por=usuario, status="VIGENTE",
+                                     prazo_regularizacao_data=timezone.localdate() + timedelta(days=15))
+    interdicao = Interdicao.objects.create(prefeitura=prefeitura, auto_infracao=aif, criado_por=usuario,
+                                           status="VIGENTE", motivo_tipo="FUNCIONAMENTO")
+    for j in range(filhos):
+        EmbargoAnexo.objects.create(embargo=embargo, tipo="FOTO", arquivo=_arquivo("autoinfracao/embargos", i, j))
+        InterdicaoAnexo.objects.create(interdicao=interdicao, tipo="FOTO", arquivo=_arquivo("autoinfracao/interdicoes", i, j))
+    return {"denuncia": den, "notificacao": notif, "aif": aif, "embargo": embargo, "interdicao": interdicao}
+
+
+def semear(prefeitura, usuario, quantidade, filhos=2, inicio=0):
+    """`quantidade` casos completos (ver criar_caso); devolve a lista de casos."""
+    return [criar_caso(prefeitura, usuario, i, filhos) for i in range(inicio, inicio + quantidade)]
+
+
+class ConsultasTestMixin:
+    """Login com prefeitura na sessão e medição de consultas por view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prefeitura = criar_prefeitura()
+        cls.usuario = criar_usuario(cls.prefeitura)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        session = self.client.session
+        session["prefeitura_id"] = self.prefeitura.pk
+        session.save()
+
+    def contar_consultas(self, url):
+        # cache vazio: toda medição calcula do banco (relatórios, catálogos, prefeitura)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            resposta = self.client.get(url)
+            if resposta.streaming:
+                b"".join(resposta.streaming_content)
+        self.assertEqual(resposta.status_code, 200, f"{url} respondeu {resposta.status_code}")
+        return len(ctx), ctx
+
+    def assertConsultasConstantes(self, url_para, limite, preparar=semear, tamanhos=TAMANHOS):
+        """
+        Para cada tamanho, `preparar(prefeitura, usuario, n)` cria os dados e
+        `url_para(dados)` dá a URL medida. O número de consultas não pode
+        crescer com o tamanho nem passar de `limite`.
+        """
+        contagens = []
+        inicio = 0
+        for n in tamanhos:
+            with self.subTest(tamanho=n):
+                dados = preparar(self.prefeitura, self.usuario, n, inicio=inicio)
+                inicio += n
+                url = url_para(dados)
+                total, ctx = self.contar_consultas(url)
+                contagens.append(total)
+                consultas = "\n".join(q["sql"] for q in ctx.captured_queries)
+                self.assertLessEqual(total, limite, f"{url}: {total} consultas (limite {limite})\n{consultas}")
+                self.assertLessEqual(total, contagens[0], f"{url}: {contagens} consultas para os tamanhos "
+                                                          f"{tamanhos[:len(contagens)]}\n{consultas}")
+        return contagens
+
+
+def um_caso(prefeitura, usuario, n, inicio=0):
+    """Preparador das views de detalhe: um caso cujos objetos têm `n` relacionados de cada tipo."""
+    return criar_caso(prefeitura, usuario, inicio, filhos=n)
@@ -0,0 +1,44 @@
+import re
+import unicodedata
+
+from django.db.models import Q
+
+
+_NAO_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def remover_acentos(value):
+    """Remove acentos/diacríticos mantendo as letras base (ex.: 'São João' -> 'Sao Joao')."""
+    s = unicodedata.normalize("NFKD", str(value or ""))
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+
+def normalizar_texto(value):
+    """Minúsculas, sem acentos e só com [a-z0-9] separados por espaço simples."""
+    s = remover_acentos(value).lower()
+    return _NAO_ALNUM.sub(" ", s).strip()
+
+
+def so_digitos(value):
+    """Mantém apenas os dígitos (CPF/CNPJ, telefone, CEP...)."""
+    return re.sub(r"\D+", "", str(value or ""))
+
+
+def prefixo_q(campo, prefixo):
+    """
+    Q de busca por prefixo como faixa [prefixo, prefixo+1), que usa índice
+    B-tree em qualquer banco (LIKE 'x%' depende de collation/opclass).
+    Pensado para colunas já normalizadas (dígitos ou texto sem acentos).
+    """
+    fim = prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+    return Q(**{f"{campo}__gte": prefixo, f"{campo}__lt": fim})
+
+
+def incluir_campos_derivados(kwargs, origem, derivados):
+    """
+    Em save(update_fields=[...]) que altera algum campo de `origem`,
+    acrescenta os campos `derivados` (colunas normalizadas) à gravação.
+    """
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and set(update_fields) & set(origem):
+        kwargs["update_fields"] = set(update_fields) | set(derivados)